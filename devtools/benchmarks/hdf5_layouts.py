@@ -0,0 +1,106 @@
+"""Compare the compression codecs and chunk layouts of the HDF5 format.
+
+For each combination, this writes a trajectory to a temporary file and
+reports the size of the file and the time to write it, to read all of it, to
+read single frames, and to read the time series of a few atoms. The
+trajectory is either a file given on the command line (with a topology, if
+it needs one) or random coordinates.
+
+    python devtools/benchmarks/hdf5_layouts.py [-t top.pdb] [traj.xtc]
+"""
+from __future__ import print_function, division
+import os
+import time
+import shutil
+import tempfile
+import itertools
+from argparse import ArgumentParser
+
+import numpy as np
+import tables
+import mdtraj as md
+from mdtraj.formats import HDF5TrajectoryFile
+
+
+def timeit(f, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.time()
+        f()
+        best = min(best, time.time() - start)
+    return best
+
+
+def benchmark(xyz, compression, chunkshape, filename):
+    n_frames, n_atoms = xyz.shape[:2]
+    rng = np.random.RandomState(0)
+    frames = rng.randint(n_frames, size=20)
+    atoms = np.sort(rng.choice(n_atoms, size=min(n_atoms, 5), replace=False))
+
+    def write():
+        with HDF5TrajectoryFile(filename, 'w', compression=compression,
+                                chunkshape=chunkshape) as f:
+            f.write(xyz)
+
+    def read_all():
+        with HDF5TrajectoryFile(filename) as f:
+            f.read()
+
+    def read_frames():
+        with HDF5TrajectoryFile(filename) as f:
+            for frame in frames:
+                f.seek(frame)
+                f.read(n_frames=1)
+
+    def read_atoms():
+        with HDF5TrajectoryFile(filename) as f:
+            f.read(atom_indices=atoms)
+
+    t_write = timeit(write, repeat=1)
+    return (os.path.getsize(filename) / 1e6, t_write, timeit(read_all),
+            timeit(read_frames) / len(frames), timeit(read_atoms))
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('traj', nargs='?', help='trajectory to benchmark with')
+    parser.add_argument('-t', '--top', help='topology for the trajectory')
+    parser.add_argument('--n-frames', type=int, default=2000,
+                        help='number of random frames, without a trajectory')
+    parser.add_argument('--n-atoms', type=int, default=5000,
+                        help='number of random atoms, without a trajectory')
+    args = parser.parse_args()
+
+    if args.traj is not None:
+        kwargs = {} if args.top is None else {'top': args.top}
+        xyz = md.load(args.traj, **kwargs).xyz
+    else:
+        # a random walk, so that it compresses roughly like a trajectory
+        rng = np.random.RandomState(0)
+        xyz = rng.uniform(0, 5, size=(1, args.n_atoms, 3)) + np.cumsum(
+            rng.normal(0, 0.01, size=(args.n_frames, args.n_atoms, 3)), axis=0)
+        xyz = xyz.astype(np.float32)
+    print('%d frames, %d atoms (%.1f MB uncompressed)\n' % (
+          xyz.shape[0], xyz.shape[1], xyz.nbytes / 1e6))
+
+    codecs = ['zlib', None] + [c for c in ['lz4', 'zstd', 'blosclz']
+                               if c in tables.blosc_compressor_list()]
+    layouts = [None, 'frames', 'atoms']
+    print('%-8s %-7s %9s %9s %9s %12s %11s' % (
+          'codec', 'layout', 'size/MB', 'write/s', 'read/s', 'frame/ms', 'atoms/s'))
+
+    tempdir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tempdir, 'benchmark.h5')
+        for compression, chunkshape in itertools.product(codecs, layouts):
+            size, t_write, t_read, t_frame, t_atoms = benchmark(
+                xyz, compression, chunkshape, filename)
+            print('%-8s %-7s %9.1f %9.3f %9.3f %12.3f %11.3f' % (
+                  compression, chunkshape, size, t_write, t_read,
+                  t_frame * 1e3, t_atoms))
+    finally:
+        shutil.rmtree(tempdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -49,8 +49,8 @@ from mdtraj.formats.hoomdxml import load_hoomdxml
 
 
 from mdtraj.core import element
-from mdtraj._rmsd import rmsd
-from mdtraj._lprmsd import lprmsd
+from mdtraj._rmsd import rmsd, rmsd_matrix
+from mdtraj._lprmsd import lprmsd, LPRMSDReference
 from mdtraj.core.topology import Topology
 from mdtraj.geometry import *
 from mdtraj.core.trajectory import *
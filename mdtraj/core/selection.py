@@ -24,8 +24,11 @@ from __future__ import print_function
 import re
 import ast
 import sys
+import operator
+import numbers
 from copy import deepcopy
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+import numpy as np
 from mdtraj.utils.six import PY2
 from mdtraj.utils.external.pyparsing import (Word, ParserElement, MatchFirst,
     Keyword, opAssoc, quotedString, alphas, alphanums, infixNotation, Group,
@@ -45,6 +48,9 @@ RE_MODULE = ast.Name(id='re', ctx=ast.Load(), SINGLETON=True)
 SELECTION_GLOBALS = {'re': re}
 _ParsedSelection = namedtuple('_ParsedSelection', ['expr', 'source', 'astnode'])
 
+# Number of parsed selection strings that parse_selection remembers
+SELECTION_CACHE_SIZE = 256
+
 # ############################################################################
 # Utils
 # ############################################################################
@@ -254,6 +260,204 @@ class RangeCondition(object):
                            comparators=[self._from.ast(), self._to.ast()])
 
 
+##############################################################################
+# Vectorized evaluation
+##############################################################################
+
+class Categorical(object):
+    """A column of (typically string) values stored as the distinct values,
+    and the index of the value of each atom into them.
+    """
+    def __init__(self, values, codes):
+        self.values = values
+        self.codes = codes
+
+    @classmethod
+    def from_list(cls, items):
+        lookup = {}
+        codes = np.empty(len(items), dtype=np.intp)
+        for i, item in enumerate(items):
+            codes[i] = lookup.setdefault(item, len(lookup))
+        values = [None] * len(lookup)
+        for item, code in lookup.items():
+            values[code] = item
+        return cls(values, codes)
+
+    def map(self, func):
+        """Apply a function that returns a bool to each distinct value, and
+        get the result for each atom
+
+        Parameters
+        ----------
+        func : callable
+            The function to apply to each distinct value. It is called once
+            per value, not once per atom.
+
+        Returns
+        -------
+        mask : np.ndarray, dtype=bool
+            The value of `func` for each atom.
+        """
+        lookup = np.array([bool(func(v)) for v in self.values], dtype=bool)
+        return lookup[self.codes]
+
+    def materialize(self):
+        values = np.empty(len(self.values), dtype=object)
+        for i, value in enumerate(self.values):
+            values[i] = value
+        return values[self.codes]
+
+
+def _is_column(value):
+    return isinstance(value, (np.ndarray, Categorical))
+
+
+def _as_categorical(column):
+    if isinstance(column, Categorical):
+        return column
+    values, codes = np.unique(column, return_inverse=True)
+    return Categorical(values.tolist(), codes)
+
+
+def _v_truth(value):
+    if isinstance(value, Categorical):
+        return value.map(bool)
+    if isinstance(value, np.ndarray):
+        return value.astype(bool)
+    return bool(value)
+
+
+def _reduce(func, values):
+    result = values[0]
+    for value in values[1:]:
+        result = func(result, value)
+    return result
+
+
+def _v_and(*values):
+    return _reduce(np.logical_and, [_v_truth(v) for v in values])
+
+
+def _v_or(*values):
+    return _reduce(np.logical_or, [_v_truth(v) for v in values])
+
+
+def _v_not(value):
+    return np.logical_not(_v_truth(value))
+
+
+def _v_compare(left, op, right):
+    op = _COMPARISON_OPERATORS[op]
+    if _is_column(left) and _is_column(right):
+        if isinstance(left, Categorical):
+            left = left.materialize()
+        if isinstance(right, Categorical):
+            right = right.materialize()
+        return np.asarray(op(left, right), dtype=bool)
+
+    if _is_column(left):
+        column, value = left, right
+        func = lambda v: op(v, value)
+    elif _is_column(right):
+        column, value = right, left
+        func = lambda v: op(value, v)
+    else:
+        return op(left, right)
+
+    if (isinstance(column, np.ndarray) and isinstance(value, numbers.Number)
+            and column.dtype.kind in 'biuf'):
+        return np.asarray(op(left, right), dtype=bool)
+    # anything else, like comparing strings, is done once per distinct value
+    # with the same semantics as the comparison on each atom
+    return _as_categorical(column).map(func)
+
+
+def _v_match(pattern, column):
+    if not _is_column(column):
+        return re.match(pattern, column) is not None
+    return _as_categorical(column).map(lambda v: re.match(pattern, v) is not None)
+
+
+_COMPARISON_OPERATORS = {
+    'Lt': operator.lt, 'LtE': operator.le, 'Eq': operator.eq,
+    'NotEq': operator.ne, 'GtE': operator.ge, 'Gt': operator.gt,
+}
+VECTORIZED_GLOBALS = {
+    '_v_and': _v_and, '_v_or': _v_or, '_v_not': _v_not,
+    '_v_compare': _v_compare, '_v_match': _v_match, '_v_truth': _v_truth,
+}
+COLUMNS = ast.Name(id='columns', ctx=ast.Load(), SINGLETON=True)
+
+
+def _call(name, args):
+    return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=args,
+                    keywords=[], starargs=None, kwargs=None)
+
+
+class _Vectorize(ast.NodeTransformer):
+    """Rewrite a parsed selection, which tests a single atom, into an
+    expression that tests all of the atoms at once.
+
+    Each attribute chain like `atom.residue.name` becomes a lookup of the
+    column `columns['residue.name']`, which is either a numpy array or a
+    `Categorical`, and the boolean operators and comparisons become
+    functions that operate on whole columns.
+    """
+    def visit_Attribute(self, node):
+        attrs = []
+        while isinstance(node, ast.Attribute):
+            attrs.append(node.attr)
+            node = node.value
+        assert isinstance(node, ast.Name) and node.id == THIS_ATOM.id
+        return ast.Subscript(value=COLUMNS, ctx=ast.Load(), slice=ast.Index(
+            value=ast.Str(s='.'.join(reversed(attrs)))))
+
+    def visit_BoolOp(self, node):
+        name = '_v_and' if isinstance(node.op, ast.And) else '_v_or'
+        return _call(name, [self.visit(v) for v in node.values])
+
+    def visit_UnaryOp(self, node):
+        assert isinstance(node.op, ast.Not)
+        return _call('_v_not', [self.visit(node.operand)])
+
+    def visit_Compare(self, node):
+        # regular expression match (see RegexInfixOperand)
+        if (isinstance(node.left, ast.Call) and
+                isinstance(node.left.func, ast.Attribute) and
+                getattr(node.left.func.value, 'id', None) == RE_MODULE.id):
+            return _call('_v_match', [self.visit(a) for a in node.left.args])
+
+        # a chained comparison like `a <= b <= c` is `a <= b and b <= c`
+        operands = [self.visit(node.left)] + [self.visit(c) for c in node.comparators]
+        comparisons = [
+            _call('_v_compare', [operands[i], ast.Str(s=type(op).__name__),
+                                 operands[i + 1]])
+            for i, op in enumerate(node.ops)]
+        if len(comparisons) == 1:
+            return comparisons[0]
+        return _call('_v_and', comparisons)
+
+
+def _vectorize(astnode):
+    astnode = _Vectorize().visit(deepcopy(astnode))
+    if PY2:
+        args = [ast.Name(id='columns', ctx=ast.Param())]
+        signature = ast.arguments(args=args, vararg=None, kwarg=None,
+                                  defaults=[])
+    else:
+        args = [ast.arg(arg='columns', annotation=None)]
+        signature = ast.arguments(args=args, vararg=None, kwarg=None,
+                                  kwonlyargs=[], defaults=[],
+                                  kw_defaults=[])
+    func = ast.Expression(body=ast.Lambda(signature, _call('_v_truth', [astnode])))
+    return eval(compile(ast.fix_missing_locations(func), '<string>', mode='eval'),
+                VECTORIZED_GLOBALS)
+
+
+##############################################################################
+# Parser
+##############################################################################
+
 class parse_selection(object):
     """Parse an atom selection expression
 
@@ -281,11 +485,17 @@ class parse_selection(object):
     >>> source
     '(atom.residue.is_protein and (atom.element.symbol == CA))'
     >>> <_ast.BoolOp at 0x103969d50>
+
+    Notes
+    -----
+    The most recently used selection strings are cached, so parsing the
+    same string again is cheap.
     """
 
     def __init__(self):
         self.is_initialized = False
         self.expression = None
+        self._cache = OrderedDict()
 
     def _initialize(self):
 
@@ -341,6 +551,47 @@ class parse_selection(object):
         self.transformer = _RewriteNames()
 
     def __call__(self, selection):
+        return self._lookup(selection)[0]
+
+    def vectorized(self, selection):
+        """Parse an atom selection expression into a function that evaluates
+        it for all of the atoms at once.
+
+        Parameters
+        ----------
+        selection : str
+            Selection string, a string in the MDTraj atom selection grammer.
+
+        Returns
+        -------
+        expr : callable (columns -> np.ndarray of bool)
+            A callable object which accepts a mapping from the attributes of
+            the atoms, joined by dots (e.g. 'residue.name'), to arrays of
+            their values for every atom, and returns a boolean mask of the
+            atoms that satisfy the selection string, or a single bool for
+            selections like 'all' that don't depend on the atoms. The arrays
+            are numpy arrays or, for strings and other objects,
+            `Categorical`s.
+        """
+        return self._lookup(selection)[1]
+
+    def _lookup(self, selection):
+        try:
+            result = self._cache.pop(selection)
+        except KeyError:
+            parsed = self._parse(selection)
+            result = (parsed, _vectorize(parsed.astnode))
+        except TypeError:
+            # not hashable, so it's not a string and can't be parsed anyway
+            parsed = self._parse(selection)
+            return (parsed, _vectorize(parsed.astnode))
+
+        self._cache[selection] = result
+        while len(self._cache) > SELECTION_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
+    def _parse(self, selection):
         if not self.is_initialized:
             self._initialize()
 
@@ -50,6 +50,9 @@
 from __future__ import print_function, division
 
 import itertools
+import numbers
+import operator
+from collections import namedtuple, OrderedDict
 import numpy as np
 import os
 import xml.etree.ElementTree as etree
@@ -57,8 +60,8 @@ import xml.etree.ElementTree as etree
 from mdtraj.core import element as elem
 from mdtraj.core.residue_names import (_PROTEIN_RESIDUES, _WATER_RESIDUES,
                                        _AMINO_ACID_CODES)
-from mdtraj.core.selection import parse_selection
-from mdtraj.utils import ilen, import_, ensure_type
+from mdtraj.core.selection import parse_selection, Categorical
+from mdtraj.utils import import_, ensure_type
 from mdtraj.utils.six import string_types
 
 ##############################################################################
@@ -83,17 +86,26 @@ def _topology_from_subset(topology, atom_indices):
     atom_indices : list([int])
         The indices of the atoms to keep
     """
+    if isinstance(topology, Topology):
+        return topology.subset(atom_indices)
+
     newTopology = Topology()
     old_atom_to_new_atom = {}
+    atom_indices = set(atom_indices)
 
     for chain in topology._chains:
-        newChain = newTopology.add_chain()
+        newChain = None
         for residue in chain._residues:
-            resSeq = getattr(residue, 'resSeq', None) or residue.index
-            newResidue = newTopology.add_residue(residue.name, newChain,
-                                                 resSeq)
+            newResidue = None
             for atom in residue._atoms:
                 if atom.index in atom_indices:
+                    # only add the chains and residues that keep some atoms
+                    if newChain is None:
+                        newChain = newTopology.add_chain()
+                    if newResidue is None:
+                        resSeq = getattr(residue, 'resSeq', None) or residue.index
+                        newResidue = newTopology.add_residue(residue.name,
+                                                             newChain, resSeq)
                     try:  # OpenMM Topology objects don't have serial attributes, so we have to check first.
                         serial = atom.serial
                     except AttributeError:
@@ -115,20 +127,179 @@ def _topology_from_subset(topology, atom_indices):
             # we only put bonds into the new topology if both of their partners
             # were indexed and thus HAVE a new atom
 
+    return newTopology
 
-    # Delete empty residues
-    newTopology._residues = [r for r in newTopology._residues if len(r._atoms) > 0]
-    for chain in newTopology._chains:
-        chain._residues = [r for r in chain._residues if len(r._atoms) > 0]
 
-    # Delete empty chains
-    newTopology._chains = [c for c in newTopology._chains
-                           if len(c._residues) > 0]
-    # Re-set the numAtoms and numResidues
-    newTopology._numAtoms = ilen(newTopology.atoms)
-    newTopology._numResidues = ilen(newTopology.residues)
+def _make_column(values, codes=None):
+    """Store a list of values as an array if they are numbers, or otherwise as
+    a Categorical. If `codes` is given, the result is `values[codes]`."""
+    if all(issubclass(t, numbers.Number) for t in set(map(type, values))):
+        column = np.array(values)
+        if codes is not None:
+            column = column[codes]
+        return column
 
-    return newTopology
+    column = Categorical.from_list(values)
+    if codes is not None:
+        column = Categorical(column.values, column.codes[codes])
+    return column
+
+
+class _AtomColumns(object):
+    """The mapping that a vectorized selection reads the attributes of all of
+    the atoms in a topology from."""
+    def __init__(self, topology):
+        self.topology = topology
+
+    def __getitem__(self, path):
+        return self.topology._atom_column(path)
+
+
+class _Array(object):
+    """A numpy array that can be appended to in amortized constant time.
+
+    Only the first `len(self)` rows of the underlying array are used, and
+    `data` is a view of them.
+    """
+    def __init__(self, dtype, row_shape=(), data=None):
+        if data is None:
+            data = np.empty((16,) + row_shape, dtype=dtype)
+            self._size = 0
+        else:
+            data = np.array(data, dtype=dtype).reshape((-1,) + row_shape)
+            self._size = len(data)
+        self._data = data
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        return self._data[index]
+
+    def __setitem__(self, index, value):
+        self._data[index] = value
+
+    @property
+    def data(self):
+        return self._data[:self._size]
+
+    def _reserve(self, size):
+        if size > len(self._data):
+            data = np.empty((max(size, 2 * len(self._data)),) +
+                            self._data.shape[1:], dtype=self._data.dtype)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+
+    def append(self, value):
+        if self._size == len(self._data):
+            self._reserve(self._size + 1)
+        self._data[self._size] = value
+        self._size += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        self._reserve(self._size + len(values))
+        self._data[self._size:self._size + len(values)] = values
+        self._size += len(values)
+
+    def copy(self):
+        return _Array(self._data.dtype, self._data.shape[1:], self.data)
+
+
+class _Codes(object):
+    """A table of distinct values, like atom names, which are stored in the
+    topology's arrays by their integer code: their index in `values`."""
+    def __init__(self, values=()):
+        self.values = list(values)
+        self._lookup = dict((v, i) for i, v in enumerate(self.values))
+
+    def code(self, value):
+        try:
+            return self._lookup[value]
+        except KeyError:
+            self._lookup[value] = len(self.values)
+            self.values.append(value)
+            return len(self.values) - 1
+
+    def codes(self, values):
+        """Get the codes of many values at once
+
+        Parameters
+        ----------
+        values : iterable
+            The values. Those that are not in the table yet are added to it.
+
+        Returns
+        -------
+        codes : np.ndarray, dtype=int32
+            The code of each value.
+        """
+        values = list(values)
+        for value in set(values):
+            self.code(value)
+        return np.fromiter(map(self._lookup.__getitem__, values),
+                           dtype=np.int32, count=len(values))
+
+    def copy(self):
+        return _Codes(self.values)
+
+
+# atom serial number of atoms that don't have one
+_NO_SERIAL = np.iinfo(np.int64).min
+
+
+def _serial_number(serial):
+    if serial is None or serial != serial:  # None or NaN, e.g. from pandas
+        return _NO_SERIAL
+    return int(serial)
+
+
+def _object_array(values):
+    """Make a 1D object array, even of values like elements, which are
+    tuples that numpy would otherwise turn into a 2D array"""
+    if isinstance(values, np.ndarray) and values.ndim == 1:
+        return values.astype(object)
+    values = list(values)
+    out = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        out[i] = value
+    return out
+
+
+# attributes of residues that are computed from just their name, for
+# Topology._atom_column
+_RESIDUE_NAME_ATTRIBUTES = {
+    'residue.is_protein': lambda name: name in _PROTEIN_RESIDUES,
+    'residue.is_water': lambda name: name in _WATER_RESIDUES,
+    'residue.code': lambda name: _AMINO_ACID_CODES.get(name)
+                                 if name in _PROTEIN_RESIDUES else None,
+}
+
+
+# the order of the chains, residues and atoms of a topology
+_Structure = namedtuple('_Structure', ['residue_order', 'residue_rank',
+                                       'chain_offsets', 'atom_order',
+                                       'residue_offsets'])
+
+
+def _check_index(index, n):
+    """Check an index into a sequence of length n, like list does, and make
+    it non-negative"""
+    index = operator.index(index)
+    if index < 0:
+        index += n
+    if not 0 <= index < n:
+        raise IndexError('index out of range')
+    return index
+
+
+def _decode(table, codes):
+    """Get an object array of the values with the given codes in a _Codes"""
+    return _object_array(table.values)[codes]
+
+
+def _sorted_rows(array):
+    return array[np.lexsort(array.T[::-1])]
 
 
 ##############################################################################
@@ -186,12 +357,30 @@ class Topology(object):
 
     def __init__(self):
         """Create a new Topology object"""
-        self._chains = []
-        self._numResidues = 0
-        self._numAtoms = 0
-        self._bonds = []
-        self._atoms = []
-        self._residues = []
+        # the atoms are stored by their index in these arrays. Atom names,
+        # elements and residue names are stored as codes into tables of the
+        # distinct values
+        self._atom_name = _Array(np.int32)
+        self._atom_element = _Array(np.int16)
+        self._atom_residue = _Array(np.int32)
+        self._atom_serial = _Array(np.int64)
+        self._residue_name = _Array(np.int32)
+        self._residue_resSeq = _Array(np.int64)
+        self._residue_chain = _Array(np.int32)
+        self._bond = _Array(np.int32, (2,))
+        self._atom_names = _Codes()
+        self._residue_names = _Codes()
+        self._elements = _Codes()
+        self._n_chains = 0
+        # attributes of the atoms, as arrays, for selections (see _atom_column)
+        self._columns = {}
+        # the order of the chains, residues and atoms (see _structure)
+        self._index = {}
+        # values derived from the topology, like the atom indices of its
+        # dihedrals, which are kept until it's modified (see _cached)
+        self._cache = {}
+        # whether the arrays are shared with another topology (see _share)
+        self._shared = False
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -216,19 +405,117 @@ class Topology(object):
             A copy of this topology
         """
         out = Topology()
-        for chain in self.chains:
-            c = out.add_chain()
-            for residue in chain.residues:
-                r = out.add_residue(residue.name, c, residue.resSeq)
-                for atom in residue.atoms:
-                    out.add_atom(atom.name, atom.element, r,
-                                 serial=atom.serial)
+        out.__dict__.update(self.__dict__)
+        out._shared = True
+        out._unshare()
+        return out
 
-        for a1, a2 in self.bonds:
-            out.add_bond(a1, a2)
+    def _share(self):
+        """Get a topology that shares this one's arrays, instead of copying
+        them.
 
+        This is much faster than copy() for large topologies. The two stay
+        identical until either of them is modified, which first gives the
+        topology being modified its own copy of the arrays (see _modify).
+
+        Returns
+        -------
+        out : Topology
+            A topology that is equal to this one
+        """
+        out = Topology()
+        out.__dict__.update(self.__dict__)
+        out._shared = self._shared = True
         return out
 
+    def _unshare(self):
+        """Copy the arrays that this topology shares with others (see
+        _share), so that it can be modified."""
+        if not self._shared:
+            return
+        for name, value in list(self.__dict__.items()):
+            if isinstance(value, (_Array, _Codes)):
+                setattr(self, name, value.copy())
+        self._columns = {}
+        self._index = dict(self._index)
+        self._cache = {}
+        self._shared = False
+
+    def _modify(self, structure=False):
+        """Prepare to modify the topology's arrays. `structure` is whether the
+        chains that the residues belong to, or the residues that the atoms
+        belong to, will change."""
+        self._unshare()
+        self._columns.clear()
+        self._cache.clear()
+        if structure:
+            self._index.clear()
+
+    def _structure(self):
+        """Get the order in which the chains, residues and atoms are
+        iterated over: chain by chain, then residue by residue within each
+        chain, then by index.
+
+        Returns
+        -------
+        structure : _Structure
+            `residue_order` is the indices of the residues, in order.
+            The residues of the chain with index `i` are
+            `residue_order[chain_offsets[i]:chain_offsets[i+1]]`.
+            `residue_rank` is the position of each residue in
+            `residue_order`. `atom_order` is the indices of the atoms, in
+            order, and the atoms of a residue at position `j` in
+            `residue_order` are
+            `atom_order[residue_offsets[j]:residue_offsets[j+1]]`.
+        """
+        try:
+            return self._index['structure']
+        except KeyError:
+            pass
+
+        residue_chain = self._residue_chain.data
+        atom_residue = self._atom_residue.data
+        residue_order = np.argsort(residue_chain, kind='mergesort')
+        residue_rank = np.empty_like(residue_order)
+        residue_rank[residue_order] = np.arange(len(residue_order))
+        atom_order = np.argsort(residue_rank[atom_residue], kind='mergesort')
+        chain_offsets = np.zeros(self._n_chains + 1, dtype=np.intp)
+        np.cumsum(np.bincount(residue_chain, minlength=self._n_chains),
+                  out=chain_offsets[1:])
+        residue_offsets = np.zeros(len(residue_order) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(atom_residue, minlength=len(residue_order))
+                  [residue_order], out=residue_offsets[1:])
+
+        structure = _Structure(residue_order, residue_rank, chain_offsets,
+                               atom_order, residue_offsets)
+        self._index['structure'] = structure
+        return structure
+
+    def _cached(self, key, compute):
+        """Get a value derived from the topology, like the atom indices of
+        its dihedrals, which is computed by `compute(self)` the first time
+        that it's asked for, and then cached under `key` until the topology
+        is modified. The value is shared by every caller, so it mustn't be
+        modified in place."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = compute(self)
+            return value
+
+    @property
+    def _numAtoms(self):
+        return len(self._atom_name)
+
+    @property
+    def _numResidues(self):
+        return len(self._residue_name)
+
+    @property
+    def _bonds(self):
+        """The indices of the atoms in each bond, shape=(n_bonds, 2)"""
+        return self._bond.data
+
     def __copy__(self, *args):
         return self.copy()
 
@@ -236,12 +523,8 @@ class Topology(object):
         return self.copy()
 
     def __hash__(self):
-        hash_value = hash(tuple(self._chains))
-        hash_value ^= hash(tuple(self._atoms))
-        hash_value ^= hash(tuple(self._bonds))
-        hash_value ^= hash(tuple(self._residues))
-
-        return hash_value
+        return hash((self.n_chains, self.n_residues, self.n_atoms,
+                     self.n_bonds))
 
     def join(self, other):
         """Join two topologies together
@@ -261,19 +544,21 @@ class Topology(object):
             raise ValueError('other must be an instance of Topology to join')
         out = self.copy()
 
-        atom_mapping = {}
-        for chain in other.chains:
-            c = out.add_chain()
-            for residue in chain.residues:
-                r = out.add_residue(residue.name, c, residue.resSeq)
-                for atom in residue.atoms:
-                    a = out.add_atom(atom.name, atom.element, r,
-                                     serial=atom.serial)
-                    atom_mapping[atom] = a
-
-        for a1, a2 in other.bonds:
-            out.add_bond(atom_mapping[a1], atom_mapping[a2])
-
+        # translate the other topology's codes into ours
+        atom_names = out._atom_names.codes(other._atom_names.values)
+        elements = out._elements.codes(other._elements.values)
+        residue_names = out._residue_names.codes(other._residue_names.values)
+
+        out._atom_name.extend(atom_names[other._atom_name.data])
+        out._atom_element.extend(elements[other._atom_element.data])
+        out._atom_residue.extend(other._atom_residue.data + self.n_residues)
+        out._atom_serial.extend(other._atom_serial.data)
+        out._residue_name.extend(residue_names[other._residue_name.data])
+        out._residue_resSeq.extend(other._residue_resSeq.data)
+        out._residue_chain.extend(other._residue_chain.data + self.n_chains)
+        out._bond.extend(other._bond.data + self.n_atoms)
+        out._n_chains += other._n_chains
+        out._index.clear()
         return out
 
     def to_fasta(self, chain=None):
@@ -295,9 +580,9 @@ class Topology(object):
         if chain is not None:
             if not isinstance(chain, int):
                 raise ValueError('chain must be an Integer.')
-            return fasta(self._chains[chain])
+            return fasta(self.chain(chain))
         else:
-            return [fasta(c) for c in self._chains]
+            return [fasta(c) for c in self.chains]
 
     def to_openmm(self, traj=None):
         """Convert this topology into OpenMM topology
@@ -395,14 +680,27 @@ class Topology(object):
             of the indices of the atoms involved in each bond.
         """
         pd = import_('pandas')
-        data = [(atom.serial, atom.name, atom.element.symbol,
-                 atom.residue.resSeq, atom.residue.name,
-                 atom.residue.chain.index) for atom in self.atoms]
-
-        atoms = pd.DataFrame(data, columns=["serial", "name", "element",
-                                            "resSeq", "resName", "chainID"])
-
-        bonds = np.array([(a.index, b.index) for (a, b) in self.bonds])
+        order = self._structure().atom_order
+        residues = self._atom_residue.data[order]
+
+        serial = self._atom_serial.data[order]
+        if np.any(serial == _NO_SERIAL):
+            serial = np.array([None if s == _NO_SERIAL else s
+                               for s in serial.tolist()], dtype=object)
+
+        symbols = np.array([e.symbol for e in self._elements.values] + [None],
+                           dtype=object)
+        atoms = pd.DataFrame(OrderedDict([
+            ('serial', serial),
+            ('name', _decode(self._atom_names, self._atom_name.data[order])),
+            ('element', symbols[self._atom_element.data[order]]),
+            ('resSeq', self._residue_resSeq.data[residues]),
+            ('resName', _decode(self._residue_names,
+                                self._residue_name.data[residues])),
+            ('chainID', self._residue_chain.data[residues].astype(np.int64)),
+        ]))
+
+        bonds = self._bond.data.astype(np.int64)
         return atoms, bonds
 
     @classmethod
@@ -449,32 +747,46 @@ class Topology(object):
         if not np.all(np.arange(len(atoms)) == atoms.index):
             raise ValueError('atoms must be uniquely numbered '
                              'starting from zero.')
-        out._atoms = [None for i in range(len(atoms))]
 
-        for ci in np.unique(atoms['chainID']):
-            chain_atoms = atoms[atoms['chainID'] == ci]
-            c = out.add_chain()
+        # the chains are numbered in order of chainID, and the residues in
+        # order of chainID then resSeq
+        _, chain = np.unique(np.asarray(atoms['chainID']), return_inverse=True)
+        _, resSeq = np.unique(np.asarray(atoms['resSeq']), return_inverse=True)
+        key = chain.astype(np.int64) * (resSeq.max() + 1 if len(resSeq) else 1) + resSeq
+        keys, first, residue = np.unique(key, return_index=True,
+                                         return_inverse=True)
+
+        residue_name = out._residue_names.codes(atoms['resName'])
+        mismatch = residue_name != residue_name[first][residue]
+        if np.any(mismatch):
+            i = np.flatnonzero(mismatch)[0]
+            raise ValueError('All of the atoms with residue index %d '
+                             'do not share the same residue name'
+                             % atoms['resSeq'].iloc[i])
+
+        symbols = _Codes()
+        element = symbols.codes(atoms['element'])
+        elements = [elem.get_by_symbol(symbol) for symbol in symbols.values]
+
+        serial = np.asarray(atoms['serial'])
+        if serial.dtype.kind not in 'iu':
+            serial = [_serial_number(s) for s in serial]
+
+        out._atom_name.extend(out._atom_names.codes(atoms['name']))
+        out._atom_element.extend(out._elements.codes(elements)[element])
+        out._atom_residue.extend(residue)
+        out._atom_serial.extend(serial)
+        out._residue_name.extend(residue_name[first])
+        out._residue_resSeq.extend(np.asarray(atoms['resSeq'])[first])
+        out._residue_chain.extend(chain[first])
+        out._n_chains = len(np.unique(chain))
+
+        bonds = np.asarray(bonds, dtype=np.int64).reshape(-1, 2)
+        bonds = np.where(bonds < 0, bonds + len(atoms), bonds)
+        if np.any((bonds < 0) | (bonds >= len(atoms))):
+            raise IndexError('bonds must be between atoms in the topology')
+        out._bond.extend(np.sort(bonds, axis=1))
 
-            for ri in np.unique(chain_atoms['resSeq']):
-                residue_atoms = chain_atoms[chain_atoms['resSeq'] == ri]
-                rnames = residue_atoms['resName']
-                residue_name = np.array(rnames)[0]
-                if not np.all(rnames == residue_name):
-                    raise ValueError('All of the atoms with residue index %d '
-                                     'do not share the same residue name' % ri)
-                r = out.add_residue(residue_name, c, ri)
-
-                for atom_index, atom in residue_atoms.iterrows():
-                    atom_index = int(atom_index)  # Fixes bizarre hashing issue on Py3K.  See #545
-                    a = Atom(atom['name'], elem.get_by_symbol(atom['element']),
-                             atom_index, r, serial=atom['serial'])
-                    out._atoms[atom_index] = a
-                    r._atoms.append(a)
-
-        for ai1, ai2 in bonds:
-            out.add_bond(out.atom(ai1), out.atom(ai2))
-
-        out._numAtoms = out.n_atoms
         return out
 
     def to_bondgraph(self):
@@ -519,46 +831,39 @@ class Topology(object):
         if self is other:
             return True
 
-        if len(self._chains) != len(other._chains):
+        if self.n_chains != other.n_chains:
             return False
-
-        for c1, c2 in zip(self.chains, other.chains):
-            if c1.index != c2.index:
-                return False
-            if len(c1._residues) != len(c2._residues):
-                return False
-
-            for r1, r2 in zip(c1.residues, c2.residues):
-                if (r1.index != r1.index) or (r1.name != r2.name):  # or (r1.resSeq != r2.resSeq):
-                    return False
-                if len(r1._atoms) != len(r2._atoms):
-                    return False
-
-                for a1, a2 in zip(r1.atoms, r2.atoms):
-                    if (a1.index != a2.index) or (a1.name != a2.name):
-                        return False
-                    if a1.element is not a2.element:
-                        return False
-                    # for attr in ['atomic_number', 'name', 'symbol']:
-                    #     if getattr(a1.element, attr) != getattr(a2.element, attr):
-                    #         return False
-
-        if len(self._bonds) != len(other._bonds):
+        if (self.n_residues != other.n_residues or
+                self.n_atoms != other.n_atoms or
+                self.n_bonds != other.n_bonds):
             return False
 
-        # the bond ordering is somewhat ambiguous, so try and fix it for comparison
-        self_sorted_bonds = sorted([(a1.index, b1.index)
-                                    for (a1, b1) in self.bonds])
-        other_sorted_bonds = sorted([(a2.index, b2.index)
-                                     for (a2, b2) in other.bonds])
+        # compare the residues, and then the atoms, in the order that they
+        # are iterated over
+        s1, s2 = self._structure(), other._structure()
+        if not (np.array_equal(s1.chain_offsets, s2.chain_offsets) and
+                np.array_equal(s1.residue_offsets, s2.residue_offsets) and
+                np.array_equal(s1.atom_order, s2.atom_order)):
+            return False
 
-        for i in range(len(self._bonds)):
-            (a1, b1) = self_sorted_bonds[i]
-            (a2, b2) = other_sorted_bonds[i]
-            if (a1 != a2) or (b1 != b2):
-                return False
+        if not np.array_equal(
+                _decode(self._residue_names,
+                        self._residue_name.data[s1.residue_order]),
+                _decode(other._residue_names,
+                        other._residue_name.data[s2.residue_order])):
+            return False
+        if not np.array_equal(
+                _decode(self._atom_names, self._atom_name.data),
+                _decode(other._atom_names, other._atom_name.data)):
+            return False
+        elements1 = _decode(self._elements, self._atom_element.data)
+        elements2 = _decode(other._elements, other._atom_element.data)
+        if not all(e1 is e2 for e1, e2 in zip(elements1, elements2)):
+            return False
 
-        return True
+        # the bond ordering is somewhat ambiguous, so try and fix it for comparison
+        return np.array_equal(_sorted_rows(self._bond.data),
+                              _sorted_rows(other._bond.data))
 
     def add_chain(self):
         """Create a new Chain and add it to the Topology.
@@ -568,9 +873,9 @@ class Topology(object):
         chain : mdtraj.topology.Chain
             the newly created Chain
         """
-        chain = Chain(len(self._chains), self)
-        self._chains.append(chain)
-        return chain
+        self._modify(structure=True)
+        self._n_chains += 1
+        return Chain(self._n_chains - 1, self)
 
     def add_residue(self, name, chain, resSeq=None):
         """Create a new Residue and add it to the Topology.
@@ -592,13 +897,14 @@ class Topology(object):
         residue : mdtraj.topology.Residue
             The newly created Residue
         """
+        self._modify(structure=True)
+        index = len(self._residue_name)
         if resSeq is None:
-            resSeq = self._numResidues
-        residue = Residue(name, self._numResidues, chain, resSeq)
-        self._residues.append(residue)
-        self._numResidues += 1
-        chain._residues.append(residue)
-        return residue
+            resSeq = index
+        self._residue_name.append(self._residue_names.code(name))
+        self._residue_resSeq.append(resSeq)
+        self._residue_chain.append(chain.index)
+        return Residue(index, self)
 
     def add_atom(self, name, element, residue, serial=None):
         """Create a new Atom and add it to the Topology.
@@ -619,13 +925,15 @@ class Topology(object):
         atom : mdtraj.topology.Atom
             the newly created Atom
         """
+        self._modify(structure=True)
         if element is None:
             element = elem.virtual
-        atom = Atom(name, element, self._numAtoms, residue, serial=serial)
-        self._atoms.append(atom)
-        self._numAtoms += 1
-        residue._atoms.append(atom)
-        return atom
+        index = len(self._atom_name)
+        self._atom_name.append(self._atom_names.code(name))
+        self._atom_element.append(self._elements.code(element))
+        self._atom_residue.append(residue.index)
+        self._atom_serial.append(_serial_number(serial))
+        return Atom(index, self)
 
     def add_bond(self, atom1, atom2):
         """Create a new bond and add it to the Topology.
@@ -637,10 +945,11 @@ class Topology(object):
         atom2 : mdtraj.topology.Atom
             The second Atom connected by the bond
         """
+        self._modify()
         if atom1.index < atom2.index:
-            self._bonds.append((atom1, atom2))
+            self._bond.append((atom1.index, atom2.index))
         else:
-            self._bonds.append((atom2, atom1))
+            self._bond.append((atom2.index, atom1.index))
 
     def chain(self, index):
         """Get a specific chain by index.  These indices
@@ -656,7 +965,7 @@ class Topology(object):
         chain : Chain
             The `index`-th chain in the topology.
         """
-        return self._chains[index]
+        return Chain(_check_index(index, self._n_chains), self)
 
     @property
     def chains(self):
@@ -667,12 +976,12 @@ class Topology(object):
         chainiter : listiterator
             Iterator over all Chains in the Topology.
         """
-        return iter(self._chains)
+        return (Chain(i, self) for i in range(self._n_chains))
 
     @property
     def n_chains(self):
         """Get the number of chains in the Topology"""
-        return len(self._chains)
+        return self._n_chains
 
     def residue(self, index):
         """Get a specific residue by index.  These indices
@@ -688,7 +997,7 @@ class Topology(object):
         residue : Residue
             The `index`-th residue in the topology.
         """
-        return self._residues[index]
+        return Residue(_check_index(index, len(self._residue_name)), self)
 
     @property
     def residues(self):
@@ -699,14 +1008,13 @@ class Topology(object):
         residueiter : generator
             Iterator over all Residues in the Topology.
         """
-        for chain in self._chains:
-            for residue in chain._residues:
-                yield residue
+        for i in self._structure().residue_order.tolist():
+            yield Residue(i, self)
 
     @property
     def n_residues(self):
         """Get the number of residues in the Topology. """
-        return len(self._residues)
+        return len(self._residue_name)
 
     def atom(self, index):
         """Get a specific atom by index. These indices
@@ -722,7 +1030,7 @@ class Topology(object):
         atom : Atom
             The `index`-th atom in the topology.
         """
-        return self._atoms[index]
+        return Atom(_check_index(index, len(self._atom_name)), self)
 
     @property
     def atoms(self):
@@ -733,10 +1041,8 @@ class Topology(object):
         atomiter : generator
             Iterator over all Atoms in the Topology.
         """
-        for chain in self._chains:
-            for residue in chain._residues:
-                for atom in residue._atoms:
-                    yield atom
+        for i in self._structure().atom_order.tolist():
+            yield Atom(i, self)
 
     def atoms_by_name(self, name):
         """Iterator over all Atoms in the Topology with a specified name
@@ -762,7 +1068,7 @@ class Topology(object):
     @property
     def n_atoms(self):
         """Get the number of atoms in the Topology"""
-        return len(self._atoms)
+        return len(self._atom_name)
 
     @property
     def bonds(self):
@@ -773,12 +1079,13 @@ class Topology(object):
         atomiter : generator
             Iterator over all tuple of Atoms in the Trajectory involved in a bond.
         """
-        return iter(self._bonds)
+        return ((Atom(a, self), Atom(b, self))
+                for a, b in self._bond.data.tolist())
 
     @property
     def n_bonds(self):
         """Get the number of bonds in the Topology"""
-        return len(self._bonds)
+        return len(self._bond)
 
     def create_standard_bonds(self):
         """Create bonds based on the atom and residue names for all standard residue types.
@@ -793,27 +1100,28 @@ class Topology(object):
                 Topology._standardBonds[residue.attrib['name']] = bonds
                 for bond in residue.findall('Bond'):
                     bonds.append((bond.attrib['from'], bond.attrib['to']))
-        for chain in self._chains:
+        for chain in self.chains:
             # First build a map of atom names to atoms.
 
+            residues = list(chain.residues)
             atomMaps = []
-            for residue in chain._residues:
+            for residue in residues:
                 atomMap = {}
                 atomMaps.append(atomMap)
-                for atom in residue._atoms:
+                for atom in residue.atoms:
                     atomMap[atom.name] = atom
 
             # Loop over residues and construct bonds.
 
-            for i in range(len(chain._residues)):
-                name = chain._residues[i].name
+            for i in range(len(residues)):
+                name = residues[i].name
                 if name in Topology._standardBonds:
                     for bond in Topology._standardBonds[name]:
                         if bond[0].startswith('-') and i > 0:
                             fromResidue = i-1
                             fromAtom = bond[0][1:]
                         elif (bond[0].startswith('+')
-                              and i < len(chain._residues)):
+                              and i < len(residues)):
                             fromResidue = i+1
                             fromAtom = bond[0][1:]
                         else:
@@ -823,7 +1131,7 @@ class Topology(object):
                             toResidue = i-1
                             toAtom = bond[1][1:]
                         elif (bond[1].startswith('+')
-                              and i < len(chain._residues)):
+                              and i < len(residues)):
                             toResidue = i+1
                             toAtom = bond[1][1:]
                         else:
@@ -844,17 +1152,17 @@ class Topology(object):
         """
 
         def isCyx(res):
-            names = [atom.name for atom in res._atoms]
+            names = [atom.name for atom in res.atoms]
             return 'SG' in names and 'HG' not in names
 
         cyx = [res for res in self.residues
                if res.name == 'CYS' and isCyx(res)]
-        atomNames = [[atom.name for atom in res._atoms] for res in cyx]
+        atomNames = [[atom.name for atom in res.atoms] for res in cyx]
         for i in range(len(cyx)):
-            sg1 = cyx[i]._atoms[atomNames[i].index('SG')]
+            sg1 = cyx[i].atom(atomNames[i].index('SG'))
             pos1 = positions[sg1.index]
             for j in range(i):
-                sg2 = cyx[j]._atoms[atomNames[j].index('SG')]
+                sg2 = cyx[j].atom(atomNames[j].index('SG'))
                 pos2 = positions[sg2.index]
                 delta = [x-y for (x, y) in zip(pos1, pos2)]
                 distance = np.sqrt(
@@ -875,7 +1183,43 @@ class Topology(object):
             A list of the indices corresponding to the atoms in that you'd
             like to retain.
         """
-        return _topology_from_subset(self, atom_indices)
+        structure = self._structure()
+        keep = np.zeros(self.n_atoms, dtype=bool)
+        keep[np.asarray(atom_indices, dtype=int)] = True
+
+        # the atoms, residues and chains that are kept are renumbered in the
+        # order in which they are iterated over
+        atoms = structure.atom_order[keep[structure.atom_order]]
+        atom_index = np.empty(self.n_atoms, dtype=np.int32)
+        atom_index[atoms] = np.arange(len(atoms))
+
+        keep_residue = np.zeros(self.n_residues, dtype=bool)
+        keep_residue[self._atom_residue.data[atoms]] = True
+        residues = structure.residue_order[keep_residue[structure.residue_order]]
+        residue_index = np.empty(self.n_residues, dtype=np.int32)
+        residue_index[residues] = np.arange(len(residues))
+
+        keep_chain = np.zeros(self.n_chains, dtype=bool)
+        keep_chain[self._residue_chain.data[residues]] = True
+        chain_index = np.cumsum(keep_chain) - 1
+
+        bonds = self._bond.data
+        bonds = np.sort(atom_index[bonds[keep[bonds].all(axis=1)]], axis=1)
+
+        out = Topology()
+        out._atom_names = self._atom_names.copy()
+        out._residue_names = self._residue_names.copy()
+        out._elements = self._elements.copy()
+        out._atom_name.extend(self._atom_name.data[atoms])
+        out._atom_element.extend(self._atom_element.data[atoms])
+        out._atom_residue.extend(residue_index[self._atom_residue.data[atoms]])
+        out._atom_serial.extend(self._atom_serial.data[atoms])
+        out._residue_name.extend(self._residue_name.data[residues])
+        out._residue_resSeq.extend(self._residue_resSeq.data[residues])
+        out._residue_chain.extend(chain_index[self._residue_chain.data[residues]])
+        out._bond.extend(bonds)
+        out._n_chains = int(np.count_nonzero(keep_chain))
+        return out
 
     def select_expression(self, selection_string):
         """Translate a atom selection expression into a pure python expression.
@@ -923,9 +1267,81 @@ class Topology(object):
         select_expression, mdtraj.core.selection.parse_selection
         """
 
-        filter_func = parse_selection(selection_string).expr
-        indices = np.array([a.index for a in self.atoms if filter_func(a)])
-        return indices
+        filter_func = parse_selection.vectorized(selection_string)
+        mask = filter_func(_AtomColumns(self))
+        mask = np.broadcast_to(mask, (self.n_atoms,))
+        return np.nonzero(mask)[0]
+
+    def _atom_column(self, path):
+        """Get the value of an attribute of every atom, as an array.
+
+        Parameters
+        ----------
+        path : str
+            The attribute, as it would be looked up from an atom. For
+            example, 'name', 'residue.name' or 'residue.chain.index'.
+
+        Returns
+        -------
+        column : np.ndarray or mdtraj.core.selection.Categorical
+            Numeric attributes are returned as an array, and any others as a
+            Categorical, which stores each distinct value only once.
+        """
+        if path in self._columns:
+            return self._columns[path]
+
+        residue = self._atom_residue.data
+        if path == 'index':
+            column = np.arange(self.n_atoms)
+        elif path == 'name':
+            column = Categorical(self._atom_names.values, self._atom_name.data)
+        elif path == 'element':
+            column = Categorical(self._elements.values,
+                                 self._atom_element.data)
+        elif path == 'n_bonds':
+            column = np.bincount(self._bond.data.ravel(),
+                                 minlength=self.n_atoms)
+        elif path in ('is_backbone', 'is_sidechain'):
+            backbone = self._atom_column('name').map(
+                lambda name: name in set(['C', 'CA', 'N', 'O']))
+            if path == 'is_sidechain':
+                backbone = ~backbone
+            column = backbone & self._atom_column('residue.is_protein')
+        elif path == 'residue':
+            column = Categorical([Residue(i, self)
+                                  for i in range(self.n_residues)], residue)
+        elif path == 'residue.index':
+            column = residue
+        elif path == 'residue.name':
+            column = Categorical(self._residue_names.values,
+                                 self._residue_name.data[residue])
+        elif path in _RESIDUE_NAME_ATTRIBUTES:
+            # these only depend on the residue name
+            names = self._atom_column('residue.name')
+            func = _RESIDUE_NAME_ATTRIBUTES[path]
+            column = _make_column([func(n) for n in names.values], names.codes)
+        elif path == 'residue.resSeq':
+            column = self._residue_resSeq.data[residue]
+        elif path == 'residue.chain':
+            column = Categorical([Chain(i, self) for i in range(self.n_chains)],
+                                 self._residue_chain.data[residue])
+        elif path == 'residue.chain.index':
+            column = self._residue_chain.data[residue]
+        elif '.' in path:
+            # look up the rest of the path on only the distinct owners, like
+            # the residues or elements, and then broadcast back to the atoms
+            head, attr = path.rsplit('.', 1)
+            owners = self._atom_column(head)
+            if not isinstance(owners, Categorical):
+                owners = Categorical.from_list(owners.tolist())
+            column = _make_column(list(map(operator.attrgetter(attr),
+                                           owners.values)), owners.codes)
+        else:
+            column = _make_column([getattr(Atom(i, self), path)
+                                   for i in range(self.n_atoms)])
+
+        self._columns[path] = column
+        return column
 
     def select_atom_indices(self, selection='minimal'):
         """Get the indices of biologically-relevant groups by name.
@@ -1031,6 +1447,10 @@ class Topology(object):
 class Chain(object):
     """A Chain object represents a chain within a Topology.
 
+    Chains, like residues and atoms, are lightweight views of the arrays in
+    which the Topology stores its data. They are created on demand, so two
+    Chain objects for the same chain compare equal, but are not identical.
+
     Attributes
     ----------
     index : int
@@ -1042,14 +1462,27 @@ class Chain(object):
     atoms : generator
         Iterator over all Atoms in the Chain.
     """
+    __slots__ = ('topology', 'index')
 
     def __init__(self, index, topology):
         """Construct a new Chain.  You should call add_chain() on the Topology instead of calling this directly."""
-        # The index of the Chain within its Topology
-        self.index = index
         # The Topology this Chain belongs to
         self.topology = topology
-        self._residues = []
+        # The index of the Chain within its Topology
+        self.index = index
+
+    @property
+    def _residue_indices(self):
+        structure = self.topology._structure()
+        start, stop = structure.chain_offsets[self.index:self.index + 2]
+        return structure.residue_order[start:stop]
+
+    @property
+    def _atom_indices(self):
+        structure = self.topology._structure()
+        start, stop = structure.chain_offsets[self.index:self.index + 2]
+        start, stop = structure.residue_offsets[[start, stop]]
+        return structure.atom_order[start:stop]
 
     @property
     def residues(self):
@@ -1060,7 +1493,8 @@ class Chain(object):
         residueiter : listiterator
             Iterator over all Residues in the Topology.
         """
-        return iter(self._residues)
+        topology = self.topology
+        return (Residue(i, topology) for i in self._residue_indices.tolist())
 
     def residue(self, index):
         """Get a specific residue in this Chain.
@@ -1074,12 +1508,12 @@ class Chain(object):
         -------
         residue : Residue
         """
-        return self._residues[index]
+        return Residue(int(self._residue_indices[index]), self.topology)
 
     @property
     def n_residues(self):
         """Get the number of residues in this Chain. """
-        return len(self._residues)
+        return len(self._residue_indices)
 
     @property
     def atoms(self):
@@ -1090,9 +1524,8 @@ class Chain(object):
         atomiter : generator
             Iterator over all Atoms in the Chain.
         """
-        for residue in self._residues:
-            for atom in residue._atoms:
-                yield atom
+        topology = self.topology
+        return (Atom(i, topology) for i in self._atom_indices.tolist())
 
     def atoms_by_name(self, name):
         """Iterator over all Atoms in the Chain with a specified name.
@@ -1127,14 +1560,23 @@ class Chain(object):
         -------
         atom : Atom
         """
-        # this could be made faster by caching the list
-        # of atoms internally if necessary
-        return next(itertools.islice(self.atoms, index, index + 1))
+        return Atom(int(self._atom_indices[index]), self.topology)
 
     @property
     def n_atoms(self):
         """Get the number of atoms in this Chain"""
-        return sum(r.n_atoms for r in self._residues)
+        return len(self._atom_indices)
+
+    def __eq__(self, other):
+        if not isinstance(other, Chain):
+            return NotImplemented
+        return self.topology is other.topology and self.index == other.index
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((id(self.topology), self.index))
 
 
 class Residue(object):
@@ -1151,15 +1593,55 @@ class Residue(object):
     resSeq : int
         The residue sequence number
     """
+    __slots__ = ('_topology', 'index')
 
-    def __init__(self, name, index, chain, resSeq):
+    def __init__(self, index, topology):
         """Construct a new Residue.  You should call add_residue()
         on the Topology instead of calling this directly."""
-        self.name = name
+        self._topology = topology
         self.index = index
-        self.chain = chain
-        self.resSeq = resSeq
-        self._atoms = []
+
+    @property
+    def name(self):
+        """The name of the Residue"""
+        topology = self._topology
+        return topology._residue_names.values[topology._residue_name[self.index]]
+
+    @name.setter
+    def name(self, value):
+        topology = self._topology
+        topology._modify()
+        topology._residue_name[self.index] = topology._residue_names.code(value)
+
+    @property
+    def chain(self):
+        """The chain within which this residue belongs"""
+        topology = self._topology
+        return Chain(int(topology._residue_chain[self.index]), topology)
+
+    @chain.setter
+    def chain(self, value):
+        topology = self._topology
+        topology._modify(structure=True)
+        topology._residue_chain[self.index] = value.index
+
+    @property
+    def resSeq(self):
+        """The residue sequence number"""
+        return int(self._topology._residue_resSeq[self.index])
+
+    @resSeq.setter
+    def resSeq(self, value):
+        topology = self._topology
+        topology._modify()
+        topology._residue_resSeq[self.index] = value
+
+    @property
+    def _atom_indices(self):
+        structure = self._topology._structure()
+        position = structure.residue_rank[self.index]
+        start, stop = structure.residue_offsets[position:position + 2]
+        return structure.atom_order[start:stop]
 
     @property
     def atoms(self):
@@ -1170,7 +1652,8 @@ class Residue(object):
         atomiter : listiterator
             Iterator over all Atoms in the Residue.
         """
-        return iter(self._atoms)
+        topology = self._topology
+        return (Atom(i, topology) for i in self._atom_indices.tolist())
 
     def atoms_by_name(self, name):
         """Iterator over all Atoms in the Residue with a specified name
@@ -1207,18 +1690,18 @@ class Residue(object):
         -------
         atom : Atom
         """
+        if not isinstance(index_or_name, string_types):
+            return Atom(int(self._atom_indices[index_or_name]),
+                        self._topology)
         try:
-            return self._atoms[index_or_name]
-        except TypeError:
-            try:
-                return next(self.atoms_by_name(index_or_name))
-            except StopIteration:
-                raise KeyError('no matching atom found')
+            return next(self.atoms_by_name(index_or_name))
+        except StopIteration:
+            raise KeyError('no matching atom found')
 
     @property
     def n_atoms(self):
         """Get the number of atoms in this Residue"""
-        return len(self._atoms)
+        return len(self._atom_indices)
 
     @property
     def is_protein(self):
@@ -1250,6 +1733,17 @@ class Residue(object):
         """Whether the residue is one found in nucleic acids."""
         raise NotImplementedError
 
+    def __eq__(self, other):
+        if not isinstance(other, Residue):
+            return NotImplemented
+        return self._topology is other._topology and self.index == other.index
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((id(self._topology), self.index))
+
     def __str__(self):
         return '%s%s' % (self.name, self.resSeq)
 
@@ -1274,26 +1768,70 @@ class Atom(object):
         The serial number from the PDB specification. Unlike index,
         this may not be contiguous or 0-indexed.
     """
+    __slots__ = ('_topology', 'index')
 
-    def __init__(self, name, element, index, residue, serial=None):
+    def __init__(self, index, topology):
         """Construct a new Atom.  You should call add_atom() on the Topology instead of calling this directly."""
-        # The name of the Atom
-        self.name = name
-        # That Atom's element
-        self.element = element
+        self._topology = topology
         # The index of the Atom within its Topology
         self.index = index
-        # The Residue this Atom belongs to
-        self.residue = residue
-        # The not-necessarily-contiguous "serial" number from the PDB spec
-        self.serial = serial
+
+    @property
+    def name(self):
+        """The name of the Atom"""
+        topology = self._topology
+        return topology._atom_names.values[topology._atom_name[self.index]]
+
+    @name.setter
+    def name(self, value):
+        topology = self._topology
+        topology._modify()
+        topology._atom_name[self.index] = topology._atom_names.code(value)
+
+    @property
+    def element(self):
+        """That Atom's element"""
+        topology = self._topology
+        return topology._elements.values[topology._atom_element[self.index]]
+
+    @element.setter
+    def element(self, value):
+        if value is None:
+            value = elem.virtual
+        topology = self._topology
+        topology._modify()
+        topology._atom_element[self.index] = topology._elements.code(value)
+
+    @property
+    def residue(self):
+        """The Residue this Atom belongs to"""
+        topology = self._topology
+        return Residue(int(topology._atom_residue[self.index]), topology)
+
+    @residue.setter
+    def residue(self, value):
+        topology = self._topology
+        topology._modify(structure=True)
+        topology._atom_residue[self.index] = value.index
+
+    @property
+    def serial(self):
+        """The not-necessarily-contiguous "serial" number from the PDB spec"""
+        serial = self._topology._atom_serial[self.index]
+        if serial == _NO_SERIAL:
+            return None
+        return int(serial)
+
+    @serial.setter
+    def serial(self, value):
+        topology = self._topology
+        topology._modify()
+        topology._atom_serial[self.index] = _serial_number(value)
 
     @property
     def n_bonds(self):
         """Number of bonds in which the atom participates."""
-        # TODO: this info could be cached.
-        return ilen(bond for bond in self.residue.chain.topology.bonds
-                    if self in bond)
+        return int(self._topology._atom_column('n_bonds')[self.index])
 
     @property
     def is_backbone(self):
@@ -59,6 +59,8 @@ from mdtraj.core.residue_names import _SOLVENT_TYPES
 from mdtraj.utils import (ensure_type, in_units_of, lengths_and_angles_to_box_vectors,
                           box_vectors_to_lengths_and_angles, cast_indices,
                           deprecated)
+from mdtraj.utils.lazy import LazyArray
+from mdtraj.utils.zipped import is_zipped, unzipped
 from mdtraj.utils.six.moves import xrange
 from mdtraj.utils.six import PY3, string_types
 from mdtraj import _rmsd
@@ -73,6 +75,13 @@ __all__ = ['open', 'load', 'iterload', 'load_frame', 'load_topology', 'Trajector
 # supported extensions for constructing topologies
 _TOPOLOGY_EXTS = ['.pdb', '.pdb.gz', '.h5','.lh5', '.prmtop', '.parm7',
                   '.psf', '.mol2', '.hoomdxml', '.gro', '.arc']
+# formats whose readers release the GIL while decoding, so that several
+# files can be read at once from threads in a single process
+_NOGIL_EXTS = ['.xtc', '.trr', '.dcd', '.dtr']
+# formats whose file objects can count their frames without reading the
+# coordinates (from a header, index or offset table)
+_CHEAP_LEN_EXTS = ['.xtc', '.trr', '.dcd', '.dtr', '.h5', '.hdf5',
+                   '.nc', '.netcdf', '.ncdf', '.binpos']
 
 
 ##############################################################################
@@ -146,6 +155,59 @@ def load_topology(filename):
     return _parse_topology(filename)
 
 
+def _share_topology(topology):
+    """Get a topology for a new trajectory that is derived from one with
+    `topology`, without copying it (see Topology._share)
+    """
+    if isinstance(topology, Topology):
+        return topology._share()
+    return deepcopy(topology)
+
+
+def _copy_array(array):
+    """Copy an array of a trajectory, for Trajectory.slice. LazyArrays are
+    computed from read-only data, so they don't need to be copied.
+    """
+    if array is None or isinstance(array, LazyArray):
+        return array
+    return array.copy()
+
+
+def _check_lazy_shape(array, shape, name):
+    """Check the shape of a LazyArray, like ensure_type does for arrays.
+    None in `shape` matches any length.
+    """
+    if len(array.shape) != len(shape) or any(
+            expected is not None and expected != actual
+            for expected, actual in zip(shape, array.shape)):
+        raise ValueError('%s must be shape %s. You supplied %s' % (
+            name, str(shape).replace('None', 'Any'), str(array.shape)))
+
+
+def _load_lazy(xyz, topology, unitcell_lengths=None, unitcell_angles=None,
+               stride=None, frame=None):
+    """Create a trajectory from LazyArrays of all of the frames in a file,
+    for the loaders' mmap=True mode. `stride` and `frame` are as in the
+    loaders.
+    """
+    if frame is not None:
+        frame = int(frame)
+        if not 0 <= frame < len(xyz):
+            raise IndexError('frame %d is out of range for a file with %d '
+                             'frames' % (frame, len(xyz)))
+        key = slice(frame, frame + 1)
+    else:
+        key = slice(None, None, stride)
+
+    if unitcell_lengths is not None:
+        unitcell_lengths = unitcell_lengths[key]
+        unitcell_angles = unitcell_angles[key]
+    return Trajectory(xyz=xyz[key], topology=topology,
+                      time=np.arange(len(xyz))[key],
+                      unitcell_lengths=unitcell_lengths,
+                      unitcell_angles=unitcell_angles)
+
+
 def _parse_topology(top):
     """Get the topology from a argument of indeterminate type
     If top is a string, we try loading a pdb, if its a trajectory
@@ -336,6 +398,20 @@ def load(filename_or_filenames, discard_overlapping_frames=False, **kwargs):
         If not none, then read only a subset of the atoms coordinates from the
         file. This may be slightly slower than the standard read because it
         requires an extra copy, but will save memory.
+    n_jobs : int, default=1
+        When loading more than one file, the number of files to read
+        concurrently. If -1, use one worker per CPU. XTC, TRR, DCD and DTR
+        files are read by threads, and other formats by worker processes.
+        When the number of frames in each file can be found cheaply, the
+        files are read into a single preallocated trajectory, which avoids
+        the extra copy made by ``Trajectory.join``. The XTC, TRR, DCD and
+        DTR frames are decoded straight into it.
+
+    Notes
+    -----
+    Files of any format can be compressed with gzip or bzip2, e.g.
+    ``traj.xtc.gz``. Text formats that support it, like PDB, are read as they
+    are decompressed. Other files are first decompressed to a temporary file.
 
     See Also
     --------
@@ -364,6 +440,7 @@ def load(filename_or_filenames, discard_overlapping_frames=False, **kwargs):
 
     if "top" in kwargs:  # If applicable, pre-loads the topology from PDB for major performance boost.
         kwargs["top"] = _parse_topology(kwargs["top"])
+    n_jobs = kwargs.pop('n_jobs', 1)
 
     # grab the extension of the filename
     if isinstance(filename_or_filenames, string_types):  # If a single filename
@@ -377,6 +454,9 @@ def load(filename_or_filenames, discard_overlapping_frames=False, **kwargs):
         elif len(set(extensions)) > 1:
             raise TypeError("Each filename must have the same extension. "
                             "Received: %s" % ', '.join(set(extensions)))
+        elif n_jobs != 1 and len(filename_or_filenames) > 1:
+            return _load_parallel(filename_or_filenames, n_jobs,
+                                  discard_overlapping_frames, **kwargs)
         else:
             # we know the topology is equal because we sent the same topology
             # kwarg in. Therefore, we explictly throw away the topology on all
@@ -393,6 +473,11 @@ def load(filename_or_filenames, discard_overlapping_frames=False, **kwargs):
                                         discard_overlapping_frames=discard_overlapping_frames,
                                         check_topology=False)
 
+    if extension not in _FormatRegistry.loaders and is_zipped(filename):
+        # a compressed file of a format whose loader can't decompress it
+        with unzipped(filename) as uncompressed:
+            return load(uncompressed, **kwargs)
+
     try:
         #loader = _LoaderRegistry[extension][0]
         loader = _FormatRegistry.loaders[extension]
@@ -421,6 +506,200 @@ def load(filename_or_filenames, discard_overlapping_frames=False, **kwargs):
     return value
 
 
+def _load_one(args):
+    """Load a single file; the unit of work for `_load_parallel`"""
+    filename, kwargs = args
+    return load(filename, **kwargs)
+
+
+def _overlapping(args):
+    """Whether the last frame that `load` returns for one file matches the
+    first frame of the next, like in `Trajectory.join`, or None if either
+    frame can't be read; a unit of work for `_load_parallel`"""
+    filename, index, next_filename, kwargs = args
+    frames = []
+    for fn, i in [(filename, index), (next_filename, 0)]:
+        try:
+            frame = load_frame(fn, i, top=kwargs.get('top'),
+                               atom_indices=kwargs.get('atom_indices'))
+        except (IOError, OSError, RuntimeError, ValueError):
+            return None
+        if len(frame) == 0:
+            return None
+        frames.append(frame.xyz[0])
+    return bool(np.all(np.abs(frames[1] - frames[0]) < 2e-3))
+
+
+def _read_into_one(args):
+    """Read a whole file into `out` with its read_into() method; a unit of
+    work for `_load_parallel`"""
+    filename, out, stride, atom_indices = args
+    with open(filename) as f:
+        return f.read_into(out, stride=stride, atom_indices=atom_indices)
+
+
+def _n_frames_in_file(filename, stride=None):
+    """Number of frames that `load` will return for a file, if it can be found
+    without reading the coordinates, otherwise None."""
+    if _get_extension(filename) not in _CHEAP_LEN_EXTS:
+        return None
+    try:
+        with open(filename) as f:
+            n_frames = len(f)
+    except (NotImplementedError, IOError):
+        return None
+    stride = 1 if stride is None else stride
+    return (n_frames + stride - 1) // stride
+
+
+def _load_parallel(filenames, n_jobs, discard_overlapping_frames, **kwargs):
+    """Load several files concurrently, and concatenate them along the frame
+    axis.
+
+    When the length of every file is known up front, one set of arrays is
+    preallocated for the result. The formats whose readers release the GIL
+    (and have a read_into() method) are decoded by threads straight into
+    their slices of it. The others are loaded by processes, and each loaded
+    trajectory is copied into its slice and dropped, so that at most
+    `n_jobs` single-file trajectories are alive in addition to the result.
+    Overlapping frames are found beforehand, by loading just the frames at
+    the boundaries of the files, so they're never put in the result.
+    Otherwise, if the lengths aren't known, the trajectories are joined at
+    the end.
+    """
+    from multiprocessing import Pool, cpu_count
+    from multiprocessing.pool import ThreadPool
+    import threading
+
+    extension = _get_extension(filenames[0])
+    if n_jobs is None or n_jobs < 1:
+        n_jobs = cpu_count()
+    n_jobs = min(n_jobs, len(filenames))
+    use_threads = extension in _NOGIL_EXTS
+    pool = ThreadPool(n_jobs) if use_threads else Pool(n_jobs)
+    jobs = [(f, kwargs) for f in filenames]
+
+    try:
+        stride = kwargs.get('stride', None)
+        sizes = [_n_frames_in_file(f, stride) for f in filenames]
+        if any(n is None for n in sizes):
+            trajectories = pool.map(_load_one, jobs)
+            for t in trajectories[1:]:
+                t.topology = None
+            return trajectories[0].join(trajectories[1:],
+                                        discard_overlapping_frames=discard_overlapping_frames,
+                                        check_topology=False)
+
+        # overlapping[i] is whether the last frame of file i is dropped, or
+        # None if that couldn't be decided, because one of the frames at the
+        # boundary couldn't be read
+        overlapping = [False] * len(filenames)
+        if discard_overlapping_frames:
+            boundaries = [i for i in range(len(filenames) - 1)
+                          if sizes[i] > 0 and sizes[i+1] > 0]
+            found = pool.map(_overlapping, [
+                (filenames[i], (sizes[i] - 1) * (stride or 1), filenames[i+1], kwargs)
+                for i in boundaries])
+            for i, value in zip(boundaries, found):
+                overlapping[i] = value
+        n_kept = [n - 1 if o else n for n, o in zip(sizes, overlapping)]
+        starts = np.concatenate([[0], np.cumsum(n_kept)]).astype(int)
+
+        out = {}
+        lock = threading.Lock()
+        topologies = [None] * len(filenames)
+        have_unitcell = [None] * len(filenames)
+        # the headers may disagree with the number of frames that can actually
+        # be read (e.g. a DCD whose writer was killed). such files are kept
+        # aside, rather than overflowing into the next file's slice
+        mismatched = {}
+
+        def allocate(n_atoms, time_dtype):
+            # the time array (and for the formats that contain their own
+            # topology, the others) is allocated when the first trajectory
+            # arrives, since only then are its dtype and the number of atoms
+            # known
+            with lock:
+                if 'xyz' not in out:
+                    out['xyz'] = np.empty((starts[-1], n_atoms, 3), dtype=np.float32)
+                    out['unitcell_lengths'] = np.empty((starts[-1], 3), dtype=np.float32)
+                    out['unitcell_angles'] = np.empty((starts[-1], 3), dtype=np.float32)
+                if 'time' not in out and time_dtype is not None:
+                    out['time'] = np.empty(starts[-1], dtype=time_dtype)
+
+        def store(i, t, in_place=False):
+            allocate(t.n_atoms, t.time.dtype)
+            if t.n_atoms != out['xyz'].shape[1]:
+                raise ValueError('Number of atoms in %s (%d) is not equal to the '
+                                 'number of atoms in the other files (%d)' % (
+                                     filenames[i], t.n_atoms, out['xyz'].shape[1]))
+            topologies[i] = t.topology
+            have_unitcell[i] = t._have_unitcell
+            if len(t) != (n_kept[i] if in_place else sizes[i]):
+                mismatched[i] = t
+                return
+            s = slice(starts[i], starts[i+1])
+            n = n_kept[i]
+            if not in_place:
+                out['xyz'][s] = t.xyz[:n]
+            out['time'][s] = t.time[:n]
+            if t._have_unitcell:
+                out['unitcell_lengths'][s] = t.unitcell_lengths[:n]
+                out['unitcell_angles'][s] = t.unitcell_angles[:n]
+
+        direct = use_threads and 'top' in kwargs and \
+            set(kwargs) <= set(['top', 'stride', 'atom_indices'])
+        if direct:
+            # decode the frames straight into the slices of the result
+            atom_indices = cast_indices(kwargs.get('atom_indices', None))
+            topology = _parse_topology(kwargs['top'])
+            if atom_indices is not None:
+                topology = topology.subset(atom_indices)
+            allocate(topology.n_atoms, None)
+
+            def read(i):
+                s = slice(starts[i], starts[i+1])
+                buffer = Trajectory(xyz=out['xyz'][s], topology=topology,
+                                    time=np.zeros(n_kept[i], dtype=np.float32),
+                                    unitcell_lengths=out['unitcell_lengths'][s],
+                                    unitcell_angles=out['unitcell_angles'][s])
+                store(i, _read_into_one((filenames[i], buffer, stride, atom_indices)),
+                      in_place=True)
+
+            pool.map(read, range(len(jobs)))
+        elif use_threads:
+            # threads share our address space, so each one copies its
+            # trajectory into place as soon as it's loaded
+            pool.map(lambda i: store(i, _load_one(jobs[i])), range(len(jobs)))
+        else:
+            for i, t in enumerate(pool.imap(_load_one, jobs)):
+                store(i, t)
+    finally:
+        pool.close()
+        pool.join()
+
+    if any(have_unitcell) and not all(have_unitcell):
+        raise ValueError('Mixing trajectories with and without unitcell')
+    if not all(have_unitcell):
+        out['unitcell_lengths'] = out['unitcell_angles'] = None
+    traj = Trajectory(out['xyz'], topologies[0], time=out['time'],
+                      unitcell_lengths=out['unitcell_lengths'],
+                      unitcell_angles=out['unitcell_angles'])
+
+    if mismatched:
+        pieces = [mismatched.get(i, traj[starts[i]:starts[i+1]])
+                  for i in range(len(filenames))]
+        # the boundaries next to the files that were shorter than their
+        # headers are only checked now
+        for i in range(len(filenames) - 1):
+            if overlapping[i] is None and len(pieces[i]) > 0 and len(pieces[i+1]) > 0 and \
+                    np.all(np.abs(pieces[i+1].xyz[0] - pieces[i].xyz[-1]) < 2e-3):
+                pieces[i] = pieces[i][:-1]
+        traj = pieces[0].join(pieces[1:], check_topology=False)
+
+    return traj
+
+
 def iterload(filename, chunk=100, **kwargs):
     """An iterator over a trajectory from one or more files on disk, in fragments
 
@@ -449,6 +728,13 @@ def iterload(filename, chunk=100, **kwargs):
         requires an extra copy, but will save memory.
     skip : int, default=0
         Skip first n frames.
+    reuse_buffer : bool, default=False
+        Read every chunk into the same preallocated arrays, for the formats
+        whose files have a ``read_into`` method (XTC, TRR, DCD, DTR, HDF5 and
+        NetCDF), rather than allocating new ones for each chunk. The topology
+        is also shared by all of the chunks. Each chunk is then only valid
+        until the next one is read, so copy anything that you want to keep
+        (e.g. with ``chunk[:]``).
 
     See Also
     --------
@@ -469,6 +755,7 @@ def iterload(filename, chunk=100, **kwargs):
     atom_indices = cast_indices(kwargs.pop('atom_indices', None))
     top = kwargs.pop('top', None)
     skip = kwargs.pop('skip', 0)
+    reuse_buffer = kwargs.pop('reuse_buffer', False)
 
     extension = _get_extension(filename)
     if extension not in _TOPOLOGY_EXTS:
@@ -484,19 +771,24 @@ def iterload(filename, chunk=100, **kwargs):
         if extension not in _TOPOLOGY_EXTS:
             kwargs['top'] = top
         yield load(filename, **kwargs)[skip:]
-    elif extension in ('.pdb', '.pdb.gz'):
-        # the PDBTrajectortFile class doesn't follow the standard API. Fixing it
-        # to support iterload could be worthwhile, but requires a deep refactor.
-        t = load(filename, stride=stride, atom_indices=atom_indices)
-        for i in range(0, len(t), chunk):
-            yield t[i:i+chunk]
-
     else:
         with (lambda x: open(x, n_atoms=topology.n_atoms)
               if extension in ('.crd', '.mdcrd')
               else open(filename))(filename) as f:
             if skip > 0:
                 f.seek(skip)
+            if reuse_buffer and hasattr(f, 'read_into') and not kwargs:
+                if extension in _TOPOLOGY_EXTS:
+                    topology = f.topology
+                if atom_indices is not None:
+                    topology = topology.subset(atom_indices)
+                buffer = _chunk_buffer(topology, chunk)
+                while True:
+                    traj = f.read_into(buffer, stride=stride, atom_indices=atom_indices)
+                    if len(traj) == 0:
+                        return
+                    yield traj
+
             while True:
                 if extension not in _TOPOLOGY_EXTS:
                     traj = f.read_as_traj(topology, n_frames=chunk*stride, stride=stride, atom_indices=atom_indices, **kwargs)
@@ -504,11 +796,59 @@ def iterload(filename, chunk=100, **kwargs):
                     traj = f.read_as_traj(n_frames=chunk*stride, stride=stride, atom_indices=atom_indices, **kwargs)
 
                 if len(traj) == 0:
-                    raise StopIteration()
+                    return
 
                 yield traj
 
 
+def _chunk_buffer(topology, n_frames):
+    """A Trajectory with room for `n_frames` frames, for the read_into()
+    method of the trajectory files to read into."""
+    return Trajectory(xyz=np.empty((n_frames, topology.n_atoms, 3), dtype=np.float32),
+                      topology=topology, time=np.zeros(n_frames, dtype=np.float32),
+                      unitcell_lengths=np.zeros((n_frames, 3), dtype=np.float32),
+                      unitcell_angles=np.zeros((n_frames, 3), dtype=np.float32))
+
+
+def _read_buffer(out, n_atoms):
+    """The coordinates of the Trajectory `out`, after checking that the
+    read_into() method of a trajectory file can decode frames of `n_atoms`
+    atoms into them."""
+    xyz = out.xyz
+    if not (isinstance(xyz, np.ndarray) and xyz.dtype == np.float32 and
+            xyz.flags['C_CONTIGUOUS'] and xyz.flags['WRITEABLE']):
+        raise ValueError('the coordinates of the trajectory to read into must '
+                         'be a writeable, C-contiguous float32 array')
+    if xyz.shape[1] != n_atoms:
+        raise ValueError('the trajectory to read into has %d atoms, but %d '
+                         'atoms are being read' % (xyz.shape[1], n_atoms))
+    return xyz
+
+
+def _buffer_view(out, n_frames, time=None, unitcell_lengths=None,
+                 unitcell_angles=None):
+    """The first `n_frames` frames of `out`, whose coordinates a read_into()
+    method has decoded into out.xyz, as a Trajectory sharing the arrays and
+    the topology of `out`.
+
+    The time and unitcell information are copied into the arrays of `out`
+    unless they're None, or used as they are if it doesn't have arrays that
+    can hold them.
+    """
+    def fill(buffer, value):
+        if (value is None or not isinstance(buffer, np.ndarray) or
+                not buffer.flags['WRITEABLE'] or
+                not np.can_cast(np.asarray(value).dtype, buffer.dtype)):
+            return value
+        buffer[:n_frames] = value
+        return buffer[:n_frames]
+
+    return Trajectory(xyz=out.xyz[:n_frames], topology=out.topology,
+                      time=fill(out.time, time),
+                      unitcell_lengths=fill(out._unitcell_lengths, unitcell_lengths),
+                      unitcell_angles=fill(out._unitcell_angles, unitcell_angles))
+
+
 class Trajectory(object):
     """Container object for a molecular dynamics trajectory
 
@@ -626,7 +966,7 @@ class Trajectory(object):
         """
         if self.top is None:
             return 0
-        return sum([1 for r in self.top.residues])
+        return self.top.n_residues
 
     @property
     def n_chains(self):
@@ -712,13 +1052,14 @@ class Trajectory(object):
         if self._unitcell_lengths is None or self._unitcell_angles is None:
             return None
 
+        lengths, angles = self.unitcell_lengths, self.unitcell_angles
         v1, v2, v3 = lengths_and_angles_to_box_vectors(
-            self._unitcell_lengths[:, 0],  # a
-            self._unitcell_lengths[:, 1],  # b
-            self._unitcell_lengths[:, 2],  # c
-            self._unitcell_angles[:, 0],   # alpha
-            self._unitcell_angles[:, 1],   # beta
-            self._unitcell_angles[:, 2],   # gamma
+            lengths[:, 0],  # a
+            lengths[:, 1],  # b
+            lengths[:, 2],  # c
+            angles[:, 0],   # alpha
+            angles[:, 1],   # beta
+            angles[:, 2],   # gamma
         )
         return np.swapaxes(np.dstack((v1, v2, v3)), 1, 2)
 
@@ -776,6 +1117,8 @@ class Trajectory(object):
             Lengths of the unit cell in each frame, in nanometers, or None
             if the Trajectory contains no unitcell information.
         """
+        if isinstance(self._unitcell_lengths, LazyArray):
+            self._unitcell_lengths = self._unitcell_lengths.materialize()
         return self._unitcell_lengths
 
     @property
@@ -791,6 +1134,8 @@ class Trajectory(object):
             vectors ``c`` and ``a``, and ``gamma`` gives the angle between
             vectors ``a`` and ``b``. The angles are in degrees.
         """
+        if isinstance(self._unitcell_angles, LazyArray):
+            self._unitcell_angles = self._unitcell_angles.materialize()
         return self._unitcell_angles
 
     @unitcell_lengths.setter
@@ -803,6 +1148,10 @@ class Trajectory(object):
             The distances ``a``, ``b``, and ``c`` that define the shape of the
             unit cell in each frame, or None
         """
+        if isinstance(value, LazyArray):
+            _check_lazy_shape(value, (len(self), 3), 'unitcell_lengths')
+            self._unitcell_lengths = value
+            return
         self._unitcell_lengths = ensure_type(value, np.float32, 2,
             'unitcell_lengths', can_be_none=True, shape=(len(self), 3),
             warn_on_cast=False, add_newaxis_on_deficient_ndim=True)
@@ -818,6 +1167,10 @@ class Trajectory(object):
             shape of the unit cell in each frame. The angles should be in
             degrees.
         """
+        if isinstance(value, LazyArray):
+            _check_lazy_shape(value, (len(self), 3), 'unitcell_angles')
+            self._unitcell_angles = value
+            return
         self._unitcell_angles = ensure_type(value, np.float32, 2,
             'unitcell_angles', can_be_none=True, shape=(len(self), 3),
             warn_on_cast=False, add_newaxis_on_deficient_ndim=True)
@@ -832,6 +1185,8 @@ class Trajectory(object):
             A three dimensional numpy array, with the cartesian coordinates
             of each atoms in each frame.
         """
+        if isinstance(self._xyz, LazyArray):
+            self._xyz = self._xyz.materialize()
         return self._xyz
 
     @xyz.setter
@@ -843,6 +1198,13 @@ class Trajectory(object):
         else:
             shape = (None, None, 3)
 
+        if isinstance(value, LazyArray):
+            # e.g. a memory-mapped file, which is read when xyz is accessed
+            _check_lazy_shape(value, shape, 'xyz')
+            self._xyz = value
+            self._rmsd_traces = None
+            return
+
         value = ensure_type(value, np.float32, 3, 'xyz', shape=shape,
                             warn_on_cast=False, add_newaxis_on_deficient_ndim=True)
         self._xyz = value
@@ -871,10 +1233,10 @@ class Trajectory(object):
     def __hash__(self):
         hash_value = hash(self.top)
         # combine with hashes of arrays
-        hash_value ^= _hash_numpy_array(self._xyz)
+        hash_value ^= _hash_numpy_array(self.xyz)
         hash_value ^= _hash_numpy_array(self.time)
-        hash_value ^= _hash_numpy_array(self._unitcell_lengths)
-        hash_value ^= _hash_numpy_array(self._unitcell_angles)
+        hash_value ^= _hash_numpy_array(self.unitcell_lengths)
+        hash_value ^= _hash_numpy_array(self.unitcell_angles)
         return hash_value
 
     def __eq__(self, other):
@@ -1020,7 +1382,7 @@ class Trajectory(object):
 
         # use this syntax so that if you subclass Trajectory,
         # the subclass's join() will return an instance of the subclass
-        return self.__class__(xyz, deepcopy(self._topology), time=time,
+        return self.__class__(xyz, _share_topology(self._topology), time=time,
             unitcell_lengths=lengths, unitcell_angles=angles)
 
     def stack(self, other):
@@ -1089,24 +1451,31 @@ class Trajectory(object):
             Copy the arrays after slicing. If you set this to false, then if
             you modify a slice, you'll modify the original array since they
             point to the same data.
+
+        Notes
+        -----
+        The topology of the slice isn't copied, even if `copy` is True.
+        Instead, it shares its atoms, residues and chains with the topology
+        of this trajectory until one of them is modified, e.g. by adding
+        atoms or bonds or renaming a residue, at which point that one gets
+        its own copy.
         """
-        xyz = self.xyz[key]
+        # a lazily loaded trajectory, e.g. md.load(..., mmap=True), stays
+        # lazy, so only the frames in the slice are ever read
+        xyz = self._xyz[key]
         time = self.time[key]
+        topology = _share_topology(self._topology)
         unitcell_lengths, unitcell_angles = None, None
-        if self.unitcell_angles is not None:
-            unitcell_angles = self.unitcell_angles[key]
-        if self.unitcell_lengths is not None:
-            unitcell_lengths = self.unitcell_lengths[key]
+        if self._unitcell_angles is not None:
+            unitcell_angles = self._unitcell_angles[key]
+        if self._unitcell_lengths is not None:
+            unitcell_lengths = self._unitcell_lengths[key]
 
         if copy:
-            xyz = xyz.copy()
+            xyz = _copy_array(xyz)
             time = time.copy()
-            topology = deepcopy(self._topology)
-
-            if self.unitcell_angles is not None:
-                unitcell_angles = unitcell_angles.copy()
-            if self.unitcell_lengths is not None:
-                unitcell_lengths = unitcell_lengths.copy()
+            unitcell_angles = _copy_array(unitcell_angles)
+            unitcell_lengths = _copy_array(unitcell_lengths)
 
         newtraj = self.__class__(
             xyz, topology, time, unitcell_lengths=unitcell_lengths,
@@ -1140,7 +1509,7 @@ class Trajectory(object):
         # time will take the default 1..N
         self._time_default_to_arange = (time is None)
         if time is None:
-            time = np.arange(len(self.xyz))
+            time = np.arange(len(self._xyz))
         self.time = time
 
         if (topology is not None) and (topology._numAtoms != self.n_atoms):
@@ -1277,7 +1646,8 @@ class Trajectory(object):
         # run the saver, and return whatever output it gives
         return saver(filename, **kwargs)
 
-    def save_hdf5(self, filename, force_overwrite=True):
+    def save_hdf5(self, filename, force_overwrite=True, compression='zlib',
+                  chunkshape=None):
         """Save trajectory to MDTraj HDF5 format
 
         Parameters
@@ -1286,8 +1656,14 @@ class Trajectory(object):
             filesystem path in which to save the trajectory
         force_overwrite : bool, default=True
             Overwrite anything that exists at filename, if its already there
+        compression : str or None, default='zlib'
+            Compression codec, as for ``HDF5TrajectoryFile``
+        chunkshape : {None, 'frames', 'atoms', tuple}, default=None
+            Layout of the chunks of the coordinates, as for
+            ``HDF5TrajectoryFile``
         """
-        with HDF5TrajectoryFile(filename, 'w', force_overwrite=force_overwrite) as f:
+        with HDF5TrajectoryFile(filename, 'w', force_overwrite=force_overwrite,
+                                compression=compression, chunkshape=chunkshape) as f:
             f.write(coordinates=in_units_of(self.xyz, Trajectory._distance_unit, f.distance_unit),
                     time=self.time,
                     cell_lengths=in_units_of(self.unitcell_lengths, Trajectory._distance_unit, f.distance_unit),
@@ -1358,14 +1734,14 @@ class Trajectory(object):
             for i in xrange(self.n_frames):
 
                 if self._have_unitcell:
-                    f.write(in_units_of(self._xyz[i], Trajectory._distance_unit, f.distance_unit),
+                    f.write(in_units_of(self.xyz[i], Trajectory._distance_unit, f.distance_unit),
                             self.topology,
                             modelIndex=i,
                             bfactors=bfactors[i],
                             unitcell_lengths=in_units_of(self.unitcell_lengths[i], Trajectory._distance_unit, f.distance_unit),
                             unitcell_angles=self.unitcell_angles[i])
                 else:
-                    f.write(in_units_of(self._xyz[i], Trajectory._distance_unit, f.distance_unit),
+                    f.write(in_units_of(self.xyz[i], Trajectory._distance_unit, f.distance_unit),
                             self.topology,
                             modelIndex=i,
                             bfactors=bfactors[i])
@@ -1484,7 +1860,7 @@ class Trajectory(object):
         """
         self._check_valid_unitcell()
         with NetCDFTrajectoryFile(filename, 'w', force_overwrite=force_overwrite) as f:
-            f.write(coordinates=in_units_of(self._xyz, Trajectory._distance_unit, NetCDFTrajectoryFile.distance_unit),
+            f.write(coordinates=in_units_of(self.xyz, Trajectory._distance_unit, NetCDFTrajectoryFile.distance_unit),
                     time=self.time,
                     cell_lengths=in_units_of(self.unitcell_lengths, Trajectory._distance_unit, f.distance_unit),
                     cell_angles=self.unitcell_angles)
@@ -1509,7 +1885,7 @@ class Trajectory(object):
         self._check_valid_unitcell()
         if self.n_frames == 1:
             with AmberNetCDFRestartFile(filename, 'w', force_overwrite=force_overwrite) as f:
-                coordinates = in_units_of(self._xyz, Trajectory._distance_unit,
+                coordinates = in_units_of(self.xyz, Trajectory._distance_unit,
                                           AmberNetCDFRestartFile.distance_unit)
                 lengths = in_units_of(self.unitcell_lengths, Trajectory._distance_unit,
                                       AmberNetCDFRestartFile.distance_unit)
@@ -1519,7 +1895,7 @@ class Trajectory(object):
             fmt = '%s.%%0%dd' % (filename, len(str(self.n_frames)))
             for i in xrange(self.n_frames):
                 with AmberNetCDFRestartFile(fmt % (i+1), 'w', force_overwrite=force_overwrite) as f:
-                    coordinates = in_units_of(self._xyz, Trajectory._distance_unit,
+                    coordinates = in_units_of(self.xyz, Trajectory._distance_unit,
                                               AmberNetCDFRestartFile.distance_unit)
                     lengths = in_units_of(self.unitcell_lengths, Trajectory._distance_unit,
                                           AmberNetCDFRestartFile.distance_unit)
@@ -1546,7 +1922,7 @@ class Trajectory(object):
         self._check_valid_unitcell()
         if self.n_frames == 1:
             with AmberRestartFile(filename, 'w', force_overwrite=force_overwrite) as f:
-                coordinates = in_units_of(self._xyz, Trajectory._distance_unit,
+                coordinates = in_units_of(self.xyz, Trajectory._distance_unit,
                                           AmberRestartFile.distance_unit)
                 lengths = in_units_of(self.unitcell_lengths, Trajectory._distance_unit,
                                       AmberRestartFile.distance_unit)
@@ -1556,7 +1932,7 @@ class Trajectory(object):
             fmt = '%s.%%0%dd' % (filename, len(str(self.n_frames)))
             for i in xrange(self.n_frames):
                 with AmberRestartFile(fmt % (i+1), 'w', force_overwrite=force_overwrite) as f:
-                    coordinates = in_units_of(self._xyz, Trajectory._distance_unit,
+                    coordinates = in_units_of(self.xyz, Trajectory._distance_unit,
                                               AmberRestartFile.distance_unit)
                     lengths = in_units_of(self.unitcell_lengths, Trajectory._distance_unit,
                                           AmberRestartFile.distance_unit)
@@ -1611,7 +1987,7 @@ class Trajectory(object):
         if mass_weighted and self.top is not None:
             self.xyz -= distance.compute_center_of_mass(self)[:, np.newaxis, :]
         else:
-            self._rmsd_traces = _rmsd._center_inplace_atom_major(self._xyz)
+            self._rmsd_traces = _rmsd._center_inplace_atom_major(self.xyz)
 
         return self
 
@@ -1674,8 +2050,8 @@ class Trajectory(object):
 
         unitcell_lengths = unitcell_angles = None
         if self._have_unitcell:
-            unitcell_lengths = self._unitcell_lengths.copy()
-            unitcell_angles = self._unitcell_angles.copy()
+            unitcell_lengths = self.unitcell_lengths.copy()
+            unitcell_angles = self.unitcell_angles.copy()
         time = self._time.copy()
 
         return Trajectory(xyz=xyz, topology=topology, time=time,
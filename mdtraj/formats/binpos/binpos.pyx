@@ -31,10 +31,12 @@ import warnings
 cimport cython
 from libc.stdio cimport SEEK_SET, SEEK_CUR, SEEK_END
 import os
+import struct
 import numpy as np
 cimport numpy as np
 np.import_array()
 from mdtraj.utils import ensure_type, cast_indices, in_units_of
+from mdtraj.utils.unit import _angstroms_to_nanometers
 from mdtraj.utils.six import string_types
 from mdtraj.formats.registry import _FormatRegistry
 from libc.stdlib cimport malloc, free
@@ -57,8 +59,9 @@ cdef int _BINPOS_EOF = -1  # end of file (or error)
 ###############################################################################
 
 @_FormatRegistry.register_loader('.binpos')
-def load_binpos(filename, top=None, stride=None, atom_indices=None, frame=None):
-    """load_binpos(filename, top=None, stride=None, atom_indices=None, frame=None)
+def load_binpos(filename, top=None, stride=None, atom_indices=None, frame=None,
+                mmap=False):
+    """load_binpos(filename, top=None, stride=None, atom_indices=None, frame=None, mmap=False)
 
     Load an AMBER .binpos file from disk.
 
@@ -84,6 +87,13 @@ def load_binpos(filename, top=None, stride=None, atom_indices=None, frame=None):
         Use this option to load only a single frame from a trajectory on disk.
         If frame is None, the default, the entire trajectory will be loaded.
         If supplied, ``stride`` will be ignored.
+    mmap : bool, default=False
+        Memory-map the file instead of reading it. The coordinates of the
+        trajectory are then computed from the mapped file only when they are
+        accessed, and only for the frames that are in the trajectory, so
+        e.g. ``md.load_binpos(fn, top=top, mmap=True)[::10]`` reads a tenth
+        of the file. Processes that map the same file share the operating
+        system's page cache.
 
     Examples
     --------
@@ -120,6 +130,13 @@ def load_binpos(filename, top=None, stride=None, atom_indices=None, frame=None):
     topology = _parse_topology(top)
     atom_indices = cast_indices(atom_indices)
 
+    if mmap:
+        from mdtraj.core.trajectory import _load_lazy
+        if atom_indices is not None:
+            topology = topology.subset(atom_indices)
+        return _load_lazy(_memmap_binpos(filename, atom_indices), topology,
+                          stride=stride, frame=frame)
+
     with BINPOSTrajectoryFile(filename) as f:
         if frame is not None:
             f.seek(frame)
@@ -131,6 +148,50 @@ def load_binpos(filename, top=None, stride=None, atom_indices=None, frame=None):
                               atom_indices=atom_indices)
 
 
+def _memmap_binpos(filename, atom_indices=None):
+    """Memory-map a BINPOS file.
+
+    Every frame of a BINPOS file has the number of atoms followed by their
+    coordinates, so the coordinates of all of the frames are a strided view
+    of the mapped file.
+
+    Returns
+    -------
+    xyz : LazyArray, shape=(n_frames, n_atoms, 3)
+        The coordinates, in nanometers.
+    """
+    from mdtraj.utils.lazy import LazyArray
+
+    with open(filename, 'rb') as f:
+        header = f.read(8)
+        file_size = os.fstat(f.fileno()).st_size
+    if len(header) < 8 or header[:4] != b'fxyz':
+        raise IOError('not a binpos amber coordinate file: %s' % filename)
+    # like the BINPOS plugin, take a huge number of atoms to mean that the
+    # file has the other byte order
+    byteorder = '<' if np.little_endian else '>'
+    n_atoms, = struct.unpack(byteorder + 'i', header[4:])
+    if n_atoms > 1000000000:
+        byteorder = '>' if byteorder == '<' else '<'
+        n_atoms, = struct.unpack(byteorder + 'i', header[4:])
+
+    frame_size = 4 + 12 * n_atoms
+    n_frames = (file_size - 4) // frame_size
+    if n_frames > 0:
+        data = np.memmap(filename, dtype=np.uint8, mode='r', offset=4,
+                         shape=(n_frames * frame_size,))
+    else:
+        data = np.empty(0, dtype=np.uint8)
+    xyz = np.ndarray((n_frames, n_atoms, 3), dtype=byteorder + 'f4',
+                     buffer=data, offset=4, strides=(frame_size, 12, 4))
+
+    if atom_indices is None:
+        return LazyArray(xyz, _angstroms_to_nanometers, (n_atoms, 3))
+    n_atoms = len(np.arange(n_atoms)[atom_indices])
+    return LazyArray(xyz, lambda xyz: _angstroms_to_nanometers(
+        xyz[:, atom_indices]), (n_atoms, 3))
+
+
 cdef class BINPOSTrajectoryFile:
     """BINPOSTrajectoryFile(filename, mode='r', force_overwrite=True, **kwargs)
 
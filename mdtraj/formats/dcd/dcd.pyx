@@ -29,10 +29,12 @@
 import cython
 cimport cython
 import os
+import struct
 import numpy as np
 cimport numpy as np
 np.import_array()
 from mdtraj.utils import ensure_type, cast_indices, in_units_of
+from mdtraj.utils.unit import _angstroms_to_nanometers
 from mdtraj.utils.six import string_types
 from mdtraj.formats.registry import _FormatRegistry
 from libc.stdlib cimport malloc, free
@@ -70,8 +72,9 @@ cdef ERROR_MESSAGES = {
 ##############################################################################
 
 @_FormatRegistry.register_loader('.dcd')
-def load_dcd(filename, top=None, stride=None, atom_indices=None, frame=None):
-    """load_dcd(filename, top=None, stride=None, atom_indices=None, frame=None)
+def load_dcd(filename, top=None, stride=None, atom_indices=None, frame=None,
+             mmap=False):
+    """load_dcd(filename, top=None, stride=None, atom_indices=None, frame=None, mmap=False)
 
     Load an DCD file from disk.
 
@@ -97,6 +100,14 @@ def load_dcd(filename, top=None, stride=None, atom_indices=None, frame=None):
         Use this option to load only a single frame from a trajectory on disk.
         If frame is None, the default, the entire trajectory will be loaded.
         If supplied, ``stride`` will be ignored.
+    mmap : bool, default=False
+        Memory-map the file instead of reading it. The coordinates and unit
+        cells of the trajectory are then computed from the mapped file only
+        when they are accessed, and only for the frames that are in the
+        trajectory, so e.g. ``md.load_dcd(fn, top=top, mmap=True)[::10]``
+        reads a tenth of the file. Processes that map the same file share
+        the operating system's page cache. DCD files with fixed atoms or
+        64-bit record markers can't be memory-mapped.
 
     Examples
     --------
@@ -133,6 +144,14 @@ def load_dcd(filename, top=None, stride=None, atom_indices=None, frame=None):
     topology = _parse_topology(top)
     atom_indices = cast_indices(atom_indices)
 
+    if mmap:
+        from mdtraj.core.trajectory import _load_lazy
+        if atom_indices is not None:
+            topology = topology.subset(atom_indices)
+        xyz, cell_lengths, cell_angles = _memmap_dcd(filename, atom_indices)
+        return _load_lazy(xyz, topology, cell_lengths, cell_angles,
+                          stride=stride, frame=frame)
+
     with DCDTrajectoryFile(filename) as f:
         if frame is not None:
             f.seek(frame)
@@ -142,6 +161,107 @@ def load_dcd(filename, top=None, stride=None, atom_indices=None, frame=None):
         return f.read_as_traj(topology, n_frames=n_frames, stride=stride, atom_indices=atom_indices)
 
 
+def _memmap_dcd(filename, atom_indices=None):
+    """Memory-map a DCD file.
+
+    The frames of a DCD file all have the same size, unless some of the
+    atoms are fixed, so the coordinates and unit cells of all of the frames
+    are strided views of the mapped file.
+
+    Returns
+    -------
+    xyz : LazyArray, shape=(n_frames, n_atoms, 3)
+        The coordinates, in nanometers.
+    cell_lengths : {LazyArray, shape=(n_frames, 3), None}
+        The lengths of the unit cell, in nanometers.
+    cell_angles : {LazyArray, shape=(n_frames, 3), None}
+        The angles of the unit cell, in degrees.
+    """
+    from mdtraj.utils.lazy import LazyArray
+
+    with open(filename, 'rb') as f:
+        header = f.read(92)
+        if len(header) < 92:
+            raise IOError('Format of DCD file is wrong: %s' % filename)
+        for byteorder in '<>':
+            if struct.unpack(byteorder + 'i', header[:4])[0] == 84:
+                break
+        else:
+            raise IOError('%s has 64-bit record markers or is not a DCD file, '
+                          'and can not be memory-mapped' % filename)
+        if header[4:8] != b'CORD':
+            raise IOError('Format of DCD file is wrong: %s' % filename)
+
+        icntrl = struct.unpack(byteorder + '20i', header[8:88])
+        is_charmm = icntrl[19] != 0
+        has_unitcell = is_charmm and icntrl[10] != 0
+        if icntrl[8] != 0 or (is_charmm and icntrl[11] == 1):
+            raise IOError('%s has fixed atoms or four dimensions, and can not '
+                          'be memory-mapped' % filename)
+
+        # the title and number of atoms records
+        title_size, = struct.unpack(byteorder + 'i', f.read(4))
+        f.seek(title_size + 4, os.SEEK_CUR)
+        record = struct.unpack(byteorder + '3i', f.read(12))
+        if record[0] != 4 or record[2] != 4:
+            raise IOError('Format of DCD file is wrong: %s' % filename)
+        n_atoms = record[1]
+        offset = f.tell()
+        file_size = os.fstat(f.fileno()).st_size
+
+    # each frame has a record with six doubles for the unit cell, and one
+    # record each for the x, y and z coordinates
+    unitcell_size = 56 if has_unitcell else 0
+    coordinate_size = 4 * n_atoms + 8
+    frame_size = unitcell_size + 3 * coordinate_size
+    n_frames = (file_size - offset) // frame_size
+
+    if n_frames > 0:
+        data = np.memmap(filename, dtype=np.uint8, mode='r', offset=offset,
+                         shape=(n_frames * frame_size,))
+    else:
+        data = np.empty(0, dtype=np.uint8)
+    xyz = np.ndarray((n_frames, n_atoms, 3), dtype=byteorder + 'f4',
+                     buffer=data, offset=unitcell_size + 4,
+                     strides=(frame_size, 4, coordinate_size))
+
+    if atom_indices is None:
+        xyz = LazyArray(xyz, _angstroms_to_nanometers, (n_atoms, 3))
+    else:
+        n_atoms = len(np.arange(n_atoms)[atom_indices])
+        xyz = LazyArray(xyz, lambda xyz: _angstroms_to_nanometers(
+            xyz[:, atom_indices]), (n_atoms, 3))
+
+    if not has_unitcell:
+        return xyz, None, None
+    # A, cos(gamma), B, cos(beta), cos(alpha), C in each frame
+    cells = np.ndarray((n_frames, 6), dtype=byteorder + 'f8', buffer=data,
+                       offset=4, strides=(frame_size, 8))
+    if n_frames > 0 and np.all(cells[0, [0, 2, 5]] < 1e-10):
+        # like DCDTrajectoryFile.read, lengths of zero mean no unit cell.
+        # Only the first frame is checked, so the file isn't read here.
+        return xyz, None, None
+    cell_lengths = LazyArray(cells, lambda cells: _angstroms_to_nanometers(
+        cells[:, [0, 2, 5]]), (3,))
+    cell_angles = LazyArray(cells, _dcd_cell_angles, (3,))
+    return xyz, cell_lengths, cell_angles
+
+
+def _dcd_cell_angles(cells):
+    """Get the angles alpha, beta and gamma, in degrees, from the unit cells
+    in a DCD file. Like the DCD plugin, the values in a frame are taken to be
+    the cosines of the angles if they are all in [-1, 1].
+    """
+    values = cells[:, [4, 3, 1]]
+    cosines = np.all((values >= -1) & (values <= 1), axis=1)
+    # 90 - asin(x) rather than acos(x), so that the angles are exactly 90
+    # degrees when the cosines are zero
+    angles = np.where(cosines[:, np.newaxis],
+                      90.0 - np.degrees(np.arcsin(np.clip(values, -1, 1))),
+                      values)
+    return angles.astype(np.float32)
+
+
 cdef class DCDTrajectoryFile:
     """DCDTrajectoryFile(filename, mode='r', force_overwrite=True)
 
@@ -396,6 +516,59 @@ cdef class DCDTrajectoryFile:
                           unitcell_lengths=box_length,
                           unitcell_angles=box_angle)
 
+    def read_into(self, out, stride=None, atom_indices=None):
+        """read_into(out, stride=None, atom_indices=None)
+
+        Read the next frames of the DCD file into an existing trajectory
+
+        The coordinates are read directly into the arrays of `out`, so that
+        reading a long file in chunks doesn't allocate new arrays for each
+        chunk.
+
+        Parameters
+        ----------
+        out : Trajectory
+            The trajectory to read up to ``len(out)`` frames into, whose
+            coordinates must be a C-contiguous float32 array with the number
+            of atoms being read.
+        stride : int, optional
+            Read only every stride-th frame.
+        atom_indices : array_like, optional
+            If not none, then read only a subset of the atoms coordinates from the
+            file.
+
+        Returns
+        -------
+        trajectory : Trajectory
+            The frames that were read, in a trajectory that shares its arrays
+            and topology with `out`, so that it's overwritten by the next
+            read into `out`.
+
+        See Also
+        --------
+        read_as_traj : Returns a new Trajectory object
+        """
+        from mdtraj.core.trajectory import Trajectory, _read_buffer, _buffer_view
+        if str(self.mode) != 'r':
+            raise ValueError('read() is only available when the file is opened in mode="r"')
+        if not self.is_open:
+            raise IOError("file is not open")
+        if stride is None:
+            stride = 1
+
+        n_atoms = self.n_atoms if atom_indices is None else len(np.arange(self.n_atoms)[atom_indices])
+        xyz_out = _read_buffer(out, n_atoms)
+
+        initial = int(self.frame_counter)
+        xyz, box_length, box_angle = self._read(len(out), n_atoms, atom_indices,
+                                                stride, xyz_out)
+        in_units_of(xyz, self.distance_unit, Trajectory._distance_unit, inplace=True)
+        if box_length is not None:
+            in_units_of(box_length, self.distance_unit, Trajectory._distance_unit, inplace=True)
+        time = (stride*np.arange(len(xyz))) + initial
+
+        return _buffer_view(out, len(xyz), time, box_length, box_angle)
+
     def read(self, n_frames=None, stride=None, atom_indices=None):
         """read(n_frames=None, stride=None, atom_indices=None)
 
@@ -458,8 +631,17 @@ cdef class DCDTrajectoryFile:
         else:
             _stride = stride
 
+        return self._read(_n_frames, n_atoms_to_read, atom_indices, _stride)
+
+    def _read(self, int _n_frames, int n_atoms_to_read, atom_indices,
+              int _stride, xyz_out=None):
+        """Read the next `_n_frames` frames of the DCD file, keeping every
+        stride-th one. The coordinates are stored in the leading frames of
+        `xyz_out`, if it's given."""
         # malloc space to put the data that we're going to read off the disk
-        cdef np.ndarray[dtype=np.float32_t, ndim=3] xyz = np.zeros((_n_frames, n_atoms_to_read, 3), dtype=np.float32)
+        cdef np.ndarray[dtype=np.float32_t, ndim=3] xyz = \
+            np.zeros((_n_frames, n_atoms_to_read, 3), dtype=np.float32) \
+            if xyz_out is None else xyz_out[:_n_frames]
         cdef np.ndarray[dtype=np.float32_t, ndim=2] cell_lengths = np.zeros((_n_frames, 3), dtype=np.float32)
         cdef np.ndarray[dtype=np.float32_t, ndim=2] cell_angles = np.zeros((_n_frames, 3), dtype=np.float32)
 
@@ -468,14 +650,19 @@ cdef class DCDTrajectoryFile:
 
         cdef int i, j
         cdef int status = _DCD_SUCCESS
+        cdef int skip_status
 
         for i in range(_n_frames):
+            # the GIL is released during the read, so that several files can
+            # be read at once from different threads
             if atom_indices is None:
                 self.timestep.coords = &xyz[i,0,0]
-                status = read_next_timestep(self.fh, self.n_atoms, self.timestep)
+                with nogil:
+                    status = read_next_timestep(self.fh, self.n_atoms, self.timestep)
             else:
                 self.timestep.coords = &framebuffer[0,0]
-                status = read_next_timestep(self.fh, self.n_atoms, self.timestep)
+                with nogil:
+                    status = read_next_timestep(self.fh, self.n_atoms, self.timestep)
                 xyz[i, :, :] = framebuffer[atom_indices, :]
 
             self.frame_counter += 1
@@ -491,7 +678,13 @@ cdef class DCDTrajectoryFile:
                 break
 
             for j in range(_stride - 1):
-                status = read_next_timestep(self.fh, self.n_atoms, NULL)
+                with nogil:
+                    skip_status = read_next_timestep(self.fh, self.n_atoms, NULL)
+                if skip_status != _DCD_SUCCESS:
+                    # running out of frames to skip isn't an error, the next
+                    # read will find the end of the file
+                    break
+                self.frame_counter += 1
 
         if np.all(cell_lengths < 1e-10):
             # in the DCD C code, if there's unitcell information inside the
@@ -1,4 +1,4 @@
-cdef extern from "include/dcdplugin.h":
+cdef extern from "include/dcdplugin.h" nogil:
     ctypedef struct dcdhandle:
         pass
 
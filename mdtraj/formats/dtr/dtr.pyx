@@ -467,6 +467,51 @@ cdef class DTRTrajectoryFile:
                           unitcell_lengths=box_length,
                           unitcell_angles=box_angle)
 
+    def read_into(self, out, stride=None, atom_indices=None):
+        """read_into(out, stride=None, atom_indices=None)
+
+        Read the next frames of the DTR file into an existing trajectory
+
+        The coordinates are read directly into the arrays of `out`, so that
+        reading a long file in chunks doesn't allocate new arrays for each
+        chunk.
+
+        Parameters
+        ----------
+        out : Trajectory
+            The trajectory to read up to ``len(out)`` frames into, whose
+            coordinates must be a C-contiguous float32 array with the number
+            of atoms being read.
+        stride : int, optional
+            Read only every stride-th frame.
+        atom_indices : array_like, optional
+            If not none, then read only a subset of the atoms coordinates from the
+            file.
+
+        Returns
+        -------
+        trajectory : Trajectory
+            The frames that were read, in a trajectory that shares its arrays
+            and topology with `out`, so that it's overwritten by the next
+            read into `out`.
+
+        See Also
+        --------
+        read_as_traj : Returns a new Trajectory object
+        """
+        from mdtraj.core.trajectory import Trajectory, _read_buffer, _buffer_view
+        if str(self.mode) != 'r':
+            raise ValueError('read() is only available when the file is opened in mode="r"')
+        if not self.is_open:
+            raise IOError("file is not open")
+
+        n_atoms = self.n_atoms if atom_indices is None else len(np.arange(self.n_atoms)[atom_indices])
+        xyz, time, box_length, box_angle = self._read(
+            len(out), stride, atom_indices, _read_buffer(out, n_atoms))
+        in_units_of(xyz, self.distance_unit, Trajectory._distance_unit, inplace=True)
+        in_units_of(box_length, self.distance_unit, Trajectory._distance_unit, inplace=True)
+        return _buffer_view(out, len(xyz), time, box_length, box_angle)
+
     def read(self, n_frames=None, stride=None, atom_indices=None):
         """read(n_frames=None, stride=None, atom_indices=None)
 
@@ -507,6 +552,11 @@ cdef class DTRTrajectoryFile:
         if not self.is_open:
             raise IOError("file is not open")
 
+        return self._read(n_frames, stride, atom_indices)
+
+    def _read(self, n_frames, stride, atom_indices, xyz_out=None):
+        """Read the data from the DTR file, as read() does, storing the
+        coordinates in the leading frames of `xyz_out` if it's given."""
         cdef int _n_frames, n_atoms_to_read, _stride
         if n_frames is None:
             # if the user specifies n_frames=None, they want to read to the
@@ -552,7 +602,9 @@ cdef class DTRTrajectoryFile:
         # allocate space to store the data that we are going to read off the disk
         # Desmond trajectory has different format, the storage could be very different
         # TODO: query the data type before the allocation
-        cdef np.ndarray[dtype=np.float32_t, ndim=3] xyz = np.zeros((_n_frames, n_atoms_to_read, 3), dtype=np.float32)
+        cdef np.ndarray[dtype=np.float32_t, ndim=3] xyz = \
+            np.zeros((_n_frames, n_atoms_to_read, 3), dtype=np.float32) \
+            if xyz_out is None else xyz_out[:_n_frames]
         cdef np.ndarray[dtype=np.float32_t, ndim=2] cell_lengths = np.zeros((_n_frames, 3), dtype=np.float32)
         cdef np.ndarray[dtype=np.float32_t, ndim=2] cell_angles = np.zeros((_n_frames, 3), dtype=np.float32)
 
@@ -565,16 +617,20 @@ cdef class DTRTrajectoryFile:
         for j in range(_n_frames):
             i = j*_stride + _start
 
+            # the GIL is released during the read, so that several files can
+            # be read at once from different threads
             if atom_indices is None:
                 self.timestep.coords = &xyz[j,0,0]
                 # set velocities to NULL, otherwise it will cause segmentation fault if the trajectory
                 # happen to contain velocities
                 self.timestep.velocities = NULL
-                status = read_timestep2(self.fh, i, self.timestep)
+                with nogil:
+                    status = read_timestep2(self.fh, i, self.timestep)
             else:
                 self.timestep.coords = &framebuffer[0,0]
                 self.timestep.velocities = NULL
-                status = read_timestep2(self.fh, i, self.timestep)
+                with nogil:
+                    status = read_timestep2(self.fh, i, self.timestep)
                 xyz[j, :, :] = framebuffer[atom_indices, :]
 
             cell_lengths[j, 0] = self.timestep.A
@@ -584,7 +640,8 @@ cdef class DTRTrajectoryFile:
             cell_angles[j, 1] = self.timestep.beta
             cell_angles[j, 2] = self.timestep.gamma
 
-            self.frame_counter += 1
+            # the next read starts at the next frame that the stride keeps
+            self.frame_counter = min(i + _stride, self.n_frames)
 
             if status != _DTR_SUCCESS:
                 raise IOError("Fail to read frame %d:"%i)
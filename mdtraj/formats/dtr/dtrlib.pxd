@@ -12,7 +12,7 @@ cdef extern from "include/molfile_plugin.h":
       unsigned int avg_bytes_per_timestep # bytes per timestep
       int has_velocities
 
-cdef extern from "include/dtrplugin.hxx":
+cdef extern from "include/dtrplugin.hxx" nogil:
 
     void* open_file_read(const char *path, const char *filetype, int *natoms)
     int read_timestep2(void *v, molfile_ssize_t n, molfile_timestep_t *ts)
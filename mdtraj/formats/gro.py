@@ -390,14 +390,35 @@ class GroTrajectoryFile(object):
         if time is not None:
             comment += ', t= %s' % time
 
-        varwidth = precision + 5
-        fmt = '%%5d%%-5s%%5s%%5d%%%d.%df%%%d.%df%%%d.%df' % (
-                varwidth, precision, varwidth, precision, varwidth, precision)
         assert topology.n_atoms == coordinates.shape[0]
-        lines = [comment, ' %d' % topology.n_atoms]
         if box is None:
             box = np.zeros((3,3))
 
+        # the coordinates are filled into the text of the whole frame with a
+        # single %-format, and written at once
+        atoms = self._frame_template(topology, precision) % tuple(coordinates.ravel().tolist())
+        box = '%10.5f%10.5f%10.5f%10.5f%10.5f%10.5f%10.5f%10.5f%10.5f' % (
+            box[0,0], box[1,1], box[2,2],
+            box[0,1], box[0,2], box[1,0],
+            box[1,2], box[2,0], box[2,1])
+
+        self._file.write('%s\n %d\n%s%s\n' % (comment, topology.n_atoms, atoms, box))
+
+    def _frame_template(self, topology, precision):
+        """Get the text of the atom lines of a frame of `topology`, with
+        %-format fields for the coordinates of each atom.
+
+        The text is cached in the topology until it's modified, e.g. by
+        renaming an atom.
+        """
+        return topology._cached(('gro_frame_template', precision),
+                                lambda topology: self._build_frame_template(topology, precision))
+
+    def _build_frame_template(self, topology, precision):
+        varwidth = precision + 5
+        fmt = '%%%d.%df%%%d.%df%%%d.%df' % (
+                varwidth, precision, varwidth, precision, varwidth, precision)
+        lines = []
         for i in range(topology.n_atoms):
             atom = topology.atom(i)
             residue = atom.residue
@@ -406,16 +427,10 @@ class GroTrajectoryFile(object):
                 serial = atom.index
             if serial >= 100000:
                 serial -= 100000
-            lines.append(fmt % (residue.resSeq, residue.name, atom.name, serial,
-                                coordinates[i, 0], coordinates[i, 1], coordinates[i, 2]))
-
-        lines.append('%10.5f%10.5f%10.5f%10.5f%10.5f%10.5f%10.5f%10.5f%10.5f' % (
-            box[0,0], box[1,1], box[2,2],
-            box[0,1], box[0,2], box[1,0],
-            box[1,2], box[2,0], box[2,1]))
+            line = '%5d%-5s%5s%5d' % (residue.resSeq, residue.name, atom.name, serial)
+            lines.append(line.replace('%', '%%') + fmt + '\n')
 
-        self._file.write('\n'.join(lines))
-        self._file.write('\n')
+        return ''.join(lines)
 
     def seek(self, offset, whence=0):
         """Move to a new file position
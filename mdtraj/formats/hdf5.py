@@ -56,6 +56,18 @@ from mdtraj.formats.registry import _FormatRegistry
 
 __all__ = ['HDF5TrajectoryFile', 'load_hdf5']
 
+# Codecs that can be named by themselves as the `compression`, which are
+# short for the blosc meta-compressor with that codec
+BLOSC_CODECS = ('blosclz', 'lz4', 'lz4hc', 'snappy', 'zstd')
+# Compression level used for every codec named by the `compression`
+COMPRESSION_LEVEL = 1
+# Target size, in bytes, of the chunks of the per-atom arrays
+CHUNK_BYTES = 2**18
+# Number of frames in the chunks of the atom-major layout
+ATOM_MAJOR_CHUNK_FRAMES = 1024
+# Most data, in bytes, that read() decompresses from a per-atom array at once
+READ_BUFFER_BYTES = 2**24
+
 ##############################################################################
 # Utilities
 ##############################################################################
@@ -182,9 +194,22 @@ class HDF5TrajectoryFile(object):
     force_overwrite : bool
         In mode='w', how do you want to behave if a file by the name of `filename`
         already exists? if `force_overwrite=True`, it will be overwritten.
-    compression : {'zlib', None}
+    compression : {'zlib', 'blosc', 'lz4', 'lz4hc', 'zstd', 'snappy', 'blosclz', 'lzo', 'bzip2', None}
         Apply compression to the file? This will save space, and does not
-        cost too many cpu cycles, so it's recommended.
+        cost too many cpu cycles, so it's recommended. 'zlib' is the most
+        portable. 'lz4', 'zstd' and the other blosc codecs (which can also be
+        given as e.g. 'blosc:zstd') are usually much faster to read and write,
+        but need an HDF5 library with the blosc filter to read the file. The
+        codecs are used at level 1 with byte shuffling; a ``tables.Filters``
+        instance can be passed instead for full control.
+    chunkshape : {None, 'frames', 'atoms', tuple}
+        Shape of the chunks of the coordinates and velocities, which are the
+        units that HDF5 compresses and reads. With None, PyTables chooses it.
+        'frames' groups whole frames (or, for large systems, contiguous
+        blocks of atoms of one frame), which is best for reading frames.
+        'atoms' groups many frames of a few atoms, which is best for reading
+        the time series of a subset of the atoms. A tuple gives the number of
+        frames and atoms in each chunk explicitly. Only used when writing.
 
     Attributes
     ----------
@@ -203,7 +228,8 @@ class HDF5TrajectoryFile(object):
     """
     distance_unit = 'nanometers'
 
-    def __init__(self, filename, mode='r', force_overwrite=True, compression='zlib'):
+    def __init__(self, filename, mode='r', force_overwrite=True, compression='zlib',
+                 chunkshape=None):
         self._open = False  # is the file handle currently open?
         self.mode = mode  # the mode in which the file was opened?
 
@@ -216,12 +242,13 @@ class HDF5TrajectoryFile(object):
         # import tables
         self.tables = import_('tables')
 
-        if compression == 'zlib':
-            compression = self.tables.Filters(complib='zlib', shuffle=True, complevel=1)
-        elif compression is None:
-            compression = None
-        else:
-            raise ValueError('compression must be either "zlib" or None')
+        compression = self._get_filters(compression)
+        if not (chunkshape in (None, 'frames', 'atoms') or
+                (isinstance(chunkshape, (tuple, list)) and len(chunkshape) == 2
+                 and all(int(n) > 0 for n in chunkshape))):
+            raise ValueError("chunkshape must be None, 'frames', 'atoms' or a "
+                             "tuple of the number of frames and atoms")
+        self._chunkshape = chunkshape
 
         self._handle = self._open_file(filename, mode=mode, filters=compression)
         self._open = True
@@ -245,6 +272,43 @@ class HDF5TrajectoryFile(object):
             self._frame_index = 0
             self._needs_initialization = False
 
+    def _get_filters(self, compression):
+        """The tables.Filters for the `compression` argument"""
+        if compression is None or isinstance(compression, self.tables.Filters):
+            return compression
+        if compression in BLOSC_CODECS:
+            compression = 'blosc:' + compression
+
+        complib = str(compression)
+        if complib.startswith('blosc:'):
+            available = complib[len('blosc:'):] in self.tables.blosc_compressor_list()
+        else:
+            available = (complib in ('zlib', 'lzo', 'bzip2', 'blosc') and
+                         self.tables.which_lib_version(complib) is not None)
+        if not available:
+            raise ValueError('compression must be None or one of "zlib", "lzo", '
+                             '"bzip2", "blosc", or "blosc:<codec>" for a codec in '
+                             '%s, that is available in this PyTables installation. '
+                             'you supplied %r' % (BLOSC_CODECS, compression))
+        return self.tables.Filters(complib=complib, shuffle=True,
+                                   complevel=COMPRESSION_LEVEL)
+
+    def _per_atom_chunkshape(self, n_atoms):
+        """Chunk shape for the (n_frames, n_atoms, 3) arrays"""
+        if self._chunkshape is None:
+            return None
+        n_atoms = max(n_atoms, 1)
+        if self._chunkshape == 'frames':
+            frame_bytes = 12 * n_atoms
+            if frame_bytes <= CHUNK_BYTES:
+                return (CHUNK_BYTES // frame_bytes, n_atoms, 3)
+            return (1, CHUNK_BYTES // 12, 3)
+        if self._chunkshape == 'atoms':
+            n_frames = ATOM_MAJOR_CHUNK_FRAMES
+            return (n_frames, min(n_atoms, max(1, CHUNK_BYTES // (12 * n_frames))), 3)
+        n_frames, n_chunk_atoms = [int(n) for n in self._chunkshape]
+        return (n_frames, min(n_atoms, n_chunk_atoms), 3)
+
     @property
     @ensure_mode('r', 'a')
     def root(self):
@@ -604,41 +668,18 @@ class HDF5TrajectoryFile(object):
         if frame_slice.stop - frame_slice.start == 0:
             return []
 
-        if atom_indices is None:
-            # get all of the atoms
-            atom_slice = slice(None)
-        else:
-            atom_slice = ensure_type(atom_indices, dtype=np.int, ndim=1,
-                                     name='atom_indices', warn_on_cast=False)
-            if not np.all(atom_slice < self._handle.root.coordinates.shape[1]):
-                raise ValueError('As a zero-based index, the entries in '
-                    'atom_indices must all be less than the number of atoms '
-                    'in the trajectory, %d' % self._handle.root.coordinates.shape[1])
-            if not np.all(atom_slice >= 0):
-                raise ValueError('The entries in atom_indices must be greater '
-                    'than or equal to zero')
+        atom_indices = self._check_atom_indices(atom_indices)
 
         def get_field(name, slice, out_units, can_be_none=True):
-            try:
-                node = self._get_node(where='/', name=name)
-                data = node.__getitem__(slice)
-                in_units = node.attrs.units
-                if not isinstance(in_units, string_types):
-                    in_units = in_units.decode()
-                data =  in_units_of(data, in_units, out_units)
-                return data
-            except self.tables.NoSuchNodeError:
-                if can_be_none:
-                    return None
-                raise
+            return self._read_field(name, slice, out_units, atom_indices, can_be_none)
 
         frames = Frames(
-            coordinates = get_field('coordinates', (frame_slice, atom_slice, slice(None)),
+            coordinates = get_field('coordinates', frame_slice,
                                     out_units='nanometers', can_be_none=False),
             time = get_field('time', frame_slice, out_units='picoseconds'),
             cell_lengths = get_field('cell_lengths', (frame_slice, slice(None)), out_units='nanometers'),
             cell_angles = get_field('cell_angles', (frame_slice, slice(None)), out_units='degrees'),
-            velocities = get_field('velocities', (frame_slice, atom_slice, slice(None)), out_units='nanometers/picosecond'),
+            velocities = get_field('velocities', frame_slice, out_units='nanometers/picosecond'),
             kineticEnergy = get_field('kineticEnergy', frame_slice, out_units='kilojoules_per_mole'),
             potentialEnergy = get_field('potentialEnergy', frame_slice, out_units='kilojoules_per_mole'),
             temperature = get_field('temperature', frame_slice, out_units='kelvin'),
@@ -648,6 +689,90 @@ class HDF5TrajectoryFile(object):
         self._frame_index += (frame_slice.stop - frame_slice.start)
         return frames
 
+    @ensure_mode('r')
+    def read_into(self, out, stride=None, atom_indices=None):
+        """Read the next frames of the file into an existing trajectory
+
+        The coordinates are decompressed directly into the arrays of `out`,
+        so that reading a long file in chunks doesn't allocate new arrays for
+        each chunk.
+
+        Parameters
+        ----------
+        out : Trajectory
+            The trajectory to read up to ``len(out)`` frames into, whose
+            coordinates must be a C-contiguous float32 array with the number
+            of atoms being read.
+        stride : {int, None}
+            By default all of the frames will be read, but you can pass this
+            flag to read a subset of of the data by grabbing only every
+            `stride`-th frame from disk.
+        atom_indices : {int, None}
+            By default all of the atom  will be read, but you can pass this
+            flag to read only a subsets of the atoms.
+
+        Returns
+        -------
+        trajectory : Trajectory
+            The frames that were read, in a trajectory that shares its arrays
+            and topology with `out`, so that it's overwritten by the next
+            read into `out`.
+        """
+        from mdtraj.core.trajectory import Trajectory, _read_buffer, _buffer_view
+        stride = 1 if stride is None else int(stride)
+        atom_indices = self._check_atom_indices(atom_indices)
+        n_atoms = self._handle.root.coordinates.shape[1]
+        if atom_indices is not None:
+            n_atoms = len(atom_indices)
+        xyz_out = _read_buffer(out, n_atoms)
+
+        total_n_frames = len(self._handle.root.coordinates)
+        frame_slice = slice(self._frame_index, min(self._frame_index + len(out) * stride, total_n_frames), stride)
+        xyz = self._read_field('coordinates', frame_slice, Trajectory._distance_unit,
+                               atom_indices, can_be_none=False, out=xyz_out)
+        time = self._read_field('time', frame_slice, 'picoseconds')
+        cell_lengths = self._read_field('cell_lengths', (frame_slice, slice(None)),
+                                        Trajectory._distance_unit)
+        cell_angles = self._read_field('cell_angles', (frame_slice, slice(None)), 'degrees')
+
+        self._frame_index += (frame_slice.stop - frame_slice.start)
+        return _buffer_view(out, len(xyz), time, cell_lengths, cell_angles)
+
+    def _check_atom_indices(self, atom_indices):
+        "Validate the atom indices to read, as an array (or None)"
+        if atom_indices is not None:
+            atom_indices = ensure_type(atom_indices, dtype=np.int, ndim=1,
+                                       name='atom_indices', warn_on_cast=False)
+            if not np.all(atom_indices < self._handle.root.coordinates.shape[1]):
+                raise ValueError('As a zero-based index, the entries in '
+                    'atom_indices must all be less than the number of atoms '
+                    'in the trajectory, %d' % self._handle.root.coordinates.shape[1])
+            if not np.all(atom_indices >= 0):
+                raise ValueError('The entries in atom_indices must be greater '
+                    'than or equal to zero')
+        return atom_indices
+
+    def _read_field(self, name, slice, out_units, atom_indices=None,
+                    can_be_none=True, out=None):
+        """Read the frames in `slice` of a field, converted to `out_units`.
+        Per-atom fields are read into the leading frames of `out`, if it's
+        given, and converted in place."""
+        try:
+            node = self._get_node(where='/', name=name)
+            if node.ndim == 3:
+                data = _read_per_atom(node, slice, atom_indices, out)
+            else:
+                data = node.__getitem__(slice)
+            in_units = node.attrs.units
+            if not isinstance(in_units, string_types):
+                in_units = in_units.decode()
+            data =  in_units_of(data, in_units, out_units, inplace=out is not None)
+            return data
+        except self.tables.NoSuchNodeError:
+            if can_be_none:
+                return None
+            raise
+
     @ensure_mode('w', 'a')
     def write(self, coordinates, time=None, cell_lengths=None, cell_angles=None,
                     velocities=None, kineticEnergy=None, potentialEnergy=None,
@@ -845,9 +970,11 @@ class HDF5TrajectoryFile(object):
             self._handle.root._v_attrs.application = 'MDTraj'
 
         # create arrays that store frame level informat
+        chunkshape = self._per_atom_chunkshape(self._n_atoms)
         if set_coordinates:
             self._create_earray(where='/', name='coordinates',
-                atom=self.tables.Float32Atom(), shape=(0, self._n_atoms, 3))
+                atom=self.tables.Float32Atom(), shape=(0, self._n_atoms, 3),
+                chunkshape=chunkshape)
             self._handle.root.coordinates.attrs['units'] = 'nanometers'
 
         if set_time:
@@ -865,7 +992,8 @@ class HDF5TrajectoryFile(object):
 
         if set_velocities:
             self._create_earray(where='/', name='velocities',
-                atom=self.tables.Float32Atom(), shape=(0, self._n_atoms, 3))
+                atom=self.tables.Float32Atom(), shape=(0, self._n_atoms, 3),
+                chunkshape=chunkshape)
             self._handle.root.velocities.attrs['units'] = 'nanometers/picosecond'
 
         if set_kineticEnergy:
@@ -984,3 +1112,60 @@ class HDF5TrajectoryFile(object):
         if not self._open:
             raise ValueError('I/O operation on closed file')
         return len(self._handle.root.coordinates)
+
+
+def _read_per_atom(node, frame_slice, atom_indices, out=None):
+    """Read the frames in `frame_slice` of the atoms in `atom_indices` (or
+    all of the atoms, if None) from a (n_frames, n_atoms, 3) array, into the
+    leading frames of `out` if it's given.
+
+    The reads are aligned to the chunks of the array, so that each chunk is
+    decompressed at most once when it fits in READ_BUFFER_BYTES: only the
+    chunks along the frame axis that hold one of the frames are read,
+    consecutive ones together, and along the atom axis only the chunks
+    spanning the atoms. Only the requested frames of those chunks are read
+    into memory, at most READ_BUFFER_BYTES of them at a time, and the atoms
+    are then picked out of them.
+    """
+    n_atoms = node.shape[1]
+    chunk_frames, chunk_atoms = (node.chunkshape or (1, n_atoms))[:2]
+    frames = np.arange(*frame_slice.indices(node.shape[0]))
+
+    if atom_indices is None:
+        shape = (len(frames),) + node.shape[1:]
+        lo, hi = 0, n_atoms
+    else:
+        shape = (len(frames), len(atom_indices)) + node.shape[2:]
+        if len(atom_indices) > 0:
+            # round out to the boundaries of the chunks
+            lo = (atom_indices.min() // chunk_atoms) * chunk_atoms
+            hi = min(n_atoms, -(-(atom_indices.max() + 1) // chunk_atoms) * chunk_atoms)
+    if out is None:
+        out = np.empty(shape, dtype=node.dtype)
+    else:
+        out = out[:len(frames)]
+    if out.size == 0:
+        return out
+
+    row_bytes = max(1, (hi - lo) * int(np.prod(node.shape[2:])) * node.dtype.itemsize)
+    max_chunks = max(1, READ_BUFFER_BYTES // (row_bytes * chunk_frames))
+    # a single row of chunks can be bigger than the buffer, so the number of
+    # frames in each read is bounded too
+    max_frames = max(1, READ_BUFFER_BYTES // row_bytes)
+    step = int(frames[1] - frames[0]) if len(frames) > 1 else 1
+
+    chunk_ids = np.unique(frames // chunk_frames)
+    # break the chunks into runs of consecutive ones, of at most max_chunks
+    breaks = np.flatnonzero(np.diff(chunk_ids) != 1) + 1
+    for run in np.split(chunk_ids, breaks):
+        for first in range(0, len(run), max_chunks):
+            start = run[first] * chunk_frames
+            stop = min((run[min(first + max_chunks, len(run)) - 1] + 1) * chunk_frames, node.shape[0])
+            i, j = np.searchsorted(frames, [start, stop])
+            for k in range(i, j, max_frames):
+                selected = frames[k:min(k + max_frames, j)]
+                block = node[selected[0]:selected[-1] + 1:step, lo:hi]
+                if atom_indices is not None:
+                    block = block[:, atom_indices - lo]
+                out[k:k + len(selected)] = block
+    return out
@@ -28,6 +28,7 @@
 from __future__ import print_function, division
 
 import os
+import warnings
 import itertools
 
 import numpy as np
@@ -35,6 +36,7 @@ import numpy as np
 from mdtraj.utils import (ensure_type, cast_indices, in_units_of,
                           lengths_and_angles_to_box_vectors)
 from mdtraj.formats.registry import _FormatRegistry
+from mdtraj.utils.offsets import load_offsets, save_offsets, scan_marker_offsets
 from mdtraj.utils.six import string_types
 from mdtraj.utils.six.moves import xrange
 
@@ -47,7 +49,7 @@ class _EOF(IOError):
 
 @_FormatRegistry.register_loader('.lammpstrj')
 def load_lammpstrj(filename, top=None, stride=None, atom_indices=None,
-                   frame=None, unit_set='real'):
+                   frame=None, unit_set='real', n_jobs=1):
     """Load a LAMMPS trajectory file.
 
     Parameters
@@ -71,6 +73,9 @@ def load_lammpstrj(filename, top=None, stride=None, atom_indices=None,
         The LAMMPS unit set that the simulation was performed in. See
         http://lammps.sandia.gov/doc/units.html for options. Currently supported
         unit sets: 'real'.
+    n_jobs : int, default=1
+        The number of processes to parse the file with. If -1, use one per
+        CPU.
 
     Returns
     -------
@@ -108,7 +113,143 @@ def load_lammpstrj(filename, top=None, stride=None, atom_indices=None,
         else:
             n_frames = None
 
-        return f.read_as_traj(topology, n_frames=n_frames, stride=stride, atom_indices=atom_indices)
+        return f.read_as_traj(topology, n_frames=n_frames, stride=stride,
+                              atom_indices=atom_indices, n_jobs=n_jobs)
+
+
+# The columns of the coordinates, in order of preference
+_COORDINATE_COLUMNS = [('x', 'y', 'z'),  # unscaled
+                       ('xs', 'ys', 'zs'),  # scaled
+                       ('xu', 'yu', 'zu'),  # unwrapped
+                       ('xsu', 'ysu', 'zsu')]  # scaled and unwrapped
+
+
+def _box_lengths_and_angles(box, style):
+    """Get the lengths and angles of the unit cell from the three lines of
+    BOX BOUNDS in a frame, as an array of shape (3, 2) or, for triclinic
+    boxes, (3, 3).
+    """
+    if style == 'triclinic':
+        xy, xz, yz = box[:, 2]
+
+        xlo = box[0, 0] - np.min([0.0, xy, xz, xy+xz])
+        xhi = box[0, 1] - np.max([0.0, xy, xz, xy+xz])
+        ylo = box[1, 0] - np.min([0.0, yz])
+        yhi = box[1, 1] - np.max([0.0, yz])
+        zlo = box[2, 0]
+        zhi = box[2, 1]
+
+        lx = xhi - xlo
+        ly = yhi - ylo
+        lz = zhi - zlo
+
+        a = lx
+        b = np.sqrt(ly**2 + xy**2)
+        c = np.sqrt(lz**2 + xz**2 + yz**2)
+        alpha = np.arccos((xy*xz + ly*yz) / (b*c))
+        beta = np.arccos(xz / c)
+        gamma = np.arccos(xy / b)
+
+        lengths = np.array([a, b, c])
+        angles = np.degrees(np.array([alpha, beta, gamma]))
+    elif style == 'orthogonal':
+        lengths = box[:, 1] - box[:, 0]
+        angles = np.empty(3)
+        angles.fill(90.0)
+    return lengths, angles
+
+
+def _parse_frame(data, filename='', line_counter=0):
+    """Parse the text of one frame of a lammpstrj file
+
+    The atom lines are converted to numbers in bulk with numpy, rather than
+    one line at a time.
+
+    Returns
+    -------
+    xyz : np.ndarray, shape=(n_atoms, 3)
+    lengths : np.ndarray, shape=(3,)
+    angles : np.ndarray, shape=(3,)
+    """
+    lines = data.split(b'\n', 9)
+    try:
+        n_atoms = int(lines[3])
+        box_header = lines[4].split()
+        if len(box_header) == 9:
+            style = 'triclinic'
+        elif len(box_header) == 6:
+            style = 'orthogonal'
+        else:
+            raise ValueError()
+        box = np.array(b' '.join(lines[5:8]).split(), dtype=np.float64)
+        lengths, angles = _box_lengths_and_angles(box.reshape(3, -1), style)
+    except (ValueError, IndexError):
+        raise IOError('lammpstrj parse error on line {0:d} of "{1:s}". '
+                      'This file does not appear to be a valid '
+                      'lammpstrj file.'.format(line_counter + 5, filename))
+
+    column_headers = [h.decode('ascii') for h in lines[8].split()[2:]]
+    columns = dict((header, idx) for idx, header in enumerate(column_headers))
+    # Make sure the file contains an x, y, and z-coordinate of the same style.
+    for keywords in _COORDINATE_COLUMNS:
+        if set(keywords).issubset(column_headers):
+            break
+    else:
+        raise IOError('Invalid .lammpstrj file. Must contain x, y, and '
+                      'z coordinates that all adhere to the same style.')
+    if 'id' not in columns or 'type' not in columns:
+        raise IOError("Invalid .lammpstrj file. Must contain 'id', "
+                      "'type', 'x*', 'y*' and 'z*' entries.")
+    index_column = columns['id']
+    xyz_columns = [columns[keyword] for keyword in keywords]
+
+    body = lines[9] if len(lines) > 9 else b''
+    n_columns = len(column_headers)
+    with warnings.catch_warnings():
+        # non-numeric columns, e.g. element names, stop the fast path
+        warnings.simplefilter('ignore')
+        values = np.fromstring(body, dtype=np.float64, sep=' ')
+    if len(values) == n_atoms * n_columns:
+        values = values.reshape(n_atoms, n_columns)
+        indices = values[:, index_column].astype(np.intp)
+        coordinates = values[:, xyz_columns]
+    else:
+        fields = body.split()
+        if len(fields) != n_atoms * n_columns:
+            raise IOError('lammpstrj parse error on line {0:d} of "{1:s}". '
+                          'This file does not appear to be a valid '
+                          'lammpstrj file.'.format(line_counter + 10, filename))
+        fields = np.array(fields).reshape(n_atoms, n_columns)
+        try:
+            indices = fields[:, index_column].astype(np.intp)
+            coordinates = fields[:, xyz_columns].astype(np.float64)
+        except ValueError:
+            raise IOError('lammpstrj parse error on line {0:d} of "{1:s}". '
+                          'This file does not appear to be a valid '
+                          'lammpstrj file.'.format(line_counter + 10, filename))
+
+    # the atoms may be in any order
+    xyz = np.empty(shape=(n_atoms, 3))
+    xyz[indices - 1] = coordinates
+    return xyz, lengths, angles
+
+
+def _read_frames(args):
+    """Read the frames between some byte offsets of a lammpstrj file; the
+    unit of work for reading a file in parallel."""
+    filename, starts, ends, atom_indices = args
+    all_coords, all_lengths, all_angles = [], [], []
+    with open(filename, 'rb') as f:
+        for start, end in zip(starts, ends):
+            f.seek(start)
+            xyz, lengths, angles = _parse_frame(f.read(end - start), filename)
+            if atom_indices is not None:
+                xyz = xyz[atom_indices, :]
+            all_coords.append(xyz)
+            all_lengths.append(lengths)
+            all_angles.append(angles)
+    return (np.array(all_coords), np.array(all_lengths, dtype=np.float32),
+            np.array(all_angles, dtype=np.float32))
 
 
 @_FormatRegistry.register_fileobject('.lammpstrj')
@@ -128,16 +269,25 @@ class LAMMPSTrajectoryFile(object):
     force_overwrite : bool
         If opened in write mode, and a file by the name of `filename` already
         exists on disk, should we overwrite it?
+    cache_offsets : bool, default=False
+        In mode='r', seeking and finding the number of frames requires the
+        offset of each frame in the file, which are found by scanning it once.
+        If True, they are saved to a hidden ``.<filename>.offsets.npz`` file
+        next to it, and reused the next time the file is opened. This writes
+        to the directory of the file, so it is off by default.
     """
 
     distance_unit = 'angstroms'
 
-    def __init__(self, filename, mode='r', force_overwrite=True):
+    def __init__(self, filename, mode='r', force_overwrite=True,
+                 cache_offsets=False):
         """Open a LAMMPS lammpstrj file for reading/writing. """
         self._is_open = False
         self._filename = filename
         self._mode = mode
         self._frame_index = 0
+        self._offsets = None
+        self._cache_offsets = cache_offsets
         # track which line we're on. this is not essential, but its useful
         # when reporting errors to the user to say what line it occured on.
         self._line_counter = 0
@@ -145,7 +295,7 @@ class LAMMPSTrajectoryFile(object):
         if mode == 'r':
             if not os.path.exists(filename):
                 raise IOError("The file '%s' doesn't exist" % filename)
-            self._fh = open(filename, 'r')
+            self._fh = open(filename, 'rb')
             self._is_open = True
         elif mode == 'w':
             if os.path.exists(filename) and not force_overwrite:
@@ -173,7 +323,8 @@ class LAMMPSTrajectoryFile(object):
         """Support the context manager protocol. """
         self.close()
 
-    def read_as_traj(self, topology, n_frames=None, stride=None, atom_indices=None):
+    def read_as_traj(self, topology, n_frames=None, stride=None,
+                     atom_indices=None, n_jobs=1):
         """Read a trajectory from a lammpstrj file
 
         Parameters
@@ -189,6 +340,8 @@ class LAMMPSTrajectoryFile(object):
             If not none, then read only a subset of the atoms coordinates from the
             file. This may be slightly slower than the standard read because it required
             an extra copy, but will save memory.
+        n_jobs : int, default=1
+            The number of processes to parse the frames with. See `read`.
 
         Returns
         -------
@@ -217,7 +370,9 @@ class LAMMPSTrajectoryFile(object):
             topology = topology.subset(atom_indices)
 
         initial = int(self._frame_index)
-        xyz, cell_lengths, cell_angles = self.read(n_frames=n_frames, stride=stride, atom_indices=atom_indices)
+        xyz, cell_lengths, cell_angles = self.read(
+            n_frames=n_frames, stride=stride, atom_indices=atom_indices,
+            n_jobs=n_jobs)
         if len(xyz) == 0:
             return Trajectory(xyz=np.zeros((0, topology.n_atoms, 3)), topology=topology)
 
@@ -233,7 +388,7 @@ class LAMMPSTrajectoryFile(object):
         t.unitcell_angles = cell_angles
         return t
 
-    def read(self, n_frames=None, stride=None, atom_indices=None):
+    def read(self, n_frames=None, stride=None, atom_indices=None, n_jobs=1):
         """Read data from a lammpstrj file.
 
         Parameters
@@ -246,6 +401,11 @@ class LAMMPSTrajectoryFile(object):
         atom_indices : array_like, optional
             If not none, then read only a subset of the atoms coordinates
             from the file.
+        n_jobs : int, default=1
+            The number of processes to parse the frames with. If -1, use one
+            per CPU. Parsing in parallel requires the index of the offsets of
+            the frames in the file (see `offsets`), which is built first if
+            it isn't cached.
 
         Returns
         -------
@@ -261,14 +421,17 @@ class LAMMPSTrajectoryFile(object):
             raise ValueError('read() is only available when file is opened '
                              'in mode="r"')
 
+        if stride is None:
+            stride = 1
+
+        if n_jobs != 1:
+            return self._read_parallel(n_frames, stride, atom_indices, n_jobs)
+
         if n_frames is None:
             frame_counter = itertools.count()
         else:
             frame_counter = xrange(n_frames)
 
-        if stride is None:
-            stride = 1
-
         all_coords, all_lengths, all_angles = [], [], []
         for _ in frame_counter:
             try:
@@ -282,10 +445,10 @@ class LAMMPSTrajectoryFile(object):
             all_lengths.append(frame_lengths)
             all_angles.append(frame_angles)
 
-            for j in range(stride - 1):
-                # throw away these frames
+            if stride > 1:
+                # skip these frames
                 try:
-                    self._read()
+                    self._skip(stride - 1)
                 except _EOF:
                     break
 
@@ -294,6 +457,34 @@ class LAMMPSTrajectoryFile(object):
         all_angles = np.array(all_angles, dtype=np.float32)
         return all_coords, all_lengths, all_angles
 
+    def _read_parallel(self, n_frames, stride, atom_indices, n_jobs):
+        """Read frames like `read`, splitting them between worker processes"""
+        from multiprocessing import Pool, cpu_count
+
+        offsets = np.append(self.offsets, os.path.getsize(self._filename))
+        frames = np.arange(self._frame_index, len(offsets) - 1, stride)
+        if n_frames is not None:
+            frames = frames[:n_frames]
+
+        if n_jobs is None or n_jobs < 1:
+            n_jobs = cpu_count()
+        n_jobs = min(n_jobs, len(frames))
+        if n_jobs == 0:
+            return np.array([]), np.array([]), np.array([])
+        jobs = [(self._filename, offsets[chunk], offsets[chunk + 1],
+                 atom_indices) for chunk in np.array_split(frames, n_jobs)]
+        pool = Pool(n_jobs)
+        try:
+            results = pool.map(_read_frames, jobs)
+        finally:
+            pool.close()
+            pool.join()
+
+        if len(frames) > 0:
+            self.seek(min(frames[-1] + stride, len(offsets) - 1))
+        return tuple(np.concatenate([r[i] for r in results])
+                     for i in range(3))
+
     def parse_box(self, style):
         """Extract lengths and angles from a frame.
 
@@ -312,118 +503,83 @@ class LAMMPSTrajectoryFile(object):
         For more info on how LAMMPS defines boxes:
         http://lammps.sandia.gov/doc/Section_howto.html#howto_12
         """
-        box = np.empty(shape=(3, 2))
-        if style == 'triclinic':
-            factors = np.empty(3)
-            for i in range(3):
-                line = self._fh.readline().split()
-                box[i] = line[:2]
-                factors[i] = line[2]
-            xy, xz, yz = factors
-
-            xlo = box[0, 0] - np.min([0.0, xy, xz, xy+xz])
-            xhi = box[0, 1] - np.max([0.0, xy, xz, xy+xz])
-            ylo = box[1, 0] - np.min([0.0, yz])
-            yhi = box[1, 1] - np.max([0.0, yz])
-            zlo = box[2, 0]
-            zhi = box[2, 1]
-
-            lx = xhi - xlo
-            ly = yhi - ylo
-            lz = zhi - zlo
-
-            a = lx
-            b = np.sqrt(ly**2 + xy**2)
-            c = np.sqrt(lz**2 + xz**2 + yz**2)
-            alpha = np.arccos((xy*xz + ly*yz) / (b*c))
-            beta = np.arccos(xz / c)
-            gamma = np.arccos(xy / b)
-
-            lengths = np.array([a, b, c])
-            angles = np.degrees(np.array([alpha, beta, gamma]))
-        elif style == 'orthogonal':
-            box[0] = self._fh.readline().split()  # x-dim of box
-            box[1] = self._fh.readline().split()  # y-dim of box
-            box[2] = self._fh.readline().split()  # z-dim of box
-            lengths = np.diff(box, axis=1).reshape(1, 3)[0]  # box lengths
-            angles = np.empty(3)
-            angles.fill(90.0)
-        return lengths, angles
+        box = np.array([self._fh.readline().split() for _ in range(3)],
+                       dtype=np.float64)
+        return _box_lengths_and_angles(box, style)
 
     def _read(self):
         """Read a single frame. """
+        if self._offsets is not None:
+            # the frame is everything up to the start of the next one
+            if self._frame_index >= len(self._offsets):
+                raise _EOF()
+            if self._frame_index + 1 < len(self._offsets):
+                size = self._offsets[self._frame_index + 1] - \
+                    self._offsets[self._frame_index]
+                data = self._fh.read(size)
+            else:
+                data = self._fh.read()
+            result = _parse_frame(data, self._filename)
+            self._frame_index += 1
+            return result
 
-        # --- begin header ---
-        first = self._fh.readline()  # ITEM: TIMESTEP
-        if first == '':
+        header = [self._fh.readline() for _ in range(4)]
+        if header[0] == b'':
             raise _EOF()
-        self._fh.readline()  # timestep
-        self._fh.readline()  # ITEM: NUMBER OF ATOMS
-        self._n_atoms = int(self._fh.readline())  # num atoms
-
-        box_header = self._fh.readline().split()  # ITEM: BOX BOUNDS
-        self._line_counter += 5
-        if len(box_header) == 9:
-            lengths, angles = self.parse_box('triclinic')
-        elif len(box_header) == 6:
-            lengths, angles = self.parse_box('orthogonal')
-        else:
+        try:
+            n_atoms = int(header[3])
+        except ValueError:
             raise IOError('lammpstrj parse error on line {0:d} of "{1:s}". '
                           'This file does not appear to be a valid '
                           'lammpstrj file.'.format(
-                    self._line_counter,  self._filename))
-
-        column_headers = self._fh.readline().split()[2:]  # ITEM: ATOMS ...
-        if self._frame_index == 0:
-            # Detect which columns the atom index, type and coordinates are.
-            columns = {header: idx for idx, header in enumerate(column_headers)}
-
-            # Make sure the file contains an x, y, and z-coordinate of the same
-            # style.
-            coord_keywords = [('x', 'y', 'z'),  # unscaled
-                              ('xs', 'ys', 'zs'),  # scaled
-                              ('xu', 'yu', 'zu'),  # unwrapped
-                              ('xsu', 'ysu', 'zsu')]  # scaled and unwrapped
-            for keywords in coord_keywords:
-                if set(keywords).issubset(column_headers):
-                    break
-            else:
-                raise IOError('Invalid .lammpstrj file. Must contain x, y, and '
-                              'z coordinates that all adhere to the same style.')
-
-            try:
-                self._atom_index_column = columns['id']
-                self._atom_type_column = columns['type']
-                self._xyz_columns = [columns[keywords[0]], columns[keywords[1]], columns[keywords[2]]]
-            except KeyError:
-                raise IOError("Invalid .lammpstrj file. Must contain 'id', "
-                              "'type', 'x*', 'y*' and 'z*' entries.")
-        self._line_counter += 4
-        # --- end header ---
-
-        xyz = np.empty(shape=(self._n_atoms, 3))
-        types = np.empty(shape=self._n_atoms, dtype='int')
-
-        # --- begin body ---
-        for _ in xrange(self._n_atoms):
-            line = self._fh.readline()
-            if line == '':
-                raise _EOF()
-            split_line = line.split()
-            try:
-                atom_index = int(split_line[self._atom_index_column])
-                types[atom_index - 1] = int(split_line[self._atom_type_column])
-                xyz[atom_index - 1] = [float(split_line[column]) for column in self._xyz_columns]
-            except Exception:
-                raise IOError('lammpstrj parse error on line {0:d} of "{1:s}". '
-                              'This file does not appear to be a valid '
-                              'lammpstrj file.'.format(
-                        self._line_counter,  self._filename))
-            self._line_counter += 1
-        # --- end body ---
+                self._line_counter + 4, self._filename))
+        # the box header and bounds, the atoms header and one line per atom
+        lines = [self._fh.readline() for _ in range(n_atoms + 5)]
+        if lines[-1] == b'':
+            raise _EOF()
 
+        result = _parse_frame(b''.join(header + lines), self._filename,
+                              self._line_counter)
+        self._n_atoms = n_atoms
+        self._line_counter += n_atoms + 9
         self._frame_index += 1
-        return xyz, lengths, angles
+        return result
+
+    def _skip(self, n_frames):
+        """Skip over frames without parsing them"""
+        if self._offsets is not None:
+            n_frames = min(n_frames, len(self._offsets) - self._frame_index)
+            self.seek(n_frames, whence=1)
+            return
+        for _ in range(n_frames):
+            header = [self._fh.readline() for _ in range(4)]
+            if header[0] == b'':
+                raise _EOF()
+            for _ in range(int(header[3]) + 5):
+                self._fh.readline()
+            self._frame_index += 1
+            self._line_counter += int(header[3]) + 9
+
+    @property
+    def offsets(self):
+        """The byte offset of the start of each frame in the file.
+
+        The offsets are found by scanning the file once. If the file was
+        opened with ``cache_offsets=True``, they are cached in a hidden
+        ``.<filename>.offsets.npz`` file next to it.
+        """
+        if not self._mode == 'r':
+            raise NotImplementedError('offsets only available in mode="r"')
+        if self._offsets is None:
+            offsets = None
+            if self._cache_offsets:
+                offsets = load_offsets(self._filename, key='lammpstrj')
+            if offsets is None:
+                offsets = scan_marker_offsets(self._filename, b'ITEM: TIMESTEP')
+                if self._cache_offsets:
+                    save_offsets(self._filename, offsets, key='lammpstrj')
+            self._offsets = offsets
+        return self._offsets
 
     def write_box(self, lengths, angles, mins):
         """Write the box lines in the header of a frame.
@@ -563,22 +719,24 @@ class LAMMPSTrajectoryFile(object):
             elif whence == 1 and offset < 0:
                 absolute = offset + self._frame_index
             elif whence == 2 and offset <= 0:
-                raise NotImplementedError('offsets from the end are not supported yet')
+                absolute = len(self.offsets) + offset
             else:
                 raise IOError('Invalid argument')
 
             if advance is not None:
-                for i in range(advance):
-                    self._read()  # advance and throw away these frames
-            elif absolute is not None:
-                self._fh.close()
-                self._fh = open(self._filename, 'r')
-                self._frame_index = 0
-                self._line_counter = 0
-                for i in range(absolute):
-                    self._read()
+                absolute = self._frame_index + advance
+            offsets = self.offsets
+            if absolute > len(offsets):
+                raise IOError('Cannot seek to frame %d of a file with %d '
+                              'frames' % (absolute, len(offsets)))
+            if absolute == len(offsets):
+                self._fh.seek(0, os.SEEK_END)
             else:
-                raise RuntimeError()
+                self._fh.seek(offsets[absolute])
+            self._frame_index = absolute
+            # the line counter is only used for error messages, and is
+            # unknown after a seek
+            self._line_counter = 0
 
         else:
             raise NotImplementedError('offsets in write mode are not supported yet')
@@ -595,6 +753,10 @@ class LAMMPSTrajectoryFile(object):
 
     def __len__(self):
         "Number of frames in the file"
-        raise NotImplementedError()
+        if str(self._mode) != 'r':
+            raise NotImplementedError('len() only available in mode="r" currently')
+        if not self._is_open:
+            raise ValueError('I/O operation on closed file')
+        return len(self.offsets)
 
 
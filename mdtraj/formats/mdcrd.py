@@ -31,6 +31,7 @@ import itertools
 import numpy as np
 from mdtraj.utils import ensure_type, cast_indices, in_units_of
 from mdtraj.formats.registry import _FormatRegistry
+from mdtraj.utils.offsets import load_offsets, save_offsets, scan_line_offsets
 from mdtraj.utils.six import string_types, PY3
 from mdtraj.utils.six.moves import xrange
 
@@ -132,12 +133,18 @@ class MDCRDTrajectoryFile(object):
     force_overwrite : bool
         If opened in write mode, and a file by the name of `filename` already
         exists on disk, should we overwrite it?
+    cache_offsets : bool, default=False
+        In mode='r', seeking and finding the number of frames requires the
+        offset of each frame in the file, which are found by scanning it once.
+        If True, they are saved to a hidden ``.<filename>.offsets.npz`` file
+        next to it, and reused the next time the file is opened. This writes
+        to the directory of the file, so it is off by default.
     """
 
     distance_unit = 'angstroms'
 
     def __init__(self, filename,  n_atoms=None, mode='r', has_box='detect',
-                 force_overwrite=True):
+                 force_overwrite=True, cache_offsets=False):
         """Open an AMBER mdcrd file for reading/writing.
         """
         self._is_open = False
@@ -147,6 +154,8 @@ class MDCRDTrajectoryFile(object):
         self._w_has_box = None
         self._frame_index = 0
         self._has_box = has_box
+        self._offsets = None
+        self._cache_offsets = cache_offsets
         # track which line we're on. this is not essential, but its useful
         # when reporting errors to the user to say what line it occured on.
         self._line_counter = 0
@@ -286,10 +295,10 @@ class MDCRDTrajectoryFile(object):
             coords.append(coord)
             boxes.append(box)
 
-            for j in range(stride - 1):
-                # throw away these frames
+            if stride > 1:
+                # skip these frames
                 try:
-                    self._read()
+                    self._skip(stride - 1)
                 except _EOF:
                     break
 
@@ -309,6 +318,42 @@ class MDCRDTrajectoryFile(object):
 
     def _read(self):
         "Read a single frame"
+        # every full line has ten 8-character fields, so the coordinates
+        # can be converted in bulk, unless the file is unusually formatted
+        n_values = self._n_atoms * 3
+        start = self._fh.tell()
+        lines = [self._fh.readline() for _ in range(-(-n_values // 10))]
+        data = b''.join(line.rstrip(b'\r\n') for line in lines)
+        coords = None
+        if len(data) == 8 * n_values and lines[-1].endswith(b'\n'):
+            try:
+                coords = np.frombuffer(data, dtype='S8').astype(np.float32)
+            except ValueError:
+                pass
+        if coords is None:
+            self._fh.seek(start)
+            return self._read_lines()
+
+        self._line_counter += len(lines)
+        box = None
+        if self._has_box is not False:
+            # peek ahead for box
+            here = self._fh.tell()
+            line = self._fh.readline()
+            peek = line.split()
+            if len(peek) == 3:
+                box = [float(elem) for elem in peek]
+                self._line_counter += 1
+            else:
+                if self._has_box is True:
+                    raise IOError('Box information not found in file.')
+                self._fh.seek(here)
+
+        self._frame_index += 1
+        return coords.reshape(self._n_atoms, 3), box
+
+    def _read_lines(self):
+        "Read a single frame, one line at a time"
         i = 0
         coords = np.empty(self._n_atoms*3, dtype=np.float32)
         box = None
@@ -453,23 +498,24 @@ class MDCRDTrajectoryFile(object):
             elif whence == 1 and offset < 0:
                 absolute = offset + self._frame_index
             elif whence == 2 and offset <= 0:
-                raise NotImplementedError('offsets from the end are not supported yet')
+                absolute = len(self.offsets) + offset
             else:
                 raise IOError('Invalid argument')
 
             if advance is not None:
-                for i in range(advance):
-                    self._read()  # advance and throw away these frames
-            elif absolute is not None:
-                self._fh.close()
-                self._fh = open(self._filename, 'rb')
-                self._fh.readline()  # read comment
-                self._frame_index = 0
-                self._line_counter = 1
-                for i in range(absolute):
-                    self._read()
+                absolute = self._frame_index + advance
+            offsets = self.offsets
+            if not 0 <= absolute <= len(offsets):
+                raise IOError('Cannot seek to frame %d of a file with %d '
+                              'frames' % (absolute, len(offsets)))
+            if absolute == len(offsets):
+                self._fh.seek(0, os.SEEK_END)
             else:
-                raise RuntimeError()
+                self._fh.seek(offsets[absolute])
+            self._frame_index = absolute
+            # the line counter is only used for error messages, and is
+            # unknown after a seek
+            self._line_counter = 0
 
         else:
             raise NotImplementedError('offsets in write mode are not supported yet')
@@ -486,4 +532,47 @@ class MDCRDTrajectoryFile(object):
 
     def __len__(self):
         "Number of frames in the file"
-        raise NotImplementedError()
+        if not self._mode == 'r':
+            raise NotImplementedError('len() only available in mode="r"')
+        return len(self.offsets)
+
+    def _skip(self, n_frames):
+        """Skip over frames without parsing them"""
+        n_frames = min(n_frames, len(self.offsets) - self._frame_index)
+        self.seek(n_frames, whence=1)
+
+    def _detect_box(self):
+        """Whether the frames in the file end with a line of box lengths"""
+        if self._has_box != 'detect':
+            return self._has_box
+        n_lines = -(-self._n_atoms * 3 // 10)
+        with open(self._filename, 'rb') as f:
+            for _ in range(n_lines + 1):
+                f.readline()
+            return len(f.readline().split()) == 3
+
+    @property
+    def offsets(self):
+        """The byte offset of the start of each frame in the file.
+
+        Every frame has the same number of lines, so the offsets are found by
+        counting lines. If the file was opened with ``cache_offsets=True``,
+        they are cached in a hidden ``.<filename>.offsets.npz`` file next
+        to it.
+        """
+        if not self._mode == 'r':
+            raise NotImplementedError('offsets only available in mode="r"')
+        if self._offsets is None:
+            has_box = self._detect_box()
+            key = 'mdcrd-%d-%d' % (self._n_atoms, has_box)
+            offsets = None
+            if self._cache_offsets:
+                offsets = load_offsets(self._filename, key=key)
+            if offsets is None:
+                lines_per_frame = -(-self._n_atoms * 3 // 10) + has_box
+                offsets = scan_line_offsets(self._filename, lines_per_frame,
+                                            first_line=1)
+                if self._cache_offsets:
+                    save_offsets(self._filename, offsets, key=key)
+            self._offsets = offsets
+        return self._offsets
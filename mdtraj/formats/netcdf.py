@@ -213,6 +213,47 @@ class NetCDFTrajectoryFile(object):
                           unitcell_lengths=cell_lengths,
                           unitcell_angles=cell_angles)
 
+    def read_into(self, out, stride=None, atom_indices=None):
+        """Read the next frames of the NetCDF file into an existing trajectory
+
+        The netCDF library returns newly allocated arrays, so the frames are
+        copied into the arrays of `out`. This gives the same chunk-by-chunk
+        interface as the other formats, whose ``read_into`` methods avoid
+        that copy.
+
+        Parameters
+        ----------
+        out : Trajectory
+            The trajectory to read up to ``len(out)`` frames into, whose
+            coordinates must be a C-contiguous float32 array with the number
+            of atoms being read.
+        stride : int, optional
+            Read only every stride-th frame.
+        atom_indices : array_like, optional
+            If not none, then read only a subset of the atoms coordinates from the
+            file.
+
+        Returns
+        -------
+        trajectory : Trajectory
+            The frames that were read, in a trajectory that shares its arrays
+            and topology with `out`, so that it's overwritten by the next
+            read into `out`.
+        """
+        from mdtraj.core.trajectory import Trajectory, _read_buffer, _buffer_view
+        n_atoms = self.n_atoms if atom_indices is None else len(np.arange(self.n_atoms)[atom_indices])
+        xyz_out = _read_buffer(out, n_atoms)
+
+        n_frames = len(out) * (1 if stride is None else stride)
+        xyz, time, cell_lengths, cell_angles = self.read(n_frames=n_frames, stride=stride, atom_indices=atom_indices)
+        if len(xyz) == 0:
+            return _buffer_view(out, 0)
+
+        xyz_out[:len(xyz)] = xyz
+        in_units_of(xyz_out[:len(xyz)], self.distance_unit, Trajectory._distance_unit, inplace=True)
+        cell_lengths = in_units_of(cell_lengths, self.distance_unit, Trajectory._distance_unit, inplace=True)
+        return _buffer_view(out, len(xyz), time, cell_lengths, cell_angles)
+
     def read(self, n_frames=None, stride=None, atom_indices=None):
         """Read data from a molecular dynamics trajectory in the AMBER NetCDF
         format.
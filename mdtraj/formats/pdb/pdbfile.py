@@ -45,6 +45,7 @@
 
 from __future__ import print_function, division
 import os
+import itertools
 from datetime import date
 import gzip
 import numpy as np
@@ -134,11 +135,10 @@ def load_pdb(filename, stride=None, atom_indices=None, frame=None):
     
     filename = str(filename)
     with PDBTrajectoryFile(filename) as f:
-        atom_slice = slice(None) if atom_indices is None else atom_indices
         if frame is not None:
-            coords = f.positions[[frame], atom_slice, :]
+            coords = f._read_frames([frame], atom_indices)
         else:
-            coords = f.positions[::stride, atom_slice, :]
+            coords = f._read_frames(slice(None, None, stride), atom_indices)
         assert coords.ndim == 3, 'internal shape error'
         n_frames = len(coords)
 
@@ -210,6 +210,7 @@ class PDBTrajectoryFile(object):
         self._file = None
         self._topology = None
         self._positions = None
+        self._coordinates = None
         self._mode = mode
         self._last_topology = None
 
@@ -266,7 +267,7 @@ class PDBTrajectoryFile(object):
             self._write_header(unitcell_lengths, unitcell_angles)
             self._header_written = True
 
-        if ilen(topology.atoms) != len(positions):
+        if topology.n_atoms != len(positions):
             raise ValueError('The number of positions must match the number of atoms')
         if np.any(np.isnan(positions)):
             raise ValueError('Particle position is NaN')
@@ -276,17 +277,49 @@ class PDBTrajectoryFile(object):
         self._last_topology = topology  # Hack to save the topology of the last frame written, allows us to output CONECT entries in write_footer()
 
         if bfactors is None:
-            bfactors = ['{0:5.2f}'.format(0.0)] * len(positions)
+            bfactors = np.zeros(len(positions))
         else:
             if (np.max(bfactors) >= 100) or (np.min(bfactors) <= -10):
                 raise ValueError("bfactors must be in (-10, 100)")
 
-            bfactors = ['{0:5.2f}'.format(b) for b in bfactors]
-        
-        atomIndex = 1
-        posIndex = 0
+        # the coordinates and bfactor of each atom are filled into the text
+        # of the whole frame with a single %-format
+        positions = np.asarray(positions, dtype=np.float64)
+        fields = np.empty((len(positions), 4), dtype=np.float64)
+        if np.all((-999.999 < positions) & (positions < 9999.999)):
+            template, n_chars = self._frame_template(topology, '%8.3f')
+        else:
+            # some coordinates need to lose precision to fit in 8 columns
+            template, n_chars = self._frame_template(topology, '%8s')
+            fields = fields.astype(object)
+            positions = [_format_83(x) for x in positions.ravel().tolist()]
+            positions = np.array(positions, dtype=object).reshape(-1, 3)
+        fields[:, :3] = positions
+        fields[:, 3] = bfactors
+
+        text = template % tuple(fields.ravel().tolist())
+        assert len(text) == n_chars, 'Fixed width overflow detected'
         if modelIndex is not None:
-            print("MODEL     %4d" % modelIndex, file=self._file)
+            text = "MODEL     %4d\n%sENDMDL\n" % (modelIndex, text)
+        self._file.write(text)
+
+    def _frame_template(self, topology, coordinate_format):
+        """Get the text of the ATOM and TER records of a frame of `topology`,
+        with %-format fields for the coordinates (with `coordinate_format`)
+        and bfactor of each atom, and the length of the formatted text.
+
+        The text is cached in the topology until it's modified, e.g. by
+        renaming an atom.
+        """
+        key = ('pdb_frame_template', tuple(self._chain_names), coordinate_format)
+        return topology._cached(key, lambda topology: self._build_frame_template(
+            topology, coordinate_format))
+
+    def _build_frame_template(self, topology, coordinate_format):
+        coordinates = 3 * coordinate_format
+        lines = []
+        n_chars = 0
+        atomIndex = 1
         for (chainIndex, chain) in enumerate(topology.chains):
             chainName = self._chain_names[chainIndex % len(self._chain_names)]
             residues = list(chain.residues)
@@ -302,26 +335,26 @@ class PDBTrajectoryFile(object):
                         atomName = atom.name[:4]
                     else:
                         atomName = atom.name
-                    coords = positions[posIndex]
                     if atom.element is not None:
                         symbol = atom.element.symbol
                     else:
                         symbol = ' '
-                    line = "ATOM  %5d %-4s %3s %s%4d    %s%s%s  1.00 %s          %2s  " % (
+                    prefix = "ATOM  %5d %-4s %3s %s%4d    " % (
                         atomIndex % 100000, atomName, resName, chainName,
-                        (res.resSeq) % 10000, _format_83(coords[0]),
-                        _format_83(coords[1]), _format_83(coords[2]),
-                        bfactors[posIndex], symbol)
-                    assert len(line) == 80, 'Fixed width overflow detected'
-                    print(line, file=self._file)
-                    posIndex += 1
+                        (res.resSeq) % 10000)
+                    suffix = "          %2s  \n" % symbol
+                    lines.append('%s%s  1.00 %%5.2f%s' % (
+                        prefix.replace('%', '%%'), coordinates,
+                        suffix.replace('%', '%%')))
+                    n_chars += 81
                     atomIndex += 1
                 if resIndex == len(residues)-1:
-                    print("TER   %5d      %3s %s%4d" % (atomIndex, resName, chainName, res.resSeq), file=self._file)
+                    ter = "TER   %5d      %3s %s%4d\n" % (atomIndex, resName, chainName, res.resSeq)
+                    lines.append(ter.replace('%', '%%'))
+                    n_chars += len(ter)
                     atomIndex += 1
 
-        if modelIndex is not None:
-            print("ENDMDL", file=self._file)
+        return ''.join(lines), n_chars
 
     def _write_header(self, unitcell_lengths, unitcell_angles, write_metadata=True):
         """Write out the header for a PDB file.
@@ -431,10 +464,150 @@ class PDBTrajectoryFile(object):
                 raise TypeError('Names must be a single character string')
         cls._chain_names = values
 
+    def read_as_traj(self, n_frames=None, stride=None, atom_indices=None):
+        """Read a trajectory from the PDB file
+
+        Parameters
+        ----------
+        n_frames : {int, None}
+            The number of frames to read. If not supplied, all of the
+            remaining frames will be read.
+        stride : {int, None}
+            By default all of the frames will be read, but you can pass this
+            flag to read a subset of of the data by grabbing only every
+            `stride`-th frame from disk.
+        atom_indices : {int, None}
+            By default all of the atom  will be read, but you can pass this
+            flag to read only a subsets of the atoms.
+
+        Returns
+        -------
+        trajectory : Trajectory
+            A trajectory object containing the loaded portion of the file.
+        """
+        from mdtraj.core.trajectory import Trajectory
+        topology = self.topology
+        if atom_indices is not None:
+            topology = topology.subset(atom_indices)
+
+        initial = self._frame_index
+        xyz = self.read(n_frames=n_frames, stride=stride, atom_indices=atom_indices)
+        if len(xyz) == 0:
+            return Trajectory(xyz=np.zeros((0, topology.n_atoms, 3)), topology=topology)
+
+        time = initial + (1 if stride is None else stride) * np.arange(len(xyz))
+        if self.unitcell_angles is not None and self.unitcell_lengths is not None:
+            unitcell_lengths = np.array([self.unitcell_lengths] * len(xyz))
+            unitcell_angles = np.array([self.unitcell_angles] * len(xyz))
+        else:
+            unitcell_lengths = None
+            unitcell_angles = None
+
+        in_units_of(xyz, self.distance_unit, Trajectory._distance_unit, inplace=True)
+        in_units_of(unitcell_lengths, self.distance_unit, Trajectory._distance_unit, inplace=True)
+
+        return Trajectory(xyz=xyz, time=time, topology=topology,
+                          unitcell_lengths=unitcell_lengths,
+                          unitcell_angles=unitcell_angles)
+
+    def read(self, n_frames=None, stride=None, atom_indices=None):
+        """Read the coordinates of the next models in the file
+
+        Only the models and atoms that are asked for are parsed.
+
+        Parameters
+        ----------
+        n_frames : {int, None}
+            The number of frames to read. If not supplied, all of the
+            remaining frames will be read.
+        stride : {int, None}
+            By default all of the frames will be read, but you can pass this
+            flag to read a subset of of the data by grabbing only every
+            `stride`-th frame from disk.
+        atom_indices : {int, None}
+            By default all of the atom  will be read, but you can pass this
+            flag to read only a subsets of the atoms.
+
+        Returns
+        -------
+        xyz : np.ndarray, shape=(n_frames, n_atoms, 3), dtype=np.float64
+            The cartesian coordinates, in angstroms
+        """
+        if not self._mode == 'r':
+            raise ValueError('file not opened for reading')
+        if n_frames is None:
+            stop = len(self)
+        else:
+            stop = min(self._frame_index + n_frames, len(self))
+        xyz = self._read_frames(slice(self._frame_index, stop, stride), atom_indices)
+        self._frame_index = max(self._frame_index, stop)
+        return xyz
+
+    def seek(self, offset, whence=0):
+        """Move to a new file position
+
+        Parameters
+        ----------
+        offset : int
+            A number of frames.
+        whence : {0, 1, 2}
+            0: offset from start of file, offset should be >=0.
+            1: move relative to the current position, positive or negative
+            2: move relative to the end of file, offset should be <= 0.
+            Seeking beyond the end of a file is not supported
+        """
+        if not self._mode == 'r':
+            raise ValueError('file not opened for reading')
+        if whence == 0 and offset >= 0:
+            self._frame_index = offset
+        elif whence == 1:
+            self._frame_index = self._frame_index + offset
+        elif whence == 2 and offset <= 0:
+            self._frame_index = len(self) + offset
+        else:
+            raise IOError('Invalid argument')
+
+    def tell(self):
+        """Current file position
+
+        Returns
+        -------
+        offset : int
+            The current frame in the file.
+        """
+        if not self._mode == 'r':
+            raise ValueError('file not opened for reading')
+        return int(self._frame_index)
+
+    def _read_frames(self, frames, atom_indices=None):
+        """Parse the coordinates of the models selected by `frames`, a list
+        of indices or a slice, of the atoms in `atom_indices` (or all of the
+        atoms, if None), into a new (n_frames, n_atoms, 3) array"""
+        if self._coordinates is None:
+            positions = self._positions[frames]
+            if atom_indices is not None:
+                positions = positions[:, atom_indices]
+            return np.array(positions)
+
+        frames = np.arange(len(self._coordinates))[frames]
+        n_atoms = self._topology.n_atoms
+        if atom_indices is not None:
+            n_atoms = len(np.arange(n_atoms)[atom_indices])
+
+        positions = np.empty((len(frames), n_atoms, 3))
+        for i, frame in enumerate(frames):
+            columns = np.frombuffer(self._coordinates[frame], dtype='S8').reshape(-1, 3)
+            if atom_indices is not None:
+                columns = columns[atom_indices]
+            positions[i] = columns
+        return positions
+
     @property
     def positions(self):
         """The cartesian coordinates of all of the atoms in each frame. Available when a file is opened in mode='r'
         """
+        if self._positions is None and self._coordinates is not None:
+            self._positions = self._read_frames(slice(None))
         return self._positions
 
     @property
@@ -471,8 +644,28 @@ class PDBTrajectoryFile(object):
             raise ValueError('file not opened for reading')
 
         self._topology = Topology()
-
-        pdb = PdbStructure(self._file, load_all_models=True)
+        self._frame_index = 0
+
+        # Only the first model is parsed into a PdbStructure, which builds a
+        # Python object for every atom. The coordinates of the models are
+        # kept as the text of their fixed-width columns, and only parsed for
+        # the frames and atoms that are read.
+        first_model, boundary = _split_first_model(self._file)
+        n_records = sum(1 for line in first_model if line.startswith(('ATOM  ', 'HETATM')))
+        pdb = PdbStructure(first_model, load_all_models=True)
+
+        if n_records != ilen(pdb.iter_atoms()):
+            # records with alternate locations were merged into one atom,
+            # so the atoms of every model have to be matched up by PdbStructure
+            if boundary is not None:
+                pdb = PdbStructure(itertools.chain(first_model, [boundary], self._file),
+                                   load_all_models=True)
+            self._coordinates = None
+            cryst1 = None
+        else:
+            lines = first_model if boundary is None else itertools.chain(
+                first_model, [boundary], self._file)
+            self._coordinates, cryst1 = _coordinate_columns(lines, n_records)
 
         atomByNumber = {}
         for chain in pdb.iter_chains():
@@ -498,26 +691,31 @@ class PDBTrajectoryFile(object):
                     newAtom = self._topology.add_atom(atomName, element, r, serial=atom.serial_number)
                     atomByNumber[atom.serial_number] = newAtom
 
-        # load all of the positions (from every model)
-        _positions = []
-        for model in pdb.iter_models(use_all_models=True):
-            coords = []
-            for chain in model.iter_chains():
-                for residue in chain.iter_residues():
-                    for atom in residue.atoms:
-                        coords.append(atom.get_position())
-            _positions.append(coords)
-
-        if not all(len(f) == len(_positions[0]) for f in _positions):
-            raise ValueError('PDB Error: All MODELs must contain the same number of ATOMs')
-
-        self._positions = np.array(_positions)
-
-        ## The atom positions read from the PDB file
-        self._unitcell_lengths = pdb.get_unit_cell_lengths()
-        self._unitcell_angles = pdb.get_unit_cell_angles()
+        if self._coordinates is None:
+            # load all of the positions (from every model)
+            _positions = []
+            for model in pdb.iter_models(use_all_models=True):
+                coords = []
+                for chain in model.iter_chains():
+                    for residue in chain.iter_residues():
+                        for atom in residue.atoms:
+                            coords.append(atom.get_position())
+                _positions.append(coords)
+
+            if not all(len(f) == len(_positions[0]) for f in _positions):
+                raise ValueError('PDB Error: All MODELs must contain the same number of ATOMs')
+
+            self._positions = np.array(_positions)
+
+        ## The unit cell is taken from the last CRYST1 record in the file
+        if cryst1 is not None:
+            self._unitcell_lengths = (float(cryst1[6:15]), float(cryst1[15:24]), float(cryst1[24:33]))
+            self._unitcell_angles = (float(cryst1[33:40]), float(cryst1[40:47]), float(cryst1[47:54]))
+        else:
+            self._unitcell_lengths = pdb.get_unit_cell_lengths()
+            self._unitcell_angles = pdb.get_unit_cell_angles()
         self._topology.create_standard_bonds()
-        self._topology.create_disulfide_bonds(self.positions[0])
+        self._topology.create_disulfide_bonds(self._read_frames([0])[0])
 
         # Add bonds based on CONECT records.
         connectBonds = []
@@ -639,9 +837,91 @@ class PDBTrajectoryFile(object):
             raise NotImplementedError('len() only available in mode="r" currently')
         if not self._open:
             raise ValueError('I/O operation on closed file')
+        if self._coordinates is not None:
+            return len(self._coordinates)
         return len(self._positions)
 
 
+def _split_first_model(lines):
+    """Read the lines of a PDB file up to the start of its second model
+
+    The models are split the way PdbStructure splits them: a model starts at
+    a MODEL record, or at the first ATOM/HETATM record after an END or ENDMDL
+    record.
+
+    Returns
+    -------
+    first_model : list of str
+        The lines of the file before the second model
+    boundary : {str, None}
+        The line starting the second model, or None if there's only one
+    """
+    first_model = []
+    started = ended = False
+    for line in lines:
+        if line.startswith(('ATOM  ', 'HETATM')):
+            if ended:
+                return first_model, line
+            started = True
+        elif line.startswith('MODEL'):
+            if started or ended:
+                return first_model, line
+            started = True
+        elif line.startswith('END'):
+            ended = True
+        first_model.append(line)
+    return first_model, None
+
+
+def _coordinate_columns(lines, n_atoms):
+    """Collect the text of the x, y and z columns of the ATOM/HETATM records
+    of each model in the lines of a PDB file
+
+    Returns
+    -------
+    coordinates : list of bytes
+        For each model, its 24 columns of coordinates for each atom, which
+        can be viewed as an (n_atoms, 3) array of 8-character fields
+    cryst1 : {str, None}
+        The last CRYST1 record in the lines
+    """
+    coordinates = []
+    columns = None
+    ended = False
+    cryst1 = None
+    for line in lines:
+        if line.startswith(('ATOM  ', 'HETATM')):
+            if columns is None or ended:
+                columns = _end_model(coordinates, columns, n_atoms)
+                ended = False
+            field = line[30:54]
+            if len(field) < 24:
+                field = field.ljust(24)
+            columns.append(field)
+        elif line.startswith('MODEL'):
+            columns = _end_model(coordinates, columns, n_atoms)
+            ended = False
+        elif line.startswith('END'):
+            ended = True
+        elif line.startswith('CRYST1'):
+            cryst1 = line
+    _end_model(coordinates, columns, n_atoms)
+    return coordinates, cryst1
+
+
+def _end_model(coordinates, columns, n_atoms):
+    """Append the coordinate columns of a model, if there is one, to
+    `coordinates`, and return an empty list for those of the next model"""
+    if columns is not None:
+        if len(columns) != n_atoms:
+            raise ValueError('PDB Error: All MODELs must contain the same number of ATOMs')
+        text = ''.join(columns)
+        if not isinstance(text, bytes):
+            text = text.encode('ascii', 'replace')
+        coordinates.append(text)
+    return []
+
+
 def _format_83(f):
     """Format a single float into a string of width 8, with ideally 3 decimal
     places of precision. If the number is a little too large, we can
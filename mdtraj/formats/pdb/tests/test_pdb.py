@@ -27,7 +27,8 @@ import re, os, tempfile
 from mdtraj.formats.pdb import pdbstructure
 from mdtraj.formats.pdb.pdbstructure import PdbStructure
 from mdtraj.testing import get_fn, eq, raises
-from mdtraj import load, load_pdb
+from mdtraj import load, load_pdb, iterload
+from mdtraj.formats import PDBTrajectoryFile
 from mdtraj.utils import ilen
 from mdtraj import Topology
 
@@ -103,6 +104,60 @@ def test_2EQQ_0():
     yield lambda: eq(ilen(t.top.residues), 28)
 
 
+def test_2EQQ_subsets():
+    # only the requested models and atoms are parsed
+    t = load(get_fn('2EQQ.pdb'))
+    atom_indices = np.array([0, 10, 50, 422])
+    eq(load(get_fn('2EQQ.pdb'), stride=3).xyz, t.xyz[::3])
+    eq(load(get_fn('2EQQ.pdb'), frame=7).xyz, t.xyz[[7]])
+    eq(load(get_fn('2EQQ.pdb'), atom_indices=atom_indices).xyz, t.xyz[:, atom_indices])
+
+    with PDBTrajectoryFile(get_fn('2EQQ.pdb')) as f:
+        eq(len(f), 20)
+        f.seek(5)
+        eq(f.read(n_frames=6, stride=2), f.positions[5:11:2])
+        eq(f.tell(), 11)
+        traj = f.read_as_traj(atom_indices=atom_indices)
+        eq(traj.xyz, t.xyz[11:, atom_indices])
+        eq(traj.time, np.arange(11, 20))
+        eq(len(f.read()), 0)
+
+
+def test_2EQQ_iterload():
+    t = load(get_fn('2EQQ.pdb'))
+    chunks = list(iterload(get_fn('2EQQ.pdb'), chunk=4, stride=2, skip=3))
+    eq([len(c) for c in chunks], [4, 4, 1])
+    t2 = chunks[0].join(chunks[1:])
+    eq(t2.xyz, t.xyz[3::2])
+    eq(t2.time, t.time[3::2])
+
+
+def test_altloc_models():
+    # records with alternate locations are merged into a single atom in
+    # each model
+    with open(temp, 'w') as f:
+        f.write("""CRYST1   20.000   20.000   20.000  90.00  90.00  90.00 P 1           1
+MODEL        1
+ATOM      1  N   ALA A   1       1.000   2.000   3.000  1.00  0.00           N
+ATOM      2  CA AALA A   1       2.000   2.000   3.000  0.60  0.00           C
+ATOM      3  CA BALA A   1       2.100   2.000   3.000  0.40  0.00           C
+ATOM      4  C   ALA A   1       3.000   2.000   3.000  1.00  0.00           C
+ENDMDL
+MODEL        2
+ATOM      1  N   ALA A   1       1.500   2.000   3.000  1.00  0.00           N
+ATOM      2  CA AALA A   1       2.500   2.000   3.000  0.60  0.00           C
+ATOM      3  CA BALA A   1       2.600   2.000   3.000  0.40  0.00           C
+ATOM      4  C   ALA A   1       3.500   2.000   3.000  1.00  0.00           C
+ENDMDL
+END
+""")
+    t = load(temp)
+    eq(t.n_frames, 2)
+    eq(t.n_atoms, 3)
+    eq(t.xyz[:, :, 0], np.array([[0.1, 0.2, 0.3], [0.15, 0.25, 0.35]]))
+    eq(load(temp, frame=1, atom_indices=[1]).xyz, t.xyz[[1]][:, [1]])
+
+
 def test_1vii_solvated_with_ligand():
     traj = load(get_fn("1vii_sustiva_water.pdb"))
     eq(len(list(traj.top.bonds)), 5124)
@@ -123,6 +178,53 @@ def test_write_large_2():
     traj.xyz.fill(-123456789)
     traj.save(temp)
 
+
+def test_write_large_3():
+    # coordinates that don't fit in 8 columns with 3 decimals lose precision
+    traj = load(get_fn('native.pdb'))
+    traj.xyz[0, 0] = [1234.5, -100.0, 0.1]
+    traj.xyz[0, 1] = [0.5, 0.25, 0.125]
+    traj.save(temp)
+    with open(temp) as f:
+        lines = [line for line in f if line.startswith('ATOM')]
+    eq(lines[0][30:54], '12345.00-1000.00   1.000')
+    eq(lines[1][30:54], '   5.000   2.500   1.250')
+    assert all(len(line) == 81 for line in lines)
+
+
+def test_write_chain_names():
+    # the text of the records is cached, but follows the chain names
+    traj = load(get_fn('2EQQ.pdb'))[:2]
+    with PDBTrajectoryFile(temp, 'w') as f:
+        f.write(traj.xyz[0] * 10, traj.topology, modelIndex=0)
+        PDBTrajectoryFile.set_chain_names(['X'])
+        try:
+            f.write(traj.xyz[1] * 10, traj.topology, modelIndex=1)
+        finally:
+            PDBTrajectoryFile.set_chain_names([chr(ord('A') + i) for i in range(26)])
+
+    with open(temp) as f:
+        chains = [line[21] for line in f if line.startswith('ATOM')]
+    eq(chains, ['A'] * traj.n_atoms + ['X'] * traj.n_atoms)
+    eq(load(temp).xyz, traj.xyz)
+
+
+def test_write_modified_topology():
+    # the cached text of the records follows changes to the topology
+    traj = load(get_fn('2EQQ.pdb'))[:2]
+    topology = traj.topology.copy()
+    with PDBTrajectoryFile(temp, 'w') as f:
+        f.write(traj.xyz[0] * 10, topology, modelIndex=0)
+        topology.atom(0).name = 'NX'
+        topology.residue(0).resSeq = 42
+        f.write(traj.xyz[1] * 10, topology, modelIndex=1)
+
+    with open(temp) as f:
+        first = [line for line in f if line.startswith('ATOM')][::traj.n_atoms]
+    eq([line[12:16] for line in first], [' N  ', ' NX '])
+    eq([line[22:26] for line in first], ['   1', '  42'])
+
+
 def test_pdbstructure_0():
     pdb_lines = [
         "ATOM    188  N   CYS A  42      40.714  -5.292  12.123  1.00 11.29           N  ",
@@ -74,6 +74,8 @@
 #ifndef _XDRFILE_H_
 #define _XDRFILE_H_
 
+#include <stdint.h>
+
 #ifdef __cplusplus
 extern "C" 
 {
@@ -137,6 +139,33 @@ extern "C"
 	xdrfile_close   (XDRFILE *       xfp);
 
 
+	/*! \brief Get the current position in a portable binary file, like ftell()
+	 *
+	 *  The position is returned as a 64-bit byte offset, so that it is
+	 *  valid for files larger than 2Gb.
+	 *
+	 *  \param xfp  Pointer to an abstract XDRFILE datatype
+	 *
+	 *  \return     Byte offset from the beginning of the file, or -1 on error.
+	 */
+	int64_t
+	xdr_tell        (XDRFILE *       xfp);
+
+
+	/*! \brief Move to a new position in a portable binary file, like fseek()
+	 *
+	 *  \param xfp     Pointer to an abstract XDRFILE datatype
+	 *  \param pos     Byte offset, interpreted according to \a whence
+	 *  \param whence  SEEK_SET, SEEK_CUR or SEEK_END
+	 *
+	 *  \return        exdrOK on success, exdrNR on error.
+	 */
+	int
+	xdr_seek        (XDRFILE *       xfp,
+					 int64_t         pos,
+					 int             whence);
+
+
 
 
 	/*! \brief Read one or more \a char type variable(s) 
@@ -49,6 +49,10 @@ extern "C" {
   extern int read_trr(XDRFILE *xd,int natoms,int *step,float *t,float *lambda,
 		      matrix box,rvec *x,rvec *v,rvec *f);
 
+  /* Skip one frame of an open trr file, using the block sizes in its
+     header, without reading the arrays */
+  extern int trr_skip_frame(XDRFILE *xd);
+
   /* Write a frame to xtc file */
   extern int write_trr(XDRFILE *xd,int natoms,int step,float t,float lambda,
 		       matrix box,rvec *x,rvec *v,rvec *f);
@@ -49,6 +49,9 @@ extern "C" {
   extern int read_xtc(XDRFILE *xd,int natoms,int *step,float *time,
 		      matrix box,rvec *x,float *prec);
   
+  /* Skip one frame of an open xtc file, without decompressing it */
+  extern int xtc_skip_frame(XDRFILE *xd,int natoms);
+
   /* Write a frame to xtc file */
   extern int write_xtc(XDRFILE *xd,
 		       int natoms,int step,float time,
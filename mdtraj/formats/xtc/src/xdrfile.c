@@ -252,6 +252,28 @@ xdrfile_close(XDRFILE *xfp)
 	return ret; /* return 0 if ok */
 }
 
+int64_t
+xdr_tell(XDRFILE *xfp)
+{
+#ifdef _WIN32
+	return _ftelli64(xfp->fp);
+#else
+	return (int64_t) ftello(xfp->fp);
+#endif
+}
+
+int
+xdr_seek(XDRFILE *xfp, int64_t pos, int whence)
+{
+	int result;
+#ifdef _WIN32
+	result = _fseeki64(xfp->fp, pos, whence);
+#else
+	result = fseeko(xfp->fp, (off_t) pos, whence);
+#endif
+	return (result < 0) ? exdrNR : exdrOK;
+}
+
 
 
 int 
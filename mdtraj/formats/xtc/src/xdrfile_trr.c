@@ -27,6 +27,7 @@
  * OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
  */
 
+#include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
 
@@ -490,33 +491,43 @@ int read_trr_natoms(char *fn,int *natoms)
 
 int read_trr_nframes(char *fn, unsigned long *nframes) {
     XDRFILE *xd;
-    int result, step;
-    float time, lambda;
-	int natoms;
-	matrix box;
-	rvec *x;
+    int result;
 	*nframes = 0;
 
-	read_trr_natoms(fn, &natoms);
-	x = malloc(natoms * sizeof(*x));
-
     xd = xdrfile_open(fn, "r");
     if (NULL == xd)
         return exdrFILENOTFOUND;
 
+	/* only the frame headers need to be read to count the frames */
 	do {
-		result = read_trr(xd, natoms, &step, &time, &lambda,
-						  box, x, NULL, NULL);
+		result = trr_skip_frame(xd);
 		if (exdrENDOFFILE != result) {
 			(*nframes)++;
 		}
 	} while (result == exdrOK);
 
 	xdrfile_close(xd);
-	free(x);
     return exdrOK;
 }
 
+int trr_skip_frame(XDRFILE *xd)
+{
+	t_trnheader sh;
+	int result;
+	int64_t nbytes;
+
+	if ((result = do_trnheader(xd,1,&sh)) != exdrOK)
+		return result;
+
+	/* the header gives the size in bytes of each block that follows it */
+	nbytes = (int64_t) sh.box_size + sh.vir_size + sh.pres_size +
+		sh.x_size + sh.v_size + sh.f_size;
+	if (xdr_seek(xd, nbytes, SEEK_CUR) != exdrOK)
+		return exdrFLOAT;
+
+	return exdrOK;
+}
+
 int write_trr(XDRFILE *xd,int natoms,int step,float t,float lambda,
 			  matrix box,rvec *x,rvec *v,rvec *f)
 {
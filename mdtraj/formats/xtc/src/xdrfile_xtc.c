@@ -27,6 +27,7 @@
  * OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
  */
  
+#include <stdio.h>
 #include <stdlib.h>
 #include "xdrfile.h"
 #include "xdrfile_xtc.h"
@@ -147,6 +148,39 @@ int read_xtc(XDRFILE *xd,
 	return exdrOK;
 }
 
+int xtc_skip_frame(XDRFILE *xd, int natoms)
+/* Skip over the next frame using only the sizes stored in its header,
+   without decompressing the coordinates */
+{
+	int result, step, lsize, byte_cnt;
+	float time;
+
+	if ((result = xtc_header(xd,&natoms,&step,&time,TRUE)) != exdrOK)
+		return result;
+
+	/* box */
+	if (xdr_seek(xd, DIM*DIM*sizeof(float), SEEK_CUR) != exdrOK)
+		return exdrFLOAT;
+	if (xdrfile_read_int(&lsize,1,xd) != 1)
+		return exdrINT;
+
+	/* frames with 9 atoms or less are stored uncompressed */
+	if (lsize <= 9)
+		return xdr_seek(xd, lsize*DIM*sizeof(float), SEEK_CUR) == exdrOK ? exdrOK : exdr3DX;
+
+	/* precision, minint[3], maxint[3] and smallidx precede the byte count */
+	if (xdr_seek(xd, 8*sizeof(int), SEEK_CUR) != exdrOK)
+		return exdr3DX;
+	if (xdrfile_read_int(&byte_cnt,1,xd) != 1)
+		return exdr3DX;
+	/* the compressed coordinates are padded to a multiple of 4 bytes */
+	byte_cnt = (byte_cnt + 3) & ~3;
+	if (xdr_seek(xd, byte_cnt, SEEK_CUR) != exdrOK)
+		return exdr3DX;
+
+	return exdrOK;
+}
+
 int write_xtc(XDRFILE *xd,
 			  int natoms,int step,float time,
 			  matrix box,rvec *x,float prec)
@@ -314,7 +314,9 @@ cdef class TRRTrajectoryFile:
             The number of frames you would like to read from the file.
             If None, all of the remaining frames will be loaded.
         stride : int, optional
-            Read only every stride-th frame.
+            Read only every stride-th frame. The frames in between are
+            skipped using the block sizes stored in their headers, without
+            being read.
         atom_indices : array_like, optional
             If not none, then read only a subset of the atoms coordinates from the
             file. This may be slightly slower than the standard read because it required
@@ -343,13 +345,17 @@ cdef class TRRTrajectoryFile:
             raise ValueError('read() is only available when file is opened in mode="r"')
         if not self.is_open:
             raise IOError('file must be open to read from it.')
+        if stride is None:
+            stride = 1
+        if not int(stride) == stride or stride < 1:
+            raise ValueError('stride must be a positive int, you supplied "%s"' % stride)
+        stride = int(stride)
 
         if n_frames is not None:
             # if they supply the number of frames they want, that's easy
             if not int(n_frames) == n_frames:
                 raise ValueError('n_frames must be an int, you supplied "%s"' % n_frames)
-            xyz, time, step, box, lambd = self._read(int(n_frames), atom_indices)
-            xyz, time, step, box, lambd = xyz[::stride], time[::stride], step[::stride], box[::stride], lambd[::stride]
+            xyz, time, step, box, lambd = self._read(int(n_frames), atom_indices, stride)
             if np.all(np.logical_and(box < 1e-10, box > -1e-10)):
                 box = None
             return xyz, time, step, box, lambd
@@ -363,7 +369,10 @@ cdef class TRRTrajectoryFile:
             # think are in the file and how many we've currently read
             chunk = max(abs(int((self.approx_n_frames - self.frame_counter) * self.chunk_size_multiplier)),
                         self.min_chunk_size)
-            xyz, time, step, box, lambd = self._read(chunk, atom_indices)
+            # keep the chunks aligned with the stride, so that every chunk
+            # starts on a frame that we want to keep
+            chunk = stride * ((chunk + stride - 1) // stride)
+            xyz, time, step, box, lambd = self._read(chunk, atom_indices, stride)
             if len(xyz) <= 0:
                 break
 
@@ -373,19 +382,83 @@ cdef class TRRTrajectoryFile:
             all_box.append(box)
             all_lambd.append(lambd)
 
-        all_xyz = np.concatenate(all_xyz)[::stride]
-        all_time = np.concatenate(all_time)[::stride]
-        all_step = np.concatenate(all_step)[::stride]
-        all_box =  np.concatenate(all_box)[::stride]
-        all_lambd = np.concatenate(all_lambd)[::stride]
+        all_xyz = np.concatenate(all_xyz)
+        all_time = np.concatenate(all_time)
+        all_step = np.concatenate(all_step)
+        all_box =  np.concatenate(all_box)
+        all_lambd = np.concatenate(all_lambd)
         if np.all(np.logical_and(all_box < 1e-10, all_box > -1e-10)):
             all_box = None
         return all_xyz, all_time, all_step, all_box, all_lambd
 
-    def _read(self, int n_frames, atom_indices):
-        """Read a specified number of TRR frames from the buffer"""
+    def read_into(self, out, stride=None, atom_indices=None):
+        """read_into(out, stride=None, atom_indices=None)
+
+        Read the next frames of the TRR file into an existing trajectory
+
+        The coordinates and times are read directly into the arrays of
+        `out`, so that reading a long file in chunks doesn't allocate new
+        arrays for each chunk.
+
+        Parameters
+        ----------
+        out : Trajectory
+            The trajectory to read up to ``len(out)`` frames into, whose
+            coordinates must be a C-contiguous float32 array with the number
+            of atoms being read.
+        stride : int, optional
+            Read only every stride-th frame.
+        atom_indices : array_like, optional
+            If not none, then read only a subset of the atoms coordinates from the
+            file.
+
+        Returns
+        -------
+        trajectory : Trajectory
+            The frames that were read, in a trajectory that shares its arrays
+            and topology with `out`, so that it's overwritten by the next
+            read into `out`.
+
+        See Also
+        --------
+        read_as_traj : Returns a new Trajectory object
+        """
+        from mdtraj.core.trajectory import _read_buffer, _buffer_view
+        if not str(self.mode) == 'r':
+            raise ValueError('read() is only available when file is opened in mode="r"')
+        if not self.is_open:
+            raise IOError('file must be open to read from it.')
+        if stride is None:
+            stride = 1
+        if not int(stride) == stride or stride < 1:
+            raise ValueError('stride must be a positive int, you supplied "%s"' % stride)
+        stride = int(stride)
+
+        n_atoms = self.n_atoms if atom_indices is None else len(np.arange(self.n_atoms)[atom_indices])
+        xyz_out = _read_buffer(out, n_atoms)
+        time_out = out.time
+        if not (isinstance(time_out, np.ndarray) and time_out.dtype == np.float32
+                and time_out.flags['C_CONTIGUOUS']):
+            time_out = None
+
+        xyz, time, step, box, _ = self._read(len(out) * stride, atom_indices, stride,
+                                             xyz_out, time_out)
+        if np.all(np.logical_and(box < 1e-10, box > -1e-10)):
+            box = None
+        trajectory = _buffer_view(out, len(xyz), time)
+        trajectory.unitcell_vectors = box
+        return trajectory
+
+    def _read(self, int n_frames, atom_indices, int stride=1, xyz_out=None,
+              time_out=None):
+        """Read a specified number of TRR frames from the buffer, keeping
+        every stride-th one. The other frames are skipped without being
+        read. The coordinates and times are stored in the leading frames of
+        `xyz_out` and `time_out`, if they're given."""
 
-        cdef int i = 0
+        cdef int i = 0  # number of frames consumed from the file
+        cdef int j = 0  # number of frames stored
+        cdef int n_frames_out = (n_frames + stride - 1) // stride
         cdef int status = _EXDROK
         cdef int n_atoms_to_read
 
@@ -402,15 +475,17 @@ cdef class TRRTrajectoryFile:
             n_atoms_to_read = len(atom_indices)
 
         cdef np.ndarray[ndim=3, dtype=np.float32_t, mode='c'] xyz = \
-            np.empty((n_frames, n_atoms_to_read, 3), dtype=np.float32)
+            np.empty((n_frames_out, n_atoms_to_read, 3), dtype=np.float32) \
+            if xyz_out is None else xyz_out[:n_frames_out]
         cdef np.ndarray[ndim=1, dtype=np.float32_t, mode='c'] time = \
-            np.empty((n_frames), dtype=np.float32)
+            np.empty((n_frames_out), dtype=np.float32) \
+            if time_out is None else time_out[:n_frames_out]
         cdef np.ndarray[ndim=1, dtype=np.int32_t, mode='c'] step = \
-            np.empty((n_frames), dtype=np.int32)
+            np.empty((n_frames_out), dtype=np.int32)
         cdef np.ndarray[ndim=1, dtype=np.float32_t, mode='c'] lambd = \
-            np.empty((n_frames), dtype=np.float32)
+            np.empty((n_frames_out), dtype=np.float32)
         cdef np.ndarray[ndim=3, dtype=np.float32_t, mode='c'] box = \
-            np.empty((n_frames, 3, 3), dtype=np.float32)
+            np.empty((n_frames_out, 3, 3), dtype=np.float32)
 
         # only used if atom_indices is given
         cdef np.ndarray[dtype=np.float32_t, ndim=2] framebuffer = np.zeros((self.n_atoms, 3), dtype=np.float32)
@@ -418,24 +493,35 @@ cdef class TRRTrajectoryFile:
 
 
         while (i < n_frames) and (status != _EXDRENDOFFILE):
-            if atom_indices is None:
-                status = trrlib.read_trr(self.fh, self.n_atoms, <int*> &step[i], &time[i], &lambd[i],
-                                         <trrlib.matrix>&box[i,0,0], <trrlib.rvec*>&xyz[i,0,0], NULL, NULL)
+            # the GIL is released during the read, so that several files can
+            # be read at once from different threads
+            if i % stride != 0:
+                with nogil:
+                    status = trrlib.trr_skip_frame(self.fh)
+            elif atom_indices is None:
+                with nogil:
+                    status = trrlib.read_trr(self.fh, self.n_atoms, <int*> &step[j], &time[j], &lambd[j],
+                                             <trrlib.matrix>&box[j,0,0], <trrlib.rvec*>&xyz[j,0,0], NULL, NULL)
             else:
-                status = trrlib.read_trr(self.fh, self.n_atoms, <int*> &step[i], &time[i], &lambd[i],
-                                         <trrlib.matrix> &box[i,0,0], <trrlib.rvec*>&framebuffer[0,0], NULL, NULL)
-                xyz[i, :, :] = framebuffer[atom_indices, :]
+                with nogil:
+                    status = trrlib.read_trr(self.fh, self.n_atoms, <int*> &step[j], &time[j], &lambd[j],
+                                             <trrlib.matrix> &box[j,0,0], <trrlib.rvec*>&framebuffer[0,0], NULL, NULL)
+                if status == _EXDROK:
+                    xyz[j, :, :] = framebuffer[atom_indices, :]
 
             if status != _EXDRENDOFFILE and status != _EXDROK:
                 raise RuntimeError('TRR read error: %s' % _EXDR_ERROR_MESSAGES.get(status, 'unknown'))
-            i += 1
-
-        if status == _EXDRENDOFFILE:
-            xyz = xyz[:i-1]
-            box = box[:i-1]
-            time = time[:i-1]
-            step = step[:i-1]
-            lambd = lambd[:i-1]
+            if status == _EXDROK:
+                if i % stride == 0:
+                    j += 1
+                i += 1
+
+        if j < n_frames_out:
+            xyz = xyz[:j]
+            box = box[:j]
+            time = time[:j]
+            step = step[:j]
+            lambd = lambd[:j]
 
         self.frame_counter += i
 
@@ -547,10 +633,7 @@ cdef class TRRTrajectoryFile:
             2: move relative to the end of file, offset should be <= 0.
             Seeking beyond the end of a file is not supported
         """
-        cdef int i, status, step
-        cdef float time, prec, lambd
-        cdef np.ndarray[dtype=np.float_t] box = np.empty(9, dtype=np.float)
-        cdef np.ndarray[dtype=np.float_t] xyz = np.empty(self.n_atoms * 3, dtype=np.float)
+        cdef int i, status
 
         if str(self.mode) != 'r':
             raise NotImplementedError('seek() only available in mode="r" currently')
@@ -567,8 +650,7 @@ cdef class TRRTrajectoryFile:
         self.fh = trrlib.xdrfile_open(self.filename, self.mode)
 
         for i in range(absolute):
-            status = trrlib.read_trr(self.fh, self.n_atoms, &step, &time,
-                &lambd, <trrlib.matrix>&box[0], <trrlib.rvec*>&xyz[0], NULL, NULL)
+            status = trrlib.trr_skip_frame(self.fh)
             if status != _EXDROK:
                 raise RuntimeError('TRR seek error: %s' % status)
 
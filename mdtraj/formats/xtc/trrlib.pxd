@@ -1,4 +1,4 @@
-cdef extern from "include/xdrfile.h":
+cdef extern from "include/xdrfile.h" nogil:
     ctypedef struct XDRFILE:
         pass
 
@@ -8,7 +8,7 @@ cdef extern from "include/xdrfile.h":
     ctypedef float rvec[3]
 
 
-cdef extern from "include/xdrfile_trr.h":
+cdef extern from "include/xdrfile_trr.h" nogil:
 
     int read_trr_natoms(char *fn, int *natoms)
     int read_trr_nframes(char* fn, unsigned long *nframes)
@@ -18,6 +18,9 @@ cdef extern from "include/xdrfile_trr.h":
     int read_trr(XDRFILE *xd, int natoms, int *step, float *t, float* lambd,
         matrix box, rvec* x, rvec* v, rvec* f)
 
+    # Skip over one frame of an open trr file without reading its arrays
+    int trr_skip_frame(XDRFILE *xd)
+
     # Write a frame to xtc file
     int write_trr(XDRFILE *xd, int natoms, int step, float t, float lambd,
         matrix box, rvec* x, rvec* v, rvec* f)
@@ -1,4 +1,6 @@
-cdef extern from "include/xdrfile.h":
+from libc.stdint cimport int64_t
+
+cdef extern from "include/xdrfile.h" nogil:
     ctypedef struct XDRFILE:
         pass
 
@@ -6,9 +8,13 @@ cdef extern from "include/xdrfile.h":
     ctypedef float matrix[3][3]
     ctypedef float rvec[3]
     int xdrfile_close (XDRFILE * xfp)
+    int xdrfile_read_int(int * ptr, int ndata, XDRFILE * xfp)
+    int64_t xdr_tell(XDRFILE *xd)
+    int xdr_seek(XDRFILE *xd, int64_t pos, int whence)
 
-cdef extern from "include/xdrfile_xtc.h":
+cdef extern from "include/xdrfile_xtc.h" nogil:
     int read_xtc_natoms(char* fn, int* natoms)
     int read_xtc(XDRFILE *xd, int natoms, int *step, float *time, matrix box, rvec *x, float *prec)
+    int xtc_skip_frame(XDRFILE *xd, int natoms)
     int write_xtc(XDRFILE *xd, int natoms, int step, float time, matrix box, rvec* x, float prec)
-    int read_xtc_nframes(char* fn, unsigned long *nframes)
\ No newline at end of file
+    int read_xtc_nframes(char* fn, unsigned long *nframes)
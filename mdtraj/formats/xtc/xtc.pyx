@@ -35,7 +35,10 @@ cimport numpy as np
 np.import_array()
 from mdtraj.utils import ensure_type, cast_indices, in_units_of
 from mdtraj.utils.six import string_types
+from mdtraj.utils.offsets import load_offsets, save_offsets
 from mdtraj.formats.registry import _FormatRegistry
+from libc.stdio cimport SEEK_SET, SEEK_END
+from libc.stdint cimport int64_t
 cimport xdrlib
 
 __all__ = ['load_xtc', 'XTCTrajectoryFile']
@@ -47,6 +50,7 @@ __all__ = ['load_xtc', 'XTCTrajectoryFile']
 
 cdef int _EXDROK = 0             # OK
 cdef int _EXDRENDOFFILE = 11     # End of file
+cdef int _XTC_MAGIC = 1995       # first int of every frame header
 _EXDR_ERROR_MESSAGES = {
     1: "Header",
     2: "String",
@@ -172,6 +176,15 @@ cdef class XTCTrajectoryFile:
         In read mode, we need to allocate a buffer in which to store the data without knowing how many frames are in
         the file. We can *guess* this information based on the size of the file on disk, but it's not perfect. This
         parameter inflates the guess by a multiplicative factor.
+    cache_offsets : bool, default=True
+        In read mode, ``seek()`` and ``len()`` use an index of the byte offset
+        of each frame, which is built by scanning the frame headers (without
+        decompressing any coordinates) the first time it's needed. If True,
+        this index is saved to a hidden ``.<filename>.offsets.npz`` file next
+        to the trajectory, and reused by later calls as long as the size and
+        modification time of the trajectory are unchanged. If the index can't
+        be written there, e.g. because the directory is read-only, it is
+        silently rebuilt the next time instead. Pass False to never write it.
 
     Examples
     --------
@@ -198,6 +211,8 @@ cdef class XTCTrajectoryFile:
     cdef int min_chunk_size
     cdef float chunk_size_multiplier
     cdef int with_unitcell    # used in mode='w' to know if we're writing unitcells or nor
+    cdef int cache_offsets    # save/load the frame offset index to/from a sidecar file?
+    cdef object _offsets      # byte offset of the start of each frame, or None if not yet known
     cdef readonly char* distance_unit
 
 
@@ -209,6 +224,7 @@ cdef class XTCTrajectoryFile:
         self.frame_counter = 0
         self.n_frames = -1  # means unknown
         self.filename = filename
+        self._offsets = None
 
         if str(mode) == 'r':
             self.n_atoms = 0
@@ -226,6 +242,7 @@ cdef class XTCTrajectoryFile:
 
             self.min_chunk_size = max(kwargs.pop('min_chunk_size', 100), 1)
             self.chunk_size_multiplier = max(kwargs.pop('chunk_size_multiplier', 1.5), 0.01)
+            self.cache_offsets = kwargs.pop('cache_offsets', True)
 
 
         elif str(mode) == 'w':
@@ -322,7 +339,9 @@ cdef class XTCTrajectoryFile:
             The number of frames you would like to read from the file.
             If None, all of the remaining frames will be loaded.
         stride : int, optional
-            Read only every stride-th frame.
+            Read only every stride-th frame. The frames in between are
+            skipped using the sizes stored in their headers, without being
+            decompressed.
         atom_indices : array_like, optional
             If not none, then read only a subset of the atoms coordinates from the
             file. This may be slightly slower than the standard read because it required
@@ -347,13 +366,17 @@ cdef class XTCTrajectoryFile:
             raise ValueError('read() is only available when file is opened in mode="r"')
         if not self.is_open:
             raise IOError('file must be open to read from it.')
+        if stride is None:
+            stride = 1
+        if not int(stride) == stride or stride < 1:
+            raise ValueError('stride must be a positive int, you supplied "%s"' % stride)
+        stride = int(stride)
 
         if n_frames is not None:
             # if they supply the number of frames they want, that's easy
             if not int(n_frames) == n_frames:
                 raise ValueError('n_frames must be an int, you supplied "%s"' % n_frames)
-            xyz, time, step, box = self._read(int(n_frames), atom_indices)
-            xyz, time, step, box = xyz[::stride], time[::stride], step[::stride], box[::stride]
+            xyz, time, step, box = self._read(int(n_frames), atom_indices, stride)
             if np.all(np.logical_and(box < 1e-10, box > -1e-10)):
                 box = None
             return xyz, time, step, box
@@ -368,8 +391,11 @@ cdef class XTCTrajectoryFile:
             # think are in the file and how many we've currently read
             chunk = max(abs(int((self.approx_n_frames - self.frame_counter) * self.chunk_size_multiplier)),
                         self.min_chunk_size)
+            # keep the chunks aligned with the stride, so that every chunk
+            # starts on a frame that we want to keep
+            chunk = stride * ((chunk + stride - 1) // stride)
 
-            xyz, time, step, box = self._read(chunk, atom_indices)
+            xyz, time, step, box = self._read(chunk, atom_indices, stride)
             if len(xyz) <= 0:
                 break
 
@@ -380,18 +406,82 @@ cdef class XTCTrajectoryFile:
 
         if len(all_xyz) == 0:
             return np.array([]), np.array([]), np.array([]), np.array([])
-        all_xyz = np.concatenate(all_xyz)[::stride]
-        all_time = np.concatenate(all_time)[::stride]
-        all_step = np.concatenate(all_step)[::stride]
-        all_box =  np.concatenate(all_box)[::stride]
+        all_xyz = np.concatenate(all_xyz)
+        all_time = np.concatenate(all_time)
+        all_step = np.concatenate(all_step)
+        all_box =  np.concatenate(all_box)
         if np.all(np.logical_and(all_box < 1e-10, all_box > -1e-10)):
             all_box = None
         return all_xyz, all_time, all_step, all_box
 
-    def _read(self, int n_frames, atom_indices):
-        """Read a specified number of XTC frames from the buffer"""
+    def read_into(self, out, stride=None, atom_indices=None):
+        """read_into(out, stride=None, atom_indices=None)
+
+        Read the next frames of the XTC file into an existing trajectory
+
+        The coordinates and times are decompressed directly into the arrays
+        of `out`, so that reading a long file in chunks doesn't allocate new
+        arrays for each chunk.
+
+        Parameters
+        ----------
+        out : Trajectory
+            The trajectory to read up to ``len(out)`` frames into, whose
+            coordinates must be a C-contiguous float32 array with the number
+            of atoms being read.
+        stride : int, optional
+            Read only every stride-th frame.
+        atom_indices : array_like, optional
+            If not none, then read only a subset of the atoms coordinates from the
+            file.
+
+        Returns
+        -------
+        trajectory : Trajectory
+            The frames that were read, in a trajectory that shares its arrays
+            and topology with `out`, so that it's overwritten by the next
+            read into `out`.
+
+        See Also
+        --------
+        read_as_traj : Returns a new Trajectory object
+        """
+        from mdtraj.core.trajectory import _read_buffer, _buffer_view
+        if not str(self.mode) == 'r':
+            raise ValueError('read() is only available when file is opened in mode="r"')
+        if not self.is_open:
+            raise IOError('file must be open to read from it.')
+        if stride is None:
+            stride = 1
+        if not int(stride) == stride or stride < 1:
+            raise ValueError('stride must be a positive int, you supplied "%s"' % stride)
+        stride = int(stride)
+
+        n_atoms = self.n_atoms if atom_indices is None else len(np.arange(self.n_atoms)[atom_indices])
+        xyz_out = _read_buffer(out, n_atoms)
+        time_out = out.time
+        if not (isinstance(time_out, np.ndarray) and time_out.dtype == np.float32
+                and time_out.flags['C_CONTIGUOUS']):
+            time_out = None
+
+        xyz, time, step, box = self._read(len(out) * stride, atom_indices, stride,
+                                          xyz_out, time_out)
+        if np.all(np.logical_and(box < 1e-10, box > -1e-10)):
+            box = None
+        trajectory = _buffer_view(out, len(xyz), time)
+        trajectory.unitcell_vectors = box
+        return trajectory
+
+    def _read(self, int n_frames, atom_indices, int stride=1, xyz_out=None,
+              time_out=None):
+        """Read a specified number of XTC frames from the buffer, keeping
+        every stride-th one. The other frames are skipped without being
+        decompressed. The coordinates and times are stored in the leading
+        frames of `xyz_out` and `time_out`, if they're given."""
 
-        cdef int i = 0
+        cdef int i = 0  # number of frames consumed from the file
+        cdef int j = 0  # number of frames stored
+        cdef int n_frames_out = (n_frames + stride - 1) // stride
         cdef int status = _EXDROK
         cdef int n_atoms_to_read
 
@@ -408,37 +498,50 @@ cdef class XTCTrajectoryFile:
             n_atoms_to_read = len(atom_indices)
 
         cdef np.ndarray[ndim=3, dtype=np.float32_t, mode='c'] xyz = \
-            np.empty((n_frames, n_atoms_to_read, 3), dtype=np.float32)
+            np.empty((n_frames_out, n_atoms_to_read, 3), dtype=np.float32) \
+            if xyz_out is None else xyz_out[:n_frames_out]
         cdef np.ndarray[ndim=1, dtype=np.float32_t, mode='c'] time = \
-            np.empty((n_frames), dtype=np.float32)
+            np.empty((n_frames_out), dtype=np.float32) \
+            if time_out is None else time_out[:n_frames_out]
         cdef np.ndarray[ndim=1, dtype=np.int32_t, mode='c'] step = \
-            np.empty((n_frames), dtype=np.int32)
+            np.empty((n_frames_out), dtype=np.int32)
         cdef np.ndarray[ndim=3, dtype=np.float32_t, mode='c'] box = \
-            np.empty((n_frames, 3, 3), dtype=np.float32)
+            np.empty((n_frames_out, 3, 3), dtype=np.float32)
         cdef np.ndarray[ndim=1, dtype=np.float32_t, mode='c'] prec = \
-            np.empty((n_frames), dtype=np.float32)
+            np.empty((n_frames_out), dtype=np.float32)
 
         # only used if atom_indices is given
         cdef np.ndarray[dtype=np.float32_t, ndim=2] framebuffer = np.zeros((self.n_atoms, 3), dtype=np.float32)
 
         while (i < n_frames) and (status != _EXDRENDOFFILE):
-            if atom_indices is None:
-                status = xdrlib.read_xtc(self.fh, self.n_atoms, <int*> &step[i],
-                                         &time[i], <xdrlib.matrix>&box[i,0,0], <xdrlib.rvec*>&xyz[i,0,0], &prec[i])
+            # the GIL is released during decompression, so that several files
+            # can be read at once from different threads
+            if i % stride != 0:
+                with nogil:
+                    status = xdrlib.xtc_skip_frame(self.fh, self.n_atoms)
+            elif atom_indices is None:
+                with nogil:
+                    status = xdrlib.read_xtc(self.fh, self.n_atoms, <int*> &step[j],
+                                             &time[j], <xdrlib.matrix>&box[j,0,0], <xdrlib.rvec*>&xyz[j,0,0], &prec[j])
             else:
-                status = xdrlib.read_xtc(self.fh, self.n_atoms, <int*> &step[i],
-                                         &time[i], <xdrlib.matrix>&box[i,0,0], <xdrlib.rvec*>&framebuffer[0,0], &prec[i])
-                xyz[i, :, :] = framebuffer[atom_indices, :]
+                with nogil:
+                    status = xdrlib.read_xtc(self.fh, self.n_atoms, <int*> &step[j],
+                                             &time[j], <xdrlib.matrix>&box[j,0,0], <xdrlib.rvec*>&framebuffer[0,0], &prec[j])
+                if status == _EXDROK:
+                    xyz[j, :, :] = framebuffer[atom_indices, :]
 
             if status != _EXDRENDOFFILE and status != _EXDROK:
                 raise RuntimeError('XTC read error: %s' % _EXDR_ERROR_MESSAGES.get(status, 'unknown'))
-            i += 1
+            if status == _EXDROK:
+                if i % stride == 0:
+                    j += 1
+                i += 1
 
-        if status == _EXDRENDOFFILE:
-            xyz = xyz[:i-1]
-            box = box[:i-1]
-            time = time[:i-1]
-            step = step[:i-1]
+        if j < n_frames_out:
+            xyz = xyz[:j]
+            box = box[:j]
+            time = time[:j]
+            step = step[:j]
 
         self.frame_counter += i
 
@@ -544,11 +647,8 @@ cdef class XTCTrajectoryFile:
             2: move relative to the end of file, offset should be <= 0.
             Seeking beyond the end of a file is not supported
         """
-        cdef int i, status, step
-        cdef float time = 0
-        cdef float prec = 0
-        cdef np.ndarray[dtype=np.float_t] box = np.empty(9, dtype=np.float)
-        cdef np.ndarray[dtype=np.float_t] xyz = np.empty(self.n_atoms * 3, dtype=np.float)
+        cdef int status
+        cdef int64_t position
 
         if str(self.mode) != 'r':
             raise NotImplementedError('seek() only available in mode="r" currently')
@@ -557,18 +657,22 @@ cdef class XTCTrajectoryFile:
         elif whence == 1:
             absolute = offset + self.frame_counter
         elif whence == 2 and offset <= 0:
-            raise NotImplementedError('offsets from the end are not supported yet')
+            absolute = len(self) + offset
         else:
             raise IOError('Invalid argument')
 
-        xdrlib.xdrfile_close(self.fh)
-        self.fh = xdrlib.xdrfile_open(self.filename, self.mode)
+        offsets = self.offsets
+        if absolute < 0 or absolute > len(offsets):
+            raise IOError('XTC seek error: frame %d is out of range for a file '
+                          'with %d frames' % (absolute, len(offsets)))
 
-        for i in range(absolute):
-            status = xdrlib.read_xtc(self.fh, self.n_atoms, <int*> &step,
-                                     &time, <xdrlib.matrix>&box[0], <xdrlib.rvec*>&xyz[0], &prec)
-            if status != _EXDROK:
-                raise RuntimeError('XTC seek error: %s' % status)
+        if absolute == len(offsets):
+            status = xdrlib.xdr_seek(self.fh, 0, SEEK_END)
+        else:
+            position = offsets[absolute]
+            status = xdrlib.xdr_seek(self.fh, position, SEEK_SET)
+        if status != _EXDROK:
+            raise RuntimeError('XTC seek error: %s' % status)
 
         self.frame_counter = absolute
 
@@ -599,6 +703,70 @@ cdef class XTCTrajectoryFile:
         if not self.is_open:
             raise ValueError('I/O operation on closed file')
         if self.n_frames == -1:
-            xdrlib.read_xtc_nframes(self.filename, &self.n_frames)
+            self.n_frames = len(self.offsets)
         return int(self.n_frames)
+
+    property offsets:
+        "Byte offset of the start of each frame in the file"
+        def __get__(self):
+            if str(self.mode) != 'r':
+                raise NotImplementedError('offsets only available in mode="r"')
+            if self._offsets is None:
+                offsets = None
+                if self.cache_offsets:
+                    offsets = load_offsets(self.filename, key=self.n_atoms)
+                    if offsets is not None and not self._check_offsets(offsets):
+                        offsets = None
+                if offsets is None:
+                    offsets = self._calc_offsets()
+                    if self.cache_offsets:
+                        save_offsets(self.filename, offsets, key=self.n_atoms)
+                self._offsets = offsets
+            return self._offsets
+
+    def _calc_offsets(self):
+        """Scan the frame headers to find the byte offset of every frame,
+        without decompressing the coordinates"""
+        cdef int status = _EXDROK
+        cdef int64_t position, filesize
+        cdef int64_t n_found = 0
+        cdef int64_t saved_position = xdrlib.xdr_tell(self.fh)
+        cdef np.ndarray[ndim=1, dtype=np.int64_t] offsets = \
+            np.empty(max(int(self.approx_n_frames * self.chunk_size_multiplier), self.min_chunk_size), dtype=np.int64)
+
+        filesize = os.stat(self.filename).st_size
+        xdrlib.xdr_seek(self.fh, 0, SEEK_SET)
+        while True:
+            position = xdrlib.xdr_tell(self.fh)
+            status = xdrlib.xtc_skip_frame(self.fh, self.n_atoms)
+            if status == _EXDRENDOFFILE:
+                break
+            if status != _EXDROK:
+                xdrlib.xdr_seek(self.fh, saved_position, SEEK_SET)
+                raise RuntimeError('XTC read error: %s' % _EXDR_ERROR_MESSAGES.get(status, 'unknown'))
+            if xdrlib.xdr_tell(self.fh) > filesize:
+                # truncated final frame
+                break
+            if n_found == len(offsets):
+                offsets = np.resize(offsets, 2 * len(offsets))
+            offsets[n_found] = position
+            n_found += 1
+
+        xdrlib.xdr_seek(self.fh, saved_position, SEEK_SET)
+        return np.array(offsets[:n_found])
+
+    def _check_offsets(self, offsets):
+        """Cheap sanity check of a cached offset index: the last indexed
+        frame must start with a valid frame header"""
+        cdef int magic = 0
+        cdef int64_t position
+        cdef int64_t saved_position
+        if len(offsets) == 0:
+            return True
+        saved_position = xdrlib.xdr_tell(self.fh)
+        position = offsets[len(offsets) - 1]
+        xdrlib.xdr_seek(self.fh, position, SEEK_SET)
+        valid = xdrlib.xdrfile_read_int(&magic, 1, self.fh) == 1 and magic == _XTC_MAGIC
+        xdrlib.xdr_seek(self.fh, saved_position, SEEK_SET)
+        return valid
 _FormatRegistry.register_fileobject('.xtc')(XTCTrajectoryFile)
@@ -36,6 +36,8 @@ import numpy as np
 from mdtraj.formats.registry import _FormatRegistry
 from mdtraj.utils import (cast_indices, in_units_of, ensure_type,
                           open_maybe_zipped)
+from mdtraj.utils.offsets import load_offsets, save_offsets, scan_line_offsets
+from mdtraj.utils.zipped import is_zipped
 from mdtraj.utils.six import string_types
 from mdtraj.utils.six.moves import xrange
 from mdtraj.version import version
@@ -132,22 +134,37 @@ class XYZTrajectoryFile(object):
     force_overwrite : bool
         If opened in write mode, and a file by the name of `filename` already
         exists on disk, should we overwrite it?
+    cache_offsets : bool, default=False
+        In mode='r', seeking and finding the number of frames in an
+        uncompressed file requires the offset of each frame in the file,
+        which are found by scanning it once. If True, they are saved to a
+        hidden ``.<filename>.offsets.npz`` file next to it, and reused the
+        next time the file is opened. This writes to the directory of the
+        file, so it is off by default.
     """
 
     distance_unit = 'angstroms'
 
-    def __init__(self, filename, mode='r', force_overwrite=True):
+    def __init__(self, filename, mode='r', force_overwrite=True,
+                 cache_offsets=False):
         """Open a xyz file for reading/writing. """
         self._is_open = False
         self._filename = filename
         self._mode = mode
         self._frame_index = 0
+        self._offsets = None
+        self._cache_offsets = cache_offsets
         # track which line we're on. this is not essential, but its useful
         # when reporting errors to the user to say what line it occured on.
         self._line_counter = 0
 
         if mode == 'r':
-            self._fh = open_maybe_zipped(filename, 'r')
+            if is_zipped(filename):
+                self._fh = open_maybe_zipped(filename, 'r')
+            else:
+                # the frame offsets are byte offsets, which can only be
+                # seeked to reliably in a binary handle
+                self._fh = open(filename, 'rb')
             self._is_open = True
         elif mode == 'w':
             self._fh = open_maybe_zipped(filename, 'w', force_overwrite)
@@ -252,10 +269,10 @@ class XYZTrajectoryFile(object):
 
             all_coords.append(frame_coords)
 
-            for j in range(stride - 1):
-                # throw away these frames
+            if stride > 1:
+                # skip these frames
                 try:
-                    self._read()
+                    self._skip(stride - 1)
                 except _EOF:
                     break
 
@@ -265,24 +282,37 @@ class XYZTrajectoryFile(object):
     def _read(self):
         """Read a single frame. """
 
+        # the lines are bytes, or str for compressed files
         first = self._fh.readline()  # Number of atoms.
-        if first == '':
+        if not first:
             raise _EOF()
         else:
             self._n_atoms = int(first)
         self._fh.readline()  # Comment line.
         self._line_counter += 2
 
-        xyz = np.empty(shape=(self._n_atoms, 3))
-        types = np.empty(shape=self._n_atoms, dtype=str)
+        lines = [self._fh.readline() for _ in xrange(self._n_atoms)]
+        if lines and not lines[-1]:
+            raise _EOF()
+
+        # convert the coordinates in bulk, unless some lines have extra
+        # fields past the z coordinate
+        fields = first[:0].join(lines).split()
+        if len(fields) == 4 * self._n_atoms:
+            try:
+                xyz = np.array(fields).reshape(self._n_atoms, 4)[:, 1:]
+                xyz = xyz.astype(np.float64)
+            except ValueError:
+                pass
+            else:
+                self._line_counter += self._n_atoms
+                self._frame_index += 1
+                return xyz
 
-        for i in xrange(self._n_atoms):
-            line = self._fh.readline()
-            if line == '':
-                raise _EOF()
+        xyz = np.empty(shape=(self._n_atoms, 3))
+        for i, line in enumerate(lines):
             split_line = line.split()
             try:
-                types[i] = split_line[0]
                 xyz[i] = [float(x) for x in split_line[1:4]]
             except Exception:
                 raise IOError('xyz parse error on line {0:d} of "{1:s}". '
@@ -351,22 +381,38 @@ class XYZTrajectoryFile(object):
             elif whence == 1 and offset < 0:
                 absolute = offset + self._frame_index
             elif whence == 2 and offset <= 0:
-                raise NotImplementedError('offsets from the end are not supported yet')
+                absolute = len(self.offsets) + offset
             else:
                 raise IOError('Invalid argument')
 
-            if advance is not None:
-                for i in range(advance):
-                    self._read()  # advance and throw away these frames
-            elif absolute is not None:
+            if is_zipped(self._filename):
+                # compressed files can't be indexed, so they're read through
+                if advance is not None:
+                    for i in range(advance):
+                        self._read()  # advance and throw away these frames
+                    return
                 self._fh.close()
-                self._fh = open(self._filename, 'r')
+                self._fh = open_maybe_zipped(self._filename, 'r')
                 self._frame_index = 0
                 self._line_counter = 0
                 for i in range(absolute):
                     self._read()
+                return
+
+            if advance is not None:
+                absolute = self._frame_index + advance
+            offsets = self.offsets
+            if not 0 <= absolute <= len(offsets):
+                raise IOError('Cannot seek to frame %d of a file with %d '
+                              'frames' % (absolute, len(offsets)))
+            if absolute == len(offsets):
+                self._fh.seek(0, os.SEEK_END)
             else:
-                raise RuntimeError()
+                self._fh.seek(offsets[absolute])
+            self._frame_index = absolute
+            # the line counter is only used for error messages, and is
+            # unknown after a seek
+            self._line_counter = 0
 
         else:
             raise NotImplementedError('offsets in write mode are not supported yet')
@@ -383,4 +429,45 @@ class XYZTrajectoryFile(object):
 
     def __len__(self):
         """Number of frames in the file. """
-        raise NotImplementedError()
+        if not self._mode == 'r':
+            raise NotImplementedError('len() only available in mode="r"')
+        return len(self.offsets)
+
+    def _skip(self, n_frames):
+        """Skip over frames without parsing them"""
+        if is_zipped(self._filename):
+            for _ in range(n_frames):
+                self._read()
+            return
+        n_frames = min(n_frames, len(self.offsets) - self._frame_index)
+        self.seek(n_frames, whence=1)
+
+    @property
+    def offsets(self):
+        """The byte offset of the start of each frame in the file.
+
+        The frames are assumed to all have the same number of atoms as the
+        first one, so the offsets are found by counting lines. If the file
+        was opened with ``cache_offsets=True``, they are cached in a hidden
+        ``.<filename>.offsets.npz`` file next to it. Compressed files can't
+        be indexed.
+        """
+        if not self._mode == 'r':
+            raise NotImplementedError('offsets only available in mode="r"')
+        if is_zipped(self._filename):
+            raise NotImplementedError('offsets are not available for '
+                                      'compressed files')
+        if self._offsets is None:
+            with open(self._filename, 'rb') as f:
+                first = f.readline().strip()
+            n_atoms = int(first) if first else 0
+            key = 'xyz-%d' % n_atoms
+            offsets = None
+            if self._cache_offsets:
+                offsets = load_offsets(self._filename, key=key)
+            if offsets is None:
+                offsets = scan_line_offsets(self._filename, n_atoms + 2)
+                if self._cache_offsets:
+                    save_offsets(self._filename, offsets, key=key)
+            self._offsets = offsets
+        return self._offsets
@@ -28,7 +28,8 @@ __all__ = ['baker_hubbard', 'shrake_rupley', 'kabsch_sander', 'compute_distances
            'compute_chi3', 'compute_chi4', 'compute_omega', 'compute_rg',
            'compute_contacts', 'compute_drid', 'compute_center_of_mass',
            'wernet_nilsson', 'compute_dssp', 'compute_neighbors', 'compute_rdf',
-           'compute_nematic_order', 'compute_inertia_tensor',
+           'RDFAccumulator', 'compute_nematic_order', 'compute_inertia_tensor',
+           'FeaturePipeline',
 
            # from thermodynamic_properties
            'dipole_moments', 'static_dielectric', 'isothermal_compressability_kappa_T',
@@ -48,4 +49,5 @@ from mdtraj.geometry.neighbors import *
 from mdtraj.geometry.thermodynamic_properties import *
 from mdtraj.geometry.rdf import *
 from mdtraj.geometry.order import *
+from mdtraj.geometry.features import *
 
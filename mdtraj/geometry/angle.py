@@ -38,7 +38,7 @@ __all__ = ['compute_angles']
 ##############################################################################
 
 
-def compute_angles(traj, angle_indices, periodic=True, opt=True):
+def compute_angles(traj, angle_indices, periodic=True, opt=True, parallel=True):
     """Compute the bond angles between the supplied triplets of indices in each frame of a trajectory.
 
     Parameters
@@ -55,6 +55,9 @@ def compute_angles(traj, angle_indices, periodic=True, opt=True):
         Use an optimized native library to calculate distances. Our optimized
         SSE angle calculation implementation is 10-20x faster than the
         (itself optimized) numpy implementation.
+    parallel : bool, default=True
+        Use OpenMP to calculate the angles in each frame in parallel. This
+        option only applies when `opt` is True.
 
     Returns
     -------
@@ -81,14 +84,14 @@ def compute_angles(traj, angle_indices, periodic=True, opt=True):
     if periodic is True and traj._have_unitcell:
         box = ensure_type(traj.unitcell_vectors, dtype=np.float32, ndim=3, name='unitcell_vectors', shape=(len(xyz), 3, 3))
         if opt:
-            _geometry._angle_mic(xyz, triplets, box, out)
+            _geometry._angle_mic(xyz, triplets, box, out, parallel)
             return out
         else:
             _angle(traj, triplets, periodic, out)
             return out
 
     if opt:
-        _geometry._angle(xyz, triplets, out)
+        _geometry._angle(xyz, triplets, out, parallel)
     else:
         _angle(traj, triplets, periodic, out)
     return out
@@ -29,10 +29,9 @@ from __future__ import print_function, division
 import numpy as np
 from mdtraj.utils import ensure_type
 from mdtraj.utils.six import string_types
-from mdtraj.utils.six.moves import xrange
 from mdtraj.core import element
+from mdtraj.geometry import _geometry
 import mdtraj as md
-import itertools
 
 __all__ = ['compute_contacts', 'squareform']
 
@@ -40,7 +39,9 @@ __all__ = ['compute_contacts', 'squareform']
 # Code
 ##############################################################################
 
-def compute_contacts(traj, contacts='all', scheme='closest-heavy', ignore_nonprotein=True):
+def compute_contacts(traj, contacts='all', scheme='closest-heavy',
+                     ignore_nonprotein=True, periodic=True, cutoff=None,
+                     parallel=True):
     """Compute the distance between pairs of residues in a trajectory.
 
     Parameters
@@ -64,6 +65,19 @@ def compute_contacts(traj, contacts='all', scheme='closest-heavy', ignore_nonpro
         When using `contact==all`, don't compute contacts between
         "residues" which are not protein (i.e. do not contain an alpha
         carbon).
+    periodic : bool, default=True
+        If `periodic` is True and the trajectory contains unitcell
+        information, we will compute distances under the minimum image
+        convention.
+    cutoff : float, optional
+        Only for the 'closest' and 'closest-heavy' schemes. If given, it
+        must be positive, and the distance between residues that are
+        further apart than `cutoff` (in nm) is reported as ``np.inf``. The
+        residues that are ruled out by the distance between their centroids
+        and the sizes of the residues are then skipped, which is much faster
+        when only the residues in contact are of interest.
+    parallel : bool, default=True
+        Use OpenMP to compute the distances in each frame in parallel.
 
     Returns
     -------
@@ -82,6 +96,13 @@ def compute_contacts(traj, contacts='all', scheme='closest-heavy', ignore_nonpro
         `contacts`. But the indexing of `distance` *will* match up with
         the indexing of `residue_pairs`
 
+    Notes
+    -----
+    For the 'closest' and 'closest-heavy' schemes, the minimum distance
+    between the atoms of each pair of residues is computed directly by a
+    native kernel, without storing the distances between all of the pairs
+    of atoms.
+
     Examples
     --------
     >>> # To compute the contact distance between residue 0 and 10 and
@@ -104,24 +125,16 @@ def compute_contacts(traj, contacts='all', scheme='closest-heavy', ignore_nonpro
     """
     if traj.topology is None:
         raise ValueError('contact calculation requires a topology')
+    top = traj.topology
+    atom_residue = top._atom_column('residue.index')
+    is_ca = top._atom_column('name').map(lambda name: name.lower() == 'ca')
+    n_ca = np.bincount(atom_residue[is_ca], minlength=top.n_residues)
 
     if isinstance(contacts, string_types):
         if contacts.lower() != 'all':
             raise ValueError('(%s) is not a valid contacts specifier' % contacts.lower())
 
-        residue_pairs = []
-        for i in xrange(traj.n_residues):
-            residue_i = traj.topology.residue(i)
-            if ignore_nonprotein and not any(a for a in residue_i.atoms if a.name.lower() == 'ca'):
-                continue
-            for j in xrange(i+3, traj.n_residues):
-                residue_j = traj.topology.residue(j)
-                if ignore_nonprotein and not any(a for a in residue_j.atoms if a.name.lower() == 'ca'):
-                    continue
-                if residue_i.chain == residue_j.chain:
-                    residue_pairs.append((i, j))
-
-        residue_pairs = np.array(residue_pairs)
+        residue_pairs = _all_residue_pairs(top, n_ca > 0 if ignore_nonprotein else None)
         if len(residue_pairs) == 0:
             raise ValueError('No acceptable residue pairs found')
 
@@ -136,56 +149,65 @@ def compute_contacts(traj, contacts='all', scheme='closest-heavy', ignore_nonpro
     scheme = scheme.lower()
     if scheme not in ['ca', 'closest', 'closest-heavy']:
         raise ValueError('scheme must be one of [ca, closest, closest-heavy]')
+    if cutoff is not None and not cutoff > 0:
+        raise ValueError('cutoff must be positive')
 
     if scheme == 'ca':
-        filtered_residue_pairs = []
-        atom_pairs = []
-
-        for r0, r1 in residue_pairs:
-            ca_atoms_0 = [a.index for a in traj.top.residue(r0).atoms if a.name.lower() == 'ca']
-            ca_atoms_1 = [a.index for a in traj.top.residue(r1).atoms if a.name.lower() == 'ca']
-            if len(ca_atoms_0) == 1 and len(ca_atoms_1) == 1:
-                atom_pairs.append((ca_atoms_0[0], ca_atoms_1[0]))
-                filtered_residue_pairs.append((r0, r1))
-            elif len(ca_atoms_0) == 0 or len(ca_atoms_1) == 0:
-                # residue does not contain a CA atom, skip it
-                if contacts != 'all':
-                    # if the user manually asked for this residue, and didn't use "all"
-                    import warnings
-                    warnings.warn('Ignoring contacts pair %d-%d. No alpha carbon.' % (r0, r1))
-            else:
-                raise ValueError('More than 1 alpha carbon detected in residue %d or %d' % (r0, r1))
-
-        residue_pairs = np.array(filtered_residue_pairs)
-        distances = md.compute_distances(traj, atom_pairs)
-
+        pair_n_ca = n_ca[residue_pairs]
+        keep = (pair_n_ca == 1).all(axis=1)
+        # pairs with a residue without an alpha carbon are skipped, even if
+        # the other residue has more than one
+        ambiguous = (pair_n_ca > 1).any(axis=1) & (pair_n_ca > 0).all(axis=1)
+        if np.any(ambiguous):
+            r0, r1 = residue_pairs[ambiguous][0]
+            raise ValueError('More than 1 alpha carbon detected in residue %d or %d' % (r0, r1))
+        if not isinstance(contacts, string_types):
+            # if the user manually asked for these residues, and didn't use "all"
+            import warnings
+            for r0, r1 in residue_pairs[~keep]:
+                warnings.warn('Ignoring contacts pair %d-%d. No alpha carbon.' % (r0, r1))
+
+        residue_pairs = residue_pairs[keep]
+        ca_atoms = np.zeros(top.n_residues, dtype=np.int)
+        ca_atoms[atom_residue[is_ca]] = np.flatnonzero(is_ca)
+        distances = md.compute_distances(traj, ca_atoms[residue_pairs],
+                                         periodic=periodic, parallel=parallel)
 
     elif scheme in ['closest', 'closest-heavy']:
-        if scheme == 'closest':
-            residue_membership = [[atom.index for atom in residue.atoms]
-                                  for residue in traj.topology.residues]
-        elif scheme == 'closest-heavy':
-            # then remove the hydrogens from the above list
-            residue_membership = [[atom.index for atom in residue.atoms if not (atom.element == element.hydrogen)]
-                                  for residue in traj.topology.residues]
-
-        residue_lens = [len(ainds) for ainds in residue_membership]
-
-        atom_pairs = []
-        n_atom_pairs_per_residue_pair = []
-        for pair in residue_pairs:
-            atom_pairs.extend(list(itertools.product(residue_membership[pair[0]], residue_membership[pair[1]])))
-            n_atom_pairs_per_residue_pair.append(residue_lens[pair[0]] * residue_lens[pair[1]])
-
-        atom_distances = md.compute_distances(traj, atom_pairs)
-
-        # now squash the results based on residue membership
-        n_residue_pairs = len(residue_pairs)
-        distances = np.zeros((len(traj), n_residue_pairs), dtype=np.float32)
-        for i in xrange(n_residue_pairs):
-            index = int(np.sum(n_atom_pairs_per_residue_pair[:i]))
-            n = n_atom_pairs_per_residue_pair[i]
-            distances[:, i] = atom_distances[:, index : index + n].min(axis=1)
+        atom_indices = np.arange(top.n_atoms)
+        if scheme == 'closest-heavy':
+            # then remove the hydrogens
+            is_hydrogen = top._atom_column('element').map(
+                lambda e: e == element.hydrogen)
+            atom_indices = atom_indices[~is_hydrogen]
+
+        # the atoms of each residue, in compressed sparse row format: the
+        # atoms of residue r are atom_indices[residue_offsets[r]:residue_offsets[r+1]]
+        atom_indices = atom_indices[np.argsort(atom_residue[atom_indices], kind='mergesort')]
+        residue_offsets = np.zeros(top.n_residues + 1, dtype=np.int32)
+        np.cumsum(np.bincount(atom_residue[atom_indices], minlength=top.n_residues),
+                  out=residue_offsets[1:])
+        empty = np.diff(residue_offsets)[residue_pairs] == 0
+        if np.any(empty):
+            raise ValueError('Residue %d has no atoms to compute contacts with' %
+                             residue_pairs[empty][0])
+
+        xyz = ensure_type(traj.xyz, dtype=np.float32, ndim=3, name='traj.xyz',
+                          shape=(None, None, 3), warn_on_cast=False)
+        box, orthogonal = None, False
+        if periodic and traj._have_unitcell:
+            box = ensure_type(traj.unitcell_vectors, dtype=np.float32, ndim=3, name='unitcell_vectors',
+                              shape=(len(xyz), 3, 3), warn_on_cast=False)
+            box = box.transpose(0, 2, 1).copy()
+            orthogonal = np.allclose(traj.unitcell_angles, 90)
+
+        distances = np.empty((len(xyz), len(residue_pairs)), dtype=np.float32)
+        if len(residue_pairs) > 0:
+            _geometry._group_min_dist(
+                xyz, residue_offsets, atom_indices.astype(np.int32),
+                np.asarray(residue_pairs, dtype=np.int32, order='C'), box,
+                orthogonal, 0 if cutoff is None else cutoff, distances,
+                parallel)
 
     else:
         raise ValueError('This is not supposed to happen!')
@@ -193,6 +215,28 @@ def compute_contacts(traj, contacts='all', scheme='closest-heavy', ignore_nonpro
     return distances, residue_pairs
 
 
+def _all_residue_pairs(top, include=None):
+    """All of the pairs of residues in the same chain that are separated by
+    two or more residues, optionally only among the residues where
+    `include` is True. The pairs are sorted."""
+    residue_chain = top._residue_chain.data
+    residues = np.arange(top.n_residues)
+    if include is not None:
+        residues = residues[include]
+
+    pairs = []
+    for chain in np.unique(residue_chain[residues]):
+        members = residues[residue_chain[residues] == chain]
+        i, j = np.triu_indices(len(members), 1)
+        i, j = members[i], members[j]
+        keep = j - i >= 3
+        pairs.append(np.column_stack((i[keep], j[keep])))
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int)
+    pairs = np.concatenate(pairs)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
 def squareform(distances, residue_pairs):
     """Reshape the contact distance to square contact maps
 
@@ -79,7 +79,7 @@ def _dihedral(traj, indices, periodic, out=None):
     return np.arctan2(p1, p2, out)
 
 
-def compute_dihedrals(traj, indices, periodic=True, opt=True):
+def compute_dihedrals(traj, indices, periodic=True, opt=True, parallel=True):
     """Compute the dihedral angles between the supplied quartets of atoms in each frame in a trajectory.
 
     Parameters
@@ -97,6 +97,9 @@ def compute_dihedrals(traj, indices, periodic=True, opt=True):
         using the minimum image convention.
     opt : bool, default=True
         Use an optimized native library to calculate angles.
+    parallel : bool, default=True
+        Use OpenMP to calculate the dihedrals in each frame in parallel. This
+        option only applies when `opt` is True.
 
     Returns
     -------
@@ -125,47 +128,19 @@ def compute_dihedrals(traj, indices, periodic=True, opt=True):
     if periodic and traj._have_unitcell:
         box = ensure_type(traj.unitcell_vectors, dtype=np.float32, ndim=3, name='unitcell_vectors', shape=(len(xyz), 3, 3))
         if opt:
-            _geometry._dihedral_mic(xyz, quartets, box, out)
+            _geometry._dihedral_mic(xyz, quartets, box, out, parallel)
             return out
         else:
             _dihedral(traj, quartets, periodic, out)
             return out
 
     if opt:
-        _geometry._dihedral(xyz, quartets, out)
+        _geometry._dihedral(xyz, quartets, out, parallel)
     else:
         _dihedral(traj, quartets, periodic, out)
     return out
 
 
-def _construct_atom_dict(topology):
-    """Create dictionary to lookup indices by atom name, residue_id, and chain
-    index.
-
-    Parameters
-    ----------
-    topology : Topology
-        The topology to parse
-
-    Returns
-    -------
-    atom_dict : dict
-        Tree of nested dictionaries such that
-        `atom_dict[chain_index][residue_index][atom_name] = atom_index`
-    """
-    atom_dict = {}
-    for chain in topology.chains:
-        residue_dict = {}
-        for residue in chain.residues:
-            local_dict = {}
-            for atom in residue.atoms:
-                local_dict[atom.name] = atom.index
-            residue_dict[residue.index] = local_dict
-        atom_dict[chain.index] = residue_dict
-
-    return atom_dict
-
-
 def _atom_sequence(top, atom_names, residue_offsets=None):
     """Find sequences of atom indices corresponding to desired atoms.
 
@@ -211,35 +186,53 @@ def _atom_sequence(top, atom_names, residue_offsets=None):
                       "deprecated. Please pass a Topology object",
                       DeprecationWarning)
         top = top.topology
-    atom_dict = _construct_atom_dict(top)
-
-    atom_indices = []
-    found_residue_ids = []
-    # py3k criticial list(zip(, not just zip(, since we iterate multiple
-    # times through it
-    atoms_and_offsets = list(zip(atom_names, residue_offsets))
-    for chain in top.chains:
-        cid = chain.index
-        for residue in chain.residues:
-            rid = residue.index
-            # Check that desired residue_IDs are in dict
-            if all([rid + offset in atom_dict[cid]
-                    for offset in residue_offsets]):
-                # Check that we find all atom names in dict
-                if all([atom in atom_dict[cid][rid + offset]
-                        for atom, offset in atoms_and_offsets]):
-                    # Lookup desired atom indices and and add to list.
-                    atom_indices.append([atom_dict[cid][rid + offset][atom]
-                                         for atom, offset in atoms_and_offsets])
-                    found_residue_ids.append(rid)
-
-    atom_indices = np.array(atom_indices)
-    found_residue_ids = np.array(found_residue_ids)
-
-    if len(atom_indices) == 0:
-        atom_indices = np.empty(shape=(0, 4), dtype=np.int)
-
-    return found_residue_ids, atom_indices
+
+    # the indices only depend on the topology, so they're only found once
+    # for each topology (e.g. not for every chunk of an iterload loop)
+    atoms_and_offsets = tuple(zip(atom_names, (int(o) for o in residue_offsets)))
+    found_residue_ids, atom_indices = top._cached(
+        ('atom_sequence', atoms_and_offsets),
+        lambda top: _find_atom_sequence(top, atoms_and_offsets))
+    return found_residue_ids.copy(), atom_indices.copy()
+
+
+def _find_atom_sequence(top, atoms_and_offsets):
+    """Find the atom indices of a sequence of (atom name, residue offset)
+    pairs in each residue, for _atom_sequence.
+
+    A residue matches if each of the residues at its offsets is in the same
+    chain, and has an atom with the name. If a residue has several atoms
+    with the same name, the last one is used.
+    """
+    structure = top._structure()
+    residues = structure.residue_order
+    residue_chain = np.empty(top.n_residues, dtype=np.intp)
+    residue_chain[residues] = np.repeat(np.arange(top.n_chains),
+                                        np.diff(structure.chain_offsets))
+    names = top._atom_column('name')
+    atom_residue = top._atom_column('residue.index')
+
+    columns = []
+    found = np.ones(len(residues), dtype=bool)
+    for atom, offset in atoms_and_offsets:
+        named = np.empty(top.n_residues, dtype=np.intp)
+        named.fill(-1)
+        if atom in names.values:
+            atoms = np.flatnonzero(names.codes == names.values.index(atom))
+            np.maximum.at(named, atom_residue[atoms], atoms)
+
+        other = residues + offset
+        in_chain = (other >= 0) & (other < top.n_residues)
+        other[~in_chain] = 0
+        in_chain &= residue_chain[other] == residue_chain[residues]
+        column = np.where(in_chain, named[other], -1)
+        found &= column != -1
+        columns.append(column)
+
+    if not np.any(found):
+        return np.array([]), np.empty(shape=(0, 4), dtype=np.int)
+    atom_indices = np.column_stack(columns)[found].astype(np.int)
+    return residues[found].astype(np.int), atom_indices
 
 
 def parse_offsets(atom_names):
@@ -40,7 +40,7 @@ __all__ = ['compute_distances', 'compute_displacements',
 ##############################################################################
 
 
-def compute_distances(traj, atom_pairs, periodic=True, opt=True):
+def compute_distances(traj, atom_pairs, periodic=True, opt=True, parallel=True):
     """Compute the distances between pairs of atoms in each frame.
 
     Parameters
@@ -57,6 +57,11 @@ def compute_distances(traj, atom_pairs, periodic=True, opt=True):
         Use an optimized native library to calculate distances. Our optimized
         SSE minimum image convention calculation implementation is over 1000x
         faster than the naive numpy implementation.
+    parallel : bool, default=True
+        Use OpenMP to calculate the distances in each frame in parallel. This
+        option only applies when `opt` is True. The optimized implementation
+        always releases the GIL, so it can also run concurrently with other
+        Python threads.
 
     Returns
     -------
@@ -77,7 +82,7 @@ def compute_distances(traj, atom_pairs, periodic=True, opt=True):
         orthogonal = np.allclose(traj.unitcell_angles, 90)
         if opt:
             out = np.empty((xyz.shape[0], pairs.shape[0]), dtype=np.float32)
-            _geometry._dist_mic(xyz, pairs, box.transpose(0, 2, 1).copy(), out, orthogonal)
+            _geometry._dist_mic(xyz, pairs, box.transpose(0, 2, 1).copy(), out, orthogonal, parallel)
             return out
         else:
             return _distance_mic(xyz, pairs, box.transpose(0, 2, 1), orthogonal)
@@ -85,13 +90,13 @@ def compute_distances(traj, atom_pairs, periodic=True, opt=True):
     # either there are no unitcell vectors or they dont want to use them
     if opt:
         out = np.empty((xyz.shape[0], pairs.shape[0]), dtype=np.float32)
-        _geometry._dist(xyz, pairs, out)
+        _geometry._dist(xyz, pairs, out, parallel)
         return out
     else:
         return _distance(xyz, pairs)
 
 
-def compute_displacements(traj, atom_pairs, periodic=True, opt=True):
+def compute_displacements(traj, atom_pairs, periodic=True, opt=True, parallel=True):
     """Compute the displacement vector between pairs of atoms in each frame of a trajectory.
 
     Parameters
@@ -108,6 +113,9 @@ def compute_displacements(traj, atom_pairs, periodic=True, opt=True):
         Use an optimized native library to calculate distances. Our
         optimized minimum image convention calculation implementation is
         over 1000x faster than the naive numpy implementation.
+    parallel : bool, default=True
+        Use OpenMP to calculate the displacements in each frame in parallel.
+        This option only applies when `opt` is True.
 
     Returns
     -------
@@ -125,7 +133,7 @@ def compute_displacements(traj, atom_pairs, periodic=True, opt=True):
         orthogonal = np.allclose(traj.unitcell_angles, 90)
         if opt:
             out = np.empty((xyz.shape[0], pairs.shape[0], 3), dtype=np.float32)
-            _geometry._dist_mic_displacement(xyz, pairs, box.transpose(0, 2, 1).copy(), out, orthogonal)
+            _geometry._dist_mic_displacement(xyz, pairs, box.transpose(0, 2, 1).copy(), out, orthogonal, parallel)
             return out
         else:
             return _displacement_mic(xyz, pairs, box.transpose(0, 2, 1), orthogonal)
@@ -133,7 +141,7 @@ def compute_displacements(traj, atom_pairs, periodic=True, opt=True):
     # either there are no unitcell vectors or they dont want to use them
     if opt:
         out = np.empty((xyz.shape[0], pairs.shape[0], 3), dtype=np.float32)
-        _geometry._dist_displacement(xyz, pairs, out)
+        _geometry._dist_displacement(xyz, pairs, out, parallel)
         return out
     return _displacement(xyz, pairs)
 
@@ -82,7 +82,8 @@ def compute_dssp(traj, simplified=True):
 
     xyz, nco_indices, ca_indices, proline_indices, protein_indices \
         = _prep_kabsch_sander_arrays(traj)
-    chain_ids = np.array([r.chain.index for r in traj.top.residues], dtype=np.int32)
+    chain_ids = traj.topology._cached('residue_chains', lambda top: np.array(
+        [r.chain.index for r in top.residues], dtype=np.int32))
 
     value = _geometry._dssp(xyz, nco_indices, ca_indices, proline_indices, chain_ids)
     if simplified:
@@ -0,0 +1,320 @@
+##############################################################################
+# MDTraj: A Python Library for Loading, Saving, and Manipulating
+#         Molecular Dynamics Trajectories.
+# Copyright 2012-2016 Stanford University and the Authors
+#
+# Authors: Robert McGibbon
+# Contributors:
+#
+# MDTraj is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with MDTraj. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+from __future__ import print_function, division
+
+import numpy as np
+
+import mdtraj as md
+from mdtraj.utils import ensure_type
+from mdtraj.utils.six import string_types
+from mdtraj.geometry.rg import compute_rg
+from mdtraj.geometry.angle import compute_angles
+from mdtraj.geometry.contact import compute_contacts
+from mdtraj.geometry.distance import compute_distances
+from mdtraj.geometry import dihedral
+
+__all__ = ['FeaturePipeline']
+
+# the coordinates of the frames in each block should stay in the (last level)
+# cache while all of the features are computed from them, but each block
+# also costs a call to each geometry function, so they can't be too small
+_BLOCK_BYTES = 1 << 23
+_MIN_BLOCK_SIZE = 16
+
+# the features whose atom indices are given: their function, the name of
+# its argument with the indices, and the number of atoms in each row
+_INDEXED = {
+    'distances': (compute_distances, 'atom_pairs', 2),
+    'angles': (compute_angles, 'angle_indices', 3),
+    'dihedrals': (dihedral.compute_dihedrals, 'indices', 4),
+}
+
+# the dihedrals whose indices are found in the topology
+_NAMED_DIHEDRALS = {
+    'phi': dihedral.indices_phi,
+    'psi': dihedral.indices_psi,
+    'omega': dihedral.indices_omega,
+    'chi1': dihedral.indices_chi1,
+    'chi2': dihedral.indices_chi2,
+    'chi3': dihedral.indices_chi3,
+    'chi4': dihedral.indices_chi4,
+}
+
+
+class FeaturePipeline(object):
+    """Compute several geometric features of a trajectory together, in a
+    single pass over its frames.
+
+    Each feature is computed by one of the geometry functions, like
+    `compute_dihedrals` or `compute_contacts`, and gives one or more columns
+    of a single feature matrix. Instead of computing each feature for all of
+    the frames in turn, the frames are split into blocks that are small
+    enough to stay in the cache, and all of the features are computed for
+    one block before moving to the next. The coordinates are converted to
+    float32 once per block, rather than once per feature, and the indices of
+    the atoms (or residues) of the features are only found in the topology
+    once.
+
+    The trajectory can be in memory, or it can be a sequence of chunks from
+    ``md.iterload``, in which case only one chunk is in memory at a time.
+
+    Parameters
+    ----------
+    features : list
+        The features to compute, in the order of their columns. Each is a
+        name, a tuple ``(name, arg)``, or a tuple ``(name, arg, kwargs)``,
+        where `kwargs` is a dict of other arguments for the geometry
+        function. The names are
+
+            'distances', 'angles', 'dihedrals' : `arg` is the array of atom
+                indices for `compute_distances`, `compute_angles` or
+                `compute_dihedrals`.
+            'phi', 'psi', 'omega', 'chi1', 'chi2', 'chi3', 'chi4' : the
+                dihedrals found by `compute_phi`, etc. There is no `arg`.
+            'rg' : the radius of gyration from `compute_rg`, a single
+                column. `arg` is the optional array of masses.
+            'contacts' : `arg` is the `contacts` argument of
+                `compute_contacts`, 'all' by default. The residue pairs are
+                only resolved once, for the first frame.
+    periodic : bool, default=True
+        The default value of `periodic` for the geometry functions that
+        take it.
+    block_size : int, optional
+        The number of frames in each block. By default, the blocks are about
+        8 MB of coordinates, and at least 16 frames.
+    n_jobs : int, default=1
+        The number of blocks to compute concurrently, in threads. If -1, use
+        one thread per CPU. With a single job, the geometry functions use
+        OpenMP to compute each block in parallel instead.
+
+    Attributes
+    ----------
+    n_features : int
+        The number of columns of the feature matrix. This is only known
+        after the first call to `transform`.
+    feature_slices : list of slice
+        The columns of each feature in the feature matrix, after the first
+        call to `transform`.
+    feature_indices : list
+        The atom indices of each feature (or the residue pairs, for
+        contacts), as they were resolved in the topology, or None for Rg.
+
+    Examples
+    --------
+    >>> top = md.load_topology('traj.pdb')
+    >>> pipeline = md.FeaturePipeline(['phi', 'psi', 'rg',
+    ...                                ('distances', [[0, 10], [5, 20]]),
+    ...                                ('contacts', 'all', {'scheme': 'ca'})])
+    >>> X = pipeline.transform(md.iterload('traj.xtc', top=top, chunk=1000))
+    >>> phi = X[:, pipeline.feature_slices[0]]
+
+    See also
+    --------
+    compute_dihedrals, compute_distances, compute_rg, compute_contacts
+    """
+
+    def __init__(self, features, periodic=True, block_size=None, n_jobs=1):
+        self.features = [_parse_feature(f) for f in features]
+        if len(self.features) == 0:
+            raise ValueError('at least one feature is required')
+        if block_size is not None and int(block_size) < 1:
+            raise ValueError('block_size must be a positive integer')
+
+        self.periodic = periodic
+        self.block_size = block_size
+        self.n_jobs = n_jobs
+        self.n_features = None
+        self.feature_slices = None
+        self.feature_indices = None
+        self._topology = None
+        self._columns = None
+
+    def transform(self, traj, n_frames=None):
+        """Compute the features of each frame of a trajectory.
+
+        Parameters
+        ----------
+        traj : Trajectory or iterable of Trajectory
+            The trajectory, or its chunks, e.g. from ``md.iterload``.
+        n_frames : int, optional
+            The total number of frames in the chunks, if it is known. The
+            feature matrix is then allocated once. Otherwise, it is grown as
+            the chunks are read.
+
+        Returns
+        -------
+        X : np.ndarray, shape=(n_frames, n_features), dtype=float32
+            The features of each frame.
+        """
+        if isinstance(traj, md.Trajectory):
+            chunks, n_frames = [traj], len(traj)
+        else:
+            chunks = traj
+
+        pool = None
+        n_jobs = self.n_jobs
+        if n_jobs == -1:
+            from multiprocessing import cpu_count
+            n_jobs = cpu_count()
+        if n_jobs > 1:
+            from multiprocessing.pool import ThreadPool
+            pool = ThreadPool(n_jobs)
+
+        out, n = None, 0
+        try:
+            for chunk in chunks:
+                columns = self._resolve(chunk)
+                if out is None:
+                    out = np.empty((max(n_frames or 0, len(chunk)), self.n_features),
+                                   dtype=np.float32)
+                elif n + len(chunk) > len(out):
+                    grown = np.empty((max(2 * len(out), n + len(chunk)), self.n_features),
+                                     dtype=np.float32)
+                    grown[:n] = out[:n]
+                    out = grown
+                self._transform_chunk(chunk, columns, out[n:n + len(chunk)], pool)
+                n += len(chunk)
+        finally:
+            if pool is not None:
+                pool.close()
+
+        if out is None:
+            raise ValueError('the trajectory has no chunks to compute features for')
+        if n < len(out):
+            out = out[:n].copy()
+        return out
+
+    def _resolve(self, traj):
+        """The geometry function, its arguments and its columns for each
+        feature, found in the topology of `traj`"""
+        if traj.topology is self._topology:
+            return self._columns
+
+        parallel = self.n_jobs == 1
+        first = md.Trajectory(np.asarray(traj._xyz[:1]), traj.topology,
+                              unitcell_lengths=_frames(traj._unitcell_lengths, 0, 1),
+                              unitcell_angles=_frames(traj._unitcell_angles, 0, 1))
+        resolved, indices = [], []
+        for name, arg, kwargs in self.features:
+            kwargs = dict(kwargs)
+            if name == 'rg':
+                kwargs.setdefault('masses', arg)
+                resolved.append((compute_rg, kwargs, 1))
+                indices.append(None)
+                continue
+
+            kwargs.setdefault('periodic', self.periodic)
+            kwargs.setdefault('parallel', parallel)
+            if name == 'contacts':
+                kwargs['contacts'] = 'all' if arg is None else arg
+                # the residue pairs are resolved once, so that 'all' isn't
+                # found again (and pairs are not warned about) for each block
+                _, pairs = compute_contacts(first, **kwargs)
+                kwargs['contacts'] = pairs
+                resolved.append((compute_contacts, kwargs, len(pairs)))
+                indices.append(pairs)
+            elif name in _NAMED_DIHEDRALS:
+                quartets = _NAMED_DIHEDRALS[name](traj.topology)
+                kwargs['indices'] = quartets
+                resolved.append((dihedral.compute_dihedrals, kwargs, len(quartets)))
+                indices.append(quartets)
+            else:
+                function, argument, width = _INDEXED[name]
+                atoms = ensure_type(np.asarray(arg), dtype=np.int32, ndim=2, name=name,
+                                    shape=(None, width), warn_on_cast=False)
+                # check the indices now, rather than after some of the blocks
+                function(first, atoms, **kwargs)
+                kwargs[argument] = atoms
+                resolved.append((function, kwargs, len(atoms)))
+                indices.append(atoms)
+
+        offsets = np.cumsum([0] + [width for _, _, width in resolved])
+        if self.n_features is not None and offsets[-1] != self.n_features:
+            raise ValueError('the features of this trajectory have %d columns, '
+                             'not %d' % (offsets[-1], self.n_features))
+        self.n_features = int(offsets[-1])
+        self.feature_slices = [slice(int(start), int(stop))
+                               for start, stop in zip(offsets[:-1], offsets[1:])]
+        self.feature_indices = indices
+        self._columns = [(function, kwargs, columns) for (function, kwargs, _), columns
+                         in zip(resolved, self.feature_slices)]
+        self._topology = traj.topology
+        return self._columns
+
+    def _transform_chunk(self, traj, columns, out, pool):
+        block_size = self.block_size
+        if block_size is None:
+            block_size = max(_MIN_BLOCK_SIZE, _BLOCK_BYTES // (12 * max(traj.n_atoms, 1)))
+
+        def compute(start):
+            stop = min(start + block_size, len(traj))
+            # a lazily loaded trajectory is only read (and cast) one block
+            # at a time, and every feature shares the same float32 array
+            xyz = ensure_type(np.asarray(traj._xyz[start:stop]), dtype=np.float32,
+                              ndim=3, name='traj.xyz', shape=(None, None, 3),
+                              warn_on_cast=False)
+            frames = md.Trajectory(
+                xyz, traj.topology,
+                unitcell_lengths=_frames(traj._unitcell_lengths, start, stop),
+                unitcell_angles=_frames(traj._unitcell_angles, start, stop))
+            for function, kwargs, feature_columns in columns:
+                values = function(frames, **kwargs)
+                if isinstance(values, tuple):
+                    # compute_contacts also returns the residue pairs
+                    values = values[0]
+                out[start:stop, feature_columns] = values.reshape(stop - start, -1)
+
+        starts = range(0, len(traj), block_size)
+        if pool is None:
+            for start in starts:
+                compute(start)
+        else:
+            pool.map(compute, starts)
+
+
+def _parse_feature(feature):
+    """Split a feature into its name, argument and keyword arguments"""
+    if isinstance(feature, string_types):
+        feature = (feature,)
+    if not isinstance(feature, (tuple, list)) or not 1 <= len(feature) <= 3:
+        raise ValueError('each feature must be a name, or a tuple (name, arg) '
+                         'or (name, arg, kwargs). You supplied %r' % (feature,))
+
+    name = feature[0].lower()
+    arg = feature[1] if len(feature) > 1 else None
+    kwargs = feature[2] if len(feature) > 2 else {}
+    if name not in _INDEXED and name not in _NAMED_DIHEDRALS and name not in ('rg', 'contacts'):
+        raise ValueError('%r is not a valid feature' % feature[0])
+    if name in _INDEXED and arg is None:
+        raise ValueError('the %s feature requires the indices of its atoms' % name)
+    if name in _NAMED_DIHEDRALS and arg is not None:
+        raise ValueError('the %s feature takes no indices' % name)
+    return name, arg, kwargs
+
+
+def _frames(array, start, stop):
+    """The frames start:stop of a per-frame array of a trajectory, which may
+    be lazy or None"""
+    if array is None:
+        return None
+    return np.asarray(array[start:stop])
@@ -26,11 +26,11 @@
 ##############################################################################
 
 from __future__ import print_function, division
-from itertools import product
 import numpy as np
 from mdtraj.utils import ensure_type
 from mdtraj.geometry import compute_distances, compute_angles
 from mdtraj.geometry import _geometry
+from mdtraj.geometry.neighbors import _neighbor_pairs
 
 __all__ = ['wernet_nilsson', 'baker_hubbard', 'kabsch_sander']
 
@@ -143,32 +143,40 @@ def wernet_nilsson(traj, exclude_water=True, periodic=True):
 
     nh_donors = get_donors('N', 'H')
     oh_donors = get_donors('O', 'H')
-    xh_donors = np.array(nh_donors + oh_donors)
+    xh_donors = np.array(nh_donors + oh_donors, dtype=int)
 
     if len(xh_donors) == 0:
         # if there are no hydrogens or protein in the trajectory, we get
         # no possible pairs and return nothing
         return [np.zeros((0, 3), dtype=int) for _ in range(traj.n_frames)]
 
-    if not exclude_water:
-        acceptors = [a.index for a in traj.topology.atoms if a.element.symbol == 'O' or a.element.symbol == 'N']
-    else:
-        acceptors = [a.index for a in traj.topology.atoms if (a.element.symbol == 'O' and a.residue.name != 'HOH') or a.element.symbol == 'N']
+    acceptors = _get_acceptors(traj, exclude_water)
 
-    # This is used to compute the angles
-    angle_triplets = np.array([(e[0][1], e[0][0], e[1]) for e in product(xh_donors, acceptors) if e[0][0] != e[1]])
-    distance_pairs = angle_triplets[:, [0, 2]]  # possible O..acceptor pairs
+    # Only the acceptors within the distance cutoff of the hydrogen, which
+    # bounds the angle-dependent one, are candidates in each frame
+    frames, pairs = _hbond_candidates(traj, xh_donors[:, 1], acceptors,
+                                      distance_cutoff, periodic)
 
-    angles = compute_angles(traj, angle_triplets, periodic=periodic) * 180.0 / np.pi  # degrees
-    distances = compute_distances(traj, distance_pairs, periodic=periodic, opt=True)
+    # This is used to compute the angles
+    angle_triplets = np.column_stack((xh_donors[pairs[:, 0], 1],
+                                      xh_donors[pairs[:, 0], 0],
+                                      acceptors[pairs[:, 1]]))
+    not_self = angle_triplets[:, 1] != angle_triplets[:, 2]
+    angle_triplets, frames = angle_triplets[not_self], frames[not_self]
+
+    # possible H..acceptor pairs are the atoms 0 and 2 of each triplet
+    angles, distances = _candidate_geometry(traj, angle_triplets, frames,
+                                            [0, 2], periodic)
+    angles = angles * 180.0 / np.pi  # degrees
     cutoffs = distance_cutoff - angle_const * angles ** 2
 
     mask = np.logical_and(distances < cutoffs, angles < angle_cutoff)
 
     # The triplets that are returned are O-H ... O, different
     # from what's used to compute the angles.
-    angle_triplets2 = angle_triplets[:, [1, 0, 2]]
-    return [angle_triplets2[i] for i in mask]
+    angle_triplets2 = angle_triplets[mask][:, [1, 0, 2]]
+    bounds = np.searchsorted(frames[mask], np.arange(1, traj.n_frames))
+    return np.split(angle_triplets2, bounds)
 
 
 def baker_hubbard(traj, freq=0.1, exclude_water=True, periodic=True):
@@ -274,29 +282,34 @@ def baker_hubbard(traj, freq=0.1, exclude_water=True, periodic=True):
 
     nh_donors = get_donors('N', 'H')
     oh_donors = get_donors('O', 'H')
-    xh_donors = np.concatenate((nh_donors, oh_donors))
+    xh_donors = np.array(nh_donors + oh_donors, dtype=int)
 
     if len(xh_donors) == 0:
         # if there are no hydrogens or protein in the trajectory, we get
         # no possible pairs and return nothing
         return np.zeros((0, 3), dtype=int)
 
-    if not exclude_water:
-        acceptors = [a.index for a in traj.topology.atoms if a.element.symbol == 'O' or a.element.symbol == 'N']
-    else:
-        acceptors = [a.index for a in traj.topology.atoms if (a.element.symbol == 'O' and a.residue.name != 'HOH') or a.element.symbol == 'N']
+    acceptors = _get_acceptors(traj, exclude_water)
 
-    angle_triplets = np.array([(e[0][0], e[0][1], e[1]) for e in product(xh_donors, acceptors)])
-    distance_pairs = angle_triplets[:, [1, 2]]  # possible H..acceptor pairs
+    frames, pairs = _hbond_candidates(traj, xh_donors[:, 1], acceptors,
+                                      distance_cutoff, periodic)
+    angle_triplets = np.column_stack((xh_donors[pairs[:, 0]],
+                                      acceptors[pairs[:, 1]]))
 
-    angles = compute_angles(traj, angle_triplets, periodic=periodic)
-    distances = compute_distances(traj, distance_pairs, periodic=periodic)
+    # possible H..acceptor pairs are the atoms 1 and 2 of each triplet
+    angles, distances = _candidate_geometry(traj, angle_triplets, frames,
+                                            [1, 2], periodic)
 
     mask = np.logical_and(distances < distance_cutoff, angles > angle_cutoff)
-    # frequency of occurance of each hydrogen bond in the trajectory
-    occurance = np.sum(mask, axis=0).astype(np.double) / traj.n_frames
+    # frequency of occurance of each hydrogen bond in the trajectory, keyed
+    # by its position in the list of all (donor, acceptor) combinations
+    keys, counts = np.unique(pairs[mask, 0] * len(acceptors) + pairs[mask, 1],
+                             return_counts=True)
+    occurance = counts.astype(np.double) / traj.n_frames
+    keys = keys[occurance > freq]
 
-    return angle_triplets[occurance > freq]
+    return np.column_stack((xh_donors[keys // len(acceptors)],
+                            acceptors[keys % len(acceptors)]))
 
 
 def kabsch_sander(traj):
@@ -357,52 +370,114 @@ def kabsch_sander(traj):
     # The C code returns its info in a pretty inconvenient format.
     # Let's change it to a list of scipy CSR matrices.
 
-    matrices = []
+    # appologies for this cryptic code -- we need to deal with the low
+    # level aspects of the csr matrix format. The index pointers of every
+    # frame are built at once, and the hbonds of all of the frames are
+    # stored back to back in `indices` and `data`.
     hbonds_mask = (hbonds != -1)
-    for i in range(xyz.shape[0]):
-        # appologies for this cryptic code -- we need to deal with the low
-        # level aspects of the csr matrix format.
-        hbonds_frame = hbonds[i]
-        mask = hbonds_mask[i]
-        henergies_frame = henergies[i]
-
-        indptr = np.zeros(n_residues + 1, np.int32)
-        indptr[1:] = np.cumsum(mask.sum(axis=1))
-        indices = hbonds_frame[mask].flatten()
-        data = henergies_frame[mask].flatten()
-
-        matrices.append(scipy.sparse.csr_matrix(
-            (data, indices, indptr), shape=(n_residues, n_residues)).T)
+    counts = hbonds_mask.sum(axis=2)
+    indptr = np.zeros((xyz.shape[0], n_residues + 1), np.int32)
+    np.cumsum(counts, axis=1, out=indptr[:, 1:])
+    frame_offsets = np.concatenate([[0], np.cumsum(indptr[:, -1])])
+    indices = hbonds[hbonds_mask]
+    data = henergies[hbonds_mask]
+
+    return [scipy.sparse.csr_matrix(
+                (data[start:stop], indices[start:stop], indptr[i]),
+                shape=(n_residues, n_residues)).T
+            for i, (start, stop) in enumerate(zip(frame_offsets[:-1], frame_offsets[1:]))]
+
+
+def _get_acceptors(traj, exclude_water):
+    """Indices of the O and N atoms, except for the water oxygens if
+    `exclude_water`."""
+    if not exclude_water:
+        acceptors = [a.index for a in traj.topology.atoms if a.element.symbol == 'O' or a.element.symbol == 'N']
+    else:
+        acceptors = [a.index for a in traj.topology.atoms if (a.element.symbol == 'O' and a.residue.name != 'HOH') or a.element.symbol == 'N']
+    return np.array(acceptors, dtype=int)
 
-    return matrices
 
+def _hbond_candidates(traj, hydrogens, acceptors, distance_cutoff, periodic):
+    """Find the (hydrogen, acceptor) pairs within `distance_cutoff` of each
+    other in each frame, with a cell list.
 
-def _get_or_minus1(f):
-    try:
-        return f()
-    except IndexError:
-        return -1
+    Returns the frame of each pair, and the pairs as rows of positions in
+    `hydrogens` and `acceptors`, ordered by frame and then by position. The
+    search uses a slightly larger cutoff than `distance_cutoff`, so that the
+    candidates include every pair that compute_distances puts within it.
+    """
+    xyz = ensure_type(traj.xyz, dtype=np.float32, ndim=3, name='traj.xyz',
+                      shape=(None, None, 3), warn_on_cast=False)
+    box = None
+    if periodic and traj.unitcell_vectors is not None:
+        # the box vectors go in the columns, as in compute_distances
+        box = np.asarray(traj.unitcell_vectors.transpose(0, 2, 1),
+                         order='c', dtype=np.float32)
+
+    frame_pairs = _neighbor_pairs(xyz, hydrogens, acceptors, box,
+                                  distance_cutoff + 1e-4)
+    frames = np.repeat(np.arange(traj.n_frames),
+                       [len(p) for p in frame_pairs])
+    return frames, np.concatenate(frame_pairs)
+
+
+def _candidate_geometry(traj, triplets, frames, distance_pair, periodic):
+    """Compute the angle of each of the `triplets`, and the distance between
+    the two of its atoms in `distance_pair`, in the frame given by `frames`.
+
+    The coordinates of each triplet are gathered into a frame of their own,
+    so that compute_angles and compute_distances only do the work for these
+    triplets, with the same results as on the whole trajectory.
+    """
+    from mdtraj.core.trajectory import Trajectory
+
+    if len(triplets) == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+
+    unitcell_lengths = unitcell_angles = None
+    if traj.unitcell_lengths is not None:
+        unitcell_lengths = traj.unitcell_lengths[frames]
+        unitcell_angles = traj.unitcell_angles[frames]
+    gathered = Trajectory(traj.xyz[frames[:, np.newaxis], triplets], None,
+                          unitcell_lengths=unitcell_lengths,
+                          unitcell_angles=unitcell_angles)
+
+    angles = compute_angles(gathered, [[0, 1, 2]], periodic=periodic)
+    distances = compute_distances(gathered, [distance_pair], periodic=periodic)
+    return angles[:, 0], distances[:, 0]
+
+
+def _first_atoms_named(topology, name):
+    """The index of the first atom called `name` in each residue, or -1 if
+    it doesn't have one, in the order that the residues are iterated over."""
+    names = topology._atom_column('name')
+    atom_residue = topology._atom_column('residue.index')
+    first_atoms = np.empty(topology.n_residues, dtype=np.int32)
+    first_atoms.fill(-1)
+    if name in names.values:
+        atoms = np.flatnonzero(names.codes == names.values.index(name))
+        residues, first = np.unique(atom_residue[atoms], return_index=True)
+        first_atoms[residues] = atoms[first]
+    return first_atoms[topology._structure().residue_order]
 
 
 def _prep_kabsch_sander_arrays(traj):
     xyz = ensure_type(traj.xyz, dtype=np.float32, ndim=3, name='traj.xyz',
                       shape=(None, None, 3), warn_on_cast=False)
 
-    ca_indices, nco_indices, is_proline, is_protein = [], [], [], []
-    for residue in traj.topology.residues:
-        ca = _get_or_minus1(lambda: [a.index for a in residue.atoms if a.name == 'CA'][0])
-        n = _get_or_minus1(lambda: [a.index for a in residue.atoms if a.name == 'N'][0])
-        c = _get_or_minus1(lambda: [a.index for a in residue.atoms if a.name == 'C'][0])
-        o = _get_or_minus1(lambda: [a.index for a in residue.atoms if a.name == 'O'][0])
-
-        ca_indices.append(ca)
-        is_proline.append(residue.name == 'PRO')
-        nco_indices.append([n, c, o])
-        is_protein.append(ca != -1 and n != -1 and c != -1 and o != -1)
+    nco_indices, ca_indices, proline_indices, is_protein = traj.topology._cached(
+        'kabsch_sander', _kabsch_sander_indices)
+    return xyz, nco_indices, ca_indices, proline_indices, is_protein
 
-    nco_indices = np.array(nco_indices, np.int32)
-    ca_indices = np.array(ca_indices, np.int32)
-    proline_indices = np.array(is_proline, np.int32)
-    is_protein = np.array(is_protein, np.int32)
 
-    return xyz, nco_indices, ca_indices, proline_indices, is_protein
+def _kabsch_sander_indices(topology):
+    """The backbone atoms of each residue, and whether it's a proline and
+    a protein residue, for _prep_kabsch_sander_arrays."""
+    ca_indices = _first_atoms_named(topology, 'CA')
+    nco_indices = np.column_stack([_first_atoms_named(topology, name)
+                                   for name in ['N', 'C', 'O']])
+    nco_indices = np.ascontiguousarray(nco_indices.reshape(-1, 3), dtype=np.int32)
+    proline_indices = np.array([r.name == 'PRO' for r in topology.residues], np.int32)
+    is_protein = ((ca_indices != -1) & np.all(nco_indices != -1, axis=1)).astype(np.int32)
+    return nco_indices, ca_indices, proline_indices, is_protein
@@ -16,6 +16,17 @@ int dist_mic_triclinic(const float* xyz, const int* pairs, const float* box_matr
                        float* distance_out, float* displacement_out,
                        const int n_frames, const int n_atoms, const int n_pairs);
 
+int dist_histogram(const float* xyz, const int* pairs, const float* box_matrix,
+                   const int orthogonal, const int n_atoms, const int n_pairs,
+                   const double r_min, const double r_max, const int n_bins,
+                   long long* counts);
+
+int group_min_dist(const float* xyz, const int* group_offsets,
+                   const int* atom_indices, const int* group_pairs,
+                   const float* box_matrix, const int orthogonal,
+                   const int n_atoms, const int n_groups, const int n_pairs,
+                   const float cutoff, float* out);
+
 int angle(const float* xyz, const int* triplets, float* out,
           const int n_frames, const int n_atoms, const int n_angles);
 
@@ -7,4 +7,22 @@ std::vector<int> _compute_neighbors(
     const std::vector<int>& haystack_indices,
     float* box_matrix);
 
+std::vector<int> _compute_neighbors_cell_list(
+    float* frame_xyz, int n_atoms, float cutoff,
+    const std::vector<int>& query_indices,
+    const std::vector<int>& haystack_indices,
+    float* box_matrix);
+
+std::vector<int> _compute_neighbor_pairs_cell_list(
+    float* frame_xyz, float cutoff,
+    const std::vector<int>& query_indices,
+    const std::vector<int>& haystack_indices,
+    float* box_matrix);
+
+void _histogram_pair_distances_cell_list(
+    float* frame_xyz, const std::vector<int>& indices1,
+    const std::vector<int>& indices2, const char* membership,
+    float* box_matrix, double r_min, double r_max, int n_bins,
+    long long* counts);
+
 #endif
\ No newline at end of file
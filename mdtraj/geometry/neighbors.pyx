@@ -26,11 +26,13 @@
 ##############################################################################
 
 from __future__ import print_function, division
+import cython
 import numpy as np
 from mdtraj.utils import ensure_type
 from mdtraj.geometry import _geometry
 
 from libcpp.vector cimport vector
+from cython.parallel cimport prange
 
 __all__ = ['compute_neighbors']
 
@@ -38,11 +40,26 @@ cdef extern from "neighbors.hpp":
     vector[int] _compute_neighbors(float* xyz, int n_atoms, float cutoff,
         vector[int]& query_indices, vector[int]& haystack_indices,
         float* box_matrix) nogil
+    vector[int] _compute_neighbors_cell_list(float* xyz, int n_atoms,
+        float cutoff, vector[int]& query_indices,
+        vector[int]& haystack_indices, float* box_matrix) nogil
+    vector[int] _compute_neighbor_pairs_cell_list(float* xyz, float cutoff,
+        vector[int]& query_indices, vector[int]& haystack_indices,
+        float* box_matrix) nogil
+    void _histogram_pair_distances_cell_list(float* xyz,
+        vector[int]& indices1, vector[int]& indices2, char* membership,
+        float* box_matrix, double r_min, double r_max, int n_bins,
+        long long* counts) nogil
+
+# Searches with at least this many (query, haystack) pairs use a cell list
+# instead of checking every pair
+CELL_LIST_MIN_PAIRS = 10000
 
 ##############################################################################
 # Functions
 ##############################################################################
 
+@cython.boundscheck(False)
 def compute_neighbors(traj, cutoff, query_indices, haystack_indices=None,
                       periodic=True):
     """compute_neighbors(traj, cutoff, query_indices, haystack_indices=None, periodic=True)
@@ -92,25 +109,37 @@ def compute_neighbors(traj, cutoff, query_indices, haystack_indices=None,
 
     cdef int i
     cdef int n_frames = traj.xyz.shape[0]
-    cdef float[:, :, ::1] xyz = traj.xyz
+    cdef int n_atoms = traj.xyz.shape[1]
+    cdef float cutoff_ = cutoff
+    cdef float[:, :, ::1] xyz = np.asarray(traj.xyz, order='c', dtype=np.float32)
     cdef float[:, :, ::1] box_matrix
-    cdef float* box_matrix_pointer
     cdef vector[int] query_indices_ = query_indices
     cdef vector[int] haystack_indices_ = haystack_indices
+    cdef vector[vector[int]] neighbors
     cdef vector[int] frame_neighbors
     cdef int[::1] frame_neighbors_mview
     cdef int is_periodic = periodic and (traj.unitcell_vectors is not None)
+    cdef bint cell_list = (len(query_indices) * len(haystack_indices) >=
+                           CELL_LIST_MIN_PAIRS)
     if is_periodic:
-        box_matrix = np.asarray(traj.unitcell_vectors, order='c')
-        box_matrix_pointer = &box_matrix[0,0,0]
-    else:
-        box_matrix_pointer = NULL
+        # the box vectors go in the columns, as in compute_distances
+        box_matrix = np.asarray(traj.unitcell_vectors.transpose(0, 2, 1),
+                                order='c', dtype=np.float32)
+
+    neighbors.resize(n_frames)
+    for i in prange(n_frames, nogil=True, schedule='dynamic'):
+        if cell_list:
+            neighbors[i] = _compute_neighbors_cell_list(
+                &xyz[i,0,0], n_atoms, cutoff_, query_indices_,
+                haystack_indices_, &box_matrix[i,0,0] if is_periodic else NULL)
+        else:
+            neighbors[i] = _compute_neighbors(
+                &xyz[i,0,0], n_atoms, cutoff_, query_indices_,
+                haystack_indices_, &box_matrix[i,0,0] if is_periodic else NULL)
 
     results = []  # list of numpy arrays
     for i in range(n_frames):
-        frame_neighbors = _compute_neighbors(
-            &xyz[i,0,0], traj.xyz.shape[1], cutoff, query_indices_,
-            haystack_indices_, box_matrix_pointer)
+        frame_neighbors = neighbors[i]
         # now, we need to go from STL vector[int] to a numpy array without
         # egregious copying performance.
         # I can't find any great cython docs on this...
@@ -126,3 +155,73 @@ def compute_neighbors(traj, cutoff, query_indices, haystack_indices=None,
 
     return results
 
+
+@cython.boundscheck(False)
+def _neighbor_pairs(float[:, :, ::1] xyz, query_indices, haystack_indices,
+                    float[:, :, ::1] box_matrix, float cutoff):
+    """Find the pairs of an atom in `query_indices` and an atom in
+    `haystack_indices` that are within `cutoff` of each other in each frame.
+
+    The pairs are found with a cell list, with the frames in parallel.
+    `box_matrix` has the box vectors in its columns, or is None for no
+    periodic boundary conditions. Returns a list with an array of shape
+    (n_pairs, 2) for each frame, whose rows are the positions of the atoms in
+    `query_indices` and `haystack_indices`, in sorted order. When the box is
+    too small for a cell list, all of the pairs are returned for that frame,
+    so the pairs are only guaranteed to be a superset of the close ones.
+    """
+    cdef int i
+    cdef int n_frames = xyz.shape[0]
+    cdef vector[int] query_indices_ = query_indices
+    cdef vector[int] haystack_indices_ = haystack_indices
+    cdef vector[vector[int]] pairs
+    cdef int is_periodic = box_matrix is not None
+    cdef int[::1] frame_pairs_mview
+
+    pairs.resize(n_frames)
+    for i in prange(n_frames, nogil=True, schedule='dynamic'):
+        pairs[i] = _compute_neighbor_pairs_cell_list(
+            &xyz[i,0,0], cutoff, query_indices_, haystack_indices_,
+            &box_matrix[i,0,0] if is_periodic else NULL)
+
+    results = []
+    for i in range(n_frames):
+        if pairs[i].size() > 0:
+            frame_pairs_mview = <int[:pairs[i].size()]> (&pairs[i][0])
+            results.append(np.array(frame_pairs_mview, dtype=np.intp).reshape(-1, 2))
+        else:
+            results.append(np.empty((0, 2), dtype=np.intp))
+    return results
+
+
+@cython.boundscheck(False)
+def _histogram_pair_distances(float[:, :, ::1] xyz, indices1, indices2,
+                              float[:, :, ::1] box_matrix, double r_min,
+                              double r_max, long long[:, ::1] counts):
+    """Histogram the distances between the unique pairs of different atoms
+    with one atom in `indices1` and the other in `indices2`, like the pairs
+    from Topology.select_pairs(indices1, indices2), in each frame.
+
+    The distances are found with a cell list, so pairs further apart than
+    `r_max` are never visited. `box_matrix` has the box vectors in its
+    columns, or is None for no periodic boundary conditions. The `n_bins`
+    bins evenly divide [r_min, r_max], and the counts of each frame are added
+    to the rows of `counts`, which has shape (n_frames, n_bins).
+    """
+    cdef int i
+    cdef int n_frames = xyz.shape[0]
+    cdef int n_bins = counts.shape[1]
+    cdef vector[int] indices1_ = indices1
+    cdef vector[int] indices2_ = indices2
+    cdef int is_periodic = box_matrix is not None
+    cdef char[::1] membership = np.zeros(xyz.shape[1], dtype=np.int8)
+    for i in indices1:
+        membership[i] |= 1
+    for i in indices2:
+        membership[i] |= 2
+
+    for i in prange(n_frames, nogil=True, schedule='dynamic'):
+        _histogram_pair_distances_cell_list(
+            &xyz[i,0,0], indices1_, indices2_, &membership[0],
+            &box_matrix[i,0,0] if is_periodic else NULL, r_min, r_max, n_bins,
+            &counts[i,0])
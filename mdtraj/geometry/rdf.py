@@ -25,9 +25,11 @@ from __future__ import print_function, division
 import numpy as np
 
 from mdtraj.utils import ensure_type
+from mdtraj.geometry import _geometry
 from mdtraj.geometry.distance import compute_distances
+from mdtraj.geometry.neighbors import _histogram_pair_distances
 
-__all__ = ['compute_rdf']
+__all__ = ['compute_rdf', 'RDFAccumulator']
 
 
 def compute_rdf(traj, pairs=None, r_range=None, bin_width=0.005, n_bins=None,
@@ -52,7 +54,8 @@ def compute_rdf(traj, pairs=None, r_range=None, bin_width=0.005, n_bins=None,
         information, we will compute distances under the minimum image
         convention.
     opt : bool, default=True
-        Use an optimized native library to compute the pair wise distances.
+        Use an optimized native library to compute the pair wise distances,
+        and histogram them without storing all of them.
 
     Returns
     -------
@@ -64,8 +67,201 @@ def compute_rdf(traj, pairs=None, r_range=None, bin_width=0.005, n_bins=None,
     See also
     --------
     Topology.select_pairs
+    RDFAccumulator : accumulate the RDF over the chunks of a trajectory
 
     """
+    if opt:
+        rdf = RDFAccumulator(pairs, r_range=r_range, bin_width=bin_width,
+                             n_bins=n_bins, periodic=periodic)
+        rdf.add(traj)
+        return rdf.rdf()
+
+    r_range, n_bins = _rdf_bins(r_range, bin_width, n_bins)
+    distances = compute_distances(traj, pairs, periodic=periodic, opt=opt)
+    g_r, edges = np.histogram(distances, range=r_range, bins=n_bins)
+    r = 0.5 * (edges[1:] + edges[:-1])
+    norm = len(pairs) * np.sum(1.0 / traj.unitcell_volumes) * _shell_volumes(edges)
+    g_r = g_r.astype(np.float64) / norm  # From int64.
+    return r, g_r
+
+
+class RDFAccumulator(object):
+    """Accumulate a radial distribution function over chunks of a trajectory.
+
+    The distances in each chunk are histogrammed in native code without
+    storing them, so the memory used does not depend on the number of frames
+    or pairs. This makes it possible to compute the RDF of a long trajectory,
+    one chunk at a time, from ``md.iterload``.
+
+    The pairs can be given explicitly, like for `compute_rdf`, or as two
+    sets of atoms. In that case the pairs are the unique pairs of different
+    atoms with one atom from each set, as from `Topology.select_pairs`, but
+    they are never enumerated: the atoms are binned into a cell list, and
+    the pairs further apart than ``r_range[1]`` are skipped.
+
+    Accumulators with the same pairs and bins can be combined with `merge`,
+    for instance after computing the RDFs of different trajectories or
+    different parts of a trajectory in separate processes.
+
+    Parameters
+    ----------
+    pairs : array-like, shape=(n_pairs, 2), dtype=int, optional
+        Each row gives the indices of two atoms. Either `pairs`, or both of
+        `atom_indices1` and `atom_indices2`, must be supplied.
+    r_range : array-like, shape=(2,), optional, default=(0.0, 1.0)
+        Minimum and maximum radii.
+    bin_width : float, optional, default=0.005
+        Width of the bins in nanometers.
+    n_bins : int, optional, default=None
+        The number of bins. If specified, this will override the `bin_width`
+        parameter.
+    periodic : bool, default=True
+        If `periodic` is True and the trajectory contains unitcell
+        information, we will compute distances under the minimum image
+        convention.
+    atom_indices1 : array-like, shape=(n_indices1,), dtype=int, optional
+        The first set of atoms.
+    atom_indices2 : array-like, shape=(n_indices2,), dtype=int, optional
+        The second set of atoms.
+
+    Attributes
+    ----------
+    edges : np.ndarray, shape=(n_bins + 1,), dtype=float
+        The edges of the bins.
+    counts : np.ndarray, shape=(n_bins,), dtype=int64
+        The number of distances in each bin, over all of the frames so far.
+    n_pairs : int
+        The number of pairs in each frame.
+    n_frames : int
+        The number of frames added so far.
+
+    Examples
+    --------
+    >>> top = md.load_topology('traj.pdb')
+    >>> oxygens = top.select('name O')
+    >>> rdf = md.RDFAccumulator(atom_indices1=oxygens, atom_indices2=oxygens)
+    >>> for chunk in md.iterload('traj.xtc', top=top, chunk=1000):
+    ...     rdf.add(chunk)
+    >>> r, g_r = rdf.rdf()
+
+    See also
+    --------
+    compute_rdf
+    """
+
+    def __init__(self, pairs=None, r_range=None, bin_width=0.005, n_bins=None,
+                 periodic=True, atom_indices1=None, atom_indices2=None):
+        r_range, n_bins = _rdf_bins(r_range, bin_width, n_bins)
+        if r_range[1] <= r_range[0] or r_range[0] < 0:
+            raise ValueError('r_range must be an increasing pair of '
+                             'non-negative radii')
+
+        if pairs is not None:
+            if atom_indices1 is not None or atom_indices2 is not None:
+                raise ValueError('supply either pairs, or atom_indices1 and '
+                                 'atom_indices2, but not both')
+            self.pairs = ensure_type(pairs, dtype=np.int32, ndim=2,
+                                     name='pairs', shape=(None, 2),
+                                     warn_on_cast=False)
+            self.atom_indices1 = self.atom_indices2 = None
+            self.n_pairs = len(self.pairs)
+        else:
+            if atom_indices1 is None or atom_indices2 is None:
+                raise ValueError('supply either pairs, or atom_indices1 and '
+                                 'atom_indices2')
+            self.pairs = None
+            self.atom_indices1 = np.unique(ensure_type(
+                atom_indices1, dtype=np.int32, ndim=1, name='atom_indices1',
+                warn_on_cast=False))
+            self.atom_indices2 = np.unique(ensure_type(
+                atom_indices2, dtype=np.int32, ndim=1, name='atom_indices2',
+                warn_on_cast=False))
+            # Each atom in both sets pairs with itself, which isn't counted,
+            # and the pairs of two such atoms would be counted twice.
+            n_both = len(np.intersect1d(self.atom_indices1, self.atom_indices2))
+            self.n_pairs = (len(self.atom_indices1) * len(self.atom_indices2) -
+                            n_both - n_both * (n_both - 1) // 2)
+
+        self.periodic = periodic
+        self.edges = np.linspace(r_range[0], r_range[1], n_bins + 1)
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.n_frames = 0
+        self._sum_inverse_volumes = 0.0
+
+    def add(self, traj):
+        """Add the distances in the frames of a trajectory to the histogram.
+
+        Parameters
+        ----------
+        traj : Trajectory
+            The frames to add. They must have unit cell information, which is
+            used to normalize the RDF.
+        """
+        if traj.unitcell_volumes is None:
+            raise ValueError('the RDF can only be computed for trajectories '
+                             'with unit cell information')
+        xyz = ensure_type(traj.xyz, dtype=np.float32, ndim=3, name='traj.xyz',
+                          shape=(None, None, 3), warn_on_cast=False)
+        indices = self.pairs if self.pairs is not None else np.concatenate(
+            [self.atom_indices1, self.atom_indices2])
+        if not np.all(np.logical_and(indices < traj.n_atoms, indices >= 0)):
+            raise ValueError('atom indices must be between 0 and %d' % traj.n_atoms)
+
+        box = None
+        orthogonal = True
+        if self.periodic:
+            box = ensure_type(traj.unitcell_vectors, dtype=np.float32, ndim=3,
+                              name='unitcell_vectors', shape=(len(xyz), 3, 3),
+                              warn_on_cast=False)
+            box = box.transpose(0, 2, 1).copy()
+            orthogonal = np.allclose(traj.unitcell_angles, 90)
+
+        counts = np.zeros((len(xyz), len(self.counts)), dtype=np.int64)
+        if self.pairs is not None:
+            if len(self.pairs) > 0:
+                _geometry._dist_histogram(xyz, self.pairs, box, orthogonal,
+                                          self.edges[0], self.edges[-1], counts)
+        else:
+            _histogram_pair_distances(xyz, self.atom_indices1, self.atom_indices2,
+                                      box, self.edges[0], self.edges[-1], counts)
+
+        self.counts += counts.sum(axis=0)
+        self.n_frames += len(xyz)
+        self._sum_inverse_volumes += np.sum(1.0 / traj.unitcell_volumes)
+
+    def merge(self, other):
+        """Add the histogram of another accumulator to this one.
+
+        Parameters
+        ----------
+        other : RDFAccumulator
+            An accumulator with the same bins and number of pairs.
+        """
+        if not (np.array_equal(self.edges, other.edges) and
+                self.n_pairs == other.n_pairs):
+            raise ValueError('only accumulators with the same bins and pairs '
+                             'can be merged')
+        self.counts += other.counts
+        self.n_frames += other.n_frames
+        self._sum_inverse_volumes += other._sum_inverse_volumes
+
+    def rdf(self):
+        """The radial distribution function of the frames added so far.
+
+        Returns
+        -------
+        r : np.ndarray, shape=(n_bins,), dtype=float
+            Radii values corresponding to the centers of the bins.
+        g_r : np.ndarray, shape=(n_bins,), dtype=float
+            Radial distribution function values at r.
+        """
+        r = 0.5 * (self.edges[1:] + self.edges[:-1])
+        norm = self.n_pairs * self._sum_inverse_volumes * _shell_volumes(self.edges)
+        g_r = self.counts.astype(np.float64) / norm  # From int64.
+        return r, g_r
+
+
+def _rdf_bins(r_range, bin_width, n_bins):
     if r_range is None:
         r_range = np.array([0.0, 1.0])
     r_range = ensure_type(r_range, dtype=np.float64, ndim=1, name='r_range',
@@ -76,18 +272,14 @@ def compute_rdf(traj, pairs=None, r_range=None, bin_width=0.005, n_bins=None,
             raise ValueError('`n_bins` must be a positive integer')
     else:
         n_bins = int((r_range[1] - r_range[0]) / bin_width)
+    return r_range, n_bins
 
-    distances = compute_distances(traj, pairs, periodic=periodic, opt=opt)
-    g_r, edges = np.histogram(distances, range=r_range, bins=n_bins)
-    r = 0.5 * (edges[1:] + edges[:-1])
 
+def _shell_volumes(edges):
     # Normalize by volume of the spherical shell.
     # See discussion https://github.com/mdtraj/mdtraj/pull/724. There might be
     # a less biased way to accomplish this. The conclusion was that this could
     # be interesting to try, but is likely not hugely consequential. This method
     # of doing the calculations matches the implementation in other packages like
     # AmberTools' cpptraj and gromacs g_rdf.
-    V = (4 / 3) * np.pi * (np.power(edges[1:], 3) - np.power(edges[:-1], 3))
-    norm = len(pairs) * np.sum(1.0 / traj.unitcell_volumes) * V
-    g_r = g_r.astype(np.float64) / norm  # From int64.
-    return r, g_r
+    return (4 / 3) * np.pi * (np.power(edges[1:], 3) - np.power(edges[:-1], 3))
@@ -67,9 +67,9 @@ def _compute_rg_xyz(xyz, masses=None):
     weights = masses / masses.sum()
 
     mu = xyz.mean(1)
-    centered = (xyz.transpose((1, 0, 2)) - mu).transpose((1, 0, 2))
-    squared_dists = (centered ** 2).sum(2)
-    Rg = (squared_dists * weights).sum(1) ** 0.5
+    centered = xyz - mu[:, np.newaxis, :]
+    squared_dists = np.einsum('ijk,ijk->ij', centered, centered)
+    Rg = squared_dists.dot(weights) ** 0.5
 
     return Rg
 
@@ -45,7 +45,8 @@ _ATOMIC_RADII = {'C': 0.15,  'F': 0.12,  'H': 0.04,
 ##############################################################################
 
 
-def shrake_rupley(traj, probe_radius=0.14, n_sphere_points=960, mode='atom'):
+def shrake_rupley(traj, probe_radius=0.14, n_sphere_points=960, mode='atom',
+                  atom_indices=None):
     """Compute the solvent accessible surface area of each atom or residue in each simulation frame.
 
     Parameters
@@ -61,6 +62,10 @@ def shrake_rupley(traj, probe_radius=0.14, n_sphere_points=960, mode='atom'):
         In mode == 'atom', the extracted areas are resolved per-atom
         In mode == 'residue', this is consolidated down to the
         per-residue SASA by summing over the atoms in each residue.
+    atom_indices : array_like, dtype=int, optional
+        Only compute the SASA of these atoms. All of the atoms in the
+        trajectory are still used to determine which parts of their
+        surfaces are buried.
 
     Returns
     -------
@@ -68,7 +73,10 @@ def shrake_rupley(traj, probe_radius=0.14, n_sphere_points=960, mode='atom'):
         The accessible surface area of each atom or residue in every frame.
         If mode == 'atom', the second dimension will index the atoms in
         the trajectory, whereas if mode == 'residue', the second
-        dimension will index the residues.
+        dimension will index the residues. If `atom_indices` is supplied,
+        in mode == 'atom' the second dimension indexes `atom_indices`, and
+        in mode == 'residue' only the atoms in `atom_indices` contribute to
+        the SASA of each residue.
 
     Notes
     -----
@@ -97,15 +105,35 @@ def shrake_rupley(traj, probe_radius=0.14, n_sphere_points=960, mode='atom'):
     roughly, the icosahedral tesselation works something like this
     http://www.ziyan.info/2008/11/sphere-tessellation-using-icosahedron.html
 
+    To find the atoms that could bury each sphere point, the atoms are binned
+    into a grid of cells whose width is at least twice the largest atomic
+    radius (plus the probe radius), so only the atoms in the neighboring cells
+    need to be checked.
+
     References
     ----------
     .. [1] Shrake, A; Rupley, JA. (1973) J Mol Biol 79 (2): 351--71.
     """
 
     xyz = ensure_type(traj.xyz, dtype=np.float32, ndim=3, name='traj.xyz', shape=(None, None, 3), warn_on_cast=False)
+    if atom_indices is not None:
+        atom_indices = ensure_type(atom_indices, dtype=np.int32, ndim=1,
+                                   name='atom_indices', warn_on_cast=False)
+        if not np.all((atom_indices >= 0) * (atom_indices < xyz.shape[1])):
+            raise ValueError('atom_indices must be valid positive indices')
+        if len(np.unique(atom_indices)) != len(atom_indices):
+            raise ValueError('atom_indices must be unique')
+
     if mode == 'atom':
-        dim1 = xyz.shape[1]
-        atom_mapping = np.arange(dim1, dtype=np.int32)
+        if atom_indices is None:
+            dim1 = xyz.shape[1]
+            atom_mapping = np.arange(dim1, dtype=np.int32)
+        else:
+            dim1 = len(atom_indices)
+            # atoms that aren't selected get -1, i.e. no group
+            atom_mapping = np.empty(xyz.shape[1], dtype=np.int32)
+            atom_mapping.fill(-1)
+            atom_mapping[atom_indices] = np.arange(dim1, dtype=np.int32)
     elif mode == 'residue':
         dim1 = traj.n_residues
         atom_mapping = np.array(
@@ -114,6 +142,10 @@ def shrake_rupley(traj, probe_radius=0.14, n_sphere_points=960, mode='atom'):
                       np.arange(1 + np.max(atom_mapping))):
             raise ValueError('residues must have contiguous integer indices '
                              'starting from zero')
+        if atom_indices is not None:
+            selected = np.zeros(xyz.shape[1], dtype=np.bool)
+            selected[atom_indices] = True
+            atom_mapping[~selected] = -1
     else:
         raise ValueError('mode must be one of "residue", "atom". "%s" supplied' %
                          mode)
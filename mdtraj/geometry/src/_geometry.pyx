@@ -24,6 +24,7 @@ import sys
 import warnings
 import cython
 import numpy as np
+from cython.parallel cimport prange
 
 ##############################################################################
 # Headers
@@ -40,6 +41,16 @@ cdef extern from "geometry.h":
                            const float* box_matrix, float* distance_out,
                            float* displacement_out, int n_frames, int n_atoms,
                            int n_pairs) nogil
+    int dist_histogram(const float* xyz, const int* pairs,
+                       const float* box_matrix, int orthogonal, int n_atoms,
+                       int n_pairs, double r_min, double r_max, int n_bins,
+                       long long* counts) nogil
+
+    int group_min_dist(const float* xyz, const int* group_offsets,
+                       const int* atom_indices, const int* group_pairs,
+                       const float* box_matrix, int orthogonal, int n_atoms,
+                       int n_groups, int n_pairs, float cutoff,
+                       float* out) nogil
 
     int angle(const float* xyz, const int* triplets, float* out,
               int n_frames, int n_atoms, int n_angles) nogil
@@ -83,21 +94,35 @@ def _processor_supports_sse41():
 @cython.boundscheck(False)
 def _dist(float[:, :, ::1] xyz,
           int[:, ::1] pairs,
-          float[:, ::1] out):
+          float[:, ::1] out,
+          bint parallel=True):
+    cdef int i
     cdef int n_frames = xyz.shape[0]
     cdef int n_atoms = xyz.shape[1]
     cdef int n_pairs = pairs.shape[0]
-    dist(&xyz[0,0,0], &pairs[0,0], &out[0,0], NULL, n_frames, n_atoms, n_pairs)
+    if parallel:
+        for i in prange(n_frames, nogil=True):
+            dist(&xyz[i,0,0], &pairs[0,0], &out[i,0], NULL, 1, n_atoms, n_pairs)
+    else:
+        with nogil:
+            dist(&xyz[0,0,0], &pairs[0,0], &out[0,0], NULL, n_frames, n_atoms, n_pairs)
 
 
 @cython.boundscheck(False)
 def _dist_displacement(float[:, :, ::1] xyz,
                        int[:, ::1] pairs,
-                       float[:, :, ::1] out):
+                       float[:, :, ::1] out,
+                       bint parallel=True):
+    cdef int i
     cdef int n_frames = xyz.shape[0]
     cdef int n_atoms = xyz.shape[1]
     cdef int n_pairs = pairs.shape[0]
-    dist(&xyz[0,0,0], <int*> &pairs[0,0], NULL, &out[0,0,0], n_frames, n_atoms, n_pairs)
+    if parallel:
+        for i in prange(n_frames, nogil=True):
+            dist(&xyz[i,0,0], &pairs[0,0], NULL, &out[i,0,0], 1, n_atoms, n_pairs)
+    else:
+        with nogil:
+            dist(&xyz[0,0,0], &pairs[0,0], NULL, &out[0,0,0], n_frames, n_atoms, n_pairs)
 
 
 @cython.boundscheck(False)
@@ -105,14 +130,24 @@ def _dist_mic(float[:, :, ::1] xyz,
               int[:, ::1] pairs,
               float[:, :, ::1] box_matrix,
               float[:, ::1] out,
-              orthogonal):
+              bint orthogonal,
+              bint parallel=True):
+    cdef int i
     cdef int n_frames = xyz.shape[0]
     cdef int n_atoms = xyz.shape[1]
     cdef int n_pairs = pairs.shape[0]
-    if orthogonal:
-        dist_mic(&xyz[0,0,0], &pairs[0,0], &box_matrix[0,0,0], &out[0,0], NULL, n_frames, n_atoms, n_pairs)
+    if parallel:
+        for i in prange(n_frames, nogil=True):
+            if orthogonal:
+                dist_mic(&xyz[i,0,0], &pairs[0,0], &box_matrix[i,0,0], &out[i,0], NULL, 1, n_atoms, n_pairs)
+            else:
+                dist_mic_triclinic(&xyz[i,0,0], &pairs[0,0], &box_matrix[i,0,0], &out[i,0], NULL, 1, n_atoms, n_pairs)
     else:
-        dist_mic_triclinic(&xyz[0,0,0], &pairs[0,0], &box_matrix[0,0,0], &out[0,0], NULL, n_frames, n_atoms, n_pairs)
+        with nogil:
+            if orthogonal:
+                dist_mic(&xyz[0,0,0], &pairs[0,0], &box_matrix[0,0,0], &out[0,0], NULL, n_frames, n_atoms, n_pairs)
+            else:
+                dist_mic_triclinic(&xyz[0,0,0], &pairs[0,0], &box_matrix[0,0,0], &out[0,0], NULL, n_frames, n_atoms, n_pairs)
 
 
 @cython.boundscheck(False)
@@ -120,56 +155,151 @@ def _dist_mic_displacement(float[:, :, ::1] xyz,
                            int[:, ::1] pairs,
                            float[:, :, ::1] box_matrix,
                            float[:, :, ::1] out,
-                           orthogonal):
+                           bint orthogonal,
+                           bint parallel=True):
+    cdef int i
+    cdef int n_frames = xyz.shape[0]
+    cdef int n_atoms = xyz.shape[1]
+    cdef int n_pairs = pairs.shape[0]
+    if parallel:
+        for i in prange(n_frames, nogil=True):
+            if orthogonal:
+                dist_mic(&xyz[i,0,0], &pairs[0,0], &box_matrix[i,0,0], NULL, &out[i,0,0], 1, n_atoms, n_pairs)
+            else:
+                dist_mic_triclinic(&xyz[i,0,0], &pairs[0,0], &box_matrix[i,0,0], NULL, &out[i,0,0], 1, n_atoms, n_pairs)
+    else:
+        with nogil:
+            if orthogonal:
+                dist_mic(&xyz[0,0,0], &pairs[0,0], &box_matrix[0,0,0], NULL, &out[0,0,0], n_frames, n_atoms, n_pairs)
+            else:
+                dist_mic_triclinic(&xyz[0,0,0], &pairs[0,0], &box_matrix[0,0,0], NULL, &out[0,0,0], n_frames, n_atoms, n_pairs)
+
+
+@cython.boundscheck(False)
+def _dist_histogram(float[:, :, ::1] xyz,
+                    int[:, ::1] pairs,
+                    float[:, :, ::1] box_matrix,
+                    bint orthogonal,
+                    double r_min,
+                    double r_max,
+                    long long[:, ::1] counts):
+    # counts has shape (n_frames, n_bins), and box_matrix may be None
+    cdef int i
     cdef int n_frames = xyz.shape[0]
     cdef int n_atoms = xyz.shape[1]
     cdef int n_pairs = pairs.shape[0]
-    if orthogonal:
-        dist_mic(&xyz[0,0,0], <int*> &pairs[0,0], &box_matrix[0,0,0], NULL, &out[0,0, 0], n_frames, n_atoms, n_pairs)
+    cdef int n_bins = counts.shape[1]
+    if box_matrix is None:
+        for i in prange(n_frames, nogil=True):
+            dist_histogram(&xyz[i,0,0], &pairs[0,0], NULL, 0, n_atoms, n_pairs,
+                           r_min, r_max, n_bins, &counts[i,0])
+    else:
+        for i in prange(n_frames, nogil=True):
+            dist_histogram(&xyz[i,0,0], &pairs[0,0], &box_matrix[i,0,0],
+                           orthogonal, n_atoms, n_pairs, r_min, r_max, n_bins,
+                           &counts[i,0])
+
+
+@cython.boundscheck(False)
+def _group_min_dist(float[:, :, ::1] xyz,
+                    int[::1] group_offsets,
+                    int[::1] atom_indices,
+                    int[:, ::1] group_pairs,
+                    float[:, :, ::1] box_matrix,
+                    bint orthogonal,
+                    float cutoff,
+                    float[:, ::1] out,
+                    bint parallel=True):
+    # out has shape (n_frames, n_pairs), and box_matrix may be None
+    cdef int i
+    cdef int n_frames = xyz.shape[0]
+    cdef int n_atoms = xyz.shape[1]
+    cdef int n_groups = group_offsets.shape[0] - 1
+    cdef int n_pairs = group_pairs.shape[0]
+    cdef const float* box
+    if parallel:
+        for i in prange(n_frames, nogil=True, schedule='dynamic'):
+            box = <const float*> NULL if box_matrix is None else &box_matrix[i,0,0]
+            group_min_dist(&xyz[i,0,0], &group_offsets[0], &atom_indices[0],
+                           &group_pairs[0,0], box, orthogonal, n_atoms,
+                           n_groups, n_pairs, cutoff, &out[i,0])
     else:
-        dist_mic_triclinic(&xyz[0,0,0], <int*> &pairs[0,0], &box_matrix[0,0,0], NULL, &out[0,0, 0], n_frames, n_atoms, n_pairs)
+        with nogil:
+            for i in range(n_frames):
+                box = <const float*> NULL if box_matrix is None else &box_matrix[i,0,0]
+                group_min_dist(&xyz[i,0,0], &group_offsets[0], &atom_indices[0],
+                               &group_pairs[0,0], box, orthogonal, n_atoms,
+                               n_groups, n_pairs, cutoff, &out[i,0])
 
 
 @cython.boundscheck(False)
 def _angle(float[:, :, ::1] xyz,
            int[:, ::1] triplets,
-           float[:, ::1] out):
+           float[:, ::1] out,
+           bint parallel=True):
+    cdef int i
     cdef int n_frames = xyz.shape[0]
     cdef int n_atoms = xyz.shape[1]
     cdef int n_angles = triplets.shape[0]
-    angle(&xyz[0,0,0], &triplets[0,0], &out[0,0], n_frames, n_atoms, n_angles)
+    if parallel:
+        for i in prange(n_frames, nogil=True):
+            angle(&xyz[i,0,0], &triplets[0,0], &out[i,0], 1, n_atoms, n_angles)
+    else:
+        with nogil:
+            angle(&xyz[0,0,0], &triplets[0,0], &out[0,0], n_frames, n_atoms, n_angles)
 
 
 @cython.boundscheck(False)
 def _angle_mic(float[:, :, ::1] xyz,
                int[:, ::1] triplets,
                float[:, :, ::1] box_matrix,
-               float[:, ::1] out):
+               float[:, ::1] out,
+               bint parallel=True):
+    cdef int i
     cdef int n_frames = xyz.shape[0]
     cdef int n_atoms = xyz.shape[1]
     cdef int n_angles = triplets.shape[0]
-    angle_mic(&xyz[0,0,0], &triplets[0,0], &box_matrix[0,0,0], &out[0,0], n_frames, n_atoms, n_angles)
+    if parallel:
+        for i in prange(n_frames, nogil=True):
+            angle_mic(&xyz[i,0,0], &triplets[0,0], &box_matrix[i,0,0], &out[i,0], 1, n_atoms, n_angles)
+    else:
+        with nogil:
+            angle_mic(&xyz[0,0,0], &triplets[0,0], &box_matrix[0,0,0], &out[0,0], n_frames, n_atoms, n_angles)
 
 
 @cython.boundscheck(False)
 def _dihedral(float[:, :, ::1] xyz,
               int[:, ::1] quartets,
-              float[:, ::1] out):
+              float[:, ::1] out,
+              bint parallel=True):
+    cdef int i
     cdef int n_frames = xyz.shape[0]
     cdef int n_atoms = xyz.shape[1]
     cdef int n_quartets = quartets.shape[0]
-    dihedral(&xyz[0,0,0], <int*> &quartets[0,0], &out[0,0], n_frames, n_atoms, n_quartets)
+    if parallel:
+        for i in prange(n_frames, nogil=True):
+            dihedral(&xyz[i,0,0], &quartets[0,0], &out[i,0], 1, n_atoms, n_quartets)
+    else:
+        with nogil:
+            dihedral(&xyz[0,0,0], &quartets[0,0], &out[0,0], n_frames, n_atoms, n_quartets)
 
 
 @cython.boundscheck(False)
 def _dihedral_mic(float[:, :, ::1] xyz,
                   int[:, ::1] quartets,
                   float[:, :, ::1] box_matrix,
-                  float[:, ::1] out):
+                  float[:, ::1] out,
+                  bint parallel=True):
+    cdef int i
     cdef int n_frames = xyz.shape[0]
     cdef int n_atoms = xyz.shape[1]
     cdef int n_quartets = quartets.shape[0]
-    dihedral_mic(&xyz[0,0,0], <int*> &quartets[0,0], &box_matrix[0,0,0], &out[0,0], n_frames, n_atoms, n_quartets)
+    if parallel:
+        for i in prange(n_frames, nogil=True):
+            dihedral_mic(&xyz[i,0,0], &quartets[0,0], &box_matrix[i,0,0], &out[i,0], 1, n_atoms, n_quartets)
+    else:
+        with nogil:
+            dihedral_mic(&xyz[0,0,0], &quartets[0,0], &box_matrix[0,0,0], &out[0,0], n_frames, n_atoms, n_quartets)
 
 
 @cython.boundscheck(False)
@@ -178,13 +308,22 @@ def _kabsch_sander(float[:, :, ::1] xyz,
                    int[::1] ca_indices,
                    int[::1] is_proline,
                    int[:, :, ::1] hbonds,
-                   float[:, :, ::1] henergies):
+                   float[:, :, ::1] henergies,
+                   bint parallel=True):
+    cdef int i
     cdef int n_frames = xyz.shape[0]
     cdef int n_atoms = xyz.shape[1]
     cdef int n_residues = ca_indices.shape[0]
-    kabsch_sander(&xyz[0,0,0], &nco_indices[0,0], &ca_indices[0],
-                  &is_proline[0], n_frames, n_atoms, n_residues,
-                  &hbonds[0,0,0], &henergies[0,0,0])
+    if parallel:
+        for i in prange(n_frames, nogil=True):
+            kabsch_sander(&xyz[i,0,0], &nco_indices[0,0], &ca_indices[0],
+                          &is_proline[0], 1, n_atoms, n_residues,
+                          &hbonds[i,0,0], &henergies[i,0,0])
+    else:
+        with nogil:
+            kabsch_sander(&xyz[0,0,0], &nco_indices[0,0], &ca_indices[0],
+                          &is_proline[0], n_frames, n_atoms, n_residues,
+                          &hbonds[0,0,0], &henergies[0,0,0])
 
 
 @cython.boundscheck(False)
@@ -195,8 +334,10 @@ def _sasa(float[:, :, ::1] xyz,
           float[:, ::1] out):
     cdef int n_frames = xyz.shape[0]
     cdef int n_atoms = xyz.shape[1]
-    sasa(n_frames, n_atoms, &xyz[0,0,0], &atom_radii[0], n_sphere_points,
-         &atom_outmapping[0], out.shape[1], &out[0,0])
+    cdef int n_groups = out.shape[1]
+    with nogil:
+        sasa(n_frames, n_atoms, &xyz[0,0,0], &atom_radii[0], n_sphere_points,
+             &atom_outmapping[0], n_groups, &out[0,0])
 
 
 @cython.boundscheck(False)
@@ -204,14 +345,23 @@ def _dssp(float[:, :, ::1] xyz,
           int[:, ::1] nco_indices,
           int[::1] ca_indices,
           int[::1] is_proline,
-          int[::1] chain_ids):
+          int[::1] chain_ids,
+          bint parallel=True):
+    cdef int i
     cdef int n_frames = xyz.shape[0]
     cdef int n_atoms = xyz.shape[1]
     cdef int n_residues = ca_indices.shape[0]
     cdef char[::1] secondary = bytearray(n_frames*n_residues)
-    dssp(&xyz[0,0,0], &nco_indices[0,0], &ca_indices[0],
-         &is_proline[0], &chain_ids[0], n_frames, n_atoms,
-         n_residues, &secondary[0])
+    if parallel:
+        for i in prange(n_frames, nogil=True):
+            dssp(&xyz[i,0,0], &nco_indices[0,0], &ca_indices[0],
+                 &is_proline[0], &chain_ids[0], 1, n_atoms,
+                 n_residues, &secondary[i*n_residues])
+    else:
+        with nogil:
+            dssp(&xyz[0,0,0], &nco_indices[0,0], &ca_indices[0],
+                 &is_proline[0], &chain_ids[0], n_frames, n_atoms,
+                 n_residues, &secondary[0])
 
     PY2 = sys.version_info[0] == 2
     value = str(secondary.base) if PY2 else secondary.base.decode('ascii')
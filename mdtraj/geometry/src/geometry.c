@@ -159,6 +159,168 @@ int dist_mic_triclinic(const float* xyz, const int* pairs, const float* box_matr
     return 1;
 }
 
+/* Number of distances that dist_histogram computes at a time */
+#define DIST_HISTOGRAM_BLOCK 4096
+
+/**
+ * Histogram the distances between pairs of atoms in a single frame, without
+ * storing all of them. The distances are computed in blocks of
+ * DIST_HISTOGRAM_BLOCK pairs with the same kernels as the distance functions
+ * above: with `box_matrix` NULL, `dist`, or else `dist_mic` if `orthogonal`
+ * and `dist_mic_triclinic` otherwise.
+ *
+ * The n_bins bins evenly divide [r_min, r_max], and as in numpy.histogram
+ * the last bin includes r_max. The count of each bin is added to `counts`.
+ */
+int dist_histogram(const float* xyz, const int* pairs, const float* box_matrix,
+                   const int orthogonal, const int n_atoms, const int n_pairs,
+                   const double r_min, const double r_max, const int n_bins,
+                   long long* counts) {
+    float distances[DIST_HISTOGRAM_BLOCK];
+    int start, n, i, bin;
+    double scale = n_bins / (r_max - r_min);
+    double width = (r_max - r_min) / n_bins;
+
+    for (start = 0; start < n_pairs; start += DIST_HISTOGRAM_BLOCK) {
+        n = MIN(DIST_HISTOGRAM_BLOCK, n_pairs - start);
+        if (box_matrix == NULL)
+            dist(xyz, pairs + 2*start, distances, NULL, 1, n_atoms, n);
+        else if (orthogonal)
+            dist_mic(xyz, pairs + 2*start, box_matrix, distances, NULL, 1, n_atoms, n);
+        else
+            dist_mic_triclinic(xyz, pairs + 2*start, box_matrix, distances, NULL, 1, n_atoms, n);
+
+        for (i = 0; i < n; i++) {
+            if (distances[i] < r_min || distances[i] > r_max)
+                continue;
+            /* like numpy.histogram, correct for rounding by checking the */
+            /* edges of the bin */
+            bin = MIN((int) ((distances[i] - r_min) * scale), n_bins - 1);
+            if (distances[i] < r_min + bin*width)
+                bin--;
+            else if (bin < n_bins - 1 && distances[i] >= r_min + (bin+1)*width)
+                bin++;
+            counts[bin]++;
+        }
+    }
+    return 1;
+}
+
+/* Compute the minimum distance between the atoms in `pairs`, in blocks of */
+/* DIST_HISTOGRAM_BLOCK pairs. `pairs` and `distances` are scratch space of */
+/* that size, and the first `n` pairs have been filled in. */
+static float min_dist_block(const float* xyz, const int* pairs, float* distances,
+                            const int n, const float* box_matrix,
+                            const int orthogonal, const int n_atoms) {
+    float best = INFINITY;
+    int i;
+    if (box_matrix == NULL)
+        dist(xyz, pairs, distances, NULL, 1, n_atoms, n);
+    else if (orthogonal)
+        dist_mic(xyz, pairs, box_matrix, distances, NULL, 1, n_atoms, n);
+    else
+        dist_mic_triclinic(xyz, pairs, box_matrix, distances, NULL, 1, n_atoms, n);
+    for (i = 0; i < n; i++)
+        if (distances[i] < best)
+            best = distances[i];
+    return best;
+}
+
+/**
+ * The minimum distance between the atoms of two groups of atoms, like
+ * residues, for each of a list of pairs of groups in a single frame. The
+ * atoms of group r are atom_indices[group_offsets[r]:group_offsets[r+1]],
+ * and every group must contain at least one atom.
+ *
+ * The atom-atom distances are computed, and reduced, in blocks with the same
+ * kernels as dist_histogram, so the atom pairs are never stored.
+ *
+ * If cutoff > 0, the distance between groups that are further apart than the
+ * cutoff is set to INFINITY. The distance between the centroids of two
+ * groups, minus the largest distance of each group's atoms from its
+ * centroid, is a lower bound on the distance between the groups, so the
+ * groups that that rules out are skipped without computing any atom-atom
+ * distances.
+ */
+int group_min_dist(const float* xyz, const int* group_offsets,
+                   const int* atom_indices, const int* group_pairs,
+                   const float* box_matrix, const int orthogonal,
+                   const int n_atoms, const int n_groups, const int n_pairs,
+                   const float cutoff, float* out) {
+    int pairs[2*DIST_HISTOGRAM_BLOCK];
+    float distances[DIST_HISTOGRAM_BLOCK];
+    float* centroids = NULL;
+    float* radii = NULL;
+    float best, d, dx, dy, dz;
+    int k, r, a, b, g0, g1, n, i;
+
+    if (cutoff > 0) {
+        centroids = (float*) malloc(3 * n_groups * sizeof(float));
+        radii = (float*) malloc(n_groups * sizeof(float));
+        if (centroids == NULL || radii == NULL) {
+            free(centroids);
+            free(radii);
+            return 0;
+        }
+        for (r = 0; r < n_groups; r++) {
+            n = group_offsets[r+1] - group_offsets[r];
+            centroids[3*r] = centroids[3*r+1] = centroids[3*r+2] = 0;
+            for (a = group_offsets[r]; a < group_offsets[r+1]; a++)
+                for (i = 0; i < 3; i++)
+                    centroids[3*r+i] += xyz[3*atom_indices[a]+i] / n;
+            radii[r] = 0;
+            for (a = group_offsets[r]; a < group_offsets[r+1]; a++) {
+                dx = xyz[3*atom_indices[a]] - centroids[3*r];
+                dy = xyz[3*atom_indices[a]+1] - centroids[3*r+1];
+                dz = xyz[3*atom_indices[a]+2] - centroids[3*r+2];
+                d = sqrtf(dx*dx + dy*dy + dz*dz);
+                if (d > radii[r])
+                    radii[r] = d;
+            }
+        }
+        /* the distances between the centroids go in `out` for now */
+        for (k = 0; k < n_pairs; k += DIST_HISTOGRAM_BLOCK) {
+            n = MIN(DIST_HISTOGRAM_BLOCK, n_pairs - k);
+            if (box_matrix == NULL)
+                dist(centroids, group_pairs + 2*k, out + k, NULL, 1, n_groups, n);
+            else if (orthogonal)
+                dist_mic(centroids, group_pairs + 2*k, box_matrix, out + k, NULL, 1, n_groups, n);
+            else
+                dist_mic_triclinic(centroids, group_pairs + 2*k, box_matrix, out + k, NULL, 1, n_groups, n);
+        }
+    }
+
+    for (k = 0; k < n_pairs; k++) {
+        g0 = group_pairs[2*k];
+        g1 = group_pairs[2*k+1];
+        if (cutoff > 0 && out[k] - radii[g0] - radii[g1] > cutoff) {
+            out[k] = INFINITY;
+            continue;
+        }
+
+        best = INFINITY;
+        n = 0;
+        for (a = group_offsets[g0]; a < group_offsets[g0+1]; a++) {
+            for (b = group_offsets[g1]; b < group_offsets[g1+1]; b++) {
+                pairs[2*n] = atom_indices[a];
+                pairs[2*n+1] = atom_indices[b];
+                if (++n == DIST_HISTOGRAM_BLOCK) {
+                    best = MIN(best, min_dist_block(xyz, pairs, distances, n, box_matrix, orthogonal, n_atoms));
+                    n = 0;
+                }
+            }
+        }
+        if (n > 0)
+            best = MIN(best, min_dist_block(xyz, pairs, distances, n, box_matrix, orthogonal, n_atoms));
+
+        out[k] = (cutoff > 0 && best > cutoff) ? INFINITY : best;
+    }
+
+    free(centroids);
+    free(radii);
+    return 1;
+}
+
 /****************************************************************************/
 /* HBond Kernels                                                            */
 /****************************************************************************/
@@ -291,6 +453,125 @@ static INLINE void store_energies(int* hbonds, float* henergies, int donor,
   }
 }
 
+/* Width of the cells of the grid of CA atoms used to find the pairs of
+   residues within the 0.9 nm CA cutoff of kabsch_sander. It's a little wider
+   than the cutoff, so that rounding can't hide a pair in non-adjacent cells */
+#define KS_CELL_WIDTH 0.91f
+/* Upper limit on the number of cells in that grid, per residue */
+#define KS_MAX_CELLS_PER_RESIDUE 8
+
+static int compare_ints(const void* a, const void* b) {
+  return (*(const int*) a) - (*(const int*) b);
+}
+
+
+static int* ks_bin_residues(const float* xyz, const int* ca_indices,
+                            const int* skip, const int n_residues,
+                            int* n_cells, int* residue_cell, int* cell_residues)
+/* Bin the residues by the position of their CA atoms into a grid of cubic
+   cells, so that the residues whose CA atoms are within KS_CELL_WIDTH of one
+   another are in the same cell or in adjacent ones.
+
+   Returns the offsets of the cells, with one more entry than the number of
+   cells: the residues in cell `c` are cell_residues[offsets[c]:offsets[c+1]],
+   in increasing order. The cell of each residue is stored in residue_cell,
+   or -1 if it's skipped. The caller must free the offsets.
+ */
+{
+  int i, k, n_valid = 0, total_cells, cell, c[3];
+  float lo[3] = {0, 0, 0}, hi[3] = {0, 0, 0}, width = KS_CELL_WIDTH, x;
+  double max_cells, want_cells = 1;
+  int* offsets;
+
+  for (i = 0; i < n_residues; i++) {
+    if (skip[i]) continue;
+    for (k = 0; k < 3; k++) {
+      x = xyz[3*ca_indices[i] + k];
+      if (n_valid == 0 || x < lo[k]) lo[k] = x;
+      if (n_valid == 0 || x > hi[k]) hi[k] = x;
+    }
+    n_valid++;
+  }
+
+  /* Grow the cells if there would be many more of them than residues, e.g.
+     if a few residues are very far from the others */
+  max_cells = (double) KS_MAX_CELLS_PER_RESIDUE * MAX(n_valid, 1);
+  for (k = 0; k < 3; k++)
+    want_cells *= floor((hi[k] - lo[k]) / width) + 1;
+  if (want_cells > max_cells)
+    width *= (float) pow(want_cells / max_cells, 1.0/3.0) + 1e-3f;
+  total_cells = 1;
+  for (k = 0; k < 3; k++) {
+    n_cells[k] = (int) floor((hi[k] - lo[k]) / width) + 1;
+    total_cells *= n_cells[k];
+  }
+
+  /* counting sort of the residues by cell */
+  offsets = (int*) calloc(total_cells + 1, sizeof(int));
+  if (offsets == NULL) {
+    fprintf(stderr, "Memory Error\n");
+    exit(1);
+  }
+  for (i = 0; i < n_residues; i++) {
+    residue_cell[i] = -1;
+    if (skip[i]) continue;
+    for (k = 0; k < 3; k++) {
+      c[k] = (int) ((xyz[3*ca_indices[i] + k] - lo[k]) / width);
+      c[k] = CLIP(c[k], 0, n_cells[k] - 1);
+    }
+    residue_cell[i] = (c[0]*n_cells[1] + c[1])*n_cells[2] + c[2];
+    offsets[residue_cell[i] + 1]++;
+  }
+  for (cell = 0; cell < total_cells; cell++)
+    offsets[cell + 1] += offsets[cell];
+  for (i = 0; i < n_residues; i++)
+    if (residue_cell[i] != -1)
+      cell_residues[offsets[residue_cell[i]]++] = i;
+  /* each offset now points at the end of its cell, so shift them back */
+  for (cell = total_cells; cell > 0; cell--)
+    offsets[cell] = offsets[cell - 1];
+  offsets[0] = 0;
+  return offsets;
+}
+
+
+static int ks_find_partners(const int ri, const int* n_cells,
+                            const int* residue_cell, const int* offsets,
+                            const int* cell_residues, int* partners)
+/* Find the residues after `ri` in the cell of its CA atom or in the adjacent
+   cells, and store them in increasing order in `partners`. Returns how many
+   there are.
+ */
+{
+  int dx, dy, dz, k, x, y, z, neighbor, n_partners = 0;
+  const int cell = residue_cell[ri];
+  const int cx = cell / (n_cells[1]*n_cells[2]);
+  const int cy = (cell / n_cells[2]) % n_cells[1];
+  const int cz = cell % n_cells[2];
+
+  for (dx = -1; dx <= 1; dx++) {
+    x = cx + dx;
+    if (x < 0 || x >= n_cells[0]) continue;
+    for (dy = -1; dy <= 1; dy++) {
+      y = cy + dy;
+      if (y < 0 || y >= n_cells[1]) continue;
+      for (dz = -1; dz <= 1; dz++) {
+        z = cz + dz;
+        if (z < 0 || z >= n_cells[2]) continue;
+        neighbor = (x*n_cells[1] + y)*n_cells[2] + z;
+        for (k = offsets[neighbor]; k < offsets[neighbor + 1]; k++)
+          if (cell_residues[k] > ri)
+            partners[n_partners++] = cell_residues[k];
+      }
+    }
+  }
+  /* visit the pairs in the same order as a loop over all of them would, so
+     that ties between hbond energies are broken the same way */
+  qsort(partners, n_partners, sizeof(int), compare_ints);
+  return n_partners;
+}
+
+
 int kabsch_sander(const float* xyz, const int* nco_indices, const int* ca_indices,
                   const int* is_proline, const int n_frames, const int n_atoms,
                   const int n_residues, int* hbonds, float* henergies) {
@@ -326,13 +607,19 @@ int kabsch_sander(const float* xyz, const int* nco_indices, const int* ca_indice
         are recorded.
   */
 
-  int i, ri, rj;
+  int i, k, ri, rj, n_partners, n_cells[3];
+  int* offsets;
   static float HBOND_ENERGY_CUTOFF = -0.5;
   __m128 ri_ca, rj_ca, r12;
   __m128 MINIMAL_CA_DISTANCE2 = _mm_set1_ps(0.81f);
   float* hcoords = (float*) malloc(n_residues*3 * sizeof(float));
   int* skip = (int*) calloc(n_residues, sizeof(int));
-  if (hcoords == NULL || skip == NULL) {
+  /* work buffers for the grid of CA atoms */
+  int* residue_cell = (int*) malloc(n_residues * sizeof(int));
+  int* cell_residues = (int*) malloc(n_residues * sizeof(int));
+  int* partners = (int*) malloc(n_residues * sizeof(int));
+  if (hcoords == NULL || skip == NULL || residue_cell == NULL ||
+      cell_residues == NULL || partners == NULL) {
     fprintf(stderr, "Memory Error\n");
     exit(1);
   }
@@ -343,13 +630,19 @@ int kabsch_sander(const float* xyz, const int* nco_indices, const int* ca_indice
 
   for (i = 0; i < n_frames; i++) {
     ks_assign_hydrogens(xyz, nco_indices, n_residues, hcoords, skip);
+    /* only the residues with their CA atoms in adjacent cells can be
+       within the CA cutoff of one another */
+    offsets = ks_bin_residues(xyz, ca_indices, skip, n_residues, n_cells,
+                              residue_cell, cell_residues);
 
     for (ri = 0; ri < n_residues; ri++) {
       if (skip[ri]) continue;
       ri_ca = load_float3(xyz + 3*ca_indices[ri]);
+      n_partners = ks_find_partners(ri, n_cells, residue_cell, offsets,
+                                    cell_residues, partners);
 
-      for (rj = ri + 1; rj < n_residues; rj++) {
-        if (skip[rj]) continue;
+      for (k = 0; k < n_partners; k++) {
+        rj = partners[k];
         rj_ca = load_float3(xyz + 3*ca_indices[rj]);
 
         /* check the ca distance before proceding */
@@ -370,12 +663,16 @@ int kabsch_sander(const float* xyz, const int* nco_indices, const int* ca_indice
         }
       }
     }
+    free(offsets);
     xyz += n_atoms*3; /* advance to the next frame */
     hbonds += n_residues*2;
     henergies += n_residues*2;
   }
   free(hcoords);
   free(skip);
+  free(residue_cell);
+  free(cell_residues);
+  free(partners);
 
   return 1;
 }
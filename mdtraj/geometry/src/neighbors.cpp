@@ -0,0 +1,550 @@
+#include "stdio.h"
+#include <math.h>
+#include <vector>
+#include <algorithm>
+#include <pmmintrin.h>
+#include "ssetools.h"
+#include "msvccompat.h"
+#include "geometryutils.h"
+#include "neighbors.hpp"
+
+
+/**
+ * Compute the distance from atom `i` to atom `j`, whose coordinates
+ * are the `i`th and `j`th row of the 2D array of cartesian coordinates
+ * `frame_xyz` (optionally using periodic boundary conditions, with the
+ * box matrix and its inverse already loaded by loadBoxMatrix).
+ */
+template<bool periodic> float get_dist(const float* frame_xyz, int i, int j,
+                                       const __m128 (*h)[3],
+                                       const __m128 (*hinv)[3])
+{
+    float result;
+    __m128 x1, x2, r12, r12_2, s;
+
+    x1 = load_float3(frame_xyz + 3*i);
+    x2 = load_float3(frame_xyz + 3*j);
+    /* r12 = x2 - x1 */
+    r12 = _mm_sub_ps(x2, x1);
+
+    if (periodic) {
+        r12 = minimum_image(r12, h, hinv);
+    }
+
+    /* r12_2 = r12*r12 */
+    r12_2 = _mm_mul_ps(r12, r12);
+    /* horizontal add the components of d2 (last one is zero)*/
+    s = _mm_hsum_ps(r12_2);
+    /* sqrt our final answer */
+    s = _mm_sqrt_ps(s);
+
+    _mm_store_ss(&result, s);
+    return result;
+}
+
+
+/**
+ * Find the haystack atoms within `cutoff` of any query atom by checking
+ * every (haystack, query) pair.
+ */
+std::vector<int> _compute_neighbors(
+    float* frame_xyz, int n_atoms, float cutoff,
+    const std::vector<int>& query_indices,
+    const std::vector<int>& haystack_indices,
+    float* box_matrix)
+{
+    std::vector<int> result;
+    __m128 h[3];
+    __m128 hinv[3];
+    if (box_matrix != NULL) {
+        loadBoxMatrix(box_matrix, &h, &hinv);
+    }
+
+    std::vector<int>::const_iterator hit;
+    for (hit = haystack_indices.begin(); hit != haystack_indices.end(); ++hit) {
+        // is this haystack atom within cutoff of _any_ query atom?
+        bool match = false;
+
+        std::vector<int>::const_iterator qit;
+        for (qit = query_indices.begin(); qit != query_indices.end(); ++qit) {
+            // compute distance from haystack atom *hit to query atom *qit
+            if (*hit == *qit) {
+                continue;
+            }
+            float dist = 0;
+            if (box_matrix == NULL) {
+                dist = get_dist<false>(frame_xyz, *hit, *qit, &h, &hinv);
+            } else {
+                dist = get_dist<true>(frame_xyz, *hit, *qit, &h, &hinv);
+            }
+
+            if (dist < cutoff) {
+                 match = true;
+                 break;
+             }
+         }
+
+         // this haystack atom is within cutoff of at least 1 query atom
+         if (match) {
+             result.push_back(*hit);
+         }
+    }
+
+    return result;
+}
+
+
+/* Upper limit on the number of cells along each axis of the grid */
+#define MAX_CELLS_PER_AXIS 128
+
+
+/**
+ * Load a box matrix (with the box vectors as its columns) into `h`, where
+ * h[i][j] is component i of box vector j, and its inverse into `hinv`.
+ */
+static void load_box(const float* box_matrix, double h[3][3], double hinv[3][3])
+{
+    int i, j;
+    for (i = 0; i < 3; i++)
+        for (j = 0; j < 3; j++)
+            h[i][j] = box_matrix[3*i + j];
+    double det = h[0][0]*(h[1][1]*h[2][2] - h[1][2]*h[2][1])
+               - h[0][1]*(h[1][0]*h[2][2] - h[1][2]*h[2][0])
+               + h[0][2]*(h[1][0]*h[2][1] - h[1][1]*h[2][0]);
+    for (i = 0; i < 3; i++) {
+        for (j = 0; j < 3; j++) {
+            /* cofactor expansion: hinv = adj(h) / det */
+            int i1 = (j+1) % 3, i2 = (j+2) % 3, j1 = (i+1) % 3, j2 = (i+2) % 3;
+            hinv[i][j] = (h[i1][j1]*h[i2][j2] - h[i1][j2]*h[i2][j1]) / det;
+        }
+    }
+}
+
+
+/**
+ * A grid of cells, at least `cutoff` wide, that a set of atoms are binned
+ * into, so that the only atoms that can be within `cutoff` of a point are
+ * those in the 27 cells around it.
+ *
+ * With periodic boundary conditions, the grid is laid out in fractional
+ * coordinates, which handles general triclinic boxes: the width of the cells
+ * is measured perpendicular to the faces of the box, and the distances are
+ * computed to the periodic image of each atom in the neighboring cells,
+ * rather than by the (approximate, for triclinic boxes) minimum image
+ * convention. Since the box is at least three cells wide, that is the only
+ * image of each atom that can be within `cutoff`. Without periodic boundary
+ * conditions, the grid just covers the bounding box of the atoms.
+ *
+ * The box matrix has the same layout as for `_compute_neighbors`. If the box
+ * is less than three cells wide along any axis, the neighboring cells would
+ * overlap, and `usable()` is false.
+ */
+class CellList {
+public:
+    CellList(const float* frame_xyz, const std::vector<int>& indices,
+             float cutoff, const float* box_matrix)
+        : frame_xyz_(frame_xyz), indices_(indices),
+          periodic_(box_matrix != NULL), usable_(true)
+    {
+        const int n = (int) indices.size();
+        int i, k;
+
+        if (periodic_) {
+            load_box(box_matrix, h_, hinv_);
+            for (i = 0; i < 3; i++) {
+                /* the rows of hinv are the reciprocal vectors, and the distance */
+                /* between the faces of the box normal to them is 1/|row| */
+                double norm = sqrt(hinv_[i][0]*hinv_[i][0] + hinv_[i][1]*hinv_[i][1] + hinv_[i][2]*hinv_[i][2]);
+                double n_axis = floor(1.0 / (norm * cutoff));
+                if (!(n_axis >= 3)) {
+                    usable_ = false;
+                    return;
+                }
+                n_cells_[i] = (int) (n_axis < MAX_CELLS_PER_AXIS ? n_axis : MAX_CELLS_PER_AXIS);
+            }
+        } else {
+            double lo[3], hi[3];
+            for (k = 0; k < 3; k++) {
+                lo[k] = hi[k] = n > 0 ? frame_xyz[3*indices[0] + k] : 0;
+            }
+            for (i = 1; i < n; i++) {
+                for (k = 0; k < 3; k++) {
+                    double x = frame_xyz[3*indices[i] + k];
+                    if (x < lo[k]) lo[k] = x;
+                    if (x > hi[k]) hi[k] = x;
+                }
+            }
+            for (k = 0; k < 3; k++) {
+                double n_axis = floor((hi[k] - lo[k]) / cutoff);
+                origin_[k] = lo[k];
+                width_[k] = hi[k] - lo[k];
+                if (!(n_axis >= 1)) {
+                    /* a single cell, which must still be at least cutoff wide */
+                    n_axis = 1;
+                    width_[k] = cutoff;
+                }
+                n_cells_[k] = (int) (n_axis < MAX_CELLS_PER_AXIS ? n_axis : MAX_CELLS_PER_AXIS);
+            }
+        }
+
+        /* Linked list of the atoms in each cell */
+        s_.resize(3*n);
+        head_.assign(n_cells_[0]*n_cells_[1]*n_cells_[2], -1);
+        next_.resize(n);
+        for (i = n - 1; i >= 0; i--) {
+            int c[3];
+            locate(frame_xyz + 3*indices[i], &s_[3*i], c);
+            for (k = 0; k < 3; k++) {
+                if (c[k] >= n_cells_[k]) c[k] = n_cells_[k] - 1;
+                if (c[k] < 0) c[k] = 0;
+            }
+            int cell = (c[0]*n_cells_[1] + c[1])*n_cells_[2] + c[2];
+            next_[i] = head_[cell];
+            head_[cell] = i;
+        }
+    }
+
+    bool usable() const { return usable_; }
+
+    /**
+     * Call `visitor(q, r2)` for each atom `indices[q]` in the cells around
+     * the point `x`, where `r2` is the squared distance from `x` to it (or,
+     * with periodic boundary conditions, to its image in that cell). If the
+     * visitor returns true, stop and return true.
+     */
+    template<class Visitor> bool visit(const float* x, Visitor& visitor) const
+    {
+        double s[3];
+        int c[3], k;
+        locate(x, s, c);
+
+        for (int dx = -1; dx <= 1; dx++)
+        for (int dy = -1; dy <= 1; dy++)
+        for (int dz = -1; dz <= 1; dz++) {
+            int d[3] = {dx, dy, dz};
+            int cell[3];
+            double shift[3];
+            bool empty = false;
+            for (k = 0; k < 3; k++) {
+                cell[k] = c[k] + d[k];
+                shift[k] = 0;
+                if (periodic_) {
+                    /* crossing the edge of the box: use the image of the */
+                    /* atoms on this side */
+                    if (cell[k] < 0) { cell[k] += n_cells_[k]; shift[k] = -1; }
+                    else if (cell[k] >= n_cells_[k]) { cell[k] -= n_cells_[k]; shift[k] = 1; }
+                } else if (cell[k] < 0 || cell[k] >= n_cells_[k]) {
+                    empty = true;
+                }
+            }
+            if (empty) {
+                continue;
+            }
+
+            int q = head_[(cell[0]*n_cells_[1] + cell[1])*n_cells_[2] + cell[2]];
+            for (; q != -1; q = next_[q]) {
+                double r[3];
+                if (periodic_) {
+                    double ds[3];
+                    for (k = 0; k < 3; k++)
+                        ds[k] = s_[3*q + k] + shift[k] - s[k];
+                    for (k = 0; k < 3; k++)
+                        r[k] = h_[k][0]*ds[0] + h_[k][1]*ds[1] + h_[k][2]*ds[2];
+                } else {
+                    const float* y = frame_xyz_ + 3*indices_[q];
+                    for (k = 0; k < 3; k++)
+                        r[k] = (double) y[k] - x[k];
+                }
+                if (visitor(q, r[0]*r[0] + r[1]*r[1] + r[2]*r[2])) {
+                    return true;
+                }
+            }
+        }
+        return false;
+    }
+
+private:
+    /**
+     * Position of the point `x` in units of the grid: fractional coordinates
+     * times the number of cells (periodic), or offset from the bounding box
+     * of the atoms in units of its width (non-periodic). Also the cell that
+     * it's in, which for a non-periodic grid can be outside of the grid.
+     */
+    void locate(const float* x, double* s, int* c) const
+    {
+        for (int k = 0; k < 3; k++) {
+            if (periodic_) {
+                s[k] = hinv_[k][0]*x[0] + hinv_[k][1]*x[1] + hinv_[k][2]*x[2];
+                s[k] -= floor(s[k]);
+            } else {
+                s[k] = (x[k] - origin_[k]) / width_[k];
+            }
+            double cell = floor(s[k] * n_cells_[k]);
+            /* anything further out than this has no neighboring cells */
+            if (cell < -2) cell = -2;
+            if (cell > n_cells_[k] + 1) cell = n_cells_[k] + 1;
+            c[k] = (int) cell;
+        }
+    }
+
+    const float* frame_xyz_;
+    const std::vector<int>& indices_;
+    bool periodic_;
+    bool usable_;
+    double h_[3][3], hinv_[3][3], origin_[3], width_[3];
+    int n_cells_[3];
+    std::vector<double> s_;
+    std::vector<int> head_;
+    std::vector<int> next_;
+};
+
+
+/* Is any atom, other than `exclude`, within the cutoff? */
+struct AnyWithinCutoff {
+    AnyWithinCutoff(const std::vector<int>& indices, int exclude, double cutoff2)
+        : indices(indices), exclude(exclude), cutoff2(cutoff2) {}
+    bool operator()(int q, double r2) {
+        return indices[q] != exclude && r2 < cutoff2;
+    }
+    const std::vector<int>& indices;
+    int exclude;
+    double cutoff2;
+};
+
+
+/**
+ * Find the haystack atoms within `cutoff` of any query atom using a cell
+ * list of the query atoms. If the box is too small for a cell list, this
+ * falls back to `_compute_neighbors`.
+ */
+std::vector<int> _compute_neighbors_cell_list(
+    float* frame_xyz, int n_atoms, float cutoff,
+    const std::vector<int>& query_indices,
+    const std::vector<int>& haystack_indices,
+    float* box_matrix)
+{
+    std::vector<int> result;
+    if (query_indices.size() == 0 || haystack_indices.size() == 0) {
+        return result;
+    }
+
+    CellList cells(frame_xyz, query_indices, cutoff, box_matrix);
+    if (!cells.usable()) {
+        return _compute_neighbors(frame_xyz, n_atoms, cutoff, query_indices,
+                                  haystack_indices, box_matrix);
+    }
+
+    std::vector<int>::const_iterator hit;
+    for (hit = haystack_indices.begin(); hit != haystack_indices.end(); ++hit) {
+        AnyWithinCutoff match(query_indices, *hit, (double) cutoff * cutoff);
+        if (cells.visit(frame_xyz + 3*(*hit), match)) {
+            result.push_back(*hit);
+        }
+    }
+
+    return result;
+}
+
+
+/* Collect every atom within the cutoff */
+struct CollectWithinCutoff {
+    CollectWithinCutoff(std::vector<int>& found, double cutoff2)
+        : found(found), cutoff2(cutoff2) {}
+    bool operator()(int q, double r2) {
+        if (r2 < cutoff2) {
+            found.push_back(q);
+        }
+        return false;
+    }
+    std::vector<int>& found;
+    double cutoff2;
+};
+
+
+/**
+ * Find the pairs of a query atom and a haystack atom within `cutoff` of each
+ * other using a cell list of the haystack atoms. The result holds the pairs
+ * as consecutive (i, j) entries, where i is a position in `query_indices`
+ * and j a position in `haystack_indices`, sorted by i and then j.
+ *
+ * With periodic boundary conditions, the distance is to the nearest image.
+ * If the box is too small for a cell list, every pair is returned, so the
+ * result is always a superset of the pairs within `cutoff`.
+ */
+std::vector<int> _compute_neighbor_pairs_cell_list(
+    float* frame_xyz, float cutoff,
+    const std::vector<int>& query_indices,
+    const std::vector<int>& haystack_indices,
+    float* box_matrix)
+{
+    std::vector<int> result;
+    const int n_query = (int) query_indices.size();
+    const int n_haystack = (int) haystack_indices.size();
+    int i, j;
+    if (n_query == 0 || n_haystack == 0) {
+        return result;
+    }
+
+    CellList cells(frame_xyz, haystack_indices, cutoff, box_matrix);
+    if (!cells.usable()) {
+        result.reserve(2 * n_query * n_haystack);
+        for (i = 0; i < n_query; i++) {
+            for (j = 0; j < n_haystack; j++) {
+                result.push_back(i);
+                result.push_back(j);
+            }
+        }
+        return result;
+    }
+
+    std::vector<int> found;
+    for (i = 0; i < n_query; i++) {
+        found.clear();
+        CollectWithinCutoff collect(found, (double) cutoff * cutoff);
+        cells.visit(frame_xyz + 3*query_indices[i], collect);
+        std::sort(found.begin(), found.end());
+        for (j = 0; j < (int) found.size(); j++) {
+            result.push_back(i);
+            result.push_back(found[j]);
+        }
+    }
+    return result;
+}
+
+
+/* Add the distances within [r_min, r_max] to a histogram */
+struct DistanceHistogram {
+    DistanceHistogram(double r_min, double r_max, int n_bins, long long* counts)
+        : r_min(r_min), r_max(r_max), n_bins(n_bins), counts(counts),
+          scale(n_bins / (r_max - r_min)), width((r_max - r_min) / n_bins) {}
+    void add(double r2) {
+        if (r2 > r_max*r_max) {
+            return;
+        }
+        double r = sqrt(r2);
+        if (r < r_min || r > r_max) {
+            return;
+        }
+        int bin = (int) ((r - r_min) * scale);
+        if (bin > n_bins - 1) bin = n_bins - 1;
+        /* the same correction for rounding as in dist_histogram */
+        if (r < r_min + bin*width) bin--;
+        else if (bin < n_bins - 1 && r >= r_min + (bin+1)*width) bin++;
+        counts[bin]++;
+    }
+    double r_min, r_max;
+    int n_bins;
+    long long* counts;
+    double scale, width;
+};
+
+
+/**
+ * The pair (atom1, atom2) is counted unless the atoms are the same, or the
+ * pair is also counted the other way around, i.e. atom1 is also in the
+ * second set and atom2 in the first, and atom1 > atom2.
+ */
+static inline bool count_pair(int atom1, int atom2, const char* membership)
+{
+    return atom1 != atom2 &&
+           !((membership[atom1] & 2) && (membership[atom2] & 1) && atom1 > atom2);
+}
+
+
+struct PairHistogramVisitor {
+    PairHistogramVisitor(const std::vector<int>& indices, int atom1,
+                         const char* membership, DistanceHistogram& histogram)
+        : indices(indices), atom1(atom1), membership(membership),
+          histogram(histogram) {}
+    bool operator()(int q, double r2) {
+        if (count_pair(atom1, indices[q], membership)) {
+            histogram.add(r2);
+        }
+        return false;
+    }
+    const std::vector<int>& indices;
+    int atom1;
+    const char* membership;
+    DistanceHistogram& histogram;
+};
+
+
+/**
+ * Histogram the distances between each unique pair of different atoms, one
+ * from `indices1` and the other from `indices2`, using a cell list of the
+ * atoms in `indices2` so that only the pairs within `r_max` are visited.
+ *
+ * `membership` has an entry for each atom in the frame, with bit 1 set if
+ * the atom is in `indices1` and bit 2 if it is in `indices2`. The bins are
+ * the same as for `dist_histogram`, and the counts are added to `counts`.
+ *
+ * With periodic boundary conditions, each pair is counted at most once, at
+ * its shortest distance. If the box is too small for a cell list, this
+ * checks all 27 images of every pair instead.
+ */
+void _histogram_pair_distances_cell_list(
+    float* frame_xyz, const std::vector<int>& indices1,
+    const std::vector<int>& indices2, const char* membership,
+    float* box_matrix, double r_min, double r_max, int n_bins,
+    long long* counts)
+{
+    DistanceHistogram histogram(r_min, r_max, n_bins, counts);
+    if (indices1.size() == 0 || indices2.size() == 0) {
+        return;
+    }
+
+    CellList cells(frame_xyz, indices2, (float) r_max, box_matrix);
+    std::vector<int>::const_iterator it1, it2;
+    if (cells.usable()) {
+        for (it1 = indices1.begin(); it1 != indices1.end(); ++it1) {
+            PairHistogramVisitor visitor(indices2, *it1, membership, histogram);
+            cells.visit(frame_xyz + 3*(*it1), visitor);
+        }
+        return;
+    }
+
+    double h[3][3], hinv[3][3];
+    if (box_matrix != NULL) {
+        load_box(box_matrix, h, hinv);
+    }
+    for (it1 = indices1.begin(); it1 != indices1.end(); ++it1) {
+        for (it2 = indices2.begin(); it2 != indices2.end(); ++it2) {
+            if (!count_pair(*it1, *it2, membership)) {
+                continue;
+            }
+            double r[3], min_r2 = -1;
+            int k;
+            for (k = 0; k < 3; k++) {
+                r[k] = (double) frame_xyz[3*(*it2) + k] - frame_xyz[3*(*it1) + k];
+            }
+            if (box_matrix == NULL) {
+                min_r2 = r[0]*r[0] + r[1]*r[1] + r[2]*r[2];
+            } else {
+                /* wrap the displacement into the box, to fractional */
+                /* coordinates in [-0.5, 0.5), so that the shortest image is */
+                /* among the 27 around it however far apart the atoms are */
+                double s[3];
+                for (k = 0; k < 3; k++) {
+                    s[k] = hinv[k][0]*r[0] + hinv[k][1]*r[1] + hinv[k][2]*r[2];
+                    s[k] -= floor(s[k] + 0.5);
+                }
+                for (k = 0; k < 3; k++) {
+                    r[k] = h[k][0]*s[0] + h[k][1]*s[1] + h[k][2]*s[2];
+                }
+                for (int i = -1; i <= 1; i++)
+                for (int j = -1; j <= 1; j++)
+                for (int l = -1; l <= 1; l++) {
+                    double r2 = 0;
+                    for (k = 0; k < 3; k++) {
+                        double rk = r[k] + i*h[k][0] + j*h[k][1] + l*h[k][2];
+                        r2 += rk*rk;
+                    }
+                    if (min_r2 < 0 || r2 < min_r2) {
+                        min_r2 = r2;
+                    }
+                }
+            }
+            histogram.add(min_r2);
+        }
+    }
+}
@@ -33,9 +33,110 @@
 #endif
 
 
+/* Upper limit on the number of cells in the neighbor grid, per atom */
+#define MAX_CELLS_PER_ATOM 8
+
+
+static int* build_cell_grid(const float* frame, const int n_atoms,
+                            const float max_cutoff, int* n_cells,
+                            float* origin, float* cell_width,
+                            int* cell_next, int* atom_cell)
+{
+  /*// Bin the atoms into a grid of cubic cells, so that the only atoms within
+  // `max_cutoff` of an atom are in the 27 cells around its own.
+  //
+  // Parameters
+  // ----------
+  // frame : 2d array, shape=[n_atoms, 3]
+  //     The coordinates of the nuclei
+  // n_atoms : int
+  //     the major axis length of frame
+  // max_cutoff : float
+  //     the largest distance at which two atoms can be neighbors
+  // n_cells : OUTPUT 1d array, shape=[3]
+  //     the number of cells along each axis
+  // origin : OUTPUT 1d array, shape=[3]
+  //     the lower corner of the grid
+  // cell_width : OUTPUT float
+  //     the width of each cell. at least max_cutoff, but larger if needed
+  //     to keep the number of cells proportional to the number of atoms
+  // cell_next : OUTPUT 1d array, shape=[n_atoms]
+  //     linked lists of the atoms in each cell: the atom after `i` in its
+  //     cell, or -1 if it's the last one
+  // atom_cell : OUTPUT 1d array, shape=[n_atoms]
+  //     the index of the cell that each atom is in
+  //
+  // Returns
+  // -------
+  // head : 1d array, shape=[n_cells[0]*n_cells[1]*n_cells[2]]
+  //     the first atom in each cell, or -1 if it's empty. The caller must
+  //     free this.
+  */
+  int i, k, c[3];
+  float lo[3], hi[3];
+  double total_cells, max_cells;
+  int* head;
+
+  *cell_width = max_cutoff > 0 ? max_cutoff : 1;
+  if (n_atoms <= 0) {
+    /* A single empty cell, without reading any coordinates */
+    for (k = 0; k < 3; k++) {
+      origin[k] = 0;
+      n_cells[k] = 1;
+    }
+    head = (int*) malloc(sizeof(int));
+    head[0] = -1;
+    return head;
+  }
+
+  for (k = 0; k < 3; k++) {
+    lo[k] = hi[k] = frame[k];
+  }
+  for (i = 1; i < n_atoms; i++) {
+    for (k = 0; k < 3; k++) {
+      if (frame[3*i+k] < lo[k]) lo[k] = frame[3*i+k];
+      if (frame[3*i+k] > hi[k]) hi[k] = frame[3*i+k];
+    }
+  }
+
+  /* Grow the cells if there would be many more of them than atoms, e.g. */
+  /* because of a few atoms that are far away from the rest */
+  max_cells = (double) MAX_CELLS_PER_ATOM * n_atoms;
+  total_cells = 1;
+  for (k = 0; k < 3; k++) {
+    total_cells *= floor((hi[k] - lo[k]) / *cell_width) + 1;
+  }
+  if (total_cells > max_cells) {
+    *cell_width *= (float) pow(total_cells / max_cells, 1.0/3.0) + 1e-3f;
+  }
+
+  for (k = 0; k < 3; k++) {
+    origin[k] = lo[k];
+    n_cells[k] = (int) floor((hi[k] - lo[k]) / *cell_width) + 1;
+  }
+
+  head = (int*) malloc(n_cells[0]*n_cells[1]*n_cells[2]*sizeof(int));
+  for (i = 0; i < n_cells[0]*n_cells[1]*n_cells[2]; i++) {
+    head[i] = -1;
+  }
+  for (i = n_atoms - 1; i >= 0; i--) {
+    for (k = 0; k < 3; k++) {
+      c[k] = (int) ((frame[3*i+k] - origin[k]) / *cell_width);
+      if (c[k] >= n_cells[k]) c[k] = n_cells[k] - 1;
+    }
+    atom_cell[i] = (c[0]*n_cells[1] + c[1])*n_cells[2] + c[2];
+    cell_next[i] = head[atom_cell[i]];
+    head[atom_cell[i]] = i;
+  }
+  return head;
+}
+
+
 static void asa_frame(const float* frame, const int n_atoms, const float* atom_radii,
 		      const float* sphere_points, const int n_sphere_points,
-		      int* neighbor_indices, float* centered_sphere_points, float* areas)
+		      const int* atom_mapping, int* neighbor_indices,
+		      int* cell_next, int* atom_cell,
+		      float* centered_sphere_points, float* areas)
 {
   /*// Calculate the accessible surface area of each atom in a single snapshot
   //
@@ -51,10 +152,13 @@ static void asa_frame(const float* frame, const int n_atoms, const float* atom_r
   //     a bunch of uniformly distributed points on a sphere
   // n_sphere_points : int
   //    the number of sphere points
+  // atom_mapping : 1d array, shape=[n_atoms]
+  //    the area is only computed for atoms `i` with atom_mapping[i] >= 0.
+  //    the other atoms are still used to occlude the sphere points.
 
   // centered_sphere_points : WORK BUFFER 2d array, shape=[n_sphere_points, 3]
   //    empty memory that intermediate calculations can be stored in
-  // neighbor_indices : WORK BUFFER 2d array, shape=[n_atoms]
+  // neighbor_indices, cell_next, atom_cell : WORK BUFFERS 1d arrays, shape=[n_atoms]
   //    empty memory that intermediate calculations can be stored in
   // NOTE: the point of these work buffers is that if we want to call
   //    this function repreatedly, its more efficient not to keep re-mallocing
@@ -65,40 +169,67 @@ static void asa_frame(const float* frame, const int n_atoms, const float* atom_r
   //     atom
   */
 
-  int i, j, k, k_prime;
+  int i, j, k, k_prime, dx, dy, dz, c[3], cell;
   __m128 r, r_i, r_j, r_ij, atom_radius_i, atom_radius_j, radius_cutoff;
   __m128 radius_cutoff2, sp, r_jk, r2;
-  int n_neighbor_indices, is_accessible, k_closest_neighbor;
+  int n_neighbor_indices, is_accessible, k_closest_neighbor, n_accessible;
   float constant = 4.0 * M_PI / n_sphere_points;
+  float max_radius, origin[3], cell_width;
+  int n_cells[3];
+  int* head;
 
+  /* Two atoms can only be neighbors if they're within twice the largest */
+  /* radius of one another */
+  max_radius = 0;
   for (i = 0; i < n_atoms; i++) {
+    if (atom_radii[i] > max_radius) {
+      max_radius = atom_radii[i];
+    }
+  }
+  head = build_cell_grid(frame, n_atoms, 2 * max_radius, n_cells, origin,
+                         &cell_width, cell_next, atom_cell);
+
+  for (i = 0; i < n_atoms; i++) {
+    areas[i] = 0;
+    if (atom_mapping[i] < 0) {
+      continue;
+    }
     atom_radius_i = _mm_set1_ps(atom_radii[i]);
     r_i = load_float3(frame+i*3);
 
-    /* Get all the atoms close to atom `i` */
+    /* Get all the atoms close to atom `i`, which are in the cells around */
+    /* its own */
     n_neighbor_indices = 0;
-    for (j = 0; j < n_atoms; j++) {
-      if (i == j) {
-	continue;
-      }
+    c[2] = atom_cell[i] % n_cells[2];
+    c[1] = (atom_cell[i] / n_cells[2]) % n_cells[1];
+    c[0] = atom_cell[i] / (n_cells[2] * n_cells[1]);
+    for (dx = c[0] > 0 ? -1 : 0; dx <= 1 && c[0] + dx < n_cells[0]; dx++)
+    for (dy = c[1] > 0 ? -1 : 0; dy <= 1 && c[1] + dy < n_cells[1]; dy++)
+    for (dz = c[2] > 0 ? -1 : 0; dz <= 1 && c[2] + dz < n_cells[2]; dz++) {
+      cell = ((c[0]+dx)*n_cells[1] + c[1]+dy)*n_cells[2] + c[2]+dz;
+      for (j = head[cell]; j != -1; j = cell_next[j]) {
+        if (i == j) {
+	  continue;
+        }
 
-      r_j = load_float3(frame+j*3);
-      r_ij = _mm_sub_ps(r_i, r_j);
-      atom_radius_j = _mm_set1_ps(atom_radii[j]);
-
-      /* Look for atoms `j` that are nearby atom `i` */
-      radius_cutoff =  _mm_add_ps(atom_radius_i, atom_radius_j);
-      radius_cutoff2 = _mm_mul_ps(radius_cutoff, radius_cutoff);
-      r2 = _mm_dp_ps2(r_ij, r_ij, 0x7F);
-      if (_mm_extract_epi16(CAST__M128I(_mm_cmplt_ps(r2, radius_cutoff2)), 0)) {
-	    neighbor_indices[n_neighbor_indices]  = j;
-	    n_neighbor_indices++;
-      }
-    if (_mm_extract_epi16(CAST__M128I(_mm_cmplt_ps(r2, _mm_set1_ps(1e-10))), 0)) {
+        r_j = load_float3(frame+j*3);
+        r_ij = _mm_sub_ps(r_i, r_j);
+        atom_radius_j = _mm_set1_ps(atom_radii[j]);
+
+        /* Look for atoms `j` that are nearby atom `i` */
+        radius_cutoff =  _mm_add_ps(atom_radius_i, atom_radius_j);
+        radius_cutoff2 = _mm_mul_ps(radius_cutoff, radius_cutoff);
+        r2 = _mm_dp_ps2(r_ij, r_ij, 0x7F);
+        if (_mm_extract_epi16(CAST__M128I(_mm_cmplt_ps(r2, radius_cutoff2)), 0)) {
+	  neighbor_indices[n_neighbor_indices]  = j;
+	  n_neighbor_indices++;
+        }
+        if (_mm_extract_epi16(CAST__M128I(_mm_cmplt_ps(r2, _mm_set1_ps(1e-10))), 0)) {
 	  printf("ERROR: THIS CODE IS KNOWN TO FAIL WHEN ATOMS ARE VIRTUALLY");
 	  printf("ON TOP OF ONE ANOTHER. YOU SUPPLIED TWO ATOMS %f", _mm_cvtss_f32(r));
 	  printf("APART. QUITTING NOW");
 	  exit(1);
+        }
       }
     }
 
@@ -110,6 +241,7 @@ static void asa_frame(const float* frame, const int n_atoms, const float* atom_r
 
     /* Check if each of these points is accessible */
     k_closest_neighbor = 0;
+    n_accessible = 0;
     for (j = 0; j < n_sphere_points; j++) {
       is_accessible = 1;
       r_j = load_float3(centered_sphere_points + 3*j);
@@ -130,12 +262,14 @@ static void asa_frame(const float* frame, const int n_atoms, const float* atom_r
       }
 
       if (is_accessible) {
-	areas[i]++;
+	n_accessible++;
       }
     }
 
-    areas[i] *= constant * (atom_radii[i])*(atom_radii[i]);
+    areas[i] = n_accessible * constant * (atom_radii[i])*(atom_radii[i]);
   }
+
+  free(head);
 }
 
 static void generate_sphere_points(float* sphere_points, int n_points)
@@ -196,6 +330,8 @@ int sasa(const int n_frames, const int n_atoms, const float* xyzlist,
   //     mapping from atoms onto groups, over which to accumulate the sasa.
   //     If `atom_mapping[i] = j`, that means that the ith atom is in group
   //     j. The groups must be contiguous integers starting from 0 to n_groups-1.
+  //     Atoms with `atom_mapping[i] = -1` are not in any group. Their SASA is
+  //     not computed, but they still occlude the surfaces of the other atoms.
   // out : 2d array, shape=[n_frames, n_groups]
   //     the output buffer to place the results in. this array must be
   //     initialized with all zeros. out[i*n_groups + j] gives, in the `i`th frame
@@ -207,6 +343,8 @@ int sasa(const int n_frames, const int n_atoms, const float* xyzlist,
 
   /* work buffers that will be thread-local */
   int* wb1;
+  int* wb3;
+  int* wb4;
   float* wb2;
   float* outframe;
   float* outframebuffer;
@@ -216,13 +354,15 @@ int sasa(const int n_frames, const int n_atoms, const float* xyzlist,
   generate_sphere_points(sphere_points, n_sphere_points);
 
 #ifdef _OPENMP
-  #pragma omp parallel private(wb1, wb2, outframebuffer, outframe)
+  #pragma omp parallel private(wb1, wb2, wb3, wb4, outframebuffer, outframe)
   {
 #endif
 
   /* malloc the work buffers for each thread */
   wb1 = (int*) malloc(n_atoms*sizeof(int));
   wb2 = (float*) malloc(3*n_sphere_points*sizeof(float));
+  wb3 = (int*) malloc(n_atoms*sizeof(int));
+  wb4 = (int*) malloc(n_atoms*sizeof(int));
   outframebuffer = (float*) calloc(n_atoms, sizeof(float));
 
 #ifdef _OPENMP
@@ -230,15 +370,19 @@ int sasa(const int n_frames, const int n_atoms, const float* xyzlist,
 #endif
   for (i = 0; i < n_frames; i++) {
     asa_frame(xyzlist + i*n_atoms*3, n_atoms, atom_radii, sphere_points,
-	      n_sphere_points, wb1, wb2, outframebuffer);
+	      n_sphere_points, atom_mapping, wb1, wb3, wb4, wb2, outframebuffer);
     outframe = out + (n_groups * i);
     for (j = 0; j < n_atoms; j++) {
-        outframe[atom_mapping[j]] += outframebuffer[j];
+        if (atom_mapping[j] >= 0) {
+            outframe[atom_mapping[j]] += outframebuffer[j];
+        }
     }
   }
 
   free(wb1);
   free(wb2);
+  free(wb3);
+  free(wb4);
   free(outframebuffer);
 #ifdef _OPENMP
   } /* close omp parallel private */
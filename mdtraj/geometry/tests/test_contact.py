@@ -24,7 +24,7 @@ from __future__ import print_function
 
 import os
 import numpy as np
-from mdtraj.testing import get_fn, eq, skipif
+from mdtraj.testing import get_fn, eq, skipif, raises
 import itertools
 from mdtraj import geometry
 import mdtraj as md
@@ -88,5 +88,47 @@ def test_contact_2():
         for t in range(pdb.n_frames):
             eq(maps[t, r0, r1], dists[t, i])
 
+
+def test_contact_cutoff():
+    pdb = md.load(get_fn('1vii_sustiva_water.pdb'))
+    contacts = list(itertools.product(range(10), range(30, 100)))
+    dists, pairs = md.compute_contacts(pdb, contacts, scheme='closest-heavy')
+    cut, cut_pairs = md.compute_contacts(pdb, contacts, scheme='closest-heavy',
+                                         cutoff=0.5, parallel=False)
+    eq(pairs, cut_pairs)
+    eq(np.where(dists > 0.5, np.inf, dists), cut)
+    assert np.any(np.isfinite(cut)) and np.any(np.isinf(cut))
+
+    # without the minimum image convention, residues can only be further apart
+    nonperiodic, _ = md.compute_contacts(pdb, contacts, scheme='closest-heavy',
+                                         periodic=False)
+    assert np.all(nonperiodic >= dists)
+
+
+@raises(ValueError)
+def test_contact_zero_cutoff():
+    pdb = md.load(get_fn('bpti.pdb'))
+    md.compute_contacts(pdb, [[0, 10]], scheme='closest', cutoff=0)
+
+
+def test_contact_ca_skips_residues_without_ca():
+    pdb = md.load(get_fn('1vii_sustiva_water.pdb'))
+    top = pdb.topology.copy()
+    # a second alpha carbon in residue 0, which is only an error when it's
+    # paired with a residue that has one
+    top.residue(0).atom(0).name = 'CA'
+    pdb.topology = top
+    water = top.select('water')[0]
+    water = top.atom(water).residue.index
+    dists, pairs = md.compute_contacts(pdb, [[0, water], [1, 10]], scheme='ca')
+    eq(pairs, np.array([[1, 10]]))
+
+    try:
+        md.compute_contacts(pdb, [[0, 10]], scheme='ca')
+    except ValueError as e:
+        assert 'More than 1 alpha carbon' in str(e)
+    else:
+        assert False
+
 if __name__ == '__main__':
     test_contact()
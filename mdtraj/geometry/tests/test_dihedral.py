@@ -204,3 +204,16 @@ def test_generator():
     a = md.compute_dihedrals(ptraj, quartets)
     b = md.compute_dihedrals(ptraj, quartets2)
     eq(a, b)
+
+def test_parallel():
+    N_FRAMES = 20
+    N_ATOMS = 10
+    xyz = np.asarray(np.random.randn(N_FRAMES, N_ATOMS, 3), dtype=np.float32)
+    ptraj = md.Trajectory(xyz=xyz, topology=None)
+    ptraj.unitcell_vectors = np.tile(4 * np.eye(3, dtype=np.float32), [N_FRAMES, 1, 1])
+
+    quartets = np.array(list(itertools.combinations(range(N_ATOMS), 4)), dtype=np.int32)
+    for periodic in [False, True]:
+        a = md.compute_dihedrals(ptraj, quartets, periodic=periodic, parallel=True)
+        b = md.compute_dihedrals(ptraj, quartets, periodic=periodic, parallel=False)
+        eq(a, b)
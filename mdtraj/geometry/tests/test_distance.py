@@ -132,3 +132,12 @@ def _run_amber_traj(trajname, ext_ref):
     eq(np.sqrt((dispopt.squeeze()**2).sum(axis=1)), distopt.squeeze())
     eq(np.sqrt((dispslw.squeeze()**2).sum(axis=1)), distslw.squeeze())
     eq(dispopt, dispslw, decimal=5)
+
+def test_parallel():
+    for periodic in [False, True]:
+        a = compute_distances(ptraj, pairs, periodic=periodic, parallel=True)
+        b = compute_distances(ptraj, pairs, periodic=periodic, parallel=False)
+        eq(a, b)
+        a = compute_displacements(ptraj, pairs, periodic=periodic, parallel=True)
+        b = compute_displacements(ptraj, pairs, periodic=periodic, parallel=False)
+        eq(a, b)
@@ -106,3 +106,13 @@ def test_6():
     protein_residues = np.array([set(a.name for a in r.atoms).issuperset(('C', 'N', 'O', 'CA')) for r in t.topology.residues])
     assert np.unique(a[:, protein_residues]) == "C"
     assert np.unique(a[:, np.logical_not(protein_residues)]) == 'NA'
+
+
+def test_7():
+    # two copies of a protein, far apart from one another, so that most of
+    # the space around them is empty
+    t = md.load(get_fn('2EQQ.pdb'))
+    far = md.Trajectory(t.xyz + 1000, t.topology)
+    both = t.stack(far)
+    ref = md.compute_dssp(t, simplified=False)
+    eq(md.compute_dssp(both, simplified=False), np.hstack([ref, ref]))
@@ -0,0 +1,98 @@
+##############################################################################
+# MDTraj: A Python Library for Loading, Saving, and Manipulating
+#         Molecular Dynamics Trajectories.
+# Copyright 2012-2016 Stanford University and the Authors
+#
+# Authors: Robert McGibbon
+# Contributors:
+#
+# MDTraj is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with MDTraj. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+from __future__ import print_function
+
+import numpy as np
+
+import mdtraj as md
+from mdtraj.testing import get_fn, eq, raises
+
+PAIRS = np.array([[0, 10], [5, 120], [30, 200]])
+TRIPLETS = np.array([[0, 1, 2], [10, 11, 12]])
+
+
+def _reference(t):
+    return np.column_stack([
+        md.compute_phi(t)[1],
+        md.compute_psi(t)[1],
+        md.compute_distances(t, PAIRS),
+        md.compute_angles(t, TRIPLETS),
+        md.compute_rg(t),
+        md.compute_contacts(t, 'all', scheme='ca')[0],
+        md.compute_contacts(t, [[0, 5], [3, 20]])[0],
+    ])
+
+
+def _pipeline(**kwargs):
+    return md.FeaturePipeline(
+        ['phi', 'psi', ('distances', PAIRS), ('angles', TRIPLETS), 'rg',
+         ('contacts', 'all', {'scheme': 'ca'}), ('contacts', [[0, 5], [3, 20]])],
+        **kwargs)
+
+
+def test_feature_pipeline():
+    t = md.load(get_fn('2EQQ.pdb'))
+    ref = _reference(t)
+
+    for kwargs in [{}, {'block_size': 3}, {'block_size': 3, 'n_jobs': 2}]:
+        pipeline = _pipeline(**kwargs)
+        X = pipeline.transform(t)
+        eq(X.dtype, np.dtype(np.float32))
+        eq(X, ref.astype(np.float32), decimal=5)
+
+        eq(pipeline.n_features, ref.shape[1])
+        eq(X[:, pipeline.feature_slices[2]], md.compute_distances(t, PAIRS))
+        eq(pipeline.feature_indices[0], md.compute_phi(t)[0])
+        eq(pipeline.feature_indices[4], None)
+
+
+def test_feature_pipeline_iterload():
+    t = md.load(get_fn('2EQQ.pdb'))
+    ref = _reference(t).astype(np.float32)
+
+    chunks = md.iterload(get_fn('2EQQ.pdb'), chunk=7)
+    eq(_pipeline(block_size=2).transform(chunks), ref, decimal=5)
+    # with a known number of frames, or too few of them
+    eq(_pipeline().transform(md.iterload(get_fn('2EQQ.pdb'), chunk=7), n_frames=len(t)),
+       ref, decimal=5)
+    eq(_pipeline().transform([t[:4], t[4:9], t[9:]], n_frames=5), ref, decimal=5)
+
+
+def test_feature_pipeline_periodic():
+    t = md.load(get_fn('1vii_sustiva_water.pdb'))
+    pairs = t.top.select_pairs('name O and water', 'name CA')[:50]
+    pipeline = md.FeaturePipeline([('distances', pairs), ('contacts', [[0, 10], [3, 25]])])
+    eq(pipeline.transform(t)[:, :50], md.compute_distances(t, pairs))
+    pipeline = md.FeaturePipeline([('distances', pairs)], periodic=False)
+    eq(pipeline.transform(t), md.compute_distances(t, pairs, periodic=False))
+
+
+@raises(ValueError)
+def test_feature_pipeline_bad_feature():
+    md.FeaturePipeline(['phi', 'sasa'])
+
+
+@raises(ValueError)
+def test_feature_pipeline_bad_indices():
+    t = md.load(get_fn('2EQQ.pdb'))
+    md.FeaturePipeline([('distances', [[0, t.n_atoms]])]).transform(t)
@@ -131,6 +131,20 @@ def test_dihedral_index_offset_generation():
     eq(ind1[0], result)
 
 
+def test_dihedral_indices_cached():
+    top = md.load(get_fn('1bpi.pdb')).topology
+    phi = mdtraj.geometry.dihedral.indices_phi(top)
+    # the indices are cached, but each caller gets its own copy
+    phi[:] = -1
+    eq(mdtraj.geometry.dihedral.indices_phi(top)[0], np.array([2, 11, 12, 13]))
+
+    # and they're found again when the topology is modified
+    top.atom(11).name = 'X'
+    eq(mdtraj.geometry.dihedral.indices_phi(top)[0], np.array([13, 18, 19, 20]))
+    top.atom(11).name = 'N'
+    eq(mdtraj.geometry.dihedral.indices_phi(top)[0], np.array([2, 11, 12, 13]))
+
+
 def test_dihedral_0():
     """We compared phi and psi angles from pymol to MDTraj output."""
     traj = md.load(get_fn('1bpi.pdb'))[0]
@@ -51,6 +51,32 @@ def test_hbonds():
     t = md.load(get_fn('2EQQ.pdb'))
     ours = md.geometry.hbond.kabsch_sander(t)
 
+
+def test_kabsch_sander_frames():
+    t = md.load(get_fn('2EQQ.pdb'))
+    ours = md.geometry.hbond.kabsch_sander(t)
+    assert len(ours) == t.n_frames
+    for i in range(t.n_frames):
+        single = md.geometry.hbond.kabsch_sander(t[i])[0]
+        eq(ours[i].toarray(), single.toarray())
+
+    # the frames are computed in parallel, which must match the serial loop
+    xyz, nco_indices, ca_indices, proline_indices, _ = \
+        md.geometry.hbond._prep_kabsch_sander_arrays(t)
+    results = []
+    for parallel in [True, False]:
+        hbonds = np.empty((t.n_frames, t.n_residues, 2), np.int32)
+        henergies = np.empty((t.n_frames, t.n_residues, 2), np.float32)
+        hbonds.fill(-1)
+        henergies.fill(np.nan)
+        md.geometry._geometry._kabsch_sander(
+            xyz, nco_indices, ca_indices, proline_indices, hbonds, henergies,
+            parallel=parallel)
+        results.append((hbonds, henergies))
+    eq(results[0][0], results[1][0])
+    eq(results[0][1], results[1][1])
+
+
 @skipif(not HAVE_DSSP, "This tests required mkdssp to be installed, from http://swift.cmbi.ru.nl/gv/dssp/")
 def test_hbonds_against_dssp():
     t = md.load(get_fn('2EQQ.pdb'))[0]
@@ -145,3 +171,46 @@ def test_wernet_nilsson_1():
             # to make sure the criterion is giving back totally implausible stuff
             if len(hbonds) > 0:
                 assert np.all(md.compute_distances(t[frame], hbonds[:, [0,2]]) < 0.5)
+
+
+def _brute_force_hbond_triplets(t, exclude_water):
+    # every (donor, hydrogen, acceptor) combination
+    donors = [(b[0].index, b[1].index) if b[1].element.symbol == 'H'
+              else (b[1].index, b[0].index) for b in t.topology.bonds
+              if set((b[0].element.symbol, b[1].element.symbol)) in
+              (set(('N', 'H')), set(('O', 'H')))
+              and not (exclude_water and b[0].residue.name == 'HOH')]
+    acceptors = [a.index for a in t.topology.atoms
+                 if a.element.symbol == 'N' or (a.element.symbol == 'O' and
+                 not (exclude_water and a.residue.name == 'HOH'))]
+    return np.array([d + (a,) for d in sorted(donors, key=lambda d: d[1])
+                     for a in acceptors])
+
+
+def test_hbonds_against_brute_force():
+    # a periodic box with water, small enough to check every triplet
+    t = md.load(get_fn('1vii_sustiva_water.pdb'))
+    t = t.atom_slice(np.arange(900))
+    t.unitcell_lengths = t.unitcell_lengths * 0.5
+
+    for exclude_water in [True, False]:
+        triplets = _brute_force_hbond_triplets(t, exclude_water)
+        triplets = triplets[triplets[:, 0] != triplets[:, 2]]
+        angles = md.compute_angles(t, triplets[:, [1, 0, 2]]) * 180 / np.pi
+        distances = md.compute_distances(t, triplets[:, [1, 2]])
+        mask = (distances < 0.33 - 0.000044 * angles ** 2) & (angles < 45)
+        result = md.wernet_nilsson(t, exclude_water=exclude_water)
+        assert len(result) == len(t)
+        for frame in range(len(t)):
+            assert_unordered_rows_equal(triplets[mask[frame]], result[frame])
+
+        angles = md.compute_angles(t, triplets)
+        mask = (distances < 0.25) & (angles > 2 * np.pi / 3)
+        ref = triplets[mask.mean(axis=0) > 0.1]
+        assert_unordered_rows_equal(
+            ref, md.baker_hubbard(t, exclude_water=exclude_water))
+
+
+def assert_unordered_rows_equal(a, b):
+    eq(np.array(sorted(map(tuple, a)), dtype=int).reshape(-1, 3),
+       np.array(sorted(map(tuple, b)), dtype=int).reshape(-1, 3))
@@ -36,3 +36,63 @@ def test_compute_neighbors_2():
     cutoff = 1.0
     value = md.compute_neighbors(traj, cutoff, query_indices)
     reference = compute_neighbors_reference(traj, cutoff, query_indices)
+
+
+def test_compute_neighbors_cell_list():
+    # enough pairs to use the cell list
+    n_frames = 3
+    n_atoms = 500
+    cutoff = 0.5
+    xyz = random.uniform(0, 3, size=(n_frames, n_atoms, 3))
+    traj = md.Trajectory(xyz=xyz, topology=None)
+    query_indices = np.arange(0, n_atoms, 10)
+    haystack_indices = np.arange(1, n_atoms, 2)
+    assert len(query_indices) * len(haystack_indices) >= md.geometry.neighbors.CELL_LIST_MIN_PAIRS
+
+    for unitcell_angles in [None, [90, 90, 90], [70, 80, 60]]:
+        if unitcell_angles is not None:
+            traj.unitcell_lengths = np.ones((n_frames, 3)) * [3, 3.5, 4]
+            traj.unitcell_angles = np.ones((n_frames, 3)) * unitcell_angles
+        for haystack in [None, haystack_indices]:
+            value = md.compute_neighbors(traj, cutoff, query_indices, haystack)
+            reference = compute_neighbors_reference(traj, cutoff, query_indices, haystack)
+            for i in range(n_frames):
+                eq(value[i], reference[i])
+
+
+def _brute_force_neighbors(xyz, box, cutoff, query_indices):
+    # the shortest distance over the 27 nearest images, with the box
+    # vectors in the rows of `box`, like Trajectory.unitcell_vectors
+    shifts = np.array([[i, j, k] for i in (-1, 0, 1) for j in (-1, 0, 1)
+                       for k in (-1, 0, 1)]).dot(box)
+    delta = xyz[:, np.newaxis, :] - xyz[query_indices][np.newaxis, :, :]
+    images = delta[:, :, np.newaxis, :] + shifts[np.newaxis, np.newaxis, :, :]
+    dist = np.sqrt((images ** 2).sum(axis=3)).min(axis=2)
+    # an atom isn't its own neighbor
+    dist[query_indices, np.arange(len(query_indices))] = np.inf
+    return np.where(dist.min(axis=1) < cutoff)[0]
+
+
+def test_compute_neighbors_triclinic_box_transpose():
+    # the box vectors are the rows of unitcell_vectors, and used to be
+    # passed to the native code as if they were its columns, which gave
+    # wrong neighbors for triclinic boxes
+    n_frames = 2
+    cutoff = 0.6
+    query_indices = np.arange(5)
+    # whether the box was skewed enough for the transposed one to be wrong
+    sensitive = False
+    for n_atoms in [40, 2000]:  # all pairs, and the cell list
+        xyz = random.uniform(0, 3, size=(n_frames, n_atoms, 3))
+        traj = md.Trajectory(xyz=xyz, topology=None)
+        traj.unitcell_lengths = np.ones((n_frames, 3)) * [3, 3.5, 4]
+        traj.unitcell_angles = np.ones((n_frames, 3)) * [70, 80, 60]
+        if n_atoms == 2000:
+            query_indices = np.arange(0, n_atoms, 100)
+        value = md.compute_neighbors(traj, cutoff, query_indices)
+        for i in range(n_frames):
+            box = traj.unitcell_vectors[i]
+            eq(value[i], _brute_force_neighbors(traj.xyz[i], box, cutoff, query_indices))
+            sensitive |= not np.array_equal(
+                value[i], _brute_force_neighbors(traj.xyz[i], box.T, cutoff, query_indices))
+    assert sensitive
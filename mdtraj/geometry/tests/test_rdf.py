@@ -73,3 +73,81 @@ def compare_gromacs_xvg(ref_filename, r, g_r):
     g_r0 = data[:, 1]
     eq(r, r0, decimal=2)
     eq(g_r, g_r0, decimal=2)
+
+
+def test_rdf_accumulator_chunks():
+    pairs = TRAJ.top.select_pairs('name O', "name =~ 'H.*'")
+    rdf = md.RDFAccumulator(pairs)
+    rdf.add(TRAJ[:5])
+    ref, _ = np.histogram(md.compute_distances(TRAJ[:5], pairs), range=(0, 1),
+                          bins=200)
+    # allow for distances that fall on the edges of bins
+    assert np.abs(rdf.counts - ref).sum() <= 0.001 * ref.sum()
+
+    rdf = md.RDFAccumulator(pairs)
+    for start in range(0, TRAJ.n_frames, 3):
+        rdf.add(TRAJ[start:start + 3])
+    assert rdf.n_frames == TRAJ.n_frames
+    r, g_r = rdf.rdf()
+    eq(r, R)
+    eq(g_r, RDF_O_H)
+
+    # merge the accumulators of different parts of the trajectory
+    rdf1 = md.RDFAccumulator(pairs)
+    rdf1.add(TRAJ[:5])
+    rdf2 = md.RDFAccumulator(pairs)
+    rdf2.add(TRAJ[5:])
+    rdf1.merge(rdf2)
+    eq(rdf1.counts, rdf.counts)
+    eq(rdf1.rdf()[1], g_r)
+
+
+def test_rdf_accumulator_atom_indices():
+    oxygens = TRAJ.top.select('name O')
+    hydrogens = TRAJ.top.select("name =~ 'H.*'")
+    everything = np.arange(TRAJ.n_atoms)
+    for traj in [TRAJ[:5], _triclinic(TRAJ[:5])]:
+        for indices1, indices2 in [(oxygens, oxygens), (oxygens, hydrogens),
+                                   (everything, oxygens)]:
+            pairs = traj.top.select_pairs(indices1, indices2)
+            # the box is too small for a cell list with r_max = 1
+            for r_range in [(0, 1), (0.2, 0.6)]:
+                ref = md.RDFAccumulator(pairs, r_range=r_range, n_bins=80)
+                ref.add(traj)
+                rdf = md.RDFAccumulator(atom_indices1=indices1,
+                                        atom_indices2=indices2,
+                                        r_range=r_range, n_bins=80)
+                rdf.add(traj)
+                assert rdf.n_pairs == len(pairs)
+                # allow for distances that fall on the edges of bins
+                assert np.abs(rdf.counts - ref.counts).sum() <= 0.001 * ref.counts.sum()
+                eq(rdf.rdf()[1], ref.rdf()[1], decimal=2)
+
+
+def test_rdf_accumulator_shifted_images():
+    # atoms moved by several box vectors, as in unwrapped coordinates, are
+    # at the same distances
+    oxygens = TRAJ.top.select('name O')
+    hydrogens = TRAJ.top.select("name =~ 'H.*'")
+    for traj in [TRAJ[:5], _triclinic(TRAJ[:5])]:
+        shifted = md.Trajectory(traj.xyz.copy(), traj.top, unitcell_lengths=traj.unitcell_lengths,
+                                unitcell_angles=traj.unitcell_angles)
+        shift = np.random.RandomState(0).randint(-4, 5, size=(traj.n_atoms, 3))
+        shifted.xyz += np.einsum('fij,aj->fai', traj.unitcell_vectors.transpose(0, 2, 1), shift)
+        for r_range in [(0, 1), (0.2, 0.6)]:
+            for kwargs in [{'pairs': traj.top.select_pairs(oxygens, hydrogens)},
+                           {'atom_indices1': oxygens, 'atom_indices2': hydrogens}]:
+                ref = md.RDFAccumulator(r_range=r_range, n_bins=80, **kwargs)
+                ref.add(traj)
+                rdf = md.RDFAccumulator(r_range=r_range, n_bins=80, **kwargs)
+                rdf.add(shifted)
+                # allow for distances that fall on the edges of bins
+                assert np.abs(rdf.counts - ref.counts).sum() <= 0.001 * ref.counts.sum()
+
+
+def _triclinic(traj):
+    # the same coordinates in a skewed box
+    traj = md.Trajectory(traj.xyz.copy(), traj.top)
+    traj.unitcell_lengths = np.ones((traj.n_frames, 3)) * [2.1, 2.2, 2.3]
+    traj.unitcell_angles = np.ones((traj.n_frames, 3)) * [80, 70, 100]
+    return traj
@@ -133,3 +133,41 @@ def test_sasa_4():
     value = md.shrake_rupley(t, mode='residue')
     yield lambda: _test_atom_group(t, value)
 
+
+def test_sasa_atom_indices():
+    t = md.load(get_fn('frame0.h5'))
+    atom_indices = np.random.permutation(t.n_atoms)[:50]
+    reference = md.shrake_rupley(t, mode='atom')
+
+    value = md.shrake_rupley(t, mode='atom', atom_indices=atom_indices)
+    assert value.shape == (t.n_frames, len(atom_indices))
+    eq(value, reference[:, atom_indices])
+
+    value = md.shrake_rupley(t, mode='residue', atom_indices=atom_indices)
+    rids = np.array([a.residue.index for a in t.top.atoms])
+    for i in range(t.n_residues):
+        mask = (rids[atom_indices] == i)
+        eq(value[:, i], np.sum(reference[:, atom_indices[mask]], axis=1))
+
+
+def test_sasa_spread_out():
+    # atoms far away from one another should each have their full area,
+    # even when they're too spread out to fit in a grid of small cells
+    probe_radius = 0.14
+    xyz = np.array([[[0, 0, 0], [0.2, 0, 0], [1000, 0, 0], [0, 1000, 1000]]])
+    top = md.Topology()
+    res = top.add_residue('res', top.add_chain())
+    for i in range(xyz.shape[1]):
+        top.add_atom('H', element.hydrogen, res)
+    traj = md.Trajectory(xyz=xyz, topology=top)
+
+    areas = md.shrake_rupley(traj, probe_radius=probe_radius)
+    true = 4 * np.pi * (_ATOMIC_RADII['H'] + probe_radius)**2
+    assert_array_less(areas[0, :2], true)
+    assert_approx_equal(areas[0, 2], true)
+    assert_approx_equal(areas[0, 3], true)
+
+
+def test_sasa_no_atoms():
+    t = md.load(get_fn('frame0.h5')).atom_slice([])
+    eq(md.shrake_rupley(t).shape, (t.n_frames, 0))
@@ -50,15 +50,21 @@ cdef extern float rot_atom_major(const int n_atoms, float* a, const float rot[9]
 cdef extern void sgemm33(const float A[9], const float B[9], float out[9]) nogil
 cdef extern void inplace_center_and_trace_atom_major(float* coords, float* traces,
     const int n_frames, const int n_atoms) nogil
+cdef extern from "include/euclidean_permutation.hpp" nogil:
+    cdef cppclass PermutationWorkspace:
+        PermutationWorkspace()
+    void euclidean_permutation_into(const float* target, const float* reference,
+        int n_atoms, int n_dims, const vector[vector[int]]& permute_groups,
+        PermutationWorkspace& workspace, int* mapping)
 cdef extern from "include/Munkres.h":
     cdef cppclass Munkres:
         Munkres()
         void solve(double* icost, int* answer, int m, int n)
-cdef extern from "include/euclidean_permutation.hpp":
-   vector[int] euclidean_permutation(float* target, float* reference,
-       int n_atoms, int n_dims, vector[vector[int]]& permute_groups) nogil
 cdef extern from "math.h":
     float sqrtf(float x) nogil
+cdef extern from "stdlib.h":
+    void* malloc(size_t size) nogil
+    void free(void* ptr) nogil
 
 
 ##############################################################################
@@ -88,15 +94,20 @@ def lprmsd(target, reference, int frame=0, atom_indices=None, permute_groups=Non
     recompute a new optimal rotation matrix to align the frame, and get the
     final RMSD.
 
+    To compute the LP-RMSD of many trajectories (or chunks of one, e.g. from
+    ``md.iterload``) to the same reference, prepare it once with
+    :class:`LPRMSDReference` and pass that as `reference`.
+
     Parameters
     ----------
     target : md.Trajectory
         For each conformation in this trajectory, compute the RMSD to
         a particular 'reference' conformation in another trajectory
         object.
-    reference : md.Trajectory
+    reference : md.Trajectory or LPRMSDReference
         The object containing the reference conformation to measure distances
-        to.
+        to. If it is an LPRMSDReference, `frame`, `atom_indices` and
+        `permute_groups` are those it was prepared with, and must not be given.
     frame : int
         The index of the conformation in `reference` to measure
         distances to.
@@ -123,108 +134,237 @@ def lprmsd(target, reference, int frame=0, atom_indices=None, permute_groups=Non
         from each of the conformations in `target` to the `frame`-th
         conformation in `reference`.
     """
-    _validate_shapes(target, reference, frame)
-    atom_indices = _validate_atom_indices(atom_indices, target.xyz.shape[1])
-    permute_groups = _validate_permute_groups(permute_groups, atom_indices)
+    if isinstance(reference, LPRMSDReference):
+        if frame != 0 or atom_indices is not None or permute_groups is not None:
+            raise ValueError('frame, atom_indices and permute_groups are set '
+                             'by the LPRMSDReference, and cannot be given')
+    else:
+        reference = LPRMSDReference(reference, frame=frame,
+                                    atom_indices=atom_indices,
+                                    permute_groups=permute_groups)
+    return reference.lprmsd(target, parallel=parallel, superpose=superpose)
 
-    # these are the indices of the permute atoms inside the coords array after
-    # selecting only the atom indices.
-    # i.e. [xyz[atom_indices][i] for in permute_groups_rel]
-    cdef vector[vector[int]] permute_groups_stl
-    for pgroup in permute_groups:
-         permute_groups_stl.push_back(np.searchsorted(atom_indices, pgroup))
-    dis_indices = np.setdiff1d(
-            np.arange(len(atom_indices)), np.concatenate(permute_groups_stl))
-    # print('dis indices', dis_indices)
-
-    cdef int n_atoms_total = target.xyz.shape[1]
-    cdef int superpose_ = superpose
-    cdef np.ndarray[ndim=3, dtype=np.float32_t, mode='c'] target_xyz = np.asarray(target.xyz, order='c')
-    cdef np.ndarray[ndim=1, dtype=int, mode='c'] atom_indices_ = np.asarray(atom_indices, dtype=np.int32)
-    cdef np.ndarray[ndim=1, dtype=int, mode='c'] dis_indices_ =  np.asarray(dis_indices, dtype=np.int32)
-
-    # get the all the coords in atom_indices in target and ref.
-    # center them and compute the g values
-    cdef int i
-    cdef double msd
-    cdef float ref_g, target_g
-    cdef np.ndarray[ndim=2, dtype=np.float32_t, mode='c'] target_xyz_frame
-    cdef np.ndarray[ndim=2, dtype=np.float32_t, mode='c'] target_xyz_frame2
-    cdef np.ndarray[ndim=2, dtype=np.float32_t, mode='c'] ref_xyz_frame
-    cdef int target_n_frames = target.xyz.shape[0]
-    cdef int n_atoms = len(atom_indices)
-    ref_xyz_frame = np.array(reference.xyz[frame, atom_indices, :], dtype=np.float32, copy=True)
-    target_xyz_frame = np.finfo(np.float32).max * np.ones_like(ref_xyz_frame)
-    target_xyz_frame2 = np.empty_like(target_xyz_frame)
-    inplace_center_and_trace_atom_major(&ref_xyz_frame[0, 0], &ref_g, 1, n_atoms)
-
-
-    # get only the distinguishable atoms in target and ref, center them
-    # and compute the g values
-    cdef float ref_g_dis, target_g_dis
-    cdef np.ndarray[ndim=2, dtype=np.float32_t, mode='c'] target_xyz_frame_dis
-    cdef np.ndarray[ndim=2, dtype=np.float32_t, mode='c'] ref_xyz_frame_dis
-    cdef int n_atoms_dis = len(dis_indices)
-    target_xyz_frame_dis = np.empty((n_atoms_dis, 3), dtype=np.float32)
-    if n_atoms_dis > 0:
-        # note: the indexing here is subtpe -- we're using atom_indices[dis_indices] since
-        # dis_indices have different semantics from atom_indices
-        ref_xyz_frame_dis = np.array(reference.xyz[frame, atom_indices[dis_indices], :], copy=True, order='c')
-        inplace_center_and_trace_atom_major(&ref_xyz_frame_dis[0, 0], &ref_g_dis, 1, n_atoms_dis)
-
-
-    cdef vector[int] mapping
-    cdef np.ndarray[ndim=2, dtype=np.float32_t, mode='c'] rot1 = np.eye(3, dtype=np.float32)
-    cdef np.ndarray[ndim=2, dtype=np.float32_t, mode='c'] rot2 = np.eye(3, dtype=np.float32)
-    cdef np.ndarray[ndim=2, dtype=np.float32_t, mode='c'] rot3 = np.eye(3, dtype=np.float32)
-    cdef np.ndarray[ndim=1, dtype=np.float32_t, mode='c'] distances = np.zeros(target_n_frames, dtype=np.float32)
-
-    #for i in prange(target_n_frames, nogil=True):
-    for i in range(target_n_frames):
-        fancy_index2d(&target_xyz[i,0,0], n_atoms_total, 3, <int*> &atom_indices_[0],
-                      n_atoms, NULL, 0, &target_xyz_frame[0, 0])
-        inplace_center_and_trace_atom_major(&target_xyz_frame[0, 0], &target_g, 1, n_atoms)
-
-        # compute rotation matrix on distinguishable atoms
-        if (n_atoms_dis > 0):
-            # subsample the target_xyz_frame to get just the distinguishable atoms
-            # target_xyz_frame has already been "sampled down" by atom_indices, so we
-            # can now apply dis_indices
-            fancy_index2d(&target_xyz_frame[0,0], n_atoms, 3, <int*> &dis_indices_[0],
-                          n_atoms_dis, NULL, 0, &target_xyz_frame_dis[0, 0])
-            inplace_center_and_trace_atom_major(&target_xyz_frame_dis[0,0], &target_g_dis, 1, n_atoms_dis)
-
-            # get `rot1`, the rotation matrix thats optimal for the distinguishable indices
-            msd_atom_major(n_atoms_dis, n_atoms_dis,
-                &target_xyz_frame_dis[0, 0], &ref_xyz_frame_dis[0, 0],
-                target_g_dis, ref_g_dis, 1, &rot1[0, 0])
-
-            # apply rot1 to all the atom_indices
-            rot_atom_major(n_atoms, &target_xyz_frame[0, 0], &rot1[0, 0])
-
-        # compute the optimal remapping of the indices
-        mapping = euclidean_permutation(&ref_xyz_frame[0, 0], &target_xyz_frame[0, 0], n_atoms, 3, permute_groups_stl)
-        # and remap the indices -- i.e.   target_xyz_frame2 = target_xyz_frame[mapping]
-        fancy_index2d(&target_xyz_frame[0, 0], n_atoms, 3, &mapping[0], n_atoms, NULL, 0, &target_xyz_frame2[0, 0])
-
-        # msd = ((target_xyz_frame2 - ref_xyz_frame)**2).sum(1).mean(0)
-        # then using these remapped indices, compute the rmsd, with a new rotation
-        if superpose_:
-            msd = msd_atom_major(n_atoms, n_atoms, &target_xyz_frame2[0, 0], &ref_xyz_frame[0, 0], target_g, ref_g, 1, &rot2[0, 0])
-            inplace_center_and_trace_atom_major(&target_xyz[i, 0, 0], NULL, 1, n_atoms_total)
-            sgemm33(&rot1[0,0], &rot2[0,0], &rot3[0,0])
-            rot_atom_major(n_atoms_total, &target_xyz[i, 0, 0], &rot3[0, 0])
-        else:
-            msd = msd_atom_major(n_atoms, n_atoms, &ref_xyz_frame[0, 0], &target_xyz_frame2[0, 0], target_g, ref_g, 0, NULL)
 
+cdef class LPRMSDReference:
+    """LPRMSDReference(reference, frame=0, atom_indices=None, permute_groups=None)
 
+    A reference conformation for :func:`lprmsd`, prepared once.
 
-        distances[i] = sqrtf(msd)
+    Preparing the reference validates the atom indices and permute groups,
+    lays out the permute groups for the assignment solver, and centers the
+    reference conformation and computes its traces. When computing the
+    LP-RMSD of many trajectories, or chunks of a long one, to the same
+    reference, that setup is only done once.
 
-    if superpose_:
-        target.xyz = target_xyz
+    Parameters
+    ----------
+    reference : md.Trajectory
+        The object containing the reference conformation.
+    frame : int
+        The index of the conformation in `reference` to measure
+        distances to.
+    atom_indices : array_like, or None
+        The indices of the atoms to use in the RMSD calculation. If not
+        supplied, all atoms will be used.
+    permute_groups : list of array_like, or None
+        A list of groups of permutable atoms. See :func:`lprmsd`.
+
+    Examples
+    --------
+    >>> ref = md.LPRMSDReference(traj, 0, atom_indices=oxygens)
+    >>> for chunk in md.iterload('traj.xtc', top='top.pdb', chunk=1000):
+    ...     distances = md.lprmsd(chunk, ref)
+    """
+    cdef vector[vector[int]] permute_groups_stl
+    cdef readonly int n_atoms
+    cdef readonly np.ndarray atom_indices
+    cdef np.ndarray dis_indices
+    cdef np.ndarray ref_xyz_frame
+    cdef np.ndarray ref_xyz_frame_dis
+    cdef float ref_g, ref_g_dis
+
+    def __init__(self, reference, int frame=0, atom_indices=None,
+                 permute_groups=None):
+        _validate_shapes(reference, reference, frame)
+        self.n_atoms = reference.xyz.shape[1]
+        atom_indices = _validate_atom_indices(atom_indices, self.n_atoms)
+        permute_groups = _validate_permute_groups(permute_groups, atom_indices)
+
+        # these are the indices of the permute atoms inside the coords array after
+        # selecting only the atom indices.
+        # i.e. [xyz[atom_indices][i] for in permute_groups_rel]
+        for pgroup in permute_groups:
+            self.permute_groups_stl.push_back(np.searchsorted(atom_indices, pgroup))
+        dis_indices = np.setdiff1d(
+                np.arange(len(atom_indices)), np.concatenate(self.permute_groups_stl))
+        self.atom_indices = np.asarray(atom_indices, dtype=np.int32)
+        self.dis_indices = np.asarray(dis_indices, dtype=np.int32)
+
+        # get the all the coords in atom_indices in the reference.
+        # center them and compute the g values
+        cdef np.ndarray[ndim=2, dtype=np.float32_t, mode='c'] ref_xyz_frame
+        ref_xyz_frame = np.array(reference.xyz[frame, atom_indices, :], dtype=np.float32, copy=True)
+        inplace_center_and_trace_atom_major(&ref_xyz_frame[0, 0], &self.ref_g, 1, len(atom_indices))
+        self.ref_xyz_frame = ref_xyz_frame
+
+        # get only the distinguishable atoms in the reference, center them
+        # and compute the g values
+        cdef np.ndarray[ndim=2, dtype=np.float32_t, mode='c'] ref_xyz_frame_dis
+        ref_xyz_frame_dis = np.zeros((max(len(dis_indices), 1), 3), dtype=np.float32)
+        self.ref_g_dis = 0
+        if len(dis_indices) > 0:
+            # note: the indexing here is subtpe -- we're using atom_indices[dis_indices] since
+            # dis_indices have different semantics from atom_indices
+            ref_xyz_frame_dis[:] = reference.xyz[frame, atom_indices[dis_indices], :]
+            inplace_center_and_trace_atom_major(&ref_xyz_frame_dis[0, 0], &self.ref_g_dis, 1, len(dis_indices))
+        self.ref_xyz_frame_dis = ref_xyz_frame_dis
+
+    @cython.boundscheck(False)
+    def lprmsd(self, target, bool parallel=True, bool superpose=False):
+        """lprmsd(target, parallel=True, superpose=False)
+
+        Compute the LP-RMSD of all conformations in target to the reference.
+        See :func:`lprmsd`.
+
+        Returns
+        -------
+        lprmsds : np.ndarray, shape=(target.n_frames,)
+        """
+        assert (target.xyz.ndim == 3) and (target.xyz.shape[2] == 3)
+        if not (target.xyz.shape[1] == self.n_atoms):
+            raise ValueError("Input trajectories must have same number of atoms. "
+                             "found %d and %d." % (target.xyz.shape[1], self.n_atoms))
+
+        cdef int n_atoms_total = self.n_atoms
+        cdef int superpose_ = superpose
+        cdef np.ndarray[ndim=3, dtype=np.float32_t, mode='c'] target_xyz = np.asarray(target.xyz, order='c')
+        cdef np.ndarray[ndim=1, dtype=int, mode='c'] atom_indices_ = self.atom_indices
+        cdef np.ndarray[ndim=1, dtype=int, mode='c'] dis_indices_ = self.dis_indices
+        cdef np.ndarray[ndim=2, dtype=np.float32_t, mode='c'] ref_xyz_frame = self.ref_xyz_frame
+        cdef np.ndarray[ndim=2, dtype=np.float32_t, mode='c'] ref_xyz_frame_dis = self.ref_xyz_frame_dis
+        cdef int target_n_frames = target_xyz.shape[0]
+        cdef int n_atoms = len(self.atom_indices)
+        cdef int n_atoms_dis = len(self.dis_indices)
+        cdef np.ndarray[ndim=1, dtype=np.float32_t, mode='c'] distances = np.zeros(target_n_frames, dtype=np.float32)
+        if target_n_frames == 0 or n_atoms == 0:
+            return distances
+
+        cdef int i
+        cdef _LPRMSDScratch* scratch
+        if parallel:
+            with nogil, cython.parallel.parallel():
+                # each thread has its own buffers and assignment solver
+                scratch = _new_scratch(n_atoms, n_atoms_dis)
+                for i in prange(target_n_frames, schedule='dynamic'):
+                    distances[i] = _lprmsd_frame(
+                        &target_xyz[i, 0, 0], n_atoms_total, superpose_,
+                        <int*> atom_indices_.data, n_atoms, <int*> dis_indices_.data, n_atoms_dis,
+                        &ref_xyz_frame[0, 0], self.ref_g,
+                        &ref_xyz_frame_dis[0, 0], self.ref_g_dis,
+                        self.permute_groups_stl, scratch)
+                _free_scratch(scratch)
+        else:
+            scratch = _new_scratch(n_atoms, n_atoms_dis)
+            for i in range(target_n_frames):
+                distances[i] = _lprmsd_frame(
+                    &target_xyz[i, 0, 0], n_atoms_total, superpose_,
+                    <int*> atom_indices_.data, n_atoms, <int*> dis_indices_.data, n_atoms_dis,
+                    &ref_xyz_frame[0, 0], self.ref_g,
+                    &ref_xyz_frame_dis[0, 0], self.ref_g_dis,
+                    self.permute_groups_stl, scratch)
+            _free_scratch(scratch)
+
+        if superpose_:
+            target.xyz = target_xyz
+
+        return distances
+
+
+cdef struct _LPRMSDScratch:
+    float* target_xyz_frame
+    float* target_xyz_frame2
+    float* target_xyz_frame_dis
+    int* mapping
+    PermutationWorkspace* workspace
+
+
+cdef _LPRMSDScratch* _new_scratch(int n_atoms, int n_atoms_dis) nogil:
+    cdef _LPRMSDScratch* scratch = <_LPRMSDScratch*> malloc(sizeof(_LPRMSDScratch))
+    scratch.target_xyz_frame = <float*> malloc(n_atoms * 3 * sizeof(float))
+    scratch.target_xyz_frame2 = <float*> malloc(n_atoms * 3 * sizeof(float))
+    scratch.target_xyz_frame_dis = <float*> malloc((n_atoms_dis + 1) * 3 * sizeof(float))
+    scratch.mapping = <int*> malloc(n_atoms * sizeof(int))
+    scratch.workspace = new PermutationWorkspace()
+    return scratch
+
+
+cdef void _free_scratch(_LPRMSDScratch* scratch) nogil:
+    free(scratch.target_xyz_frame)
+    free(scratch.target_xyz_frame2)
+    free(scratch.target_xyz_frame_dis)
+    free(scratch.mapping)
+    del scratch.workspace
+    free(scratch)
+
+
+cdef float _lprmsd_frame(float* target_xyz, int n_atoms_total, int superpose,
+                         int* atom_indices, int n_atoms,
+                         int* dis_indices, int n_atoms_dis,
+                         float* ref_xyz_frame, float ref_g,
+                         float* ref_xyz_frame_dis, float ref_g_dis,
+                         const vector[vector[int]]& permute_groups,
+                         _LPRMSDScratch* scratch) nogil:
+    """The LP-RMSD of one frame of the target, which is superposed on the
+    reference in-place if `superpose`"""
+    cdef float* target_xyz_frame = scratch.target_xyz_frame
+    cdef float* target_xyz_frame2 = scratch.target_xyz_frame2
+    cdef float* target_xyz_frame_dis = scratch.target_xyz_frame_dis
+    cdef float target_g, target_g_dis, msd
+    cdef float rot1[9]
+    cdef float rot2[9]
+    cdef float rot3[9]
+    cdef int k
+    for k in range(9):
+        rot1[k] = 1 if k % 4 == 0 else 0
+
+    fancy_index2d(target_xyz, n_atoms_total, 3, atom_indices,
+                  n_atoms, NULL, 0, target_xyz_frame)
+    inplace_center_and_trace_atom_major(target_xyz_frame, &target_g, 1, n_atoms)
+
+    # compute rotation matrix on distinguishable atoms
+    if (n_atoms_dis > 0):
+        # subsample the target_xyz_frame to get just the distinguishable atoms
+        # target_xyz_frame has already been "sampled down" by atom_indices, so we
+        # can now apply dis_indices
+        fancy_index2d(target_xyz_frame, n_atoms, 3, dis_indices,
+                      n_atoms_dis, NULL, 0, target_xyz_frame_dis)
+        inplace_center_and_trace_atom_major(target_xyz_frame_dis, &target_g_dis, 1, n_atoms_dis)
+
+        # get `rot1`, the rotation matrix thats optimal for the distinguishable indices
+        msd_atom_major(n_atoms_dis, n_atoms_dis,
+            target_xyz_frame_dis, ref_xyz_frame_dis,
+            target_g_dis, ref_g_dis, 1, rot1)
+
+        # apply rot1 to all the atom_indices
+        rot_atom_major(n_atoms, target_xyz_frame, rot1)
+
+    # compute the optimal remapping of the indices
+    euclidean_permutation_into(ref_xyz_frame, target_xyz_frame, n_atoms, 3,
+                               permute_groups, scratch.workspace[0], scratch.mapping)
+    # and remap the indices -- i.e.   target_xyz_frame2 = target_xyz_frame[mapping]
+    fancy_index2d(target_xyz_frame, n_atoms, 3, scratch.mapping, n_atoms, NULL, 0, target_xyz_frame2)
+
+    # msd = ((target_xyz_frame2 - ref_xyz_frame)**2).sum(1).mean(0)
+    # then using these remapped indices, compute the rmsd, with a new rotation
+    if superpose:
+        msd = msd_atom_major(n_atoms, n_atoms, target_xyz_frame2, ref_xyz_frame, target_g, ref_g, 1, rot2)
+        inplace_center_and_trace_atom_major(target_xyz, NULL, 1, n_atoms_total)
+        sgemm33(rot1, rot2, rot3)
+        rot_atom_major(n_atoms_total, target_xyz, rot3)
+    else:
+        msd = msd_atom_major(n_atoms, n_atoms, ref_xyz_frame, target_xyz_frame2, target_g, ref_g, 0, NULL)
 
-    return distances
+    return sqrtf(msd)
 
 
 def _validate_atom_indices(atom_indices, n_atoms):
@@ -196,6 +196,147 @@ def rmsd(target, reference, int frame=0, atom_indices=None,
     return distances
 
 
+def rmsd_matrix(target, reference=None, atom_indices=None,
+                ref_atom_indices=None, bool parallel=True,
+                bool precentered=False, out=None, bool condensed=False):
+    """rmsd_matrix(target, reference=None, atom_indices=None, ref_atom_indices=None, parallel=True, precentered=False, out=None, condensed=False)
+
+    Compute the RMSD between every pair of conformations in two trajectories.
+
+    The conformations are centered and their traces are computed once, and
+    the matrix is then filled in square tiles of frames, so that each
+    thread works on a set of conformations small enough to stay in cache.
+    Unlike `rmsd`, the coordinates of `target` and `reference` are not
+    modified.
+
+    Parameters
+    ----------
+    target : md.Trajectory
+        The conformations indexing the rows of the matrix.
+    reference : md.Trajectory, or None
+        The conformations indexing the columns of the matrix. If not
+        supplied, the RMSD between every pair of conformations in `target`
+        is computed.
+    atom_indices : array_like, or None
+        The indices of the atoms to use in the RMSD calculation. If not
+        supplied, all atoms will be used.
+    ref_atom_indices : array_like, or None
+        Use these indices for the reference trajectory. If not supplied,
+        the atom indices will be the same as those for target.
+    parallel : bool
+        Use OpenMP to calculate the tiles of the matrix in parallel over
+        multiple cores.
+    precentered : bool, default=False
+        Assume that the conformations are already centered at the origin, and
+        that the "rmsd_traces" have been computed, as is done by
+        `Trajectory.center_coordinates`. This is only used when
+        `atom_indices` is None.
+    out : array_like, or None
+        Array to store the result in, with the shape of the returned matrix.
+        This can be anything that supports slice assignment, such as a
+        ``np.memmap`` or an HDF5 dataset, for matrices that do not fit in
+        memory. Arrays other than C-contiguous float32 numpy arrays are
+        written to in blocks of rows.
+    condensed : bool, default=False
+        Only compute the upper triangle of the (symmetric) matrix, excluding
+        the diagonal, and return it as a flat array in the row-major order
+        used by ``scipy.spatial.distance.squareform``. This requires
+        `reference` to be None, and is twice as fast as the full matrix.
+
+    Returns
+    -------
+    rmsds : np.ndarray, shape=(target.n_frames, reference.n_frames)
+        ``rmsds[i, j]`` is the optimal root-mean-square deviation between
+        the `i`-th conformation in target and the `j`-th conformation in
+        reference. If `condensed` is True, the shape is instead
+        ``(target.n_frames * (target.n_frames - 1) // 2,)``. If `out` was
+        supplied, it is returned.
+
+    Examples
+    --------
+    >>> import scipy.cluster.hierarchy                            # doctest: +SKIP
+    >>> d = md.rmsd_matrix(trajectory, condensed=True)            # doctest: +SKIP
+    >>> z = scipy.cluster.hierarchy.linkage(d, method='average')  # doctest: +SKIP
+
+    To stream a large matrix to disk
+
+    >>> out = np.memmap('rmsd.dat', dtype=np.float32, mode='w+',  # doctest: +SKIP
+    ...                 shape=(trajectory.n_frames, trajectory.n_frames))
+    >>> md.rmsd_matrix(trajectory, out=out)                       # doctest: +SKIP
+
+    See Also
+    --------
+    rmsd
+
+    Notes
+    -----
+    This function uses OpenMP to parallelize the calculation across
+    multiple cores. To control the number of threads launched by OpenMP,
+    you can set the environment variable ``OMP_NUM_THREADS``.
+    """
+    symmetric = reference is None
+    if symmetric:
+        reference = target
+        if ref_atom_indices is not None:
+            raise ValueError("ref_atom_indices requires a reference trajectory")
+    elif condensed:
+        raise ValueError("condensed output is only available when reference is None")
+
+    atom_indices = _check_atom_indices(atom_indices, target, 'atom_indices')
+    if ref_atom_indices is None:
+        ref_atom_indices = atom_indices
+    else:
+        ref_atom_indices = _check_atom_indices(ref_atom_indices, reference, 'ref_atom_indices')
+
+    target_xyz, target_g = _centered_and_traces(target, atom_indices, precentered)
+    if symmetric:
+        ref_xyz, ref_g = target_xyz, target_g
+    else:
+        ref_xyz, ref_g = _centered_and_traces(reference, ref_atom_indices, precentered)
+    if target_xyz.shape[1] != ref_xyz.shape[1]:
+        raise ValueError("Input trajectories must have same number of atoms. "
+                         "found %d and %d." % (target_xyz.shape[1], ref_xyz.shape[1]))
+
+    n_target, n_ref = target_xyz.shape[0], ref_xyz.shape[0]
+    if condensed:
+        shape = (n_target * (n_target - 1) // 2,)
+    else:
+        shape = (n_target, n_ref)
+    if out is None:
+        out = np.empty(shape, dtype=np.float32)
+    elif tuple(out.shape) != shape:
+        raise ValueError("out must have shape %s, found %s" % (shape, tuple(out.shape)))
+    if n_target == 0 or n_ref == 0:
+        return out
+
+    # C-contiguous float32 arrays (including np.memmap) are filled in place,
+    # everything else goes through a buffer of RMSD_BLOCK_ENTRIES
+    direct = (not condensed and isinstance(out, np.ndarray) and
+              out.dtype == np.float32 and out.flags.c_contiguous and
+              out.flags.writeable)
+    cdef int block_rows = n_target if direct else max(1, RMSD_BLOCK_ENTRIES // n_ref)
+    cdef float[:, :, ::1] xyz1 = target_xyz
+    cdef float[:, :, ::1] xyz2 = ref_xyz
+    cdef float[::1] g1 = target_g
+    cdef float[::1] g2 = ref_g
+    cdef float[:, ::1] buf
+    cdef int r0, r1
+
+    if not direct:
+        buffer = np.empty((min(block_rows, n_target), n_ref), dtype=np.float32)
+    for r0 in range(0, n_target, block_rows):
+        r1 = min(r0 + block_rows, n_target)
+        buf = out[r0:r1] if direct else buffer[:r1 - r0]
+        _rmsd_block(xyz1, g1, xyz2, g2, buf, r0, r1, condensed, parallel)
+        if condensed:
+            out[_condensed_start(n_target, r0):_condensed_start(n_target, r1)] = \
+                _gather_upper(buf, r0, r1, n_target)
+        elif not direct:
+            out[r0:r1] = buffer[:r1 - r0]
+
+    return out
+
+
 def _center_inplace_atom_major(np.ndarray[ndim=3, dtype=np.float32_t, mode='c'] xyz not None):
     assert xyz.shape[2] == 3
     if not xyz.flags.writeable:
@@ -210,6 +351,95 @@ def _center_inplace_atom_major(np.ndarray[ndim=3, dtype=np.float32_t, mode='c']
 # Private Functions
 ##############################################################################
 
+# Edge length, in frames, of the square tiles of the matrix that rmsd_matrix
+# hands out to each thread
+cdef int RMSD_TILE = 64
+# Number of matrix entries rmsd_matrix computes between writes when the
+# output can't be filled in place
+cdef int RMSD_BLOCK_ENTRIES = 16777216
+
+
+def _check_atom_indices(atom_indices, traj, name):
+    if atom_indices is None:
+        return None
+    atom_indices = ensure_type(np.asarray(atom_indices), dtype=np.int, ndim=1, name=name)
+    if not np.all((atom_indices >= 0) * (atom_indices < traj.xyz.shape[1])):
+        raise ValueError("%s must be valid positive indices" % name)
+    return atom_indices
+
+
+def _centered_and_traces(traj, atom_indices, precentered):
+    """Centered copy of (a subset of) the coordinates of a trajectory, and
+    the traces of each of its frames"""
+    if precentered and atom_indices is None and traj._rmsd_traces is not None:
+        return (np.asarray(traj.xyz, order='C', dtype=np.float32),
+                np.asarray(traj._rmsd_traces, order='C', dtype=np.float32))
+
+    if atom_indices is None:
+        xyz = np.array(traj.xyz, order='C', dtype=np.float32)
+    else:
+        xyz = np.ascontiguousarray(traj.xyz[:, atom_indices], dtype=np.float32)
+    if xyz.shape[0] == 0:
+        return xyz, np.empty(0, dtype=np.float32)
+    return xyz, _center_inplace_atom_major(xyz)
+
+
+cdef inline Py_ssize_t _condensed_start(Py_ssize_t n, Py_ssize_t i):
+    # offset in the condensed matrix of the first entry in row i
+    return i * n - i * (i + 1) // 2
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _rmsd_tile(float[:, :, ::1] xyz1, float[::1] g1,
+                     float[:, :, ::1] xyz2, float[::1] g2, float[:, ::1] buf,
+                     int r0, int r1, int ti, int tj, bint upper) nogil:
+    cdef int n_atoms = xyz1.shape[1]
+    cdef int i0 = r0 + ti * RMSD_TILE
+    cdef int i1 = min(i0 + RMSD_TILE, r1)
+    cdef int j0 = tj * RMSD_TILE
+    cdef int j1 = min(j0 + RMSD_TILE, xyz2.shape[0])
+    cdef int i, j
+    cdef float msd
+
+    for i in range(i0, i1):
+        for j in range(max(j0, i + 1) if upper else j0, j1):
+            msd = msd_atom_major(n_atoms, n_atoms, &xyz1[i, 0, 0], &xyz2[j, 0, 0], g1[i], g2[j], 0, NULL)
+            buf[i - r0, j] = sqrtf(msd)
+
+
+cdef void _rmsd_block(float[:, :, ::1] xyz1, float[::1] g1,
+                      float[:, :, ::1] xyz2, float[::1] g2, float[:, ::1] buf,
+                      int r0, int r1, bint upper, bint parallel):
+    # Fill buf[i - r0, j] for i in [r0, r1) and all j (only j > i if upper)
+    cdef int n_tiles_j = (xyz2.shape[0] + RMSD_TILE - 1) // RMSD_TILE
+    cdef int n_tiles = ((r1 - r0 + RMSD_TILE - 1) // RMSD_TILE) * n_tiles_j
+    cdef int t
+
+    if parallel:
+        for t in prange(n_tiles, nogil=True, schedule='dynamic'):
+            _rmsd_tile(xyz1, g1, xyz2, g2, buf, r0, r1, t // n_tiles_j, t % n_tiles_j, upper)
+    else:
+        with nogil:
+            for t in range(n_tiles):
+                _rmsd_tile(xyz1, g1, xyz2, g2, buf, r0, r1, t // n_tiles_j, t % n_tiles_j, upper)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef _gather_upper(float[:, ::1] buf, int r0, int r1, int n):
+    # Pack the entries above the diagonal in rows [r0, r1) of an n x n matrix
+    cdef np.ndarray[ndim=1, dtype=np.float32_t] chunk = np.empty(
+        _condensed_start(n, r1) - _condensed_start(n, r0), dtype=np.float32)
+    cdef Py_ssize_t pos = 0
+    cdef int i, j
+    for i in range(r0, r1):
+        for j in range(i + 1, n):
+            chunk[pos] = buf[i - r0, j]
+            pos += 1
+    return chunk
+
+
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -40,14 +40,32 @@ class Munkres {
 public:
 	Munkres();
 	virtual ~Munkres();
+	// The buffers are kept between calls, and only grown when a larger
+	// problem is solved, so one Munkres can solve many problems without
+	// allocating for each of them.
 	void solve(double * icost, int* answer, int m, int n);
 private:
+	// not copyable, since it owns its buffers
+	Munkres(const Munkres&);
+	Munkres& operator=(const Munkres&);
+	void reserve(int m, int n);
+
 	double ** cost;
 	bool ** starred;
 	bool ** primed;
 	bool *covered_rows;
 	bool *covered_cols;
 
+	// the storage of the rows of cost, starred and primed
+	double *cost_data;
+	bool *starred_data;
+	bool *primed_data;
+	int row_capacity;
+	int col_capacity;
+	int cell_capacity;
+	// the augmenting path of step5, which is done with it before going on
+	std::vector<path_item> path;
+
 	double k;
 	int rows;
 	int cols;
@@ -2,6 +2,22 @@
 #ifndef __PERMUTATION_MSD__
 #define __PERMUTATION_MSD__
 
+#include "Munkres.h"
+
+/*
+ * Scratch space for euclidean_permutation_into(), so that repeated calls
+ * (e.g. one per frame, in one thread) don't reallocate it: the cost matrix
+ * and mask, and the Munkres solver, which keeps its own buffers between
+ * calls. They only grow when a larger permute group is solved. A workspace
+ * must not be shared between threads.
+ */
+class PermutationWorkspace {
+public:
+    Munkres munkres;
+    std::vector<double> cost;
+    std::vector<int> mask;
+};
+
 std::vector<int> euclidean_permutation(
 float* target,
 float* reference,
@@ -9,5 +25,14 @@ int n_atoms,
 int n_dims,
 std::vector<std::vector<int> >& permute_groups);
 
+void euclidean_permutation_into(
+const float* target,
+const float* reference,
+int n_atoms,
+int n_dims,
+const std::vector<std::vector<int> >& permute_groups,
+PermutationWorkspace& workspace,
+int* mapping);
+
 
 #endif // __PERMUTATION_MSD__
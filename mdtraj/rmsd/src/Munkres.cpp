@@ -40,24 +40,62 @@ path_item::~path_item() {
 
 }
 
-Munkres::Munkres() {
-	// TODO Auto-generated constructor stub
-
+Munkres::Munkres()
+	: cost(NULL), starred(NULL), primed(NULL), covered_rows(NULL),
+	  covered_cols(NULL), cost_data(NULL), starred_data(NULL),
+	  primed_data(NULL), row_capacity(0), col_capacity(0), cell_capacity(0) {
 }
 
 Munkres::~Munkres() {
-	// TODO Auto-generated destructor stub
+	delete[] cost;
+	delete[] starred;
+	delete[] primed;
+	delete[] covered_rows;
+	delete[] covered_cols;
+	delete[] cost_data;
+	delete[] starred_data;
+	delete[] primed_data;
+}
+
+/* Make the buffers big enough for an m x n problem, and point the rows of
+ * cost, starred and primed into them. */
+void Munkres::reserve(int m, int n) {
+	if (m > row_capacity) {
+		delete[] cost;
+		delete[] starred;
+		delete[] primed;
+		delete[] covered_rows;
+		cost = new double*[m];
+		starred = new bool*[m];
+		primed = new bool*[m];
+		covered_rows = new bool[m];
+		row_capacity = m;
+	}
+	if (n > col_capacity) {
+		delete[] covered_cols;
+		covered_cols = new bool[n];
+		col_capacity = n;
+	}
+	if (m * n > cell_capacity) {
+		delete[] cost_data;
+		delete[] starred_data;
+		delete[] primed_data;
+		cost_data = new double[m * n];
+		starred_data = new bool[m * n];
+		primed_data = new bool[m * n];
+		cell_capacity = m * n;
+	}
+	for (int i = 0; i < m; i++) {
+		cost[i] = cost_data + i * n;
+		starred[i] = starred_data + i * n;
+		primed[i] = primed_data + i * n;
+	}
 }
 
 void Munkres::solve(double* icost, int* answer, int m, int n) {
 	rows = m;
 	cols = n;
-	cost = new double*[rows];
-	starred = new bool*[rows];
-
-	primed = new bool*[rows];
-	covered_rows = new bool[rows];
-	covered_cols = new bool[cols];
+	reserve(rows, cols);
 
 	for (int i = 0; i < rows; i++) {
 		covered_rows[i] = false;
@@ -67,10 +105,6 @@ void Munkres::solve(double* icost, int* answer, int m, int n) {
 	}
 
 	for (int i = 0; i < rows; i++) {
-		cost[i] = new double[cols];
-		starred[i] = new bool[cols];
-		primed[i] = new bool[cols];
-
 		for (int j = 0; j < cols; j++) {
 			cost[i][j] = icost[(i * cols) + j];
 			starred[i][j] = 0;
@@ -96,18 +130,6 @@ void Munkres::solve(double* icost, int* answer, int m, int n) {
 			index++;
 		}
 	}
-
-	for (int i = 0; i < rows; i++) {
-		delete cost[i];
-		delete primed[i];
-		delete starred[i];
-	}
-	delete cost;
-	delete primed;
-	delete starred;
-	delete covered_rows;
-	delete covered_cols;
-
 }
 
 void Munkres::step0() {
@@ -230,7 +252,7 @@ void Munkres::step5(int i, int j) {
 	 * uncover everything
 	 * return to step 3.
 	 */
-	std::vector<path_item> path;
+	path.clear();
 	path.push_back(path_item(i, j, PRIMED));
 	bool done = false;
 	int row = 0;
@@ -29,16 +29,19 @@ from __future__ import print_function
 import os
 import sys
 import glob
+import time
 import warnings
 import functools
 import operator
+import threading
 from argparse import ArgumentParser
 
 import numpy as np
 import mdtraj as md
 from mdtraj.core.trajectory import _parse_topology
 from mdtraj.utils import in_units_of
-from mdtraj.utils.six import iteritems
+from mdtraj.utils.six import iteritems, reraise
+from mdtraj.utils.six.moves import queue
 
 ###############################################################################
 # Crappy class that should go elsewhere
@@ -80,6 +83,10 @@ units = {'.xtc': 'nanometers',
          '.lh5': 'nanometers',
          '.pdb': 'angstroms'}
 
+# maximum number of chunks waiting between the stages of the pipeline, for
+# each input file being read and for the output
+PIPELINE_DEPTH = 4
+
 ###############################################################################
 # Utility Functions
 ###############################################################################
@@ -116,10 +123,15 @@ def index(str):
 ###############################################################################
 
 
-def parse_args():
+def parse_args(argv=None):
     """Parse the command line arguments and perform some validation on the
     arguments
 
+    Parameters
+    ----------
+    argv : list of str, optional
+        The arguments to parse. By default, those in sys.argv.
+
     Returns
     -------
     args : argparse.Namespace
@@ -171,8 +183,17 @@ def parse_args():
                         dcd/xtc/trr/netcdf/binpos as a PDB file. If you\'re
                         converting *to* .h5, the topology will be stored
                         inside the h5 file.''')
-
-    args = parser.parse_args()
+    parser.add_argument('-p', '--pipeline', action='store_true',
+                        help='''read, convert and write the chunks in
+                        separate threads, so that reading the input overlaps
+                        with writing the output. up to %d chunks are queued
+                        between the stages.''' % PIPELINE_DEPTH)
+    parser.add_argument('-j', '--jobs', default=1, type=int, help='''number
+                        of input files to read in parallel. their frames are
+                        still written in the order of the files. more than 1
+                        implies --pipeline. default=1''')
+
+    args = parser.parse_args(argv)
 
     if not args.force and os.path.exists(args.output):
         parser.error('file exists: %s' % args.output)
@@ -213,6 +234,8 @@ def parse_args():
         parser.error('stride must be positive')
     if args.chunk <= 0:
         parser.error('chunk must be positive')
+    if args.jobs <= 0:
+        parser.error('jobs must be positive')
 
     if args.index and len(args.input) > 1:
         parser.error('index notation only allowed with a single input trajectory')
@@ -263,7 +286,6 @@ def main(args, verbose=True):
     if topology is not None and atom_indices is not None:
         topology = topology.subset(atom_indices)
 
-    n_total = 0
     if args.index is not None:
         assert len(args.input) == 1
         # when chunk is None, we load up ALL of the frames. this isn't
@@ -273,58 +295,166 @@ def main(args, verbose=True):
         # for hdf5 and netcdf, but for the others...
         assert args.chunk is None
 
+    def read_file(fn):
+        assert in_x == ext(fn)
+        with InFileFormat(fn, 'r') as infile:
+            while True:
+                data, in_units, n_frames = read(infile, args.chunk, stride=args.stride,
+                                                atom_indices=atom_indices)
+                if n_frames == 0:
+                    break
+                yield data, in_units
+
+    def prepare(data, in_units):
+        if topology is not None:
+            # if the user supplied a topology, we should probably
+            # do some simple checks
+            if data['xyz'].shape[1] != topology._numAtoms:
+                warnings.warn('sdsfsd!!!!')
+            data['topology'] = topology
+
+        # if they want a specific set of frames, get those
+        # with slice notation
+        if args.index is not None:
+            _data = {}
+            for k, v in iteritems(data):
+                if isinstance(v, np.ndarray):
+                    # we don't want the dimensionality to go deficient
+                    if isinstance(args.index, int):
+                        _data[k] = v[np.newaxis, args.index]
+                    else:
+                        _data[k] = v[args.index]
+                elif isinstance(v, md.Topology):
+                    _data[k] = v
+                else:
+                    raise RuntineError()
+            data = _data
+            print(list(data.keys()))
+
+        return convert(data, in_units, out_units, out_fields)
+
+    if args.pipeline or args.jobs > 1:
+        chunks = pipeline(args.input, read_file, prepare, args.jobs)
+    else:
+        chunks = (prepare(data, in_units) for fn in args.input
+                  for data, in_units in read_file(fn))
+
     # this is the normal invocation pattern, but for PDBTrajectoryFile it's
     # different
     outfile_factory = functools.partial(OutFileFormat, args.output, 'w',
                         force_overwrite=args.force)
 
+    n_total = 0
+    start = time.time()
     with outfile_factory() as outfile:
-        for fn in args.input:
-            assert in_x == ext(fn)
-            with InFileFormat(fn, 'r') as infile:
-
-                while True:
-                    data, in_units, n_frames = read(infile, args.chunk, stride=args.stride,
-                                                    atom_indices=atom_indices)
-                    if n_frames == 0:
-                        break
-
-                    if topology is not None:
-                        # if the user supplied a topology, we should probably
-                        # do some simple checks
-                        if data['xyz'].shape[1] != topology._numAtoms:
-                            warnings.warn('sdsfsd!!!!')
-                        data['topology'] = topology
-
-                    # if they want a specific set of frames, get those
-                    # with slice notation
-                    if args.index is not None:
-                        _data = {}
-                        for k, v in iteritems(data):
-                            if isinstance(v, np.ndarray):
-                                # we don't want the dimensionality to go deficient
-                                if isinstance(args.index, int):
-                                    _data[k] = v[np.newaxis, args.index]
-                                else:
-                                    _data[k] = v[args.index]
-                            elif isinstance(v, md.Topology):
-                                _data[k] = v
-                            else:
-                                raise RuntineError()
-                        data = _data
-                        print(list(data.keys()))
-                        n_frames = len(data['xyz'])
-
-                    convert(data, in_units, out_units, out_fields)
-                    write(outfile, data)
-                    n_total += n_frames
-
-                    if verbose:
-                        sys.stdout.write('\rconverted %d frames, %d atoms' % (n_total, data['xyz'].shape[1]))
-                        sys.stdout.flush()
+        for data in chunks:
+            write(outfile, data)
+            n_total += len(data['xyz'])
+
+            if verbose:
+                sys.stdout.write('\rconverted %d frames, %d atoms' % (n_total, data['xyz'].shape[1]))
+                sys.stdout.flush()
 
     if verbose:
         print(' ')
+        elapsed = max(time.time() - start, 1e-6)
+        mb_in = sum(os.path.getsize(fn) for fn in args.input) / 1e6
+        mb_out = os.path.getsize(args.output) / 1e6
+        print('%d frames in %.2f s: %.1f frames/s, %.1f MB/s read, %.1f MB/s written' % (
+              n_total, elapsed, n_total / elapsed, mb_in / elapsed, mb_out / elapsed))
+
+
+class _Failure(object):
+    """An exception raised in one of the threads of `pipeline`"""
+    def __init__(self, exc_info):
+        self.exc_info = exc_info
+
+_DONE = object()
+
+
+def pipeline(filenames, read_file, prepare, n_jobs=1, depth=PIPELINE_DEPTH):
+    """Read, prepare and yield the chunks of several files, with the
+    stages running in separate threads.
+
+    Up to `n_jobs` threads read the files with `read_file(fn)`, which
+    yields the arguments to `prepare` for each chunk. Another thread calls
+    `prepare` on them, in the order of the files, while the caller consumes
+    the prepared chunks from this generator. The stages are connected by
+    queues of at most `depth` chunks, so that a slow stage blocks the ones
+    in front of it rather than letting the chunks pile up in memory. An
+    exception in any of the threads is re-raised here.
+    """
+    n_jobs = max(1, min(n_jobs, len(filenames)))
+    in_queues = [queue.Queue(depth) for fn in filenames]
+    out_queue = queue.Queue(depth)
+    stop = threading.Event()
+    lock = threading.Lock()
+    files = iter(enumerate(filenames))
+
+    def put(q, item):
+        # give up if the consumer has gone away, rather than block forever
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(q):
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def reader():
+        while True:
+            with lock:
+                i, fn = next(files, (None, None))
+            if fn is None:
+                return
+            try:
+                for item in read_file(fn):
+                    if not put(in_queues[i], item):
+                        return
+                put(in_queues[i], _DONE)
+            except Exception:
+                put(in_queues[i], _Failure(sys.exc_info()))
+                return
+
+    def converter():
+        for q in in_queues:
+            while True:
+                item = get(q)
+                if item is _DONE:
+                    break
+                if not isinstance(item, _Failure):
+                    try:
+                        item = prepare(*item)
+                    except Exception:
+                        item = _Failure(sys.exc_info())
+                if not put(out_queue, item) or isinstance(item, _Failure):
+                    return
+        put(out_queue, _DONE)
+
+    threads = [threading.Thread(target=reader) for _ in range(n_jobs)]
+    threads.append(threading.Thread(target=converter))
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    try:
+        while True:
+            item = out_queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                reraise(*item.exc_info)
+            yield item
+    finally:
+        stop.set()
 
 
 def write(outfile, data):
@@ -411,7 +541,7 @@ def read(infile, chunk, stride, atom_indices):
         else:
             topology = infile.topology.subset(atom_indices)
 
-        data = {'xyz': infile.positions[::stride, atom_indices, :],
+        data = {'xyz': infile.read(stride=stride, atom_indices=atom_indices),
                 'topology': topology}
         if infile.unitcell_lengths is not None:
             data['cell_lengths'] =np.array([infile.unitcell_lengths] * len(data['xyz']))
@@ -174,3 +174,14 @@ def test_seek():
         eq(f.tell(), len(reference))
         
         
+
+
+def test_load_mmap():
+    import mdtraj as md
+    pdb = get_fn('native.pdb')
+    t1 = md.load(fn_binpos, top=pdb)
+    t2 = md.load(fn_binpos, top=pdb, mmap=True)
+    eq(t2[::10].xyz, t1[::10].xyz)
+    eq(t2.xyz, t1.xyz)
+    eq(md.load(fn_binpos, top=pdb, mmap=True, atom_indices=[1, 5]).xyz,
+       t1.xyz[:, [1, 5]])
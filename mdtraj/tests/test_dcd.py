@@ -300,3 +300,20 @@ def test_ragged_2():
     with DCDTrajectoryFile(temp, 'w', force_overwrite=True) as f:
         f.write(xyz, cell_lengths, cell_angles)
         assert_raises(ValueError, lambda: f.write(xyz))
+
+
+def test_load_mmap():
+    import mdtraj as md
+    t1 = md.load(fn_dcd, top=pdb)
+    t2 = md.load(fn_dcd, top=pdb, mmap=True)
+    sliced = t2[::10]
+    eq(sliced.xyz, t1[::10].xyz)
+    eq(sliced.unitcell_lengths, t1[::10].unitcell_lengths)
+    eq(sliced.unitcell_angles, t1[::10].unitcell_angles)
+    eq(t2.xyz, t1.xyz)
+
+    t3 = md.load(fn_dcd, top=pdb, mmap=True, stride=3, atom_indices=[1, 5, 7])
+    t4 = md.load(fn_dcd, top=pdb, stride=3, atom_indices=[1, 5, 7])
+    eq(t3.xyz, t4.xyz)
+    eq(t3.time, t4.time)
+    eq(md.load(fn_dcd, top=pdb, mmap=True, frame=4).xyz, t1.xyz[4:5])
@@ -78,6 +78,21 @@ def test_read_write_precision():
     eq(t.xyz, md.load(temp).xyz, decimal=3)
 
 
+def test_write_modified_topology():
+    # the cached text of the atom lines follows changes to the topology
+    t = md.load(get_fn('native2.pdb'))
+    topology = t.topology.copy()
+    with GroTrajectoryFile(temp, 'w') as f:
+        f.write(t.xyz, topology)
+        topology.atom(0).name = 'NX'
+        f.write(t.xyz, topology)
+
+    with open(temp) as f:
+        lines = f.readlines()
+    eq(lines[2][10:15], md.load(get_fn('native2.pdb')).top.atom(0).name.rjust(5))
+    eq(lines[t.n_atoms + 5][10:15], '   NX')
+
+
 def test_no_whitespace_gro():
     t = md.load(get_fn('v_error.gro'))
     eq(t.xyz.shape, (1, 1, 3))
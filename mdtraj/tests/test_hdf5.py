@@ -290,3 +290,80 @@ def test_append():
 
     with HDF5TrajectoryFile(temp) as f:
         eq(f.root.coordinates[:], np.concatenate((x1,x2)))
+
+
+def test_compression():
+    import tables
+    coordinates = np.random.randn(20, 10, 3).astype(np.float32)
+    codecs = ['zlib', None] + [c for c in ['lz4', 'zstd', 'blosc:blosclz']
+                               if c.split(':')[-1] in tables.blosc_compressor_list()]
+    for compression in codecs:
+        with HDF5TrajectoryFile(temp, 'w', compression=compression) as f:
+            f.write(coordinates)
+        with HDF5TrajectoryFile(temp) as f:
+            eq(f.read().coordinates, coordinates)
+            if compression is not None:
+                eq(f.root.coordinates.filters.complevel, 1)
+
+    assert_raises(ValueError, lambda: HDF5TrajectoryFile(temp, 'w', compression='foo'))
+    assert_raises(ValueError, lambda: HDF5TrajectoryFile(temp, 'w', chunkshape='foo'))
+
+
+def test_chunkshape():
+    coordinates = np.random.randn(50, 200, 3).astype(np.float32)
+    velocities = np.random.randn(50, 200, 3).astype(np.float32)
+    atom_indices = np.array([150, 3, 4, 199, 70])
+    for chunkshape, expected in [('frames', (109, 200, 3)), ('atoms', (1024, 21, 3)),
+                                 ((7, 16), (7, 16, 3)), ((1, 500), (1, 200, 3))]:
+        with HDF5TrajectoryFile(temp, 'w', chunkshape=chunkshape) as f:
+            f.write(coordinates, velocities=velocities)
+        with HDF5TrajectoryFile(temp) as f:
+            eq(f.root.coordinates.chunkshape, expected)
+            eq(f.root.velocities.chunkshape, expected)
+            eq(f.read().coordinates, coordinates)
+            f.seek(3)
+            data = f.read(n_frames=40, stride=3, atom_indices=atom_indices)
+            eq(data.coordinates, coordinates[3:43:3, atom_indices])
+            eq(data.velocities, velocities[3:43:3, atom_indices])
+            f.seek(49)
+            eq(f.read(atom_indices=[5]).coordinates, coordinates[49:, [5]])
+
+
+def test_read_per_atom_large_chunks():
+    # a few frames from chunks with many frames are read without reading the
+    # rest of the frames of the chunks
+    class Recorder(object):
+        def __init__(self, node):
+            self.node = node
+            self.shape = node.shape
+            self.chunkshape = node.chunkshape
+            self.dtype = node.dtype
+            self.blocks = []
+
+        def __getitem__(self, key):
+            block = self.node[key]
+            self.blocks.append(block.shape)
+            return block
+
+    coordinates = np.random.randn(300, 40, 3).astype(np.float32)
+    with HDF5TrajectoryFile(temp, 'w', chunkshape=(256, 16)) as f:
+        f.write(coordinates)
+    old_buffer_bytes = hdf5.READ_BUFFER_BYTES
+    # smaller than a single row of chunks
+    hdf5.READ_BUFFER_BYTES = 10 * 40 * 3 * 4
+    try:
+        with HDF5TrajectoryFile(temp) as f:
+            for frame_slice, atom_indices in [(slice(5, 6), None),
+                                              (slice(3, 290, 7), None),
+                                              (slice(250, 262), np.array([1, 20]))]:
+                node = Recorder(f.root.coordinates)
+                data = hdf5._read_per_atom(node, frame_slice, atom_indices)
+                expected = coordinates[frame_slice]
+                if atom_indices is not None:
+                    expected = expected[:, atom_indices]
+                eq(data, expected)
+                assert all(np.prod(shape) * 4 <= hdf5.READ_BUFFER_BYTES
+                           for shape in node.blocks)
+                eq(sum(shape[0] for shape in node.blocks), len(expected))
+    finally:
+        hdf5.READ_BUFFER_BYTES = old_buffer_bytes
@@ -107,3 +107,43 @@ def test_custom():
 
     t1 = md.load(temp, top=get_fn('custom.pdb'))
     eq(t0.xyz, t1.xyz)
+
+def test_len_and_seek_from_end():
+    reference = md.load(get_fn('frame0.dcd'), top=get_fn('native.pdb'))
+
+    with LAMMPSTrajectoryFile(get_fn('frame0.lammpstrj'),
+                              cache_offsets=False) as f:
+        eq(len(f), len(reference))
+        f.seek(-2, 2)
+        eq(len(reference) - 2, f.tell())
+        xyz, _, _ = f.read()
+        eq(reference.xyz[-2:], xyz/10, decimal=3)
+
+def test_offsets_cache():
+    t0 = md.load(get_fn('frame0.lammpstrj'), top=get_fn('native.pdb'))
+    t0.save(temp)
+    with LAMMPSTrajectoryFile(temp) as f:
+        offsets = f.offsets
+    assert not os.path.exists(md.utils.offsets.offsets_filename(temp))
+    with LAMMPSTrajectoryFile(temp, cache_offsets=True) as f:
+        eq(f.offsets, offsets)
+    assert os.path.exists(md.utils.offsets.offsets_filename(temp))
+    with LAMMPSTrajectoryFile(temp, cache_offsets=True) as f:
+        eq(f.offsets, offsets)
+        f.seek(5)
+        xyz, _, _ = f.read(n_frames=1)
+    eq(t0.xyz[5], xyz[0]/10, decimal=3)
+    os.unlink(md.utils.offsets.offsets_filename(temp))
+
+def test_read_parallel():
+    with LAMMPSTrajectoryFile(get_fn('frame0.lammpstrj'),
+                              cache_offsets=False) as f:
+        xyz, lengths, angles = f.read()
+    with LAMMPSTrajectoryFile(get_fn('frame0.lammpstrj'),
+                              cache_offsets=False) as f:
+        f.seek(1)
+        xyz2, lengths2, angles2 = f.read(stride=2, n_jobs=2)
+        eq(f.tell(), len(xyz))
+    eq(xyz[1::2], xyz2)
+    eq(lengths[1::2], lengths2)
+    eq(angles[1::2], angles2)
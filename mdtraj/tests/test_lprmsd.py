@@ -2,7 +2,7 @@ from __future__ import print_function
 import numpy as np
 
 import mdtraj as md
-from mdtraj.testing import eq, get_fn
+from mdtraj.testing import eq, get_fn, assert_raises
 from mdtraj import Trajectory, lprmsd
 from mdtraj._lprmsd import _munkres
 from mdtraj.utils import rotation_matrix_from_quaternion, uniform_quaternion
@@ -101,3 +101,15 @@ def test_lprmsd_5():
     r = md.rmsd(t, t1, 0)
     a = md.lprmsd(t, t1, 0, permute_groups=[[]], superpose=True)
     eq(a, r, decimal=3)
+
+
+def test_lprmsd_reference():
+    t = md.load(get_fn('frame0.h5'))
+    groups = [np.arange(5), np.arange(5, 12)]
+    ref = md.LPRMSDReference(t, 3, permute_groups=groups)
+
+    expected = md.lprmsd(t, t, 3, permute_groups=groups, parallel=False)
+    eq(md.lprmsd(t, ref), expected)
+    eq(ref.lprmsd(t[10:20], parallel=False), expected[10:20])
+    assert_raises(ValueError, lambda: md.lprmsd(t, ref, atom_indices=[0, 1]))
+    assert_raises(ValueError, lambda: ref.lprmsd(t.atom_slice(range(5))))
@@ -42,7 +42,7 @@ import numpy as np
 import mdtraj as md
 from mdtraj import element
 from mdtraj.utils import import_
-from mdtraj.testing import skipif, get_fn, eq, slow
+from mdtraj.testing import skipif, get_fn, eq, slow, assert_raises
 on_win = (sys.platform == 'win32')
 on_py3 = (sys.version_info >= (3, 0))
 
@@ -242,3 +242,37 @@ def test_mdconvert_1():
     eq(t.xyz, t2.xyz)
     eq(t.topology, t2.topology)
 
+
+
+def test_mdconvert_pipeline():
+    "Check that the pipelined conversion of several files works"
+    from mdtraj.scripts import mdconvert
+
+    topology_fn = os.path.join(staging_dir, 'topology.pdb')
+    TRAJ[0].save(topology_fn)
+    inputs = []
+    for i, fn in enumerate(['traj1.dcd', 'traj2.dcd', 'traj3.dcd']):
+        inputs.append(os.path.join(staging_dir, fn))
+        TRAJ[i:].save(inputs[-1])
+
+    for flags in [['-p'], ['-j', '2'], ['-j', '5', '-s', '2']]:
+        out = os.path.join(staging_dir, 'pipeline.h5')
+        args = mdconvert.parse_args(inputs + ['-o', out, '-t', topology_fn,
+                                             '-c', '4', '-f'] + flags)
+        mdconvert.main(args, verbose=False)
+        stride = 2 if '-s' in flags else 1
+        expected = [md.load(fn, top=topology_fn, stride=stride)
+                    for fn in inputs]
+        expected = expected[0].join(expected[1:])
+        result = md.load(out)
+        eq(result.xyz, expected.xyz, decimal=5)
+        eq(result.unitcell_vectors, expected.unitcell_vectors, decimal=4)
+        os.unlink(out)
+
+    # errors in the reader threads are raised in the main thread
+    atom_indices_fn = os.path.join(staging_dir, 'bad_atom_indices.dat')
+    np.savetxt(atom_indices_fn, [0, 100], fmt='%d')
+    out = os.path.join(staging_dir, 'pipeline.xtc')
+    args = mdconvert.parse_args(inputs + ['-o', out, '-j', '2', '-f',
+                                          '-a', atom_indices_fn])
+    assert_raises(ValueError, mdconvert.main, args, verbose=False)
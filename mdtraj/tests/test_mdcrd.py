@@ -133,3 +133,15 @@ def test_atom_indices_1():
     t1 = md.load(get_fn('frame0.mdcrd'), top=top, atom_indices=atom_indices)
 
     eq(t0.xyz[:, atom_indices], t1.xyz)
+
+def test_len_and_seek_from_end():
+    with MDCRDTrajectoryFile(get_fn('frame0.mdcrdbox'), n_atoms=22,
+                             cache_offsets=False) as f:
+        xyz, box = f.read()
+    with MDCRDTrajectoryFile(get_fn('frame0.mdcrdbox'), n_atoms=22,
+                             cache_offsets=False) as f:
+        eq(len(f), len(xyz))
+        f.seek(-3, 2)
+        xyz2, box2 = f.read()
+    eq(xyz[-3:], xyz2)
+    eq(box[-3:], box2)
@@ -24,7 +24,7 @@
 import numpy as np
 
 import mdtraj as md
-from mdtraj.testing import get_fn, eq
+from mdtraj.testing import get_fn, eq, assert_raises
 from mdtraj.geometry.alignment import rmsd_qcp, compute_translation_and_rotation
 
 
@@ -188,3 +188,42 @@ def test_rmsd_ref_ainds():
 #         translation, rotation = compute_translation_and_rotation(t.xyz[0], t.xyz[i])
 #         eq(rot[i], rotation)
 #         eq(float(rmsd_qcp(t.xyz[0], t.xyz[i])), float(rmsd[i]), decimal=3)
+
+
+def test_rmsd_matrix():
+    t1 = md.load(get_fn('traj.h5'), stride=10)
+    t2 = md.load(get_fn('traj.h5'), stride=7)
+    atom_indices = np.arange(0, t1.n_atoms, 2)
+
+    for parallel in [True, False]:
+        for indices in [None, atom_indices]:
+            m = md.rmsd_matrix(t1, t2, atom_indices=indices, parallel=parallel)
+            eq(m.shape, (t1.n_frames, t2.n_frames))
+            for j in range(t2.n_frames):
+                eq(m[:, j], md.rmsd(t1, t2, j, atom_indices=indices), decimal=4)
+
+            m = md.rmsd_matrix(t1, atom_indices=indices, parallel=parallel)
+            for j in range(t1.n_frames):
+                eq(m[:, j], md.rmsd(t1, t1, j, atom_indices=indices), decimal=4)
+
+            # scipy's squareform order, without the diagonal
+            c = md.rmsd_matrix(t1, atom_indices=indices, condensed=True, parallel=parallel)
+            eq(c, m[np.triu_indices(t1.n_frames, 1)])
+
+
+def test_rmsd_matrix_out():
+    t = md.load(get_fn('traj.h5'), stride=10)
+    ref = md.rmsd_matrix(t)
+
+    # written in place
+    out = np.zeros((t.n_frames, t.n_frames), dtype=np.float32)
+    assert md.rmsd_matrix(t, out=out) is out
+    eq(out, ref)
+
+    # written in blocks of rows
+    out = np.zeros((t.n_frames, t.n_frames), dtype=np.float64)
+    md.rmsd_matrix(t, out=out)
+    eq(out, ref.astype(np.float64))
+
+    assert_raises(ValueError, lambda: md.rmsd_matrix(t, out=np.zeros(3, dtype=np.float32)))
+    assert_raises(ValueError, lambda: md.rmsd_matrix(t, t, condensed=True))
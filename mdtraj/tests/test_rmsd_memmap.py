@@ -52,3 +52,28 @@ def test_2():
         del traj
         os.unlink(fn)
         os.rmdir(dir)
+
+
+def test_rmsd_matrix():
+    try:
+        dir = tempfile.mkdtemp()
+        fn = os.path.join(dir, 'temp.dat')
+        traj = md.load(get_fn('frame0.h5'), stride=5)
+        n = traj.n_frames
+
+        out = np.memmap(fn, dtype=np.float32, mode='w+', shape=(n, n))
+        md.rmsd_matrix(traj, out=out)
+        out.flush()
+        np.testing.assert_array_equal(np.fromfile(fn, dtype=np.float32).reshape(n, n),
+                                      md.rmsd_matrix(traj))
+        del out
+
+        out = np.memmap(fn, dtype=np.float32, mode='w+', shape=(n * (n - 1) // 2,))
+        md.rmsd_matrix(traj, out=out, condensed=True)
+        np.testing.assert_array_equal(out, md.rmsd_matrix(traj, condensed=True))
+        del out
+
+    finally:
+        del traj
+        os.unlink(fn)
+        os.rmdir(dir)
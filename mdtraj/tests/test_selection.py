@@ -308,3 +308,32 @@ def test_literal():
     eq(name_og1_0, ref_og1)
     eq(name_og1_1, ref_og1)
     eq(name_og1_2, ref_og1)
+
+
+def test_vectorized():
+    selections = [
+        "all", "none", "protein and name CA", "not water", "backbone",
+        "sidechain", "resname ALA or resname 'HOH'", "resSeq 3 to 7",
+        "resid > 10 and mass < 14", "element H and not protein",
+        "(name =~ 'H.*') and chainid 0", "type O", "index 5 to 40",
+        "resSeq != 5", "n_bonds 2", "rescode A", "name 5",
+    ]
+    for top in [ala.topology, gbp.topology, tt]:
+        for selection in selections:
+            expr = parse_selection(selection).expr
+            ref = [a.index for a in top.atoms if expr(a)]
+            eq(top.select(selection), np.array(ref, dtype=int))
+
+
+def test_selection_cache():
+    top = make_test_topology()
+    assert parse_selection("name CA") is parse_selection("name CA")
+    eq(top.select("element H"), np.array([1, 3, 4]))
+
+    # modifying the topology must not use stale attributes
+    top.atom(0).element = mdtraj.element.hydrogen
+    eq(top.select("element H"), np.array([0, 1, 3, 4]))
+    top.residue(1).name = "ALA"
+    eq(top.select("resname ALA"), np.arange(5))
+    top.add_atom("CB", mdtraj.element.carbon, top.residue(0))
+    eq(top.select("name CB"), np.array([5]))
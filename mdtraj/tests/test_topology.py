@@ -186,6 +186,16 @@ def test_n_bonds():
             assert atom.n_bonds in [1, 2]
 
 
+def test_n_bonds_after_add_bond():
+    top = md.load(get_fn('2EQQ.pdb')).top
+    a, b = top.atom(0), top.atom(10)
+    n_a, n_b = a.n_bonds, b.n_bonds
+    top.add_bond(a, b)
+    eq(a.n_bonds, n_a + 1)
+    eq(b.n_bonds, n_b + 1)
+    eq(top.atom(5).n_bonds, sum(5 in bond for bond in top._bonds.tolist()))
+
+
 def test_load_unknown_topology():
     try:
         md.load(get_fn('frame0.dcd'), top=get_fn('frame0.dcd'))
@@ -217,3 +227,57 @@ def test_subset():
      t1 = md.load(get_fn('2EQQ.pdb')).top
      t2 = t1.subset([1,2,3])
      assert t2.n_residues == 1
+
+
+def test_slice_shares_topology():
+    traj = md.load(get_fn('2EQQ.pdb'))
+    top = traj.topology
+    n_bonds = top.n_bonds
+    frame = traj[0]
+    assert frame.topology is not top
+    assert frame.topology._atom_name is top._atom_name
+    eq(frame.topology, top)
+
+    # adding to the slice's topology copies it first
+    chain = frame.topology.chain(0)
+    residue = frame.topology.add_residue('HOH', chain)
+    frame.topology.add_atom('O', md.element.oxygen, residue)
+    frame.topology.add_bond(frame.topology.atom(0), frame.topology.atom(5))
+    assert frame.topology._atom_name is not top._atom_name
+    assert frame.topology.chain(0).n_residues == top.chain(0).n_residues + 1
+    eq(frame.topology.n_atoms, top.n_atoms + 1)
+    eq(frame.topology.n_bonds, n_bonds + 1)
+    eq(top.n_bonds, n_bonds)
+    eq(frame.topology.select('water'), np.array([top.n_atoms]))
+    eq(len(top.select('water')), 0)
+
+    # and so does adding to the original's
+    joined = traj.join(traj)
+    top.add_bond(top.atom(0), top.atom(5))
+    eq(joined.topology.n_bonds, n_bonds)
+    eq(top.n_bonds, n_bonds + 1)
+
+
+def test_array_topology():
+    top = md.load(get_fn('2EQQ.pdb')).topology
+    atoms, bonds = top.to_dataframe()
+    eq(md.Topology.from_dataframe(atoms, bonds), top)
+    eq(top.subset(range(top.n_atoms)), top)
+
+    joined = top.join(top)
+    eq(joined.n_atoms, 2 * top.n_atoms)
+    eq(joined.n_bonds, 2 * top.n_bonds)
+    eq(joined.subset(range(top.n_atoms)), top)
+
+    # atoms, residues and chains are views, created on demand
+    assert top.atom(3) == top.atom(3)
+    assert top.residue(1) == top.residue(1)
+    assert top.residue(1) != top.residue(2)
+    assert top.atom(3).residue == top.residue(0)
+    assert top.chain(0) == top.residue(1).chain
+
+    copy = top.copy()
+    copy.residue(0).name = 'XXX'
+    eq(copy.residue(0).name, 'XXX')
+    assert top.residue(0).name != 'XXX'
+    eq(len(copy.select('resname XXX')), top.residue(0).n_atoms)
@@ -194,6 +194,72 @@ def test_load():
         yield lambda: eq(t3.n_frames, t2.n_frames)
 
 
+def test_load_parallel():
+    # the threaded (xtc, dcd, trr) and multiprocess (h5, lammpstrj) loaders
+    # must give the same result as loading the files one at a time
+    filenames = ["frame0.xtc", "frame0.trr", "frame0.dcd", "traj.h5",
+                 "frame0.lammpstrj"]
+    num_block = 3
+    for filename in filenames:
+        for stride in [None, 3]:
+            fns = [get_fn(filename) for i in xrange(num_block)]
+            t1 = md.load(fns, top=nat, stride=stride, atom_indices=[0, 1, 5])
+            t2 = md.load(fns, top=nat, stride=stride, atom_indices=[0, 1, 5], n_jobs=2)
+            def f():
+                eq(t1.xyz, t2.xyz)
+                eq(t1.time, t2.time)
+                eq(t1.unitcell_vectors, t2.unitcell_vectors)
+                eq(t1.topology, t2.topology)
+            yield f
+
+
+def test_load_parallel_overlapping():
+    t = md.load(get_fn('frame0.xtc'), top=nat)
+    with enter_temp_directory():
+        t[:10].save('a.xtc')
+        t[9:20].save('b.xtc')
+        t[20:30].save('c.xtc')
+        t1 = md.load(['a.xtc', 'b.xtc', 'c.xtc'], top=nat, discard_overlapping_frames=True)
+        t2 = md.load(['a.xtc', 'b.xtc', 'c.xtc'], top=nat, discard_overlapping_frames=True, n_jobs=-1)
+    eq(t1.n_frames, 30)
+    eq(t1.xyz, t2.xyz)
+    eq(t1.time, t2.time)
+
+
+def test_load_parallel_read_into():
+    # the xtc and dcd files are decoded straight into the result, without a
+    # per-file trajectory to copy it from
+    try:
+        import tracemalloc
+    except ImportError:
+        raise SkipTest('tracemalloc is not available')
+    t = md.load(get_fn('frame0.xtc'), top=nat)
+    t = md.Trajectory(np.tile(t.xyz, (1, 50, 1)), topology=None, time=t.time,
+                      unitcell_lengths=t.unitcell_lengths,
+                      unitcell_angles=t.unitcell_angles)
+    top = md.Topology()
+    residue = top.add_residue('A', top.add_chain())
+    for _ in range(t.n_atoms):
+        top.add_atom('C', element.carbon, residue)
+    t.topology = top
+    with enter_temp_directory():
+        for extension in ['xtc', 'dcd']:
+            fns = ['%d.%s' % (i, extension) for i in range(3)]
+            for fn in fns:
+                t.save(fn)
+            expected = md.load(fns, top=top)
+            tracemalloc.start()
+            try:
+                value = md.load(fns, top=top, n_jobs=3)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            eq(value.xyz, expected.xyz)
+            eq(value.time, expected.time)
+            eq(value.unitcell_vectors, expected.unitcell_vectors)
+            assert peak < 1.5 * expected.xyz.nbytes
+
+
 def test_hdf5_0():
     t = md.load(get_fn('traj.h5'))
     t2 = md.load(get_fn('native.pdb'))
@@ -534,6 +600,33 @@ def test_iterload_skip():
                 eq(t_ref.topology, t.topology, err_msg=err_msg % (file, cs, skip))
 
 
+def test_iterload_reuse_buffer():
+    files = ['frame0.nc', 'frame0.h5', 'frame0.xtc', 'frame0.trr',
+             'frame0.dcd', 'frame0.dtr']
+    atom_indices = np.array([0, 3, 4, 10])
+
+    for file in files:
+        for stride, skip, indices in [(1, 0, None), (2, 5, None), (1, 3, atom_indices)]:
+            t_ref = md.load(get_fn(file), top=get_fn('native.pdb'),
+                            atom_indices=indices)[skip::stride]
+            chunks = []
+            for chunk in md.iterload(get_fn(file), top=get_fn('native.pdb'),
+                                     chunk=10, stride=stride, skip=skip,
+                                     atom_indices=indices, reuse_buffer=True):
+                if chunks:
+                    # all of the chunks are read into the same arrays
+                    assert np.may_share_memory(chunk.xyz, chunks[0][1])
+                    assert chunk.topology is chunks[0][2]
+                chunks.append((chunk[:], chunk.xyz, chunk.topology))
+
+            t = chunks[0][0].join([c for c, _, _ in chunks[1:]])
+            err_msg = 'failed for file %s with stride %d and skip %d' % (file, stride, skip)
+            eq(t_ref.xyz, t.xyz, err_msg=err_msg)
+            eq(t_ref.time, t.time, err_msg=err_msg)
+            eq(t_ref.unitcell_lengths, t.unitcell_lengths, err_msg=err_msg)
+            eq(t_ref.unitcell_angles, t.unitcell_angles, err_msg=err_msg)
+
+
 def test_save_load():
     # this cycles all the known formats you can save to, and then tries
     # to reload, using just a single-frame file.
@@ -75,6 +75,26 @@ def test_read_stride_2():
     yield lambda: eq(time[::3], time3)
 
 
+def test_read_stride_3():
+    "trr read stride in chunks that don't divide evenly, with atom_indices"
+    with TRRTrajectoryFile(get_fn('frame0.trr')) as f:
+         xyz, time, step, box, lambd = f.read()
+    with TRRTrajectoryFile(get_fn('frame0.trr'), min_chunk_size=7, chunk_size_multiplier=0.01) as f:
+         xyz3, time3, step3, box3, lambd3 = f.read(stride=4, atom_indices=[0, 5])
+    yield lambda: eq(xyz[::4, [0, 5]], xyz3)
+    yield lambda: eq(step[::4], step3)
+    yield lambda: eq(box[::4], box3)
+    yield lambda: eq(time[::4], time3)
+
+    with TRRTrajectoryFile(get_fn('frame0.trr')) as f:
+        xyz4 = f.read(n_frames=10, stride=3)[0]
+        tell = f.tell()
+        xyz5 = f.read(n_frames=10, stride=3)[0]
+    yield lambda: eq(tell, 10)
+    yield lambda: eq(xyz[0:10:3], xyz4)
+    yield lambda: eq(xyz[10:20:3], xyz5)
+
+
 
 def test_15():
     "Write data and read it back"
@@ -78,6 +78,23 @@ def test_read_stride_2():
     yield lambda: eq(box, iofile['box'][::3])
     yield lambda: eq(time, iofile['time'][::3])
 
+def test_read_stride_3():
+    "read xtc with stride in chunks that don't divide evenly, with atom_indices"
+    iofile = io.loadh(get_fn('frame0.xtc.h5'), deferred=False)
+    with XTCTrajectoryFile(fn_xtc, min_chunk_size=7, chunk_size_multiplier=0.01) as f:
+         xyz, time, step, box = f.read(stride=4, atom_indices=[0, 5])
+    yield lambda: eq(xyz, iofile['xyz'][::4, [0, 5]])
+    yield lambda: eq(step, iofile['step'][::4])
+    yield lambda: eq(time, iofile['time'][::4])
+
+    with XTCTrajectoryFile(fn_xtc) as f:
+        xyz1 = f.read(n_frames=10, stride=3)[0]
+        tell = f.tell()
+        xyz2 = f.read(n_frames=10, stride=3)[0]
+    yield lambda: eq(tell, 10)
+    yield lambda: eq(xyz1, iofile['xyz'][0:10:3])
+    yield lambda: eq(xyz2, iofile['xyz'][10:20:3])
+
 
 def test_read_atomindices_1():
     iofile = io.loadh(get_fn('frame0.xtc.h5'), deferred=False)
@@ -257,3 +274,78 @@ def test_ragged_2():
     with XTCTrajectoryFile(temp, 'w', force_overwrite=True) as f:
         f.write(xyz, time=time, box=box)
         assert_raises(ValueError, lambda: f.write(xyz))
+
+
+def test_seek_end():
+    reference = XTCTrajectoryFile(get_fn('frame0.xtc')).read()[0]
+    with XTCTrajectoryFile(get_fn('frame0.xtc')) as f:
+        f.seek(-1, 2)
+        eq(f.tell(), len(reference) - 1)
+        eq(f.read(1)[0][0], reference[-1])
+
+        f.seek(0, 2)
+        eq(f.tell(), len(reference))
+        eq(len(f.read(1)[0]), 0)
+
+
+def test_offsets():
+    # the offset index is found by scanning the frame headers; check it
+    # against reading the frames one at a time
+    with XTCTrajectoryFile(get_fn('frame0.xtc')) as f:
+        offsets = f.offsets
+        n_frames = len(f)
+    eq(len(offsets), n_frames)
+    eq(int(offsets[0]), 0)
+    assert np.all(np.diff(offsets) > 0)
+
+    with XTCTrajectoryFile(get_fn('frame0.xtc'), cache_offsets=False) as f:
+        for i in [0, 1, 51, n_frames - 1]:
+            f.seek(i)
+            xyz = f.read(1)[0]
+            with XTCTrajectoryFile(get_fn('frame0.xtc'), cache_offsets=False) as g:
+                eq(g.read(i + 1)[0][-1:], xyz)
+
+
+def test_offsets_cache():
+    from mdtraj.utils.offsets import offsets_filename, load_offsets
+    xyz = np.around(np.random.randn(100, 20, 3), 3).astype(np.float32)
+    with XTCTrajectoryFile(temp, 'w') as f:
+        f.write(xyz)
+
+    # nothing is written next to the file if it's not wanted
+    with XTCTrajectoryFile(temp, cache_offsets=False) as f:
+        eq(len(f), 100)
+    assert not os.path.exists(offsets_filename(temp))
+
+    with XTCTrajectoryFile(temp) as f:
+        eq(len(f), 100)
+        offsets = f.offsets
+    assert os.path.exists(offsets_filename(temp))
+    eq(load_offsets(temp, key=20), offsets)
+
+    # rewriting the file invalidates the cached index
+    with XTCTrajectoryFile(temp, 'w') as f:
+        f.write(xyz[:50])
+    with XTCTrajectoryFile(temp) as f:
+        eq(len(f), 50)
+        f.seek(49)
+        eq(f.read(1)[0], xyz[49:50], decimal=3)
+    os.unlink(offsets_filename(temp))
+
+
+def test_offsets_cache_not_writable():
+    # if the index can't be saved, it is silently rebuilt each time
+    from mdtraj.utils.offsets import offsets_filename
+    xyz = np.around(np.random.randn(10, 20, 3), 3).astype(np.float32)
+    with XTCTrajectoryFile(temp, 'w') as f:
+        f.write(xyz)
+    # a directory in the way of the index can't be written over, even by root
+    os.mkdir(offsets_filename(temp))
+    try:
+        for _ in range(2):
+            with XTCTrajectoryFile(temp) as f:
+                eq(len(f), 10)
+                f.seek(7)
+                eq(f.read(1)[0], xyz[7:8], decimal=3)
+    finally:
+        os.rmdir(offsets_filename(temp))
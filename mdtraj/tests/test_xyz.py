@@ -101,3 +101,25 @@ def test_seek():
         f.seek(4, 1)
         xyz8 = f.read(n_frames=1)
         eq(reference.xyz[8], xyz8[0]/10)
+
+def test_len_and_seek_from_end():
+    with XYZTrajectoryFile(get_fn('frame0.xyz'), cache_offsets=False) as f:
+        xyz = f.read()
+    with XYZTrajectoryFile(get_fn('frame0.xyz'), cache_offsets=False) as f:
+        eq(len(f), len(xyz))
+        f.seek(-3, 2)
+        eq(f.read(), xyz[-3:])
+
+def test_seek_crlf_and_non_utf8():
+    # the frame offsets are byte offsets, so seeking must not depend on how
+    # the lines would be decoded as text
+    frame = b'2\r\ncomment \xe9\r\nC 1.0 2.0 3.0\r\nO 4.0 5.0 6.0\r\n'
+    with open(temp, 'wb') as f:
+        for i in range(4):
+            f.write(frame.replace(b'1.0', str(i).encode('ascii')))
+    with XYZTrajectoryFile(temp) as f:
+        eq(len(f), 4)
+        f.seek(2)
+        eq(f.read(n_frames=1)[0], np.array([[2.0, 2.0, 3.0], [4.0, 5.0, 6.0]]))
+        f.seek(-3, 2)
+        eq(f.read()[:, 0, 0], np.array([1.0, 2.0, 3.0]))
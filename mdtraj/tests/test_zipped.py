@@ -5,8 +5,10 @@ import gzip
 import bz2
 import tempfile
 import unittest
-from mdtraj.testing import eq
+import mdtraj as md
+from mdtraj.testing import eq, get_fn
 from mdtraj.utils import open_maybe_zipped
+from mdtraj.utils.zipped import unzipped
 
 
 class test_open_maybe_zipped(unittest.TestCase):
@@ -43,3 +45,35 @@ class test_open_maybe_zipped(unittest.TestCase):
             f.write(u'COOKIE')
         with bz2.BZ2File(fn, 'r') as f:
             eq(f.read().decode('utf-8'), u'COOKIE')
+
+    def test_read_gz_threaded(self):
+        fn = os.path.join(self.tmpdir, 'read_threaded.gz')
+        lines = [u'COOKIE %d\n' % i for i in range(100000)]
+        with gzip.GzipFile(fn, 'w') as f:
+            f.write(u''.join(lines).encode('utf-8'))
+        with open_maybe_zipped(fn, 'r', threaded=True) as f:
+            eq(f.readline(), lines[0])
+            eq(f.read(), u''.join(lines[1:]))
+        # closing before the end stops the background thread
+        f = open_maybe_zipped(fn, 'r', threaded=True)
+        eq(f.readline(), lines[0])
+        f.close()
+
+    def test_unzipped(self):
+        fn = os.path.join(self.tmpdir, 'unzipped.dat.bz2')
+        with bz2.BZ2File(fn, 'w') as f:
+            f.write('COOKIE'.encode('utf-8'))
+        with unzipped(fn) as uncompressed:
+            assert uncompressed.endswith('.dat')
+            with open(uncompressed, 'rb') as f:
+                eq(f.read(), 'COOKIE'.encode('utf-8'))
+        assert not os.path.exists(uncompressed)
+
+    def test_load_compressed_xtc(self):
+        fn = os.path.join(self.tmpdir, 'frame0.xtc.gz')
+        with open(get_fn('frame0.xtc'), 'rb') as f:
+            with gzip.GzipFile(fn, 'w') as gz_f:
+                gz_f.write(f.read())
+        t1 = md.load(fn, top=get_fn('native.pdb'))
+        t2 = md.load(get_fn('frame0.xtc'), top=get_fn('native.pdb'))
+        eq(t1.xyz, t2.xyz)
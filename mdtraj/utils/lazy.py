@@ -0,0 +1,103 @@
+##############################################################################
+# MDTraj: A Python Library for Loading, Saving, and Manipulating
+#         Molecular Dynamics Trajectories.
+# Copyright 2012-2016 Stanford University and the Authors
+#
+# Authors: Robert McGibbon
+# Contributors:
+#
+# MDTraj is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with MDTraj. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+
+from __future__ import print_function, division
+import numbers
+import numpy as np
+
+__all__ = ['LazyArray']
+
+
+class LazyArray(object):
+    """A per-frame array, like the coordinates in a trajectory, that is
+    computed from the frames of another array only when it is needed.
+
+    The base array is typically a ``np.memmap`` of a trajectory file, in the
+    file's units and layout. Selecting frames from a LazyArray (with a slice,
+    an array of indices or a boolean mask) selects the same frames from the
+    base array, which for a memmap doesn't read anything from disk. The
+    transformation, e.g. the conversion from angstroms to nanometers, is
+    only done when the LazyArray is converted to a numpy array, and then
+    only for the selected frames.
+
+    Parameters
+    ----------
+    base : np.ndarray, shape=(n_frames, ...)
+        The array that the values are computed from.
+    transform : callable
+        A function that takes the base array of some frames and returns the
+        values for those frames, as an array of shape
+        ``(n_frames,) + row_shape``.
+    row_shape : tuple
+        The shape of the values in each frame.
+    dtype : np.dtype, default=np.float32
+        The dtype of the values.
+    """
+    def __init__(self, base, transform, row_shape, dtype=np.float32):
+        self.base = base
+        self.transform = transform
+        self.row_shape = tuple(row_shape)
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def shape(self):
+        return (len(self.base),) + self.row_shape
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __len__(self):
+        return len(self.base)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            if len(key) == 0 or key[0] is Ellipsis:
+                return self.materialize()[key]
+            # select the frames first, so that only those are computed
+            frames = self[key[0]]
+            if isinstance(frames, LazyArray):
+                return frames.materialize()[(slice(None),) + key[1:]]
+            return frames[key[1:]]
+        if isinstance(key, numbers.Integral):
+            return self._compute(self.base[[key]])[0]
+        return LazyArray(self.base[key], self.transform, self.row_shape,
+                         self.dtype)
+
+    def __array__(self, dtype=None):
+        values = self.materialize()
+        if dtype is not None:
+            values = values.astype(dtype, copy=False)
+        return values
+
+    def _compute(self, base):
+        return np.ascontiguousarray(self.transform(base), dtype=self.dtype)
+
+    def materialize(self):
+        """Compute the values of all of the frames.
+
+        Returns
+        -------
+        values : np.ndarray, shape=self.shape
+            A new C-contiguous array.
+        """
+        return self._compute(self.base).reshape(self.shape)
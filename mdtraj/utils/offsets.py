@@ -0,0 +1,226 @@
+##############################################################################
+# MDTraj: A Python Library for Loading, Saving, and Manipulating
+#         Molecular Dynamics Trajectories.
+# Copyright 2012-2015 Stanford University and the Authors
+#
+# Authors: Robert McGibbon
+# Contributors:
+#
+# MDTraj is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with MDTraj. If not, see <http://www.gnu.org/licenses/>.
+##############################################################################
+"""Sidecar cache of the byte offsets at which each frame of a trajectory
+file begins.
+
+Formats that do not store frames at fixed-size positions (XTC, text
+trajectories) need to scan the whole file once to support random access.
+The result of that scan can be saved next to the trajectory as a hidden
+``.<basename>.offsets.npz`` file, tagged with the size and modification time
+of the trajectory so that a stale index is never used. The XTC reader does
+this by default; the text readers only when they are opened with
+``cache_offsets=True``. If the index can't be written, it is just rebuilt
+the next time the file is opened.
+"""
+
+##############################################################################
+# imports
+##############################################################################
+
+from __future__ import print_function, division
+import os
+import numpy as np
+
+# Files are scanned in chunks of this many bytes
+_SCAN_CHUNK_SIZE = 1 << 24
+
+__all__ = ['offsets_filename', 'load_offsets', 'save_offsets',
+           'scan_line_offsets', 'scan_marker_offsets']
+
+##############################################################################
+# functions
+##############################################################################
+
+
+def offsets_filename(filename):
+    """Path of the sidecar offset index for a trajectory file
+
+    Parameters
+    ----------
+    filename : str
+        Path to the trajectory file.
+
+    Returns
+    -------
+    sidecar : str
+        Path to the (possibly nonexistent) offset index.
+    """
+    dirname, basename = os.path.split(os.path.abspath(filename))
+    return os.path.join(dirname, '.%s.offsets.npz' % basename)
+
+
+def _file_signature(filename):
+    st = os.stat(filename)
+    return np.array([st.st_size, int(st.st_mtime * 1e6)], dtype=np.int64)
+
+
+def load_offsets(filename, key=None):
+    """Load the cached frame offsets for a trajectory file, if they are valid
+
+    Parameters
+    ----------
+    filename : str
+        Path to the trajectory file.
+    key : str, optional
+        Extra string that must match the one the index was saved with,
+        e.g. to distinguish indices built with different parser settings.
+
+    Returns
+    -------
+    offsets : np.ndarray, dtype=int64, or None
+        The byte offset of the start of each frame, or None if no index
+        exists or the file has changed since the index was written.
+    """
+    sidecar = offsets_filename(filename)
+    if not os.path.exists(sidecar):
+        return None
+    try:
+        with np.load(sidecar) as data:
+            if not np.array_equal(data['signature'], _file_signature(filename)):
+                return None
+            if str(data['key']) != str(key):
+                return None
+            return np.array(data['offsets'], dtype=np.int64)
+    except Exception:
+        # a corrupt or truncated index is treated as a missing one
+        return None
+
+
+def save_offsets(filename, offsets, key=None):
+    """Save the frame offsets for a trajectory file to its sidecar index
+
+    Failure to write the index (e.g. because the directory is read-only)
+    is not an error; the index will just be rebuilt next time.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the trajectory file.
+    offsets : np.ndarray, dtype=int64
+        The byte offset of the start of each frame.
+    key : str, optional
+        Extra string stored alongside the offsets. See `load_offsets`.
+
+    Returns
+    -------
+    success : bool
+        Whether the index was written.
+    """
+    sidecar = offsets_filename(filename)
+    try:
+        with open(sidecar, 'wb') as f:
+            np.savez(f, offsets=np.asarray(offsets, dtype=np.int64),
+                     signature=_file_signature(filename),
+                     key=np.array(str(key)))
+    except (IOError, OSError):
+        return False
+    return True
+
+
+def scan_line_offsets(filename, lines_per_frame, first_line=0):
+    """Find the byte offsets of the frames of a text file in which every
+    frame has the same number of lines
+
+    The file is read in large chunks and its newlines are found with numpy,
+    so the scan runs at close to the speed of the disk.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the trajectory file.
+    lines_per_frame : int
+        The number of lines in each frame.
+    first_line : int, default=0
+        The (zero-based) line on which the first frame begins, e.g. 1 if the
+        file starts with a title line.
+
+    Returns
+    -------
+    offsets : np.ndarray, dtype=int64
+        The byte offset of the start of each complete frame.
+    """
+    starts = []
+    # the number of lines before the chunk, and the offset of its start
+    n_lines, position = 0, 0
+    last = b'\n'
+    with open(filename, 'rb') as f:
+        while True:
+            chunk = f.read(_SCAN_CHUNK_SIZE)
+            if not chunk:
+                break
+            newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+            # line `n_lines + i + 1` starts after the i-th newline
+            next_lines = n_lines + np.arange(1, len(newlines) + 1)
+            is_start = ((next_lines - first_line) % lines_per_frame == 0) & \
+                (next_lines >= first_line)
+            starts.append(position + newlines[is_start] + 1)
+            n_lines += len(newlines)
+            position += len(chunk)
+            last = chunk[-1:]
+    if last != b'\n':
+        # the last line has no newline
+        n_lines += 1
+
+    if first_line == 0:
+        starts.insert(0, np.zeros(1, dtype=np.int64))
+    offsets = np.concatenate(starts).astype(np.int64) if starts else \
+        np.zeros(0, dtype=np.int64)
+    n_frames = max(n_lines - first_line, 0) // lines_per_frame
+    return offsets[:n_frames]
+
+
+def scan_marker_offsets(filename, marker):
+    """Find the byte offsets of the frames of a text file in which every
+    frame begins with a line that starts with `marker`
+
+    Parameters
+    ----------
+    filename : str
+        Path to the trajectory file.
+    marker : bytes
+        The start of the first line of each frame, e.g. b'ITEM: TIMESTEP'.
+
+    Returns
+    -------
+    offsets : np.ndarray, dtype=int64
+        The byte offset of the start of each frame.
+    """
+    offsets = []
+    # the chunks overlap by the length of the marker and the preceding
+    # newline, so that markers that straddle two chunks are found
+    overlap = len(marker)
+    position = 0
+    tail = b'\n'
+    with open(filename, 'rb') as f:
+        while True:
+            chunk = f.read(_SCAN_CHUNK_SIZE)
+            if not chunk:
+                break
+            data = tail + chunk
+            base = position - len(tail)
+            index = data.find(b'\n' + marker)
+            while index != -1:
+                offsets.append(base + index + 1)
+                index = data.find(b'\n' + marker, index + 1)
+            position += len(chunk)
+            tail = data[-overlap:]
+    return np.array(offsets, dtype=np.int64)
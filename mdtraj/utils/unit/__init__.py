@@ -170,3 +170,12 @@ def in_units_of(quantity, units_in, units_out, inplace=False):
         return quantity
     return quantity * factor
 
+
+
+def _angstroms_to_nanometers(value):
+    """Convert an array of coordinates or lengths from angstroms to
+    nanometers, as float32, for the readers of the formats stored in
+    angstroms. The conversion is in place when `value` is already a
+    writable float32 array."""
+    return in_units_of(np.asarray(value, dtype=np.float32), 'angstroms',
+                       'nanometers', inplace=True)
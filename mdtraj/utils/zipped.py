@@ -4,13 +4,26 @@ import os
 import io
 import bz2
 import gzip
-from mdtraj.utils.six import PY2, StringIO
+import shutil
+import tempfile
+import threading
+from mdtraj.utils.six import PY2
+from mdtraj.utils.six.moves import queue
 
+# The size of the chunks in which files are decompressed
+_CHUNK_SIZE = 1 << 20
+# The number of decompressed chunks that a background thread may get ahead
+# of the reader
+_QUEUE_SIZE = 4
 
-def open_maybe_zipped(filename, mode, force_overwrite=True):
+
+def open_maybe_zipped(filename, mode, force_overwrite=True, threaded=False):
     """Open a file in text (not binary) mode, transparently handling
     .gz or .bz2 compresssion, with utf-8 encoding.
 
+    Compressed files are decompressed as they are read, so only a small part
+    of the file is held in memory at any time, regardless of its size.
+
     Parameters
     ----------
     filename : str
@@ -21,6 +34,10 @@ def open_maybe_zipped(filename, mode, force_overwrite=True):
     force_overwrite : bool, default=True
         If 'w', should we overwrite the file if something with `filename`
         already exists?
+    threaded : bool, default=False
+        If 'r' and the file is compressed, decompress it in a background
+        thread, ahead of the reader. zlib and bz2 release the GIL, so this
+        overlaps decompression with parsing.
 
     Returns
     -------
@@ -29,12 +46,14 @@ def open_maybe_zipped(filename, mode, force_overwrite=True):
     """
     _, extension = os.path.splitext(filename.lower())
     if mode == 'r':
-        if extension == '.gz':
-            with gzip.GzipFile(filename, 'r') as gz_f:
-                return StringIO(gz_f.read().decode('utf-8'))
-        elif extension == '.bz2':
-            with bz2.BZ2File(filename, 'r') as bz2_f:
-                return StringIO(bz2_f.read().decode('utf-8'))
+        if extension in ('.gz', '.bz2'):
+            binary_fh = _open_compressed(filename, extension)
+            if PY2:
+                return binary_fh
+            if threaded:
+                binary_fh = io.BufferedReader(_ThreadedReader(binary_fh),
+                                              buffer_size=_CHUNK_SIZE)
+            return io.TextIOWrapper(binary_fh, encoding='utf-8')
         else:
             return open(filename, 'r')
     elif mode == 'w':
@@ -54,3 +73,131 @@ def open_maybe_zipped(filename, mode, force_overwrite=True):
             return open(filename, 'w')
     else:
         raise ValueError('Invalid mode "%s"' % mode)
+
+
+def is_zipped(filename):
+    """Whether a filename has a .gz or .bz2 extension
+
+    Parameters
+    ----------
+    filename : str
+        Path to the file.
+
+    Returns
+    -------
+    zipped : bool
+        True if the file is compressed, judging by its extension.
+    """
+    return os.path.splitext(filename.lower())[1] in ('.gz', '.bz2')
+
+
+class unzipped(object):
+    """Context manager for the path of an uncompressed copy of a file.
+
+    Readers of binary formats, like XTC and DCD, open files by name, so
+    they can't read a compressed file as it is decompressed. Instead, if
+    `filename` ends in .gz or .bz2, it is decompressed in chunks into a
+    temporary file, which is removed on exit. Otherwise, `filename` itself
+    is used.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the file, which may be compressed.
+
+    Examples
+    --------
+    >>> with unzipped('traj.xtc.gz') as fn:
+    ...     traj = md.load_xtc(fn, top='top.pdb')
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self._temp = None
+
+    def __enter__(self):
+        if not is_zipped(self.filename):
+            return self.filename
+
+        base, extension = os.path.splitext(self.filename)
+        fd, self._temp = tempfile.mkstemp(suffix=os.path.splitext(base)[1])
+        try:
+            with os.fdopen(fd, 'wb') as out, \
+                    _open_compressed(self.filename, extension.lower()) as f:
+                shutil.copyfileobj(f, out, _CHUNK_SIZE)
+        except BaseException:
+            self._remove()
+            raise
+        return self._temp
+
+    def __exit__(self, ty, val, tb):
+        self._remove()
+        return False
+
+    def _remove(self):
+        if self._temp is not None:
+            os.unlink(self._temp)
+            self._temp = None
+
+
+def _open_compressed(filename, extension):
+    if extension == '.gz':
+        return gzip.GzipFile(filename, 'rb')
+    return bz2.BZ2File(filename, 'rb')
+
+
+class _ThreadedReader(io.RawIOBase):
+    """A readable stream of the data in another one, which is read in chunks
+    by a background thread. At most _QUEUE_SIZE chunks are read ahead.
+    """
+    def __init__(self, fh):
+        self._fh = fh
+        self._queue = queue.Queue(_QUEUE_SIZE)
+        self._chunk = b''
+        self._offset = 0
+        self._eof = False
+        self._closing = False
+        self._thread = threading.Thread(target=self._read_ahead)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _read_ahead(self):
+        try:
+            while not self._closing:
+                chunk = self._fh.read(_CHUNK_SIZE)
+                self._queue.put(chunk)
+                if not chunk:
+                    break
+        except Exception as e:
+            self._queue.put(e)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._offset == len(self._chunk):
+            if self._eof:
+                return 0
+            chunk = self._queue.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if not chunk:
+                self._eof = True
+                return 0
+            self._chunk, self._offset = chunk, 0
+
+        n = min(len(buffer), len(self._chunk) - self._offset)
+        buffer[:n] = self._chunk[self._offset:self._offset + n]
+        self._offset += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            # stop the thread, unblocking it if the queue is full
+            self._closing = True
+            while self._thread.is_alive():
+                try:
+                    self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self._fh.close()
+        super(_ThreadedReader, self).close()
@@ -168,8 +168,8 @@ def geometry_extensions():
             include_dirs=['mdtraj/geometry/include',
                           'mdtraj/geometry/src/kernels'],
             define_macros=define_macros,
-            extra_compile_args=compiler_args,
-            libraries=extra_cpp_libraries,
+            extra_compile_args=compiler_args + compiler.compiler_args_openmp,
+            libraries=extra_cpp_libraries + compiler.compiler_libraries_openmp,
             language='c++'),
         Extension('mdtraj.geometry.drid',
             sources=["mdtraj/geometry/drid.pyx",
@@ -186,7 +186,8 @@ def geometry_extensions():
                      "mdtraj/geometry/src/neighbors.cpp"],
             include_dirs=["mdtraj/geometry/include",],
             define_macros=define_macros,
-            extra_compile_args=compiler_args,
+            extra_compile_args=compiler_args + compiler.compiler_args_openmp,
+            libraries=compiler.compiler_libraries_openmp,
             language='c++'),
         ]
 